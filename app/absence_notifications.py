@@ -0,0 +1,318 @@
+"""
+Bulk absence alerts.
+
+After a class day, every student whose absences in an assigned course
+reached ABSENCE_ALERT_THRESHOLD is emailed (and, optionally, each course's
+faculty gets one summary of those students). The pipeline is built for
+thousands of recipients:
+
+    - one query over attendance_monthly_rollup finds every recipient among
+      the students still enrolled in the current term's classes
+    - the templates are filled with the shared values once; each message
+      only substitutes the recipient's own fields
+    - messages go out over a few reused SMTP sessions (SMTPConnectionPool),
+      throttled to ABSENCE_ALERT_RATE messages per second
+
+absence_notifications remembers the absence count each student was last
+alerted at, so running this again only alerts students whose count has
+grown since. Run it from the command line with send_absence_alerts.py.
+"""
+import html
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from string import Template
+
+from .config import (
+    APP_NAME,
+    ABSENCE_ALERT_THRESHOLD,
+    ABSENCE_ALERT_RATE,
+    EMAIL_SMTP_POOL_SIZE,
+    EMAIL_ABSENCE_ALERT_SUBJECT
+)
+from .email_outbox import SMTPConnectionPool
+
+# Delivered alerts recorded per transaction
+RECORD_BATCH_SIZE = 100
+
+
+def create_notification_schema(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS absence_notifications (
+            user_id INTEGER NOT NULL,
+            assigned_course_id INTEGER NOT NULL,
+            absences INTEGER NOT NULL,
+            notified_at TEXT NOT NULL,
+            PRIMARY KEY (user_id, assigned_course_id)
+        ) WITHOUT ROWID
+    """)
+
+
+_STUDENT_TEXT = Template("""
+Hello $first_name,
+
+You have been absent $absences times in $course_code - $course_name ($section_name).
+
+Please coordinate with your instructor about the classes you have missed.
+
+Best regards,
+The $app_name Team
+""".strip())
+
+_STUDENT_HTML = Template("""
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #dc3545;">Absence Alert</h2>
+        <p>Hello $first_name,</p>
+        <p>You have been absent <strong>$absences times</strong> in
+           <strong>$course_code - $course_name</strong> ($section_name).</p>
+        <p>Please coordinate with your instructor about the classes you have missed.</p>
+        <p>Best regards,<br>The $app_name Team</p>
+    </div>
+</body>
+</html>
+""".strip())
+
+_FACULTY_TEXT = Template("""
+Hello $first_name,
+
+These students in $course_code - $course_name ($section_name) have reached $threshold or more absences:
+
+$students
+
+Best regards,
+The $app_name Team
+""".strip())
+
+
+class _RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def find_current_term(conn):
+    """
+    The (academic_year, semester) of the class with the most recent
+    attendance, or None if nothing has been recorded yet.
+
+    Classes created ahead of the next term have no attendance, so they do
+    not move the current term forward early.
+    """
+    row = conn.execute("""
+        SELECT ac.academic_year, ac.semester
+        FROM attendance_daily_rollup dr
+        JOIN assigned_courses ac ON ac.id = dr.assigned_course_id AND ac.isDeleted = 0
+        ORDER BY dr.date DESC
+        LIMIT 1
+    """).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def find_absence_recipients(conn, threshold, assigned_course_id=None, term=None):
+    """
+    Students due an absence alert: still enrolled in the class, absences
+    >= threshold and more than when they were last alerted for that course.
+
+    Only classes of the current term (see find_current_term) are checked
+    unless one class is given, so past classes are never reported.
+
+    Returns:
+        list: sqlite3.Row with user, course, section and faculty fields
+    """
+    if assigned_course_id is not None:
+        course_filter = "assigned_course_id = ?"
+        params = [assigned_course_id]
+    else:
+        term = term or find_current_term(conn)
+        if term is None:
+            return []
+        course_filter = """assigned_course_id IN (
+                SELECT id FROM assigned_courses
+                WHERE academic_year = ? AND semester = ? AND isDeleted = 0
+            )"""
+        params = list(term)
+    params.append(threshold)
+    return conn.execute(f"""
+        WITH absences AS (
+            SELECT user_id, assigned_course_id, SUM(absent_count) AS absences
+            FROM attendance_monthly_rollup
+            WHERE {course_filter}
+            GROUP BY user_id, assigned_course_id
+            HAVING SUM(absent_count) >= ?
+        )
+        SELECT a.user_id, a.assigned_course_id, a.absences,
+               u.first_name, u.last_name, u.email,
+               c.name AS course_name, c.code AS course_code, s.name AS section_name,
+               ac.faculty_id, f.first_name AS faculty_first_name, f.email AS faculty_email
+        FROM absences a
+        JOIN users u ON u.id = a.user_id AND u.isDeleted = 0
+        JOIN students st ON st.user_id = a.user_id
+        JOIN assigned_course_approvals aca
+            ON aca.assigned_course_id = a.assigned_course_id AND aca.student_id = st.id
+            AND aca.status = 'enrolled'
+        JOIN assigned_courses ac ON ac.id = a.assigned_course_id AND ac.isDeleted = 0
+        JOIN courses c ON c.id = ac.course_id
+        JOIN sections s ON s.id = ac.section_id
+        LEFT JOIN users f ON f.id = ac.faculty_id AND f.isDeleted = 0
+        LEFT JOIN absence_notifications n
+            ON n.user_id = a.user_id AND n.assigned_course_id = a.assigned_course_id
+        WHERE a.absences > COALESCE(n.absences, 0)
+        ORDER BY a.assigned_course_id, u.last_name, u.first_name
+    """, params).fetchall()
+
+
+class AbsenceNotifier:
+    """Sends absence alerts for one database"""
+
+    def __init__(self, pool, mailer, rate=ABSENCE_ALERT_RATE, connections=EMAIL_SMTP_POOL_SIZE):
+        self.pool = pool
+        self.mailer = mailer
+        self.rate = rate
+        self.connections = max(1, connections)
+
+    def _render_messages(self, recipients, threshold, include_faculty):
+        """Yield (to_email, subject, text, html, recipient or None) for every alert"""
+        shared = {'app_name': APP_NAME, 'threshold': threshold}
+        student_text = Template(_STUDENT_TEXT.safe_substitute(shared))
+        student_html = Template(_STUDENT_HTML.safe_substitute({k: html.escape(str(v)) for k, v in shared.items()}))
+
+        for row in recipients:
+            if not row['email']:
+                continue
+            fields = {
+                'first_name': row['first_name'],
+                'absences': row['absences'],
+                'course_code': row['course_code'] or '',
+                'course_name': row['course_name'],
+                'section_name': row['section_name'],
+            }
+            yield (
+                row['email'],
+                EMAIL_ABSENCE_ALERT_SUBJECT,
+                student_text.substitute(fields),
+                student_html.substitute({k: html.escape(str(v)) for k, v in fields.items()}),
+                row
+            )
+
+        if not include_faculty:
+            return
+
+        faculty_text = Template(_FACULTY_TEXT.safe_substitute(shared))
+        by_course = {}
+        for row in recipients:
+            if row['faculty_email']:
+                by_course.setdefault(row['assigned_course_id'], []).append(row)
+        for rows in by_course.values():
+            first = rows[0]
+            students = "\n".join(f"  - {r['last_name']}, {r['first_name']}: {r['absences']} absences" for r in rows)
+            yield (
+                first['faculty_email'],
+                f"{EMAIL_ABSENCE_ALERT_SUBJECT} - {first['course_code'] or first['course_name']}",
+                faculty_text.substitute(
+                    first_name=first['faculty_first_name'],
+                    course_code=first['course_code'] or '',
+                    course_name=first['course_name'],
+                    section_name=first['section_name'],
+                    students=students
+                ),
+                None,
+                None
+            )
+
+    def send(self, threshold=ABSENCE_ALERT_THRESHOLD, include_faculty=False, assigned_course_id=None,
+             dry_run=False, progress=None):
+        """
+        Find the students due an alert and email them.
+
+        Args:
+            threshold (int): Absences that trigger an alert
+            include_faculty (bool): Also send each course's faculty a summary
+            assigned_course_id (int, optional): Only this class
+            dry_run (bool): Only count recipients
+            progress (callable, optional): progress(done, total, sent, failed)
+
+        Returns:
+            dict: recipients, messages, sent, failed, errors (first few), seconds
+        """
+        started = time.perf_counter()
+        conn = self.pool.acquire()
+        try:
+            recipients = find_absence_recipients(conn, threshold, assigned_course_id)
+        finally:
+            conn.close()
+
+        messages = list(self._render_messages(recipients, threshold, include_faculty))
+        summary = {'recipients': len(recipients), 'messages': len(messages), 'sent': 0, 'failed': 0, 'errors': []}
+        if dry_run or not messages:
+            summary['seconds'] = time.perf_counter() - started
+            return summary
+
+        smtp_pool = SMTPConnectionPool(self.mailer._create_smtp_connection, max_connections=self.connections)
+        limiter = _RateLimiter(self.rate)
+
+        def deliver(message):
+            to_email, subject, body_text, body_html, _ = message
+            limiter.wait()
+            mime = self.mailer.build_message(to_email, subject, body_text, body_html)
+            smtp_pool.send(self.mailer.email, to_email, mime.as_string())
+
+        delivered = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.connections, thread_name_prefix="absence-alert") as executor:
+                futures = {executor.submit(deliver, message): message for message in messages}
+                for done, future in enumerate(as_completed(futures), 1):
+                    to_email, _, _, _, row = futures[future]
+                    error = future.exception()
+                    if error is None:
+                        summary['sent'] += 1
+                        if row is not None:
+                            delivered.append(row)
+                    else:
+                        summary['failed'] += 1
+                        if len(summary['errors']) < 10:
+                            summary['errors'].append(f"{to_email}: {error}")
+
+                    if len(delivered) >= RECORD_BATCH_SIZE:
+                        self._record_delivered(delivered)
+                        delivered = []
+                    if progress:
+                        progress(done, len(messages), summary['sent'], summary['failed'])
+        finally:
+            self._record_delivered(delivered)
+            smtp_pool.close_all()
+
+        summary['seconds'] = time.perf_counter() - started
+        return summary
+
+    def _record_delivered(self, rows):
+        if not rows:
+            return
+        now = datetime.now().isoformat(timespec='seconds')
+        conn = self.pool.acquire()
+        try:
+            conn.executemany("""
+                INSERT INTO absence_notifications (user_id, assigned_course_id, absences, notified_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id, assigned_course_id) DO UPDATE SET
+                    absences = excluded.absences,
+                    notified_at = excluded.notified_at
+            """, [(row['user_id'], row['assigned_course_id'], row['absences'], now) for row in rows])
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,203 @@
+"""
+Materialized attendance summaries.
+
+Two rollup tables are kept in sync with attendance_logs by triggers:
+
+    attendance_daily_rollup    one row per (assigned_course_id, day)
+    attendance_monthly_rollup  one row per (user_id, assigned_course_id, month)
+
+Each row holds present/absent/late/total counts. Section, course and
+program totals are derived by joining assigned_courses, which is small, so
+the statistics queries no longer depend on the size of attendance_logs.
+
+The day key is the first 10 characters of attendance_logs.date
+(YYYY-MM-DD) and the month key the first 7 (YYYY-MM).
+
+Rebuild from scratch with:
+    python -m app.attendance_rollups
+"""
+import sqlite3
+
+
+ROLLUP_TABLES = ['attendance_daily_rollup', 'attendance_monthly_rollup']
+
+_CREATE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS attendance_daily_rollup (
+        assigned_course_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        present_count INTEGER NOT NULL DEFAULT 0,
+        absent_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (assigned_course_id, date)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS attendance_monthly_rollup (
+        user_id INTEGER NOT NULL,
+        assigned_course_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        present_count INTEGER NOT NULL DEFAULT 0,
+        absent_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, assigned_course_id, month)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_attendance_daily_rollup_date ON attendance_daily_rollup (date)",
+    """
+    CREATE INDEX IF NOT EXISTS ix_attendance_monthly_rollup_course
+    ON attendance_monthly_rollup (assigned_course_id, month, user_id)
+    """,
+]
+
+
+def _apply_sql(row, sign):
+    """Statements that add (sign=1) or remove (sign=-1) one log row's contribution"""
+    present = f"CASE WHEN {row}.status = 'present' THEN {sign} ELSE 0 END"
+    absent = f"CASE WHEN {row}.status = 'absent' THEN {sign} ELSE 0 END"
+    late = f"CASE WHEN {row}.status = 'late' THEN {sign} ELSE 0 END"
+    return f"""
+        INSERT INTO attendance_daily_rollup
+            (assigned_course_id, date, present_count, absent_count, late_count, total_count)
+        VALUES ({row}.assigned_course_id, SUBSTR({row}.date, 1, 10), {present}, {absent}, {late}, {sign})
+        ON CONFLICT (assigned_course_id, date) DO UPDATE SET
+            present_count = present_count + excluded.present_count,
+            absent_count = absent_count + excluded.absent_count,
+            late_count = late_count + excluded.late_count,
+            total_count = total_count + excluded.total_count;
+
+        INSERT INTO attendance_monthly_rollup
+            (user_id, assigned_course_id, month, present_count, absent_count, late_count, total_count)
+        VALUES ({row}.user_id, {row}.assigned_course_id, SUBSTR({row}.date, 1, 7), {present}, {absent}, {late}, {sign})
+        ON CONFLICT (user_id, assigned_course_id, month) DO UPDATE SET
+            present_count = present_count + excluded.present_count,
+            absent_count = absent_count + excluded.absent_count,
+            late_count = late_count + excluded.late_count,
+            total_count = total_count + excluded.total_count;
+    """
+
+
+# Rows that drop to zero are removed so LEFT JOINs and DISTINCT counts
+# behave exactly as they would against attendance_logs.
+_PRUNE_SQL = """
+        DELETE FROM attendance_daily_rollup
+        WHERE assigned_course_id = OLD.assigned_course_id
+          AND date = SUBSTR(OLD.date, 1, 10) AND total_count <= 0;
+
+        DELETE FROM attendance_monthly_rollup
+        WHERE user_id = OLD.user_id AND assigned_course_id = OLD.assigned_course_id
+          AND month = SUBSTR(OLD.date, 1, 7) AND total_count <= 0;
+"""
+
+_CREATE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_logs_rollup_insert
+    AFTER INSERT ON attendance_logs
+    BEGIN
+        {_apply_sql('NEW', 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_logs_rollup_delete
+    AFTER DELETE ON attendance_logs
+    BEGIN
+        {_apply_sql('OLD', -1)}
+        {_PRUNE_SQL}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_logs_rollup_update
+    AFTER UPDATE OF user_id, assigned_course_id, date, status ON attendance_logs
+    BEGIN
+        {_apply_sql('OLD', -1)}
+        {_PRUNE_SQL}
+        {_apply_sql('NEW', 1)}
+    END
+    """,
+]
+
+
+def create_rollup_schema(cursor):
+    """Create the rollup tables and the triggers that maintain them"""
+    for statement in _CREATE_TABLES + _CREATE_TRIGGERS:
+        cursor.execute(statement)
+
+
+def populate_rollups(cursor):
+    """Fill the (empty) rollup tables from attendance_logs"""
+    cursor.execute("""
+        INSERT INTO attendance_daily_rollup
+            (assigned_course_id, date, present_count, absent_count, late_count, total_count)
+        SELECT
+            assigned_course_id,
+            SUBSTR(date, 1, 10),
+            SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+            COUNT(*)
+        FROM attendance_logs
+        GROUP BY assigned_course_id, SUBSTR(date, 1, 10)
+    """)
+    cursor.execute("""
+        INSERT INTO attendance_monthly_rollup
+            (user_id, assigned_course_id, month, present_count, absent_count, late_count, total_count)
+        SELECT
+            user_id,
+            assigned_course_id,
+            SUBSTR(date, 1, 7),
+            SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+            COUNT(*)
+        FROM attendance_logs
+        GROUP BY user_id, assigned_course_id, SUBSTR(date, 1, 7)
+    """)
+
+
+def rebuild_rollups(conn):
+    """
+    Regenerate both rollup tables from attendance_logs in one transaction.
+
+    Use after bulk loads that bypassed the triggers or if the
+    rollups are suspected to have drifted.
+
+    Returns:
+        dict: Row counts of the rebuilt tables
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        create_rollup_schema(cursor)
+        for table in ROLLUP_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        populate_rollups(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    counts = {}
+    for table in ROLLUP_TABLES:
+        counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return counts
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    db_path = os.getenv('DB_PATH')
+    if not db_path or not os.path.exists(db_path):
+        print("❌ Database not found. Check DB_PATH in your .env file")
+        raise SystemExit(1)
+
+    print("Rebuilding attendance rollups...")
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        for table, count in rebuild_rollups(conn).items():
+            print(f"✓ {table}: {count} rows")
+    finally:
+        conn.close()
@@ -0,0 +1,206 @@
+"""
+Grouped write path for attendance check-ins.
+
+At the start of a period a whole section checks in within a couple of
+minutes, often several faces per kiosk frame. Instead of one transaction
+(and one fsync) per check-in, AttendanceWriter collects the check-ins that
+arrive within ATTENDANCE_BATCH_WINDOW seconds on a single writer thread
+and records them in one transaction.
+
+Each check-in is an upsert on (user_id, assigned_course_id, date), so a
+repeated scan of the same student is a no-op; only an 'absent' mark is
+upgraded to the scanned status.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from .blob_store import store_blob
+from .config import ATTENDANCE_BATCH_WINDOW
+
+# Upper bound on check-ins written in one transaction
+ATTENDANCE_MAX_BATCH = 200
+
+_STOP = object()
+
+
+class AttendanceWriter:
+    """Single writer thread that records queued check-ins in grouped transactions"""
+
+    def __init__(self, pool, batch_window=ATTENDANCE_BATCH_WINDOW, max_batch=ATTENDANCE_MAX_BATCH):
+        self.pool = pool
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, assigned_course_id, date, status, image_data=None, timestamp=None):
+        """
+        Queue one check-in.
+
+        Returns:
+            Future: resolves to (success, {'id', 'status', 'created'} or error message)
+        """
+        future = Future()
+        record = {
+            'user_id': user_id,
+            'assigned_course_id': assigned_course_id,
+            'date': date,
+            'status': status,
+            'image_data': image_data,
+            'timestamp': (timestamp or datetime.now()).isoformat(sep=' ', timespec='seconds'),
+        }
+        self._ensure_thread()
+        self._queue.put((record, future))
+        return future
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written"""
+        future = Future()
+        self._ensure_thread()
+        self._queue.put((None, future))
+        return future.result(timeout)
+
+    def close(self, timeout=5):
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_thread(self):
+        # Also restarts a writer thread that died, so later check-ins are still written
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            # Gather whatever else arrives within the batch window
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # _write_batch resolved the batch's futures; keep serving the queue
+                print(f"Attendance writer error: {e}")
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        records = [(record, future) for record, future in batch if record is not None]
+        try:
+            results = self._write_records([record for record, _ in records]) if records else []
+            for (_, future), result in zip(records, results):
+                future.set_result(result)
+            # Markers complete once everything queued before them is written
+            for record, future in batch:
+                if record is None:
+                    future.set_result((True, len(records)))
+        finally:
+            # Whatever went wrong, nobody waiting on this batch is left hanging
+            for _, future in batch:
+                if not future.done():
+                    future.set_result((False, "Attendance could not be written"))
+
+    def _write_records(self, records):
+        """Write check-ins in one transaction; returns one result per record"""
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            results = [_record_in_savepoint(cursor, record) for record in records]
+            conn.commit()
+            return results
+        except Exception as e:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+            print(f"Error writing attendance batch: {e}")
+            return [(False, str(e))] * len(records)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def _record_in_savepoint(cursor, record):
+    """A failing check-in is reported on its own without undoing the rest of the batch"""
+    cursor.execute("SAVEPOINT check_in")
+    try:
+        result = _record_check_in(cursor, record)
+    except Exception as e:
+        cursor.execute("ROLLBACK TO check_in")
+        print(f"Error recording attendance for user {record['user_id']}: {e}")
+        result = (False, str(e))
+    cursor.execute("RELEASE check_in")
+    return result
+
+
+def _record_check_in(cursor, record):
+    """Upsert one check-in inside the batch transaction"""
+    cursor.execute("""
+        SELECT id, status FROM attendance_logs
+        WHERE user_id = ? AND assigned_course_id = ? AND date = ?
+    """, (record['user_id'], record['assigned_course_id'], record['date']))
+    existing = cursor.fetchone()
+    if existing and existing[1] != 'absent':
+        # Already checked in: nothing to write, not even the image
+        return True, {'id': existing[0], 'status': existing[1], 'created': False}
+
+    image_hash = store_blob(cursor, record['image_data']) if record['image_data'] else None
+    cursor.execute("""
+        INSERT INTO attendance_logs
+            (user_id, assigned_course_id, date, status, image_hash, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, assigned_course_id, date) DO UPDATE SET
+            status = excluded.status,
+            image_hash = excluded.image_hash,
+            updated_at = excluded.updated_at
+        WHERE attendance_logs.status = 'absent'
+    """, (
+        record['user_id'], record['assigned_course_id'], record['date'], record['status'],
+        image_hash, record['timestamp'], record['timestamp']
+    ))
+    row_id = existing[0] if existing else cursor.lastrowid
+    return True, {'id': row_id, 'status': record['status'], 'created': True}
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_attendance_writer(pool):
+    """Return the shared writer for a connection pool (one writer per database)"""
+    with _writers_lock:
+        writer = _writers.get(pool.db_path)
+        if writer is None:
+            writer = _writers[pool.db_path] = AttendanceWriter(pool)
+        return writer
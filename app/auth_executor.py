@@ -0,0 +1,146 @@
+"""
+Password hashing off the Tk event loop.
+
+bcrypt at a realistic cost factor takes hundreds of milliseconds, which
+froze the login and password reset screens while it ran. The auth calls
+are submitted to a small worker pool instead (bcrypt releases the GIL, so
+the UI keeps redrawing) and the screens poll the returned future with
+await_future(), which uses widget.after() so the callback runs on the Tk
+thread.
+
+Each stage of an auth call (user lookup, hash verify, OTP check, hashing
+a new password, rehash) is timed; get_auth_latency_stats() summarises
+the recent samples.
+
+Hashes are created with BCRYPT_ROUNDS. When that setting changes, a
+user's hash is upgraded the next time they log in (needs_rehash).
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import bcrypt
+
+from .config import BCRYPT_ROUNDS, AUTH_HASH_WORKERS
+
+# Samples kept per stage for the latency summary
+LATENCY_SAMPLES = 500
+# Milliseconds between checks of a pending auth future
+POLL_INTERVAL_MS = 30
+
+
+def hash_password(password, rounds=None):
+    """bcrypt hash of a password at the configured cost, as a str"""
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def check_password(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def needs_rehash(password_hash, rounds=None):
+    """True if a hash was made with a different cost factor than configured"""
+    try:
+        return int(password_hash.split('$')[2]) != (rounds or BCRYPT_ROUNDS)
+    except (IndexError, ValueError):
+        return False
+
+
+class LatencyStats:
+    """Recent timings per stage"""
+
+    def __init__(self, max_samples=LATENCY_SAMPLES):
+        self._samples = {}
+        self._counts = {}
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self._max_samples)
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    @contextmanager
+    def timed(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def summary(self):
+        """
+        Returns:
+            dict: {stage: {'count', 'avg_ms', 'p95_ms', 'max_ms'}} over the recent samples
+        """
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        result = {}
+        for stage, samples in snapshot.items():
+            result[stage] = {
+                'count': counts[stage],
+                'avg_ms': round(1000 * sum(samples) / len(samples), 2),
+                'p95_ms': round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                'max_ms': round(1000 * samples[-1], 2),
+            }
+        return result
+
+
+auth_latency = LatencyStats()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_auth_executor():
+    """Shared worker pool for auth calls"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="auth")
+        return _executor
+
+
+def get_auth_latency_stats():
+    return auth_latency.summary()
+
+
+def await_future(widget, future, callback, interval=POLL_INTERVAL_MS, timeout=None, timeout_message="Timed out"):
+    """
+    Call callback(result) on the Tk thread once future is done.
+
+    An exception raised by the auth call is passed to the callback as a
+    (False, message) result, matching the managers' return convention.
+    If timeout seconds pass first the callback gets (False, timeout_message)
+    and the future is left to finish on its own. Nothing is called if the
+    widget was destroyed meanwhile.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def poll():
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        if not future.done():
+            if deadline is not None and time.monotonic() >= deadline:
+                callback((False, timeout_message))
+                return
+            widget.after(interval, poll)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            result = (False, str(e))
+        callback(result)
+
+    widget.after(interval, poll)
@@ -0,0 +1,255 @@
+"""
+Content-addressed storage for face and attendance images.
+
+Image bytes live outside SQLite, keyed by their SHA-256 hash. Rows only
+keep the hash (users.face_image_hash and face_thumbnail_hash,
+attendance_logs.image_hash), and the blobs table records size,
+dimensions and a reference count that triggers keep up to date as those
+columns change. Identical images are stored once.
+
+Blobs whose reference count drops to zero stay on disk until
+collect_garbage() removes them, so a blob can be re-referenced cheaply
+and nothing is deleted while a writer is still using it.
+
+The default backend is a directory under UPLOAD_DIR (BLOB_STORE_DIR),
+sharded by the first characters of the hash. Another backend can be
+plugged in with set_blob_store().
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from .config import BLOB_STORE_DIR
+
+
+# (table, column) pairs that reference blobs by hash
+BLOB_REFERENCES = [
+    ('users', 'face_image_hash'),
+    ('users', 'face_thumbnail_hash'),
+    ('attendance_logs', 'image_hash'),
+]
+
+
+class BlobStore(ABC):
+    """Interface for blob backends. Keys are hex SHA-256 digests."""
+
+    @abstractmethod
+    def put(self, blob_hash, data):
+        """Store bytes under a hash; storing an existing hash again is a no-op"""
+
+    @abstractmethod
+    def get(self, blob_hash):
+        """Return the bytes for a hash, or None if there is no such blob"""
+
+    @abstractmethod
+    def exists(self, blob_hash):
+        """Return whether a blob is stored under the hash"""
+
+    @abstractmethod
+    def delete(self, blob_hash):
+        """Remove a blob; deleting a missing hash is not an error"""
+
+
+class FileSystemBlobStore(BlobStore):
+    """Stores each blob as a file at <root>/<h[0:2]>/<h[2:4]>/<h>"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, blob_hash):
+        return os.path.join(self.root, blob_hash[0:2], blob_hash[2:4], blob_hash)
+
+    def put(self, blob_hash, data):
+        path = self.path_for(blob_hash)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get(self, blob_hash):
+        try:
+            with open(self.path_for(blob_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path_for(blob_hash))
+
+    def delete(self, blob_hash):
+        try:
+            os.remove(self.path_for(blob_hash))
+        except FileNotFoundError:
+            pass
+
+
+_blob_store = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Return the configured blob store, creating the default on first use"""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = FileSystemBlobStore(BLOB_STORE_DIR)
+        return _blob_store
+
+
+def set_blob_store(store):
+    """Replace the blob backend used by the application"""
+    global _blob_store
+    with _blob_store_lock:
+        _blob_store = store
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _image_dimensions(data):
+    """Return (width, height) of an image, or (None, None) if it cannot be read"""
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def _reference_triggers(table, column):
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_ref_insert
+        AFTER INSERT ON {table}
+        WHEN NEW.{column} IS NOT NULL
+        BEGIN
+            UPDATE blobs SET ref_count = ref_count + 1 WHERE hash = NEW.{column};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_ref_update
+        AFTER UPDATE OF {column} ON {table}
+        WHEN OLD.{column} IS NOT NEW.{column}
+        BEGIN
+            UPDATE blobs SET ref_count = ref_count - 1 WHERE hash = OLD.{column};
+            UPDATE blobs SET ref_count = ref_count + 1 WHERE hash = NEW.{column};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_ref_delete
+        AFTER DELETE ON {table}
+        WHEN OLD.{column} IS NOT NULL
+        BEGIN
+            UPDATE blobs SET ref_count = ref_count - 1 WHERE hash = OLD.{column};
+        END
+        """,
+    ]
+
+
+def create_blob_schema(cursor):
+    """Create the blobs table and the reference-counting triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            width INTEGER,
+            height INTEGER,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_blobs_unreferenced ON blobs (hash) WHERE ref_count <= 0")
+    for table, column in BLOB_REFERENCES:
+        # Columns added by later migrations get their triggers when they are added
+        cursor.execute(f"PRAGMA table_info({table})")
+        if not any(row[1] == column for row in cursor.fetchall()):
+            continue
+        for statement in _reference_triggers(table, column):
+            cursor.execute(statement)
+
+
+def store_blob(cursor, data, store=None):
+    """
+    Save bytes to the blob store and register them in the blobs table.
+
+    Call inside the transaction that writes the referencing row: the
+    reference count is only incremented when that row is written, and the
+    blobs row is inserted before the file so garbage collection (which
+    holds the write lock) cannot remove the file in between.
+
+    Returns:
+        str: The content hash to store in the referencing column
+    """
+    store = store or get_blob_store()
+    blob_hash = content_hash(data)
+    width, height = _image_dimensions(data)
+    cursor.execute("""
+        INSERT OR IGNORE INTO blobs (hash, size, width, height, ref_count, created_at)
+        VALUES (?, ?, ?, ?, 0, ?)
+    """, (blob_hash, len(data), width, height, datetime.now().isoformat()))
+    store.put(blob_hash, data)
+    return blob_hash
+
+
+def load_blob(blob_hash, store=None):
+    """Return the bytes for a hash, or None if there is no such blob"""
+    if not blob_hash:
+        return None
+    return (store or get_blob_store()).get(blob_hash)
+
+
+def collect_garbage(conn, store=None):
+    """
+    Delete blobs that are no longer referenced by any row.
+
+    The blobs rows are deleted and committed first, then the files are
+    removed, so a failed commit never leaves rows pointing at missing
+    files. A file that could not be removed is only wasted space.
+
+    Returns:
+        int: Number of blobs removed
+    """
+    store = store or get_blob_store()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT hash FROM blobs WHERE ref_count <= 0")
+        unreferenced = [row[0] for row in cursor.fetchall()]
+        cursor.executemany("DELETE FROM blobs WHERE hash = ?", [(blob_hash,) for blob_hash in unreferenced])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if not unreferenced:
+        return 0
+
+    # A writer may have stored one of these blobs again since the commit.
+    # Holding the write lock keeps store_blob() out while the files go.
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        for blob_hash in unreferenced:
+            cursor.execute("SELECT 1 FROM blobs WHERE hash = ?", (blob_hash,))
+            if cursor.fetchone() is None:
+                store.delete(blob_hash)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error removing unreferenced blob files: {e}")
+    return len(unreferenced)
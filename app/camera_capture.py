@@ -0,0 +1,183 @@
+"""
+Shared camera capture for the check-in, kiosk and registration screens.
+
+A dedicated thread grabs frames from the camera as fast as it delivers
+them and keeps only the most recent one. Consumers (the on-screen preview,
+face validation, the kiosk's identification loop) take that latest frame
+when they are ready for it; frames nobody took before the next one arrived
+are dropped and counted rather than queued, so a slow consumer never falls
+behind the camera.
+
+Frames are read into two preallocated buffers that swap roles, so grabbing
+does not allocate once the first frame has arrived. read_into() copies the
+latest frame into a caller-owned buffer for the same reason.
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Frames the FPS figures are averaged over
+FPS_WINDOW = 30
+# Consecutive failed reads after which the camera is given up on
+MAX_FAILED_READS = 30
+
+
+def _fps(timestamps):
+    if len(timestamps) < 2 or timestamps[-1] == timestamps[0]:
+        return 0.0
+    return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+
+class CameraCapture:
+    """Camera with a grab thread and a single-slot latest-frame buffer"""
+
+    def __init__(self, device=0):
+        self.device = device
+        self.camera = None
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+
+        self._back = None      # being filled by the grab thread
+        self._latest = None    # most recent complete frame (BGR)
+        self._sequence = 0     # number of the latest frame, 0 before the first
+        self._taken = 0        # last sequence number a consumer read
+
+        self._grabbed = 0
+        self._dropped = 0
+        self._failed_reads = 0
+        self._grab_times = deque(maxlen=FPS_WINDOW)
+        # Set when the camera stopped delivering frames on its own
+        self.error = None
+
+    def start(self):
+        """Open the camera and start grabbing; returns False if it cannot be opened"""
+        if self._running:
+            return True
+        camera = cv2.VideoCapture(self.device)
+        if not camera.isOpened():
+            camera.release()
+            return False
+
+        self.camera = camera
+        self.error = None
+        self._failed_reads = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._grab_loop, args=(camera,), name="camera-grab", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop grabbing and release the camera.
+
+        The grab thread releases the camera itself when it exits, so the
+        device is never released while a read is still in progress; if the
+        thread is stuck in a read past the join timeout, the release happens
+        once that read returns.
+        """
+        self._running = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+            if thread.is_alive():
+                print("Camera read still in progress; the camera is released when it returns")
+        elif thread is None and self.camera is not None:
+            self._release(self.camera)
+
+    def _release(self, camera):
+        try:
+            camera.release()
+        except cv2.error as e:
+            print(f"Error releasing camera: {e}")
+        with self._lock:
+            if self.camera is camera:
+                self.camera = None
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def _grab_loop(self, camera):
+        try:
+            self._grab_frames(camera)
+        finally:
+            self._release(camera)
+            with self._frame_ready:
+                self._frame_ready.notify_all()
+
+    def _grab_frames(self, camera):
+        # A thread left in a read by stop() exits there if start() opened a new camera meanwhile
+        while self._running and self.camera is camera:
+            # VideoCapture.read blocks until the camera delivers the next frame and
+            # fills the buffer passed in when its shape matches
+            try:
+                ok, frame = camera.read(self._back)
+            except cv2.error as e:
+                print(f"Camera read error: {e}")
+                ok, frame = False, None
+
+            if not ok:
+                self._failed_reads += 1
+                if self._failed_reads >= MAX_FAILED_READS:
+                    print("Camera stopped delivering frames")
+                    self.error = "The camera stopped delivering frames. Please check the connection and start it again."
+                    self._running = False
+                    break
+                time.sleep(0.01)
+                continue
+
+            self._failed_reads = 0
+            with self._frame_ready:
+                if self._sequence > self._taken:
+                    self._dropped += 1
+                # Swap buffers instead of copying the frame
+                self._back, self._latest = self._latest, frame
+                self._sequence += 1
+                self._grabbed += 1
+                self._grab_times.append(time.monotonic())
+                self._frame_ready.notify_all()
+
+    def read_into(self, out=None, newer_than=0, timeout=0.0):
+        """
+        Copy the latest frame into out.
+
+        out is reused when it has the frame's shape and is replaced by a new
+        array otherwise, so pass back what the previous call returned.
+        Returns (sequence, frame), or (sequence, None) when there is no
+        frame newer than newer_than within timeout seconds.
+        """
+        with self._frame_ready:
+            if self._sequence <= newer_than and timeout > 0 and self._running:
+                self._frame_ready.wait_for(lambda: self._sequence > newer_than or not self._running, timeout)
+            if self._latest is None or self._sequence <= newer_than:
+                return self._sequence, None
+            if out is None or out.shape != self._latest.shape or out.dtype != self._latest.dtype:
+                out = np.empty_like(self._latest)
+            np.copyto(out, self._latest)
+            self._taken = self._sequence
+            return self._sequence, out
+
+    def read(self, timeout=1.0):
+        """
+        A copy of the latest BGR frame for keeping (captures, identification).
+
+        Waits up to timeout seconds for the first frame; returns None without one.
+        """
+        _, frame = self.read_into(None, timeout=timeout if self._sequence == 0 else 0.0)
+        return frame
+
+    def get_stats(self):
+        """Frames grabbed and dropped, and the rate the camera delivers them"""
+        with self._lock:
+            return {
+                'grabbed': self._grabbed,
+                'dropped': self._dropped,
+                'capture_fps': round(_fps(self._grab_times), 1),
+            }
@@ -13,6 +13,19 @@ db_dir = os.path.dirname(DB_PATH)
 if not os.path.exists(db_dir):
     os.makedirs(db_dir, exist_ok=True)
 
+# Database connection pool settings
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))  # Max connections checked out at once
+DB_POOL_MAX_IDLE_PER_THREAD = int(os.getenv('DB_POOL_MAX_IDLE_PER_THREAD', '2'))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))  # Seconds idle before ping
+
+# SQL tracing (diagnostics; adds overhead to every statement while enabled)
+SQL_TRACE = os.getenv('SQL_TRACE', 'False').lower() == 'true'  # Time every statement, print the slowest at exit
+SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', '100'))  # Statements at least this slow go to the slow-query log
+SQL_SLOW_QUERY_LOG = os.getenv('SQL_SLOW_QUERY_LOG', os.path.join(db_dir, 'slow_queries.log'))
+
+# Admin statistics results kept in memory until the tables they read change (0 disables)
+STATISTICS_CACHE_SIZE = int(os.getenv('STATISTICS_CACHE_SIZE', '128'))
+
 # App settings
 APP_NAME = os.getenv('APP_NAME', 'Attendance App')
 APP_VERSION = "1.0.0"
@@ -27,6 +40,32 @@ THEME_NAME = "darkly"  # ttkbootstrap theme
 # Paths - use environment variable or default
 UPLOAD_DIR = os.getenv('UPLOAD_DIR', os.path.join(ROOT_DIR, "uploads"))
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+BLOB_STORE_DIR = os.getenv('BLOB_STORE_DIR', os.path.join(UPLOAD_DIR, "blobs"))  # Face and attendance images
+
+# Face recognition: max distance between 128-d face encodings to count as the same person
+FACE_MATCH_TOLERANCE = float(os.getenv('FACE_MATCH_TOLERANCE', '0.6'))
+# Kiosk identification switches from an exact scan to a clustered index at this many faces
+FACE_INDEX_IVF_THRESHOLD = int(os.getenv('FACE_INDEX_IVF_THRESHOLD', '2000'))
+# Section a kiosk camera checks in (main.py --kiosk without a section id)
+KIOSK_SECTION_ID = os.getenv('KIOSK_SECTION_ID', '')
+# Face detection and encoding run in a separate process, fed frames through shared memory
+VISION_WORKER = os.getenv('VISION_WORKER', 'True').lower() == 'true'
+VISION_RING_SLOTS = int(os.getenv('VISION_RING_SLOTS', '4'))  # Frames that can be in flight to the worker at once
+# Frame quality gate: frames failing these checks are not sent to face matching
+FRAME_MIN_BRIGHTNESS = float(os.getenv('FRAME_MIN_BRIGHTNESS', '50'))  # Mean gray level (0-255) below which a frame is too dark
+FRAME_MAX_BRIGHTNESS = float(os.getenv('FRAME_MAX_BRIGHTNESS', '205'))  # Mean gray level above which a frame is too bright
+FRAME_MIN_SHARPNESS = float(os.getenv('FRAME_MIN_SHARPNESS', '40'))  # Laplacian variance of the face below which it is blurred
+FRAME_MIN_FACE_SIZE = float(os.getenv('FRAME_MIN_FACE_SIZE', '0.15'))  # Face width as a fraction of the frame width
+FRAME_SELECT_WINDOW = float(os.getenv('FRAME_SELECT_WINDOW', '1.0'))  # Seconds of frames check-in picks the best one from
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))  # Cost factor; existing hashes are upgraded at login
+AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', '2'))  # Threads that run login / password hashing
+
+# Attendance check-ins
+ATTENDANCE_LATE_MINUTES = int(os.getenv('ATTENDANCE_LATE_MINUTES', '15'))  # After class start, check-ins count as late
+ATTENDANCE_BATCH_WINDOW = float(os.getenv('ATTENDANCE_BATCH_WINDOW', '0.25'))  # Seconds to gather check-ins into one transaction
+ATTENDANCE_WRITE_TIMEOUT = float(os.getenv('ATTENDANCE_WRITE_TIMEOUT', '15'))  # Seconds a check-in waits for the writer before failing
 
 # Email settings
 EMAIL_SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
@@ -35,7 +74,19 @@ EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")  # Google App Password
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
 
+# Email outbox (emails are queued in the database and sent in the background)
+EMAIL_SMTP_POOL_SIZE = int(os.getenv('EMAIL_SMTP_POOL_SIZE', '2'))  # SMTP sessions kept open at once
+EMAIL_SMTP_IDLE_TIMEOUT = float(os.getenv('EMAIL_SMTP_IDLE_TIMEOUT', '60'))  # Seconds before an idle session is reconnected
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', '5'))  # Delivery attempts before an email is marked failed
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv('EMAIL_RETRY_BASE_SECONDS', '30'))  # First retry delay, doubled per attempt
+EMAIL_SENDING_LEASE_SECONDS = float(os.getenv('EMAIL_SENDING_LEASE_SECONDS', '300'))  # Seconds before another sender may retake an email claimed for sending
+
+# Absence alerts (send_absence_alerts.py)
+ABSENCE_ALERT_THRESHOLD = int(os.getenv('ABSENCE_ALERT_THRESHOLD', '3'))  # Absences in a class that trigger an alert
+ABSENCE_ALERT_RATE = float(os.getenv('ABSENCE_ALERT_RATE', '5'))  # Messages per second, 0 for no limit
+
 # Email templates
 EMAIL_VERIFICATION_SUBJECT = os.getenv('EMAIL_VERIFICATION_SUBJECT', 'Verify Your Email - AttendanceApp')
 EMAIL_PASSWORD_RESET_SUBJECT = os.getenv('EMAIL_PASSWORD_RESET_SUBJECT', 'Password Reset - AttendanceApp')
-EMAIL_LOGIN_OTP_SUBJECT = os.getenv('EMAIL_LOGIN_OTP_SUBJECT', 'Your AttendanceApp login code')
\ No newline at end of file
+EMAIL_LOGIN_OTP_SUBJECT = os.getenv('EMAIL_LOGIN_OTP_SUBJECT', 'Your AttendanceApp login code')
+EMAIL_ABSENCE_ALERT_SUBJECT = os.getenv('EMAIL_ABSENCE_ALERT_SUBJECT', 'Absence Alert - AttendanceApp')
\ No newline at end of file
@@ -0,0 +1,216 @@
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from .config import DB_POOL_SIZE, DB_POOL_MAX_IDLE_PER_THREAD, DB_POOL_HEALTH_CHECK_INTERVAL, SQL_TRACE
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that goes back to its pool when closed.
+
+    Existing code calls ``conn.close()`` after every operation, so close()
+    is what hands the connection back instead of tearing it down.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        # Shared with the pool's leak finalizer, so it must not reference self
+        self._checkout = {'in_use': False}
+        self._owner_thread = threading.get_ident()
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._pool is None:
+            super().close()
+        elif self._checkout['in_use']:
+            self._pool.release(self)
+
+    def close_physical(self):
+        """Really close the underlying sqlite3 connection"""
+        self._pool = None
+        self._checkout['in_use'] = False
+        super().close()
+
+
+class ConnectionPool:
+    """Thread-local pool of reusable SQLite connections.
+
+    sqlite3 connections may only be used by the thread that created them,
+    so each thread keeps its own list of idle connections. The total number
+    of connections checked out at the same time is bounded by ``max_connections``.
+    With a ``tracer`` (see sql_trace) every connection times its statements.
+    """
+
+    def __init__(self, db_path, timeout=10, max_connections=DB_POOL_SIZE,
+                 max_idle_per_thread=DB_POOL_MAX_IDLE_PER_THREAD,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL, tracer=None):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_idle_per_thread = max_idle_per_thread
+        self.health_check_interval = health_check_interval
+        self.tracer = tracer
+
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'health_check_failures': 0,
+            'leaked': 0,
+            'in_use': 0
+        }
+
+    def _idle_connections(self):
+        idle = getattr(self._local, 'idle', None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def _bump(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _connect(self):
+        factory = PooledConnection if self.tracer is None else self.tracer.connection_factory
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, factory=factory)
+        conn.row_factory = sqlite3.Row
+        conn._pool = self
+        if self.tracer is not None:
+            conn._tracer = self.tracer
+        # A caller that drops a connection without closing it would otherwise
+        # hold its pool slot forever.
+        weakref.finalize(conn, self._reclaim_leaked, conn._checkout)
+        self._bump('created')
+        return conn
+
+    def _reclaim_leaked(self, checkout):
+        if checkout['in_use']:
+            checkout['in_use'] = False
+            self._bump('in_use', -1)
+            self._bump('leaked')
+            self._slots.release()
+
+    def _is_healthy(self, conn):
+        """Ping connections that have been idle longer than the health check interval"""
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._bump('health_check_failures')
+            return False
+
+    def _discard(self, conn):
+        self._bump('discarded')
+        try:
+            conn.close_physical()
+        except sqlite3.Error:
+            # Connection belongs to another thread or is already broken;
+            # it is closed when garbage collected.
+            pass
+
+    def acquire(self):
+        """Check out a connection for the calling thread"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(
+                f"Timed out waiting for a database connection (pool size {self.max_connections})"
+            )
+
+        try:
+            idle = self._idle_connections()
+            conn = None
+            while idle:
+                candidate = idle.pop()
+                if self._is_healthy(candidate):
+                    conn = candidate
+                    self._bump('reused')
+                    break
+                self._discard(candidate)
+
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        conn._checkout['in_use'] = True
+        self._bump('in_use')
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the calling thread's idle list"""
+        if not conn._checkout['in_use']:
+            return
+
+        conn._checkout['in_use'] = False
+        self._bump('in_use', -1)
+        self._slots.release()
+
+        if conn._owner_thread != threading.get_ident():
+            self._discard(conn)
+            return
+
+        try:
+            # Match the semantics of closing a fresh connection: anything
+            # left uncommitted is thrown away.
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        idle = self._idle_connections()
+        if len(idle) < self.max_idle_per_thread:
+            conn._last_used = time.monotonic()
+            idle.append(conn)
+        else:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and always returns it"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def clear_idle(self):
+        """Close the calling thread's idle connections"""
+        idle = self._idle_connections()
+        while idle:
+            self._discard(idle.pop())
+
+    def get_stats(self):
+        """Return a snapshot of pool usage counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['max_connections'] = self.max_connections
+        stats['idle_in_thread'] = len(self._idle_connections())
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, timeout=10):
+    """Return the shared pool for a database file, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            tracer = None
+            if SQL_TRACE:
+                # sql_trace builds on PooledConnection, so it is only imported when enabled
+                from .sql_trace import get_sql_tracer
+                tracer = get_sql_tracer()
+            pool = _pools[db_path] = ConnectionPool(db_path, timeout=timeout, tracer=tracer)
+        return pool
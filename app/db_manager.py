@@ -1,4 +1,3 @@
-import sqlite3
 import bcrypt
 import base64
 import os
@@ -14,16 +13,24 @@ load_dotenv()
 DB_PATH = os.getenv('DB_PATH')
 UPLOAD_DIR = os.getenv('UPLOAD_DIR')
 
+from .db_connection_pool import get_pool
 from .email_service import EmailService
+from .email_outbox import get_email_outbox
+from .auth_executor import get_auth_latency_stats
+from .statistics_cache import get_statistics_cache
 from .db_manager_auth import DatabaseAuthManager
 from .db_manager_init import DatabaseInitManager
 from .db_manager_user_management import DatabaseUserManager
 from .db_manager_program import DatabaseProgramManager
 from .db_manager_course import DatabaseCourseManager
 from .db_manager_section import DatabaseSectionManager
+from .db_manager_attendance import DatabaseAttendanceManager
 
 class DatabaseManager:
     def __init__(self):
+        # Connections are shared by every DatabaseManager pointing at the same file
+        self.pool = get_pool(DB_PATH)
+        
         # Initialize database init manager with reference to this instance
         self.init = DatabaseInitManager(self)
         
@@ -31,7 +38,10 @@ class DatabaseManager:
         if not self.init.initialize_database():
             raise Exception("Database initialization failed")
         
-        self.email_service = EmailService()
+        # Emails are queued in the outbox; a shared sender thread delivers them
+        self.email_service = EmailService(outbox=get_email_outbox(self.pool))
+        # Statistics results are reused until the tables they read change
+        self.statistics_cache = get_statistics_cache(self.pool)
         # Initialize auth manager with reference to this instance
         self.auth = DatabaseAuthManager(self)
         # Initialize user management manager with reference to this instance
@@ -42,19 +52,60 @@ class DatabaseManager:
         self.courses = DatabaseCourseManager(self)
         # Initialize section management manager with reference to this instance  
         self.sections = DatabaseSectionManager(self)
+        # Initialize attendance manager (check-ins go through a shared writer thread)
+        self.attendance = DatabaseAttendanceManager(self)
     
     def get_connection(self):
-        """Create and return a new database connection."""
-        conn = sqlite3.connect(DB_PATH, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """
+        Check out a connection from the pool.
+        Calling close() on it returns it to the pool instead of closing it.
+        """
+        return self.pool.acquire()
     
-    def close(self):
+    def connection(self):
         """
-        Dummy close method to maintain compatibility with application code.
-        Since we're using per-operation connections now, this method doesn't need to do anything.
+        Context manager around get_connection().
+        
+        Usage:
+            with db_manager.connection() as conn:
+                conn.execute(...)
         """
-        return
+        return self.pool.connection()
+    
+    def get_pool_stats(self):
+        return self.pool.get_stats()
+    
+    def get_statistics_cache_stats(self):
+        return self.statistics_cache.get_stats()
+    
+    def get_sql_trace_summary(self, limit=10):
+        """Slowest statements by total time when SQL_TRACE is enabled, otherwise an empty list"""
+        if self.pool.tracer is None:
+            return []
+        return self.pool.tracer.summary(limit)
+    
+    def close(self):
+        """Write queued check-ins and close the idle pooled connections held by the calling thread."""
+        self.attendance.flush_attendance(timeout=5)
+        self.pool.clear_idle()
+    
+    def rebuild_attendance_rollups(self):
+        result = self.init.rebuild_attendance_rollups()
+        # Rollups are rewritten without touching attendance_logs, so its version does not change
+        self.statistics_cache.clear()
+        return result
+    
+    def collect_unused_blobs(self):
+        return self.init.collect_unused_blobs()
+    
+    def compact_face_images(self):
+        return self.init.compact_face_images()
+    
+    def get_table_versions(self, tables):
+        return self.init.get_table_versions(tables)
+    
+    def get_email_status(self, outbox_id):
+        return self.email_service.get_delivery_status(outbox_id)
     
     # Delegate authentication methods to auth manager
     def check_email_exists(self, email):
@@ -69,6 +120,12 @@ class DatabaseManager:
     def login(self, email, password):
         return self.auth.login(email, password)
     
+    def login_async(self, email, password):
+        return self.auth.login_async(email, password)
+    
+    def get_auth_latency_stats(self):
+        return get_auth_latency_stats()
+    
     def generate_otp(self, length=6):
         return self.auth.generate_otp(length)
     
@@ -101,13 +158,16 @@ class DatabaseManager:
 
     def reset_password_with_otp(self, email, otp_code, new_password):
         return self.auth.reset_password_with_otp(email, otp_code, new_password)
+    
+    def reset_password_with_otp_async(self, email, otp_code, new_password):
+        return self.auth.reset_password_with_otp_async(email, otp_code, new_password)
 
     # Delegate user management methods to user manager
     def get_all_users_simple(self):
         return self.users.get_all_users_simple()
 
-    def filter_users_python(self, all_users, search_term="", role_filter="", year_filter="", section_filter="", program_filter="", status_filter=""):
-        return self.users.filter_users_python(all_users, search_term, role_filter, year_filter, section_filter, program_filter, status_filter)
+    def search_users(self, user_type, search_term="", filters=None, sort=None, cursor=None, limit=10, include_count=True):
+        return self.users.search_users(user_type, search_term, filters, sort, cursor, limit, include_count)
 
     def get_students_with_filters(self, search_term="", year_filter="", section_filter="", program_filter="", status_filter=""):
         return self.users.get_students_with_filters(search_term, year_filter, section_filter, program_filter, status_filter)
@@ -115,6 +175,12 @@ class DatabaseManager:
     def get_faculty_with_filters(self, search_term="", status_filter="", role_filter=""):
         return self.users.get_faculty_with_filters(search_term, status_filter, role_filter)
 
+    def get_face_embedding(self, user_id):
+        return self.users.get_face_embedding(user_id)
+
+    def get_face_embeddings(self, user_ids):
+        return self.users.get_face_embeddings(user_ids)
+
     def get_user_by_name(self, first_name, last_name, role=None):
         return self.users.get_user_by_name(first_name, last_name, role)
 
@@ -256,9 +322,34 @@ class DatabaseManager:
     def get_section_students(self, section_id, search_term="", status_filter=""):
         return self.sections.get_section_students(section_id, search_term, status_filter)
 
+    def get_current_assigned_course(self, section_id, at=None):
+        return self.sections.get_current_assigned_course(section_id, at)
+
+    # Delegate attendance check-ins to attendance manager
+    def log_attendance(self, user_id, assigned_course_id=None, section_id=None, image_data=None, status=None, timestamp=None):
+        return self.attendance.log_attendance(user_id, assigned_course_id, section_id, image_data, status, timestamp)
+
+    def queue_attendance(self, user_id, assigned_course_id=None, section_id=None, image_data=None, status=None, timestamp=None):
+        return self.attendance.queue_attendance(user_id, assigned_course_id, section_id, image_data, status, timestamp)
+
+    def flush_attendance(self, timeout=None):
+        return self.attendance.flush_attendance(timeout)
+    
+    def send_absence_notifications(self, threshold=None, include_faculty=False, assigned_course_id=None, dry_run=False, progress=None):
+        return self.attendance.send_absence_notifications(threshold, include_faculty, assigned_course_id, dry_run, progress)
+
+    def get_section_embedding_versions(self, section_id):
+        return self.sections.get_section_embedding_versions(section_id)
+
+    def get_enrolled_user_ids(self, assigned_course_id):
+        return self.sections.get_enrolled_user_ids(assigned_course_id)
+
     def get_section_courses(self, section_id, academic_year=None, semester=None):
         return self.sections.get_section_courses(section_id, academic_year, semester)
 
+    def get_course_roster_attendance(self, section_id, course_id, academic_year=None, semester=None):
+        return self.sections.get_course_roster_attendance(section_id, course_id, academic_year, semester)
+
     def get_section_statistics(self, section_id, academic_year=None, semester=None):
         return self.sections.get_section_statistics(section_id, academic_year, semester)
 
@@ -0,0 +1,124 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+
+from .absence_notifications import AbsenceNotifier
+from .attendance_writer import get_attendance_writer
+from .config import ATTENDANCE_LATE_MINUTES, ATTENDANCE_WRITE_TIMEOUT, ABSENCE_ALERT_THRESHOLD
+
+class DatabaseAttendanceManager:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        # Shared by every DatabaseManager on this database
+        self.writer = get_attendance_writer(db_manager.pool)
+
+    def get_connection(self):
+        """Return a pooled database connection from the parent manager."""
+        return self.db_manager.get_connection()
+
+    def get_student_section(self, user_id):
+        """Section id of a student, or None"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT section FROM students WHERE user_id = ?", (user_id,)).fetchone()
+            return row['section'] if row else None
+        finally:
+            conn.close()
+
+    def resolve_check_in(self, user_id, assigned_course_id=None, section_id=None, timestamp=None):
+        """
+        Work out which class a check-in belongs to and whether it is late.
+
+        The assigned course is the one the student's section has scheduled at
+        `timestamp` (day of week and time of day). A course that is given
+        must be that one; check-ins for another section's class or for a
+        class that is not in session are rejected.
+
+        Returns:
+            tuple: (success, (assigned_course_id, status) or error message)
+        """
+        timestamp = timestamp or datetime.now()
+        if section_id is None:
+            section_id = self.get_student_section(user_id)
+            if section_id is None:
+                return False, "Student is not enrolled in a section"
+
+        success, course = self.db_manager.get_current_assigned_course(section_id, timestamp)
+        if not success:
+            return False, course
+        if course is None:
+            return False, "No class is scheduled for your section right now"
+        if assigned_course_id is not None and course['id'] != assigned_course_id:
+            return False, "That class is not in session for this section right now"
+
+        start = datetime.combine(timestamp.date(), datetime.strptime(course['start_time'], '%H:%M:%S').time())
+        status = 'late' if timestamp > start + timedelta(minutes=ATTENDANCE_LATE_MINUTES) else 'present'
+        return True, (course['id'], status)
+
+    def queue_attendance(self, user_id, assigned_course_id=None, section_id=None, image_data=None, status=None, timestamp=None):
+        """
+        Queue a check-in on the attendance writer without waiting for it.
+
+        Returns:
+            tuple: (success, Future resolving to log_attendance's result, or error message)
+        """
+        timestamp = timestamp or datetime.now()
+        success, result = self.resolve_check_in(user_id, assigned_course_id, section_id, timestamp)
+        if not success:
+            return False, result
+
+        assigned_course_id, scheduled_status = result
+        future = self.writer.submit(
+            user_id,
+            assigned_course_id,
+            timestamp.strftime('%Y-%m-%d'),
+            status or scheduled_status,
+            image_data,
+            timestamp
+        )
+        return True, future
+
+    def log_attendance(self, user_id, assigned_course_id=None, section_id=None, image_data=None, status=None, timestamp=None):
+        """
+        Record a check-in and wait until it is written.
+
+        Scanning the same student again for the same class and day is a
+        no-op (an existing 'absent' mark is upgraded). Gives up after
+        ATTENDANCE_WRITE_TIMEOUT seconds so a stalled writer cannot block
+        the caller; the check-in may still be written later.
+
+        Returns:
+            tuple: (success, {'id', 'status', 'created'} or error message)
+        """
+        try:
+            success, result = self.queue_attendance(user_id, assigned_course_id, section_id, image_data, status, timestamp)
+            if not success:
+                return False, result
+            return result.result(timeout=ATTENDANCE_WRITE_TIMEOUT)
+        except FutureTimeoutError:
+            print(f"Timed out recording attendance for user {user_id}")
+            return False, "Recording attendance timed out. Please try again."
+        except Exception as e:
+            print(f"Error logging attendance: {e}")
+            return False, str(e)
+
+    def flush_attendance(self, timeout=None):
+        """Wait for every queued check-in to be written"""
+        return self.writer.flush(timeout)
+
+    def send_absence_notifications(self, threshold=None, include_faculty=False,
+                                   assigned_course_id=None, dry_run=False, progress=None):
+        """
+        Email students whose absences in a class reached `threshold`
+        (ABSENCE_ALERT_THRESHOLD by default; see app/absence_notifications.py).
+
+        Returns:
+            tuple: (success, summary dict or error message)
+        """
+        try:
+            notifier = AbsenceNotifier(self.db_manager.pool, self.db_manager.email_service)
+            if threshold is None:
+                threshold = ABSENCE_ALERT_THRESHOLD
+            return True, notifier.send(threshold, include_faculty, assigned_course_id, dry_run, progress)
+        except Exception as e:
+            print(f"Error sending absence notifications: {e}")
+            return False, str(e)
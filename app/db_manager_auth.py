@@ -1,14 +1,22 @@
 import sqlite3
-import bcrypt
 import random
 import string
 from datetime import datetime, timedelta
-from .email_service import EmailService
+from .face_images import store_face_image
+from .auth_executor import (
+    auth_latency,
+    check_password,
+    get_auth_executor,
+    hash_password,
+    needs_rehash
+)
+from .face_embeddings import save_face_embedding
 
 class DatabaseAuthManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
-        self.email_service = EmailService()
+        # Shared service that queues emails in the outbox
+        self.email_service = db_manager.email_service
     
     def check_email_exists(self, email):
         """Check if an email address is already registered
@@ -97,16 +105,23 @@ class DatabaseAuthManager:
             LEFT JOIN students s ON u.id = s.user_id
             WHERE u.email = ?
             """
-            cursor.execute(query, (email,))
-            user = cursor.fetchone()
+            with auth_latency.timed('lookup'):
+                cursor.execute(query, (email,))
+                user = cursor.fetchone()
             
             if not user:
                 return False, "Invalid email or password"
                 
             # Check password
-            if not bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+            with auth_latency.timed('hash_verify'):
+                password_ok = check_password(password, user['password_hash'])
+            if not password_ok:
                 return False, "Invalid email or password"
             
+            # Upgrade the hash when BCRYPT_ROUNDS changed since it was made
+            if needs_rehash(user['password_hash']):
+                self._rehash_password(conn, user['id'], user['password_hash'], password)
+            
             # Check role and handle accordingly
             user_role = user['role']
             
@@ -160,6 +175,24 @@ class DatabaseAuthManager:
             if conn:
                 conn.close()
     
+    def _rehash_password(self, conn, user_id, old_hash, password):
+        """Replace a user's hash with one at the configured cost; failures are only logged"""
+        try:
+            with auth_latency.timed('rehash'):
+                new_hash = hash_password(password)
+            # Skip if the password changed since it was read
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                (new_hash, user_id, old_hash)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Error rehashing password for user {user_id}: {e}")
+    
+    def login_async(self, email, password):
+        """Run login() on the auth worker pool; returns a Future of its result"""
+        return get_auth_executor().submit(self.login, email, password)
+    
     def generate_otp(self, length=6):
         """Generate a random OTP code"""
         return ''.join(random.choices(string.digits, k=length))
@@ -294,18 +327,19 @@ class DatabaseAuthManager:
             cursor = conn.cursor()
             
             # Find valid OTP
-            cursor.execute("""
-                SELECT o.user_id, u.first_name, u.last_name, u.email, u.role, u.contact_number, u.birthday, s.student_number
-                FROM otp_requests o
-                JOIN users u ON o.user_id = u.id
-                LEFT JOIN students s ON u.id = s.user_id
-                WHERE u.email = ? AND o.otp_code = ? AND o.type = 'login' 
-                AND o.expires_at > ? 
-                ORDER BY o.created_at DESC
-                LIMIT 1
-            """, (email, otp_code, datetime.now().isoformat()))
-            
-            result = cursor.fetchone()
+            with auth_latency.timed('otp_check'):
+                cursor.execute("""
+                    SELECT o.user_id, u.first_name, u.last_name, u.email, u.role, u.contact_number, u.birthday, s.student_number
+                    FROM otp_requests o
+                    JOIN users u ON o.user_id = u.id
+                    LEFT JOIN students s ON u.id = s.user_id
+                    WHERE u.email = ? AND o.otp_code = ? AND o.type = 'login' 
+                    AND o.expires_at > ? 
+                    ORDER BY o.created_at DESC
+                    LIMIT 1
+                """, (email, otp_code, datetime.now().isoformat()))
+                
+                result = cursor.fetchone()
             
             if not result:
                 conn.close()
@@ -424,7 +458,8 @@ class DatabaseAuthManager:
                     return False, "Student number is already in use"
                     
                 # Hash the password
-                hashed_pw = bcrypt.hashpw(registration_data['password'].encode('utf-8'), bcrypt.gensalt())
+                with auth_latency.timed('hash'):
+                    hashed_pw = hash_password(registration_data['password'])
                 
                 # Convert date_of_birth string to date format if provided
                 birthday = None
@@ -452,20 +487,27 @@ class DatabaseAuthManager:
                 
                 # Insert user - set as VERIFIED since OTP was successful with default status
                 user_query = """
-                INSERT INTO users (first_name, last_name, email, birthday, password_hash, contact_number, role, status_id, face_image, verified, isDeleted, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO users (first_name, last_name, email, birthday, password_hash, contact_number, role, status_id, face_image_hash, face_thumbnail_hash, verified, isDeleted, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """
                 current_time = datetime.now().isoformat()
+                
+                # Face crop and thumbnail go to the blob store; the row keeps their hashes
+                face_image_hash = face_thumbnail_hash = None
+                if registration_data.get('face_image'):
+                    face_image_hash, face_thumbnail_hash = store_face_image(cursor, registration_data['face_image'])
+                
                 cursor.execute(user_query, (
                     registration_data['first_name'],
                     registration_data['last_name'],
                     registration_data['email'],
                     birthday,
-                    hashed_pw.decode('utf-8'),
+                    hashed_pw,
                     registration_data.get('contact_number'),
                     "Student",
                     default_status_id,  # Assign default status
-                    registration_data.get('face_image'),
+                    face_image_hash,
+                    face_thumbnail_hash,
                     1,  # verified = 1 (True) - OTP verification means account is verified
                     0,  # isDeleted = 0 (False)
                     current_time,
@@ -484,6 +526,10 @@ class DatabaseAuthManager:
                     registration_data['student_number']
                 ))
                 
+                # Face encoding used at check-in (computed at capture time when available)
+                if face_image_hash:
+                    save_face_embedding(cursor, user_id, registration_data['face_image'], registration_data.get('face_encoding'))
+                
                 # Delete used OTP
                 cursor.execute("DELETE FROM otp_requests WHERE id = ?", (otp_id,))
                 
@@ -619,17 +665,18 @@ class DatabaseAuthManager:
             cursor = conn.cursor()
             
             # Find valid password reset OTP
-            cursor.execute("""
-                SELECT o.user_id, o.id
-                FROM otp_requests o
-                JOIN users u ON o.user_id = u.id
-                WHERE u.email = ? AND o.otp_code = ? AND o.type = 'password_reset' 
-                AND o.expires_at > ? 
-                ORDER BY o.created_at DESC
-                LIMIT 1
-            """, (email, otp_code, datetime.now().isoformat()))
-            
-            result = cursor.fetchone()
+            with auth_latency.timed('otp_check'):
+                cursor.execute("""
+                    SELECT o.user_id, o.id
+                    FROM otp_requests o
+                    JOIN users u ON o.user_id = u.id
+                    WHERE u.email = ? AND o.otp_code = ? AND o.type = 'password_reset' 
+                    AND o.expires_at > ? 
+                    ORDER BY o.created_at DESC
+                    LIMIT 1
+                """, (email, otp_code, datetime.now().isoformat()))
+                
+                result = cursor.fetchone()
             
             if not result:
                 conn.close()
@@ -638,7 +685,8 @@ class DatabaseAuthManager:
             user_id, otp_id = result
             
             # Hash the new password
-            hashed_pw = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+            with auth_latency.timed('hash'):
+                hashed_pw = hash_password(new_password)
             
             # Begin transaction
             conn.execute("BEGIN TRANSACTION")
@@ -649,7 +697,7 @@ class DatabaseAuthManager:
                     UPDATE users 
                     SET password_hash = ?, updated_at = ?
                     WHERE id = ?
-                """, (hashed_pw.decode('utf-8'), datetime.now().isoformat(), user_id))
+                """, (hashed_pw, datetime.now().isoformat(), user_id))
                 
                 # Delete used OTP
                 cursor.execute("DELETE FROM otp_requests WHERE id = ?", (otp_id,))
@@ -669,3 +717,7 @@ class DatabaseAuthManager:
         except Exception as e:
             print(f"Error resetting password with OTP: {e}")
             return False, str(e)
+
+    def reset_password_with_otp_async(self, email, otp_code, new_password):
+        """Run reset_password_with_otp() on the auth worker pool; returns a Future of its result"""
+        return get_auth_executor().submit(self.reset_password_with_otp, email, otp_code, new_password)
@@ -1,16 +1,14 @@
-import sqlite3
 from datetime import datetime
-from .config import DB_PATH
+
+from .statistics_cache import cached_statistics
 
 class DatabaseCourseManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
     
     def get_connection(self):
-        """Create and return a new database connection."""
-        conn = sqlite3.connect(DB_PATH, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Return a pooled database connection from the parent manager."""
+        return self.db_manager.get_connection()
 
     def get_courses(self, program_filter=None, year_filter=None, section_filter=None):
         """
@@ -207,36 +205,42 @@ class DatabaseCourseManager:
             print(f"Error in delete_course: {e}")
             return False, f"Database error: {str(e)}"
 
+    @cached_statistics('assigned_courses', 'attendance_logs')
     def get_course_statistics(self, course_id, academic_year=None, semester=None):
         """Get comprehensive statistics for a specific course"""
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
-            # Build base query for course statistics
-            base_query = """
-            SELECT 
-                COUNT(DISTINCT al.user_id) as total_students,
-                COUNT(al.id) as total_records,
-                SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as total_present,
-                SUM(CASE WHEN al.status = 'late' THEN 1 ELSE 0 END) as total_late,
-                SUM(CASE WHEN al.status = 'absent' THEN 1 ELSE 0 END) as total_absents,
-                COUNT(DISTINCT DATE(al.date)) as total_classes
-            FROM attendance_logs al
-            JOIN assigned_courses ac ON al.assigned_course_id = ac.id
-            WHERE ac.course_id = ? AND ac.isDeleted = 0
-            """
-            
-            params = [course_id]
+            # Assigned courses (classes) of this course matching the filters
+            assigned_filter = "ac.course_id = ? AND ac.isDeleted = 0"
+            filter_params = [course_id]
             
             # Add academic year filter if provided
             if academic_year:
-                base_query += " AND ac.academic_year = ?"
-                params.append(academic_year)
+                assigned_filter += " AND ac.academic_year = ?"
+                filter_params.append(academic_year)
             
             # Removed semester filter completely
             
-            cursor.execute(base_query, params)
+            # Build base query for course statistics from the attendance rollups
+            base_query = f"""
+            SELECT 
+                (SELECT COUNT(DISTINCT mr.user_id)
+                 FROM attendance_monthly_rollup mr
+                 JOIN assigned_courses ac ON mr.assigned_course_id = ac.id
+                 WHERE {assigned_filter}) as total_students,
+                SUM(dr.total_count) as total_records,
+                SUM(dr.present_count) as total_present,
+                SUM(dr.late_count) as total_late,
+                SUM(dr.absent_count) as total_absents,
+                COUNT(DISTINCT DATE(dr.date)) as total_classes
+            FROM attendance_daily_rollup dr
+            JOIN assigned_courses ac ON dr.assigned_course_id = ac.id
+            WHERE {assigned_filter}
+            """
+            
+            cursor.execute(base_query, filter_params + filter_params)
             result = cursor.fetchone()
             
             if result:
@@ -388,6 +392,7 @@ class DatabaseCourseManager:
         finally:
             conn.close()
 
+    @cached_statistics('sections', 'assigned_courses', 'attendance_logs')
     def get_course_section_statistics(self, course_id, academic_year=None, semester=None):
         """Get section-based statistics for a specific course"""
         conn = self.get_connection()
@@ -398,12 +403,12 @@ class DatabaseCourseManager:
             section_query = """
             SELECT 
                 s.name as section_name,
-                COUNT(DISTINCT al.user_id) as total_students,
-                COUNT(al.id) as total_records,
-                SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as present_count
+                COUNT(DISTINCT r.user_id) as total_students,
+                SUM(r.total_count) as total_records,
+                SUM(r.present_count) as present_count
             FROM sections s
             JOIN assigned_courses ac ON s.id = ac.section_id
-            LEFT JOIN attendance_logs al ON al.assigned_course_id = ac.id
+            LEFT JOIN attendance_monthly_rollup r ON r.assigned_course_id = ac.id
             WHERE ac.course_id = ? AND ac.isDeleted = 0
             """
             
@@ -468,6 +473,7 @@ class DatabaseCourseManager:
         finally:
             conn.close()
 
+    @cached_statistics('assigned_courses', 'schedules', 'attendance_logs')
     def get_course_schedule_statistics(self, course_id, academic_year=None, semester=None):
         """Get schedule-based statistics for a specific course"""
         conn = self.get_connection()
@@ -615,39 +621,39 @@ class DatabaseCourseManager:
         finally:
             conn.close()
 
+    @cached_statistics('sections', 'assigned_courses', 'attendance_logs')
     def get_course_monthly_attendance(self, course_id, academic_year=None, semester=None):
         """Get monthly attendance data for a specific course grouped by sections - only months with actual data"""
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
-            # Get monthly attendance data by section - only for months that have actual attendance records
+            # Get monthly attendance data by section from the daily rollup - only for months that have actual attendance records
             monthly_query = """
             SELECT 
                 s.name as section_name,
                 CASE 
-                    WHEN SUBSTR(al.date, 6, 2) = '01' THEN 'Jan'
-                    WHEN SUBSTR(al.date, 6, 2) = '02' THEN 'Feb'
-                    WHEN SUBSTR(al.date, 6, 2) = '03' THEN 'Mar'
-                    WHEN SUBSTR(al.date, 6, 2) = '04' THEN 'Apr'
-                    WHEN SUBSTR(al.date, 6, 2) = '05' THEN 'May'
-                    WHEN SUBSTR(al.date, 6, 2) = '06' THEN 'Jun'
-                    WHEN SUBSTR(al.date, 6, 2) = '07' THEN 'Jul'
-                    WHEN SUBSTR(al.date, 6, 2) = '08' THEN 'Aug'
-                    WHEN SUBSTR(al.date, 6, 2) = '09' THEN 'Sep'
-                    WHEN SUBSTR(al.date, 6, 2) = '10' THEN 'Oct'
-                    WHEN SUBSTR(al.date, 6, 2) = '11' THEN 'Nov'
-                    WHEN SUBSTR(al.date, 6, 2) = '12' THEN 'Dec'
+                    WHEN SUBSTR(r.date, 6, 2) = '01' THEN 'Jan'
+                    WHEN SUBSTR(r.date, 6, 2) = '02' THEN 'Feb'
+                    WHEN SUBSTR(r.date, 6, 2) = '03' THEN 'Mar'
+                    WHEN SUBSTR(r.date, 6, 2) = '04' THEN 'Apr'
+                    WHEN SUBSTR(r.date, 6, 2) = '05' THEN 'May'
+                    WHEN SUBSTR(r.date, 6, 2) = '06' THEN 'Jun'
+                    WHEN SUBSTR(r.date, 6, 2) = '07' THEN 'Jul'
+                    WHEN SUBSTR(r.date, 6, 2) = '08' THEN 'Aug'
+                    WHEN SUBSTR(r.date, 6, 2) = '09' THEN 'Sep'
+                    WHEN SUBSTR(r.date, 6, 2) = '10' THEN 'Oct'
+                    WHEN SUBSTR(r.date, 6, 2) = '11' THEN 'Nov'
+                    WHEN SUBSTR(r.date, 6, 2) = '12' THEN 'Dec'
                     ELSE 'Unknown'
                 END as month,
-                SUBSTR(al.date, 1, 4) as year,
-                COUNT(al.id) as total_records,
-                SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as present_count
+                SUBSTR(r.date, 1, 4) as year,
+                SUM(r.total_count) as total_records,
+                SUM(r.present_count) as present_count
             FROM sections s
             JOIN assigned_courses ac ON s.id = ac.section_id
-            INNER JOIN attendance_logs al ON al.assigned_course_id = ac.id
+            INNER JOIN attendance_daily_rollup r ON r.assigned_course_id = ac.id
             WHERE ac.course_id = ? AND ac.isDeleted = 0
-            AND al.date IS NOT NULL 
             """
             
             params = [course_id]
@@ -661,8 +667,8 @@ class DatabaseCourseManager:
             
             monthly_query += """
             GROUP BY s.id, s.name, year, month
-            HAVING COUNT(al.id) > 0
-            ORDER BY s.name, year, SUBSTR(al.date, 6, 2)
+            HAVING SUM(r.total_count) > 0
+            ORDER BY s.name, year, SUBSTR(r.date, 6, 2)
             """
             
             cursor.execute(monthly_query, params)
@@ -3,6 +3,11 @@ import os
 import sys
 from datetime import datetime
 from dotenv import load_dotenv
+from .db_migrations import run_migrations, SCHEMA_VERSION
+from .attendance_rollups import rebuild_rollups
+from .blob_store import collect_garbage
+from .face_images import compact_stored_face_images, face_detection_available
+from .table_versions import get_table_versions
 
 # Load environment variables first
 load_dotenv()
@@ -49,7 +54,17 @@ class DatabaseInitManager:
                     print("  python create_db.py")
                     return False
                 
-                print("✓ Database found and properly initialized")
+                # Bring older databases up to the current schema version
+                conn = self.db_manager.get_connection()
+                try:
+                    run_migrations(conn)
+                finally:
+                    conn.close()
+                
+                # Remove images no row refers to any more (e.g. replaced face images)
+                self.collect_unused_blobs()
+                
+                print(f"✓ Database found and properly initialized (schema v{SCHEMA_VERSION})")
                 return True
                 
             except Exception as e:
@@ -93,6 +108,68 @@ class DatabaseInitManager:
                 'error': str(e)
             }
 
+    def rebuild_attendance_rollups(self):
+        """Regenerate the attendance summary tables from attendance_logs"""
+        conn = self.db_manager.get_connection()
+        try:
+            counts = rebuild_rollups(conn)
+            print(f"✓ Attendance rollups rebuilt: {counts}")
+            return True, counts
+        except Exception as e:
+            print(f"Error rebuilding attendance rollups: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def collect_unused_blobs(self):
+        """Delete blob store entries that are no longer referenced"""
+        conn = self.db_manager.get_connection()
+        try:
+            removed = collect_garbage(conn)
+            if removed:
+                print(f"✓ Removed {removed} unused images from the blob store")
+            return True, removed
+        except Exception as e:
+            print(f"Error collecting unused blobs: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def compact_face_images(self):
+        """
+        Convert stored whole-frame face images to compact crops (see app/face_images.py).
+
+        For images schema migration 11 left unchanged because face detection
+        was not available; images without a detectable face are kept.
+        """
+        if not face_detection_available():
+            return False, "Face detection (OpenCV) is not available"
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            converted, skipped = compact_stored_face_images(cursor)
+            conn.commit()
+            print(f"✓ Converted {converted} face images to compact crops ({skipped} left unchanged)")
+            return True, {'converted': converted, 'skipped': skipped}
+        except Exception as e:
+            conn.rollback()
+            print(f"Error converting face images: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def get_table_versions(self, tables):
+        """Change counters for the given tables (see app/table_versions.py)"""
+        conn = self.db_manager.get_connection()
+        try:
+            return True, get_table_versions(conn, tables)
+        except Exception as e:
+            print(f"Error reading table versions: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
     def reset_database(self):
         """Reset the database by running the creation scripts again"""
         try:
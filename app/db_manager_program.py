@@ -1,16 +1,14 @@
-import sqlite3
 from datetime import datetime
-from .config import DB_PATH
+
+from .statistics_cache import cached_statistics
 
 class DatabaseProgramManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
     
     def get_connection(self):
-        """Create and return a new database connection."""
-        conn = sqlite3.connect(DB_PATH, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Return a pooled database connection from the parent manager."""
+        return self.db_manager.get_connection()
 
     def create_program(self, program_data):
         """
@@ -275,6 +273,7 @@ class DatabaseProgramManager:
         finally:
             conn.close()
 
+    @cached_statistics('users', 'students', 'sections', 'courses', 'assigned_courses', 'attendance_logs')
     def get_program_statistics(self, program_id, academic_year=None, semester=None):
         """
         Get comprehensive statistics for a specific program
@@ -291,97 +290,58 @@ class DatabaseProgramManager:
         try:
             cursor = conn.cursor()
             
-            # Get all students and their sections
-            cursor.execute("""
-                SELECT u.id, s.section 
-                FROM users u
-                JOIN students s ON u.id = s.user_id
-                WHERE u.isDeleted = 0 AND u.role = 'Student'
-            """)
-            students_data = cursor.fetchall()
-            
-            # Get all sections for this program
-            cursor.execute("""
-                SELECT id FROM sections 
-                WHERE program_id = ? AND isDeleted = 0
-            """, (program_id,))
-            program_sections = [row['id'] for row in cursor.fetchall()]
-            
-            # Filter students in Python
-            program_student_ids = []
-            for student in students_data:
-                if student['section'] in program_sections:
-                    program_student_ids.append(student['id'])
-            
-            total_students = len(program_student_ids)
-            
-            # Get total courses in the program
-            cursor.execute("""
-                SELECT COUNT(*) as total_courses 
-                FROM courses 
-                WHERE program_id = ? AND isDeleted = 0
-            """, (program_id,))
-            total_courses = cursor.fetchone()['total_courses']
-            
-            # Get total sections
-            total_sections = len(program_sections)
-            
-            # Get attendance logs with academic year and semester filtering
+            # Attendance logs only count for assigned courses matching the filters
+            log_filter = ""
+            log_params = []
             if academic_year or semester:
-                # Get assigned courses that match the filters
                 filter_conditions = ["1=1"]
-                filter_params = []
                 
                 if academic_year:
                     filter_conditions.append("academic_year = ?")
-                    filter_params.append(academic_year)
+                    log_params.append(academic_year)
                 
                 if semester:
                     filter_conditions.append("semester = ?")
-                    filter_params.append(semester)
+                    log_params.append(semester)
                 
-                cursor.execute(f"""
-                    SELECT id FROM assigned_courses 
-                    WHERE {' AND '.join(filter_conditions)}
-                """, filter_params)
-                
-                valid_assigned_course_ids = [row['id'] for row in cursor.fetchall()]
-                
-                # Get attendance logs only for these assigned courses
-                cursor.execute("""
-                    SELECT user_id, status, assigned_course_id
-                    FROM attendance_logs
-                """)
-                all_attendance_data = cursor.fetchall()
-                
-                # Filter in Python
-                attendance_data = []
-                for log in all_attendance_data:
-                    if log['assigned_course_id'] in valid_assigned_course_ids:
-                        attendance_data.append(log)
-            else:
-                # Get all attendance logs
-                cursor.execute("""
-                    SELECT user_id, status 
-                    FROM attendance_logs
-                """)
-                attendance_data = cursor.fetchall()
-            
-            # Filter attendance logs for students in this program
-            total_present = 0
-            total_absents = 0
-            total_late = 0
-            total_records = 0
-            
-            for log in attendance_data:
-                if log['user_id'] in program_student_ids:
-                    total_records += 1
-                    if log['status'] == 'present':
-                        total_present += 1
-                    elif log['status'] == 'absent':
-                        total_absents += 1
-                    elif log['status'] == 'late':
-                        total_late += 1
+                log_filter = f"""
+                    AND r.assigned_course_id IN (
+                        SELECT id FROM assigned_courses 
+                        WHERE {' AND '.join(filter_conditions)}
+                    )
+                """
+            
+            # Counts and attendance totals in one aggregation over the
+            # per-student monthly rollup
+            cursor.execute(f"""
+                WITH program_sections AS (
+                    SELECT id FROM sections 
+                    WHERE program_id = ? AND isDeleted = 0
+                ),
+                program_students AS (
+                    SELECT u.id
+                    FROM users u
+                    JOIN students s ON u.id = s.user_id
+                    WHERE u.isDeleted = 0 AND u.role = 'Student'
+                      AND s.section IN (SELECT id FROM program_sections)
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM program_students) as total_students,
+                    (SELECT COUNT(*) FROM courses 
+                     WHERE program_id = ? AND isDeleted = 0) as total_courses,
+                    (SELECT COUNT(*) FROM program_sections) as total_sections,
+                    SUM(r.total_count) as total_records,
+                    SUM(r.present_count) as total_present,
+                    SUM(r.absent_count) as total_absents,
+                    SUM(r.late_count) as total_late
+                FROM attendance_monthly_rollup r
+                WHERE r.user_id IN (SELECT id FROM program_students)
+                {log_filter}
+            """, [program_id, program_id] + log_params)
+            row = cursor.fetchone()
+            
+            total_records = row['total_records'] or 0
+            total_present = row['total_present'] or 0
             
             # Calculate attendance rate
             attendance_rate = 0
@@ -389,12 +349,12 @@ class DatabaseProgramManager:
                 attendance_rate = round((total_present / total_records) * 100, 1)
             
             statistics = {
-                'total_students': total_students,
-                'total_courses': total_courses,
-                'total_sections': total_sections,
-                'total_absents': total_absents,
+                'total_students': row['total_students'],
+                'total_courses': row['total_courses'],
+                'total_sections': row['total_sections'],
+                'total_absents': row['total_absents'] or 0,
                 'total_present': total_present,
-                'total_late': total_late,
+                'total_late': row['total_late'] or 0,
                 'attendance_rate': f"{attendance_rate}%",
                 'total_attendance_records': total_records,
                 'academic_year': academic_year or 'All Years',
@@ -457,6 +417,7 @@ class DatabaseProgramManager:
         finally:
             conn.close()
 
+    @cached_statistics('users', 'students', 'sections', 'assigned_courses', 'attendance_logs')
     def get_program_key_metrics(self, program_id, academic_year=None, semester=None):
         """
         Get key metrics for program analytics
@@ -473,98 +434,63 @@ class DatabaseProgramManager:
         try:
             cursor = conn.cursor()
             
-            # Get program sections
-            cursor.execute("""
-                SELECT id FROM sections 
-                WHERE program_id = ? AND isDeleted = 0
-            """, (program_id,))
-            program_sections = [row['id'] for row in cursor.fetchall()]
-            
-            if not program_sections:
-                return True, {
-                    'current_month': '0%',
-                    'previous_month': '0%',
-                    'best_month': '0%',
-                    'lowest_month': '0%',
-                    'most_active_day': 'N/A'
-                }
-            
-            # Get students in this program
-            cursor.execute("""
-                SELECT u.id
-                FROM users u
-                JOIN students s ON u.id = s.user_id
-                WHERE u.isDeleted = 0 AND u.role = 'Student' AND s.section IN ({})
-            """.format(','.join('?' * len(program_sections))), program_sections)
-            program_student_ids = [row['id'] for row in cursor.fetchall()]
-            
-            if not program_student_ids:
-                return True, {
-                    'current_month': '0%',
-                    'previous_month': '0%',
-                    'best_month': '0%',
-                    'lowest_month': '0%',
-                    'most_active_day': 'N/A'
-                }
+            empty_metrics = {
+                'current_month': '0%',
+                'previous_month': '0%',
+                'best_month': '0%',
+                'lowest_month': '0%',
+                'most_active_day': 'N/A'
+            }
             
             # Filter assigned courses based on year/semester if provided
+            log_filter = ""
+            log_params = []
             if academic_year or semester:
                 filter_conditions = ["1=1"]
-                filter_params = []
                 
                 if academic_year:
                     filter_conditions.append("academic_year = ?")
-                    filter_params.append(academic_year)
+                    log_params.append(academic_year)
                 
                 if semester:
                     filter_conditions.append("semester = ?")
-                    filter_params.append(semester)
+                    log_params.append(semester)
                 
-                cursor.execute(f"""
-                    SELECT id FROM assigned_courses 
-                    WHERE {' AND '.join(filter_conditions)}
-                """, filter_params)
-                
-                valid_assigned_course_ids = [row['id'] for row in cursor.fetchall()]
-                
-                if not valid_assigned_course_ids:
-                    return True, {
-                        'current_month': '0%',
-                        'previous_month': '0%',
-                        'best_month': '0%',
-                        'lowest_month': '0%',
-                        'most_active_day': 'N/A'
-                    }
-                
-                # Get attendance logs for filtered courses
-                cursor.execute("""
-                    SELECT al.user_id, al.status, al.date, al.assigned_course_id
-                    FROM attendance_logs al
-                    WHERE al.assigned_course_id IN ({})
-                """.format(','.join('?' * len(valid_assigned_course_ids))), valid_assigned_course_ids)
-                
-                all_attendance_data = cursor.fetchall()
-                
-                # Filter for program students
-                attendance_data = [log for log in all_attendance_data if log['user_id'] in program_student_ids]
-            else:
-                # Get all attendance logs for program students
-                cursor.execute("""
-                    SELECT al.user_id, al.status, al.date
-                    FROM attendance_logs al
-                    WHERE al.user_id IN ({})
-                """.format(','.join('?' * len(program_student_ids))), program_student_ids)
-                
-                attendance_data = cursor.fetchall()
-            
-            if not attendance_data:
-                return True, {
-                    'current_month': '0%',
-                    'previous_month': '0%',
-                    'best_month': '0%',
-                    'lowest_month': '0%',
-                    'most_active_day': 'N/A'
-                }
+                log_filter = f"""
+                    AND al.assigned_course_id IN (
+                        SELECT id FROM assigned_courses 
+                        WHERE {' AND '.join(filter_conditions)}
+                    )
+                """
+            
+            # Totals per month and weekday for the program's students.
+            # Logs whose date is not a plain YYYY-MM-DD land in the NULL group.
+            cursor.execute(f"""
+                WITH program_students AS (
+                    SELECT u.id
+                    FROM users u
+                    JOIN students s ON u.id = s.user_id
+                    JOIN sections sec ON s.section = sec.id
+                    WHERE u.isDeleted = 0 AND u.role = 'Student'
+                      AND sec.program_id = ? AND sec.isDeleted = 0
+                )
+                SELECT
+                    CASE WHEN date(al.date) = al.date 
+                         THEN strftime('%Y-%m', al.date) END as month_key,
+                    CASE WHEN date(al.date) = al.date 
+                         THEN CAST(strftime('%w', al.date) AS INTEGER) END as weekday,
+                    COUNT(*) as total,
+                    SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as present
+                FROM attendance_logs al
+                WHERE al.user_id IN (SELECT id FROM program_students)
+                {log_filter}
+                GROUP BY month_key, weekday
+                ORDER BY month_key, weekday
+            """, [program_id] + log_params)
+            grouped_rows = cursor.fetchall()
+            
+            if not grouped_rows:
+                return True, empty_metrics
             
             # Calculate monthly attendance rates
             from datetime import datetime, timedelta
@@ -573,30 +499,27 @@ class DatabaseProgramManager:
             monthly_stats = {}
             daily_stats = {}
             
-            for log in attendance_data:
-                try:
-                    log_date = datetime.strptime(log['date'], '%Y-%m-%d')
-                    month_key = f"{log_date.year}-{log_date.month:02d}"
-                    day_name = calendar.day_name[log_date.weekday()]
-                    
-                    # Monthly stats
-                    if month_key not in monthly_stats:
-                        monthly_stats[month_key] = {'total': 0, 'present': 0, 'date_obj': log_date}
-                    
-                    monthly_stats[month_key]['total'] += 1
-                    if log['status'] == 'present':
-                        monthly_stats[month_key]['present'] += 1
-                    
-                    # Daily stats
-                    if day_name not in daily_stats:
-                        daily_stats[day_name] = {'total': 0, 'present': 0}
-                    
-                    daily_stats[day_name]['total'] += 1
-                    if log['status'] == 'present':
-                        daily_stats[day_name]['present'] += 1
-                        
-                except ValueError:
+            for row in grouped_rows:
+                if row['month_key'] is None:
                     continue
+                
+                month_key = row['month_key']
+                # strftime('%w') counts from Sunday, calendar.day_name from Monday
+                day_name = calendar.day_name[(row['weekday'] - 1) % 7]
+                
+                # Monthly stats
+                if month_key not in monthly_stats:
+                    monthly_stats[month_key] = {'total': 0, 'present': 0}
+                
+                monthly_stats[month_key]['total'] += row['total']
+                monthly_stats[month_key]['present'] += row['present']
+                
+                # Daily stats
+                if day_name not in daily_stats:
+                    daily_stats[day_name] = {'total': 0, 'present': 0}
+                
+                daily_stats[day_name]['total'] += row['total']
+                daily_stats[day_name]['present'] += row['present']
             
             # Calculate monthly percentages with month names
             monthly_percentages = {}
@@ -606,7 +529,7 @@ class DatabaseProgramManager:
                     percentage = (stats['present'] / stats['total']) * 100
                     monthly_percentages[month] = round(percentage, 1)
                     # Store month name for display
-                    month_names[month] = stats['date_obj'].strftime('%B %Y')
+                    month_names[month] = datetime.strptime(month, '%Y-%m').strftime('%B %Y')
             
             # Get current and previous month
             now = datetime.now()
@@ -666,13 +589,14 @@ class DatabaseProgramManager:
         finally:
             conn.close()
 
+    @cached_statistics('sections', 'courses', 'assigned_courses', 'attendance_logs')
     def get_program_monthly_attendance(self, program_id, academic_year=None, semester=None):
         """Get monthly attendance data for a specific program by year levels - only months with actual data"""
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
-            # Get monthly attendance data by year level - only for months that have actual attendance records
+            # Get monthly attendance data by year level from the daily rollup - only for months that have actual attendance records
             monthly_query = """
             SELECT 
                 CASE 
@@ -684,29 +608,28 @@ class DatabaseProgramManager:
                     ELSE 'Other Year'
                 END as year_level,
                 CASE 
-                    WHEN SUBSTR(al.date, 6, 2) = '01' THEN 'Jan'
-                    WHEN SUBSTR(al.date, 6, 2) = '02' THEN 'Feb'
-                    WHEN SUBSTR(al.date, 6, 2) = '03' THEN 'Mar'
-                    WHEN SUBSTR(al.date, 6, 2) = '04' THEN 'Apr'
-                    WHEN SUBSTR(al.date, 6, 2) = '05' THEN 'May'
-                    WHEN SUBSTR(al.date, 6, 2) = '06' THEN 'Jun'
-                    WHEN SUBSTR(al.date, 6, 2) = '07' THEN 'Jul'
-                    WHEN SUBSTR(al.date, 6, 2) = '08' THEN 'Aug'
-                    WHEN SUBSTR(al.date, 6, 2) = '09' THEN 'Sep'
-                    WHEN SUBSTR(al.date, 6, 2) = '10' THEN 'Oct'
-                    WHEN SUBSTR(al.date, 6, 2) = '11' THEN 'Nov'
-                    WHEN SUBSTR(al.date, 6, 2) = '12' THEN 'Dec'
+                    WHEN SUBSTR(r.date, 6, 2) = '01' THEN 'Jan'
+                    WHEN SUBSTR(r.date, 6, 2) = '02' THEN 'Feb'
+                    WHEN SUBSTR(r.date, 6, 2) = '03' THEN 'Mar'
+                    WHEN SUBSTR(r.date, 6, 2) = '04' THEN 'Apr'
+                    WHEN SUBSTR(r.date, 6, 2) = '05' THEN 'May'
+                    WHEN SUBSTR(r.date, 6, 2) = '06' THEN 'Jun'
+                    WHEN SUBSTR(r.date, 6, 2) = '07' THEN 'Jul'
+                    WHEN SUBSTR(r.date, 6, 2) = '08' THEN 'Aug'
+                    WHEN SUBSTR(r.date, 6, 2) = '09' THEN 'Sep'
+                    WHEN SUBSTR(r.date, 6, 2) = '10' THEN 'Oct'
+                    WHEN SUBSTR(r.date, 6, 2) = '11' THEN 'Nov'
+                    WHEN SUBSTR(r.date, 6, 2) = '12' THEN 'Dec'
                     ELSE 'Unknown'
                 END as month,
-                SUBSTR(al.date, 1, 4) as year,
-                COUNT(al.id) as total_records,
-                SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as present_count
+                SUBSTR(r.date, 1, 4) as year,
+                SUM(r.total_count) as total_records,
+                SUM(r.present_count) as present_count
             FROM sections s
             JOIN assigned_courses ac ON s.id = ac.section_id
             JOIN courses c ON ac.course_id = c.id
-            INNER JOIN attendance_logs al ON al.assigned_course_id = ac.id
+            INNER JOIN attendance_daily_rollup r ON r.assigned_course_id = ac.id
             WHERE c.program_id = ? AND ac.isDeleted = 0 AND c.isDeleted = 0
-            AND al.date IS NOT NULL
             """
             
             params = [program_id]
@@ -722,8 +645,8 @@ class DatabaseProgramManager:
             
             monthly_query += """
             GROUP BY year_level, year, month
-            HAVING COUNT(al.id) > 0
-            ORDER BY year_level, year, SUBSTR(al.date, 6, 2)
+            HAVING SUM(r.total_count) > 0
+            ORDER BY year_level, year, SUBSTR(r.date, 6, 2)
             """
             
             cursor.execute(monthly_query, params)
@@ -1,16 +1,14 @@
-import sqlite3
 from datetime import datetime
-from .config import DB_PATH
+
+from .statistics_cache import cached_statistics
 
 class DatabaseSectionManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
     
     def get_connection(self):
-        """Create and return a new database connection."""
-        conn = sqlite3.connect(DB_PATH, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Return a pooled database connection from the parent manager."""
+        return self.db_manager.get_connection()
 
     def get_sections(self, program_filter=None, year_filter=None, academic_year=None, semester=None):
         """Get all sections with optional filters"""
@@ -295,6 +293,95 @@ class DatabaseSectionManager:
         finally:
             conn.close()
 
+    def get_current_assigned_course(self, section_id, at=None):
+        """
+        Find the assigned course a section has class in at a given time.
+
+        schedules stores start/end either as times or as full datetimes;
+        only the time of day is compared.
+
+        Returns:
+            tuple: (success, course dict or None if no class is scheduled)
+        """
+        at = at or datetime.now()
+        try:
+            conn = self.db_manager.get_connection()
+            try:
+                cursor = conn.execute("""
+                    SELECT ac.id, ac.course_id, c.name as course_name, c.code as course_code,
+                           ac.academic_year, ac.semester, ac.room,
+                           TIME(sch.start_time) as start_time, TIME(sch.end_time) as end_time
+                    FROM schedules sch
+                    JOIN assigned_courses ac ON sch.assigned_course_id = ac.id
+                    JOIN courses c ON ac.course_id = c.id
+                    WHERE ac.section_id = ? AND ac.isDeleted = 0
+                      AND sch.day_of_week = ?
+                      AND TIME(sch.start_time) <= ? AND TIME(sch.end_time) > ?
+                    ORDER BY ac.academic_year DESC, ac.semester DESC, ac.id DESC
+                    LIMIT 1
+                """, (section_id, at.strftime('%A'), at.strftime('%H:%M:%S'), at.strftime('%H:%M:%S')))
+                row = cursor.fetchone()
+                return True, dict(row) if row else None
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error finding current course for section: {e}")
+            return False, str(e)
+
+    def get_section_embedding_versions(self, section_id):
+        """
+        Get which students of a section have a face encoding, and when it was stored.
+
+        Cheap enough to poll: it reads only ids and timestamps, so a kiosk
+        can tell which encodings changed without loading them all again.
+
+        Returns:
+            tuple: (success, {user_id: created_at} or error message)
+        """
+        try:
+            conn = self.db_manager.get_connection()
+            try:
+                cursor = conn.execute("""
+                    SELECT fe.user_id, fe.created_at
+                    FROM students st
+                    JOIN users u ON st.user_id = u.id
+                    JOIN face_embeddings fe ON fe.user_id = u.id
+                    WHERE st.section = ? AND u.isDeleted = 0
+                """, (section_id,))
+                return True, {row['user_id']: row['created_at'] for row in cursor.fetchall()}
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error getting section face embeddings: {e}")
+            return False, str(e)
+
+    def get_enrolled_user_ids(self, assigned_course_id):
+        """
+        Get the students approved to attend an assigned course.
+
+        Only approvals with status 'enrolled' or 'passed' count; pending and
+        rejected students are left out.
+
+        Returns:
+            tuple: (success, set of user ids or error message)
+        """
+        try:
+            conn = self.db_manager.get_connection()
+            try:
+                cursor = conn.execute("""
+                    SELECT st.user_id
+                    FROM assigned_course_approvals aca
+                    JOIN students st ON aca.student_id = st.id
+                    WHERE aca.assigned_course_id = ? AND aca.status IN ('enrolled', 'passed')
+                """, (assigned_course_id,))
+                return True, {row['user_id'] for row in cursor.fetchall()}
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error getting enrolled students: {e}")
+            return False, str(e)
+
+    @cached_statistics('users', 'students', 'courses', 'assigned_courses')
     def get_section_statistics(self, section_id, academic_year=None, semester=None):
         """Get statistics for a specific section"""
         conn = self.db_manager.get_connection()
@@ -418,22 +505,20 @@ class DatabaseSectionManager:
                     c.code as course_code,
                     ac.academic_year,
                     ac.semester,
-                    COUNT(CASE WHEN al.status = 'present' THEN 1 END) as present_count,
-                    COUNT(CASE WHEN al.status = 'absent' THEN 1 END) as absent_count,
-                    COUNT(CASE WHEN al.status = 'late' THEN 1 END) as late_count,
-                    COUNT(al.id) as total_logs,
-                    COUNT(DISTINCT al.user_id) as student_count
+                    SUM(r.present_count) as present_count,
+                    SUM(r.absent_count) as absent_count,
+                    SUM(r.late_count) as late_count,
+                    SUM(r.total_count) as total_logs,
+                    COUNT(DISTINCT r.user_id) as student_count
                 FROM assigned_courses ac
                 JOIN courses c ON ac.course_id = c.id
-                LEFT JOIN attendance_logs al ON ac.id = al.assigned_course_id
-                LEFT JOIN users u ON al.user_id = u.id AND u.isDeleted = 0
-                LEFT JOIN students s ON u.id = s.user_id AND s.section = ?
+                LEFT JOIN attendance_monthly_rollup r ON ac.id = r.assigned_course_id
                 WHERE ac.section_id = ? 
                   AND ac.isDeleted = 0 
                   AND c.isDeleted = 0
             """
             
-            params = [section_id, section_id]
+            params = [section_id]
             
             if academic_year:
                 query += " AND ac.academic_year = ?"
@@ -488,6 +573,86 @@ class DatabaseSectionManager:
         finally:
             conn.close()
 
+    def get_course_roster_attendance(self, section_id, course_id, academic_year=None, semester=None):
+        """
+        Get every student of a section with their attendance in one course.
+
+        Counts come from attendance_monthly_rollup in a single grouped
+        LEFT JOIN, so students without any attendance are listed with zeros.
+
+        Returns:
+            tuple: (success, list of student dicts or error message); the list is
+            empty when the course is not assigned to the section for that term
+        """
+        conn = self.db_manager.get_connection()
+        try:
+            assigned_course_query = """
+                SELECT id FROM assigned_courses
+                WHERE course_id = ? AND section_id = ? AND isDeleted = 0
+            """
+            params = [course_id, section_id]
+
+            if academic_year:
+                assigned_course_query += " AND academic_year = ?"
+                params.append(academic_year)
+
+            if semester:
+                assigned_course_query += " AND semester = ?"
+                params.append(semester)
+
+            assigned_course = conn.execute(assigned_course_query + " ORDER BY id LIMIT 1", params).fetchone()
+            if not assigned_course:
+                return True, []
+
+            cursor = conn.execute("""
+                SELECT u.id, u.first_name, u.last_name, u.email, s.student_number,
+                       stat.name as status_name,
+                       COALESCE(SUM(r.present_count), 0) as present_count,
+                       COALESCE(SUM(r.absent_count), 0) as absent_count,
+                       COALESCE(SUM(r.late_count), 0) as late_count,
+                       COALESCE(SUM(r.total_count), 0) as total_logs
+                FROM students s
+                JOIN users u ON s.user_id = u.id
+                LEFT JOIN statuses stat ON u.status_id = stat.id
+                LEFT JOIN attendance_monthly_rollup r
+                       ON r.user_id = u.id AND r.assigned_course_id = ?
+                WHERE s.section = ? AND u.isDeleted = 0
+                GROUP BY u.id
+                ORDER BY u.last_name, u.first_name
+            """, (assigned_course['id'], section_id))
+
+            roster = []
+            for row in cursor.fetchall():
+                present = row['present_count']
+                late = row['late_count']
+                total = row['total_logs']
+
+                # Count late as present for attendance rate calculation
+                percentage = ((present + late) / total) * 100 if total > 0 else 0.0
+
+                roster.append({
+                    'id': row['id'],
+                    'first_name': row['first_name'],
+                    'last_name': row['last_name'],
+                    'email': row['email'],
+                    'student_number': row['student_number'],
+                    'status_name': row['status_name'] or 'Active',
+                    'assigned_course_id': assigned_course['id'],
+                    'present': present,
+                    'absent': row['absent_count'],
+                    'late': late,
+                    'total': total,
+                    'percentage': percentage
+                })
+
+            return True, roster
+
+        except Exception as e:
+            print(f"Error getting course roster attendance: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
     def get_available_academic_years_for_section(self, section_id):
         """Get unique academic years from assigned courses for a specific section"""
         conn = self.db_manager.get_connection()
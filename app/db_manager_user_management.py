@@ -1,11 +1,18 @@
 import sqlite3
-import bcrypt
 import re
 from datetime import datetime
 
+from .user_search_index import USER_SEARCH_TABLE, match_phrase, search_index_exists
+from .blob_store import load_blob
+from .face_images import store_face_image
+from .face_embeddings import save_face_embedding, encoding_from_bytes, compute_face_encoding_from_bytes, store_face_embedding
+from .auth_executor import hash_password
+
 class DatabaseUserManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Checked on first search; False when FTS5 is not available
+        self._search_index_available = None
     
     def get_all_users_simple(self):
         """Get all users with basic joins - simple query"""
@@ -50,136 +57,331 @@ class DatabaseUserManager:
             print(f"Error getting all users: {e}")
             return False, str(e)
 
-    def filter_users_python(self, all_users, search_term="", role_filter="", year_filter="", section_filter="", program_filter="", status_filter=""):
-        """Filter users using Python instead of SQL"""
-        filtered_users = []
+    # Sortable columns for search_users, by the key the UI passes in.
+    # Plain columns only, so the users indexes can serve the ORDER BY.
+    USER_SORT_COLUMNS = {
+        'name': ("u.first_name", "u.last_name"),
+        'section': ("sec.name",),
+        'program': ("p.name",),
+        'status': ("s.name",),
+        'employee_number': ("f.employee_number",),
+        'email': ("u.email",),
+        'role': ("u.role",)
+    }
+
+    # Sort keys from LEFT JOINed tables, which are NULL for users without a row there
+    NULLABLE_SORT_KEYS = {'section', 'program', 'status', 'employee_number'}
+
+    # Program filter abbreviations matched against the full program name
+    PROGRAM_ABBREVIATIONS = {
+        'BSIT': 'Information Technology',
+        'BSCS': 'Computer Science',
+        'BSIS': 'Information Systems'
+    }
+
+    YEAR_FILTERS = {'1st Year': '1', '2nd Year': '2', '3rd Year': '3', '4th Year': '4'}
+
+    def _build_user_search_filters(self, conn, user_type, search_term, filters):
+        """Build the WHERE clause and parameters for search_users"""
+        conditions = ["u.isDeleted = 0"]
+        params = []
+        filters = {key: value for key, value in (filters or {}).items() if value and value != "All"}
         
-        for user in all_users:
-            # Apply role filter first
-            if role_filter and role_filter != "All":
-                if user['role'] != role_filter:
-                    continue
-            
-            # Apply status filter
-            if status_filter and status_filter != "All":
-                if user.get('status_name') != status_filter:
-                    continue
-            
-            # Apply search term (search in multiple fields)
-            if search_term:
-                search_fields = [
-                    user.get('first_name', ''),
-                    user.get('last_name', ''),
-                    user.get('email', ''),
-                    user.get('student_number', ''),
-                    user.get('employee_number', ''),
-                    user.get('full_name', '')
-                ]
+        if user_type == 'student':
+            conditions.append("u.role = 'Student'")
+        else:
+            conditions.append("u.role IN ('Faculty', 'Admin')")
+            if filters.get('role'):
+                conditions.append("u.role = ?")
+                params.append(filters['role'])
+        
+        if filters.get('status'):
+            conditions.append("s.name = ?")
+            params.append(filters['status'])
+        
+        if user_type == 'student':
+            if filters.get('year'):
+                # Year comes from the section name, e.g. "1-1" -> 1st Year
+                conditions.append("INSTR(sec.name, '-') > 0 AND SUBSTR(sec.name, 1, INSTR(sec.name, '-') - 1) = ?")
+                params.append(self.YEAR_FILTERS.get(filters['year'], filters['year']))
+            
+            if filters.get('section'):
+                conditions.append("sec.name = ?")
+                params.append(filters['section'])
+            
+            if filters.get('program'):
+                program = filters['program']
+                if program in self.PROGRAM_ABBREVIATIONS:
+                    conditions.append("(p.name = ? OR INSTR(p.name, ?) > 0)")
+                    params.extend([program, self.PROGRAM_ABBREVIATIONS[program]])
+                else:
+                    conditions.append("p.name = ?")
+                    params.append(program)
+        
+        if search_term:
+            if len(search_term) >= 3 and self._has_search_index(conn):
+                conditions.append(f"u.id IN (SELECT rowid FROM {USER_SEARCH_TABLE} WHERE {USER_SEARCH_TABLE} MATCH ?)")
+                params.append(match_phrase(search_term))
+            else:
+                # Terms too short for the trigram index are matched by scanning
+                term = search_term.lower()
+                conditions.append("""(
+                    INSTR(LOWER(u.first_name || ' ' || u.last_name), ?) > 0
+                    OR INSTR(LOWER(u.email), ?) > 0
+                    OR INSTR(LOWER(st.student_number), ?) > 0
+                    OR INSTR(LOWER(f.employee_number), ?) > 0
+                )""")
+                params.extend([term] * 4)
+        
+        return " AND ".join(conditions), params
+
+    def _has_search_index(self, conn):
+        if self._search_index_available is None:
+            self._search_index_available = search_index_exists(conn)
+        return self._search_index_available
+
+    def _user_sort_keys(self, sort):
+        """Return the (expression, descending) sort keys for search_users"""
+        if not sort or sort[0] not in self.USER_SORT_COLUMNS:
+            keys = [("u.role", False), ("u.last_name", False), ("u.first_name", False)]
+            descending = False
+        else:
+            descending = bool(sort[1])
+            keys = []
+            for column in self.USER_SORT_COLUMNS[sort[0]]:
+                if sort[0] in self.NULLABLE_SORT_KEYS:
+                    # Missing values sort last in both directions
+                    keys.append((f"{column} IS NULL", False))
+                keys.append((column, descending))
+        # Always end with u.id so every row has a unique position
+        keys.append(("u.id", descending))
+        return keys
+
+    @staticmethod
+    def _after_cursor(sort_keys, cursor):
+        """
+        WHERE clause selecting the rows that sort after a cursor.
+
+        A row-value comparison lets SQLite seek straight to the cursor in
+        the sort index, but only works when every key has the same
+        direction and no cursor value is NULL. Otherwise the comparison is
+        spelled out key by key, with IS so NULLs compare equal.
+        """
+        if len({descending for _, descending in sort_keys}) == 1 and None not in cursor:
+            keys = ", ".join(key for key, _ in sort_keys)
+            placeholders = ", ".join("?" * len(sort_keys))
+            return f"({keys}) {'<' if sort_keys[0][1] else '>'} ({placeholders})", list(cursor)
+
+        alternatives = []
+        params = []
+        for i, (key, descending) in enumerate(sort_keys):
+            terms = [f"({previous}) IS ?" for previous, _ in sort_keys[:i]]
+            terms.append(f"({key}) {'<' if descending else '>'} ?")
+            alternatives.append("(" + " AND ".join(terms) + ")")
+            params.extend(cursor[:i + 1])
+        return "(" + " OR ".join(alternatives) + ")", params
+
+    def search_users(self, user_type, search_term="", filters=None, sort=None, cursor=None, limit=10, include_count=True):
+        """
+        Search students or faculty with keyset pagination.
+
+        Filtering, sorting and paging all happen in SQL on plain columns,
+        so fetching a page does not sort or skip over earlier pages. The
+        total is a separate COUNT over every match; callers paging through
+        the same search pass include_count=False and keep the first total.
+
+        Args:
+            user_type: "student" or "faculty" (faculty includes admins)
+            search_term: Substring matched against name, email and student/employee number
+            filters: Optional dict with role, status, year, section and program
+            sort: Optional (column, descending) with a key from USER_SORT_COLUMNS
+            cursor: next_cursor from the previous page, or None for the first page
+            limit: Page size, or None to return every match
+            include_count: Whether to count all matches for total_count
+
+        Returns:
+            tuple: (success, {'users': list, 'next_cursor': list or None, 'total_count': int or None})
+        """
+        try:
+            conn = self.db_manager.get_connection()
+            try:
+                where, params = self._build_user_search_filters(conn, user_type, search_term, filters)
+                sort_keys = self._user_sort_keys(sort)
+                
+                from_clause = """
+                FROM users u
+                LEFT JOIN statuses s ON u.status_id = s.id
+                LEFT JOIN students st ON u.id = st.user_id
+                LEFT JOIN faculties f ON u.id = f.user_id
+                LEFT JOIN sections sec ON st.section = sec.id
+                LEFT JOIN programs p ON sec.program_id = p.id
+                """
                 
-                # Check if search term exists in any field
-                search_found = False
-                for field in search_fields:
-                    if field and search_term.lower() in str(field).lower():
-                        search_found = True
-                        break
+                page_where = where
+                page_params = list(params)
+                if cursor:
+                    cursor_where, cursor_params = self._after_cursor(sort_keys, cursor)
+                    page_where += f" AND {cursor_where}"
+                    page_params.extend(cursor_params)
                 
-                if not search_found:
-                    continue
-            
-            # Apply year filter (for students only)
-            if year_filter and year_filter != "All" and user['role'] == 'Student':
-                section_name = user.get('section_name', '')
-                if section_name:
-                    # Extract year from section name (e.g., "1-1" -> "1")
-                    section_year = section_name.split('-')[0] if '-' in section_name else ''
-                    year_mapping = {'1': '1st Year', '2': '2nd Year', '3': '3rd Year', '4': '4th Year'}
-                    user_year = year_mapping.get(section_year, '')
-                    
-                    if user_year != year_filter:
-                        continue
-                else:
-                    # If no section, skip this user for year filter
-                    continue
-            
-            # Apply section filter (for students only)
-            if section_filter and section_filter != "All" and user['role'] == 'Student':
-                if user.get('section_name') != section_filter:
-                    continue
-            
-            # Apply program filter (for students only)
-            if program_filter and program_filter != "All" and user['role'] == 'Student':
-                program_name = user.get('program_name', '')
+                sort_columns = ", ".join(f"{key} AS _sort_{i}" for i, (key, _) in enumerate(sort_keys))
+                order_by = ", ".join(key + (" DESC" if descending else "") for key, descending in sort_keys)
+                query = f"""
+                SELECT 
+                    u.*,
+                    s.name as status_name,
+                    st.student_number,
+                    st.section as section_id,
+                    f.employee_number,
+                    sec.name as section_name,
+                    p.name as program_name,
+                    {sort_columns}
+                {from_clause}
+                WHERE {page_where}
+                ORDER BY {order_by}
+                """
+                if limit is not None:
+                    # One extra row tells us whether there is a next page
+                    query += " LIMIT ?"
+                    page_params.append(limit + 1)
+                
+                rows = conn.execute(query, page_params).fetchall()
+                
+                next_cursor = None
+                if limit is not None and len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = [rows[-1][f"_sort_{i}"] for i in range(len(sort_keys))]
                 
-                # Handle both full names and abbreviations
-                program_matches = False
-                if program_filter == 'BSIT' and 'Information Technology' in program_name:
-                    program_matches = True
-                elif program_filter == 'BSCS' and 'Computer Science' in program_name:
-                    program_matches = True
-                elif program_filter == 'BSIS' and 'Information Systems' in program_name:
-                    program_matches = True
-                elif program_name == program_filter:
-                    program_matches = True
+                users = []
+                for row in rows:
+                    user_dict = dict(row)
+                    for i in range(len(sort_keys)):
+                        del user_dict[f"_sort_{i}"]
+                    user_dict['full_name'] = f"{user_dict['first_name']} {user_dict['last_name']}"
+                    users.append(user_dict)
                 
-                if not program_matches:
-                    continue
+                if limit is None:
+                    total_count = len(users)
+                elif include_count:
+                    total_count = conn.execute(f"SELECT COUNT(*) {from_clause} WHERE {where}", params).fetchone()[0]
+                else:
+                    total_count = None
+            finally:
+                conn.close()
             
-            # If we reach here, user passes all filters
-            filtered_users.append(user)
-        
-        return filtered_users
+            return True, {'users': users, 'next_cursor': next_cursor, 'total_count': total_count}
+            
+        except Exception as e:
+            print(f"Error searching users: {e}")
+            return False, str(e)
 
     def get_students_with_filters(self, search_term="", year_filter="", section_filter="", program_filter="", status_filter=""):
-        """Get filtered students using Python filtering"""
+        """Get all students matching the filters (unpaginated, e.g. for export)"""
+        success, result = self.search_users(
+            'student',
+            search_term=search_term,
+            filters={
+                'year': year_filter,
+                'section': section_filter,
+                'program': program_filter,
+                'status': status_filter
+            },
+            limit=None
+        )
+        if not success:
+            return False, result
+        return True, result['users']
+
+    def get_faculty_with_filters(self, search_term="", status_filter="", role_filter=""):
+        """Get all faculty and admins matching the filters (unpaginated, e.g. for export)"""
+        success, result = self.search_users(
+            'faculty',
+            search_term=search_term,
+            filters={'status': status_filter, 'role': role_filter},
+            limit=None
+        )
+        if not success:
+            return False, result
+        return True, result['users']
+
+    def get_face_embedding(self, user_id):
+        """
+        Get the 128-d face encoding used to verify a user at check-in.
+
+        Users registered before encodings were stored get theirs computed
+        from the stored face image on first use.
+
+        Returns:
+            tuple: (success, numpy.ndarray or error message)
+        """
         try:
-            # Get all users first
-            success, all_users = self.get_all_users_simple()
-            if not success:
-                return False, all_users
-            
-            # Filter to only students
-            students = [user for user in all_users if user['role'] == 'Student']
-            
-            # Apply filters using Python
-            filtered_students = self.filter_users_python(
-                students,
-                search_term=search_term,
-                role_filter="Student",
-                year_filter=year_filter,
-                section_filter=section_filter,
-                program_filter=program_filter,
-                status_filter=status_filter
-            )
-            
-            return True, filtered_students
-            
+            conn = self.db_manager.get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT u.face_image_hash, fe.encoding
+                    FROM users u
+                    LEFT JOIN face_embeddings fe ON fe.user_id = u.id
+                    WHERE u.id = ? AND u.isDeleted = 0
+                """, (user_id,))
+                result = cursor.fetchone()
+                
+                if not result:
+                    return False, "User not found"
+                if result['encoding']:
+                    return True, encoding_from_bytes(result['encoding'])
+                if not result['face_image_hash']:
+                    return False, "No registered face image"
+                
+                image_data = load_blob(result['face_image_hash'])
+                if not image_data:
+                    return False, "Registered face image is missing"
+                
+                encoding = compute_face_encoding_from_bytes(image_data)
+                if encoding is None:
+                    return False, "No face could be encoded from the registered image"
+                
+                store_face_embedding(cursor, user_id, encoding)
+                conn.commit()
+                return True, encoding
+            finally:
+                conn.close()
+                
         except Exception as e:
-            print(f"Error getting filtered students: {e}")
+            print(f"Error getting face embedding: {e}")
             return False, str(e)
 
-    def get_faculty_with_filters(self, search_term="", status_filter="", role_filter=""):
-        """Get filtered faculty using Python filtering"""
+    def get_face_embeddings(self, user_ids):
+        """
+        Get the stored face encodings of several users at once.
+
+        Users without a stored encoding are left out; nothing is computed here.
+
+        Returns:
+            tuple: (success, {user_id: (created_at, numpy.ndarray)} or error message)
+        """
         try:
-            # Get all users first
-            success, all_users = self.get_all_users_simple()
-            if not success:
-                return False, all_users
-            
-            # Filter to only faculty and admin
-            faculty = [user for user in all_users if user['role'] in ['Faculty', 'Admin']]
-            
-            # Apply filters using Python
-            filtered_faculty = self.filter_users_python(
-                faculty,
-                search_term=search_term,
-                role_filter=role_filter if role_filter and role_filter != "All" else "",
-                status_filter=status_filter
-            )
-            
-            return True, filtered_faculty
-            
+            conn = self.db_manager.get_connection()
+            try:
+                user_ids = list(user_ids)
+                embeddings = {}
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(user_ids), 500):
+                    chunk = user_ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor = conn.execute(f"""
+                        SELECT user_id, encoding, created_at
+                        FROM face_embeddings
+                        WHERE user_id IN ({placeholders})
+                    """, chunk)
+                    for row in cursor.fetchall():
+                        embeddings[row['user_id']] = (row['created_at'], encoding_from_bytes(row['encoding']))
+                return True, embeddings
+            finally:
+                conn.close()
+
         except Exception as e:
-            print(f"Error getting filtered faculty: {e}")
+            print(f"Error getting face embeddings: {e}")
             return False, str(e)
 
     def get_user_by_name(self, first_name, last_name, role=None):
@@ -228,7 +430,7 @@ class DatabaseUserManager:
             query = """
             SELECT 
                 u.id, u.first_name, u.last_name, u.email, u.birthday, 
-                u.contact_number, u.role, u.face_image, u.status_id, 
+                u.contact_number, u.role, u.face_image_hash, u.face_thumbnail_hash, u.status_id, 
                 u.verified, u.isDeleted, u.created_at, u.updated_at,
                 s.name as status_name,
                 st.student_number, st.section as section_id,
@@ -260,7 +462,9 @@ class DatabaseUserManager:
                 'birthday': result['birthday'],
                 'contact_number': result['contact_number'] or '',
                 'role': result['role'],
-                'face_image': result['face_image'],
+                'face_image': load_blob(result['face_image_hash']),
+                'face_image_hash': result['face_image_hash'],
+                'face_thumbnail': load_blob(result['face_thumbnail_hash']),
                 'status_id': result['status_id'],
                 'status_name': result['status_name'] or 'No Status',
                 'verified': result['verified'],
@@ -409,9 +613,8 @@ class DatabaseUserManager:
                     return False, "Password must be at least 6 characters long"
                 
                 # Hash the new password
-                hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
                 update_fields.append('password_hash')
-                update_values.append(hashed_pw.decode('utf-8'))
+                update_values.append(hash_password(password))
             
             # Update face image if provided
             if user_data.get('face_image'):
@@ -421,8 +624,9 @@ class DatabaseUserManager:
                     conn.close()
                     return False, "Face image size exceeds 5MB limit"
                 
-                update_fields.append('face_image')
-                update_values.append(user_data['face_image'])
+                face_image_hash, face_thumbnail_hash = store_face_image(cursor, user_data['face_image'])
+                update_fields.extend(['face_image_hash', 'face_thumbnail_hash'])
+                update_values.extend([face_image_hash, face_thumbnail_hash])
             
             # Update users table
             update_query = f"UPDATE users SET {', '.join([f'{field} = ?' for field in update_fields])} WHERE id = ?"
@@ -430,6 +634,10 @@ class DatabaseUserManager:
             
             cursor.execute(update_query, update_values)
             
+            # Replace the face encoding along with the image (the old one was dropped by trigger)
+            if user_data.get('face_image'):
+                save_face_embedding(cursor, user_id, user_data['face_image'], user_data.get('face_encoding'))
+            
             # Handle role-specific updates
             if user_role == 'Student':
                 self._handle_student_updates(cursor, user_id, user_data, conn)
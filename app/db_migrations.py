@@ -0,0 +1,311 @@
+"""
+Versioned schema migrations for the SQLite database.
+
+The current schema version is stored in the database header via
+PRAGMA user_version, so existing databases are upgraded in place by
+applying every migration newer than the recorded version, in order.
+This module avoids the DatabaseManager stack so create_db.py can run it too.
+"""
+import sqlite3
+
+from .attendance_rollups import ROLLUP_TABLES, create_rollup_schema, populate_rollups
+from .user_search_index import create_search_index, populate_search_index
+from .blob_store import create_blob_schema, store_blob
+from .face_embeddings import create_embedding_schema
+from .face_images import compact_stored_face_images, face_detection_available
+from .table_versions import TRACKED_TABLES, create_table_version_schema
+from .email_outbox import create_outbox_schema
+from .absence_notifications import create_notification_schema
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+
+def _column_exists(cursor, table, column):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
+
+
+def _create_index(cursor, name, table, columns):
+    """Create an index if its table exists (older databases may lack some tables)"""
+    if not _table_exists(cursor, table):
+        print(f"⚠️  Skipping index {name}: table '{table}' not found")
+        return
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+
+def _add_lookup_indexes(cursor):
+    """Secondary indexes for the statistics, roster and OTP access paths"""
+    indexes = [
+        # Attendance statistics: per student, per class and per date range.
+        # status is included so the counts are answered from the index alone.
+        ('ix_attendance_logs_user_course_date', 'attendance_logs', ['user_id', 'assigned_course_id', 'date', 'status']),
+        ('ix_attendance_logs_course_date', 'attendance_logs', ['assigned_course_id', 'date', 'status', 'user_id']),
+        ('ix_attendance_logs_date_status', 'attendance_logs', ['date', 'status']),
+
+        # Student/faculty lookups by user and section rosters
+        ('ix_students_section_user', 'students', ['section', 'user_id']),
+        ('ix_students_user_section', 'students', ['user_id', 'section']),
+        ('ix_faculties_user', 'faculties', ['user_id']),
+        ('ix_users_role_deleted', 'users', ['role', 'isDeleted']),
+
+        # Course assignments by section, course and academic term
+        ('ix_assigned_courses_section_term', 'assigned_courses', ['section_id', 'academic_year', 'semester', 'isDeleted']),
+        ('ix_assigned_courses_course_section', 'assigned_courses', ['course_id', 'section_id', 'academic_year', 'semester']),
+        ('ix_assigned_courses_term', 'assigned_courses', ['academic_year', 'semester']),
+        ('ix_sections_program', 'sections', ['program_id', 'isDeleted']),
+        ('ix_courses_program', 'courses', ['program_id', 'isDeleted']),
+        ('ix_schedules_assigned_course', 'schedules', ['assigned_course_id', 'day_of_week']),
+
+        # OTP verification and cleanup
+        ('ix_otp_requests_user_type', 'otp_requests', ['user_id', 'type', 'expires_at']),
+        ('ix_otp_requests_type_expires', 'otp_requests', ['type', 'expires_at']),
+    ]
+
+    for name, table, columns in indexes:
+        _create_index(cursor, name, table, columns)
+
+    # Refresh planner statistics so the new indexes are actually chosen
+    cursor.execute("ANALYZE")
+
+
+def _add_attendance_rollups(cursor):
+    """Daily/monthly attendance summary tables, their triggers and the initial backfill"""
+    if not _table_exists(cursor, 'attendance_logs'):
+        raise sqlite3.OperationalError("attendance_logs table not found")
+
+    create_rollup_schema(cursor)
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    populate_rollups(cursor)
+
+
+def _add_user_search_index(cursor):
+    """Full-text index and keyset-order index for the paginated user search"""
+    for table in ('users', 'students', 'faculties'):
+        if not _table_exists(cursor, table):
+            raise sqlite3.OperationalError(f"{table} table not found")
+
+    # Default listing order (role, last name, first name, id) straight from the index
+    _create_index(cursor, 'ix_users_role_deleted_name', 'users', ['role', 'isDeleted', 'last_name', 'first_name'])
+
+    # Without FTS5 the search falls back to scanning, so this is not fatal
+    if create_search_index(cursor):
+        populate_search_index(cursor)
+
+
+def _move_blobs(cursor, table, source_column, hash_column):
+    """Copy inline image bytes into the blob store and keep only their hash"""
+    if not _column_exists(cursor, table, source_column):
+        return 0
+
+    cursor.execute(f"SELECT id FROM {table} WHERE {source_column} IS NOT NULL")
+    row_ids = [row[0] for row in cursor.fetchall()]
+    # One row at a time so only a single image is held in memory
+    for row_id in row_ids:
+        cursor.execute(f"SELECT {source_column} FROM {table} WHERE id = ?", (row_id,))
+        blob_hash = store_blob(cursor, bytes(cursor.fetchone()[0]))
+        cursor.execute(
+            f"UPDATE {table} SET {hash_column} = ?, {source_column} = NULL WHERE id = ?",
+            (blob_hash, row_id)
+        )
+    return len(row_ids)
+
+
+def _move_images_to_blob_store(cursor):
+    """Content-addressed blob store for face and attendance images"""
+    for table in ('users', 'attendance_logs'):
+        if not _table_exists(cursor, table):
+            raise sqlite3.OperationalError(f"{table} table not found")
+
+    if not _column_exists(cursor, 'users', 'face_image_hash'):
+        cursor.execute("ALTER TABLE users ADD COLUMN face_image_hash VARCHAR(64)")
+    if not _column_exists(cursor, 'attendance_logs', 'image_hash'):
+        cursor.execute("ALTER TABLE attendance_logs ADD COLUMN image_hash VARCHAR(64)")
+
+    create_blob_schema(cursor)
+
+    moved = _move_blobs(cursor, 'users', 'face_image', 'face_image_hash')
+    moved += _move_blobs(cursor, 'attendance_logs', 'image', 'image_hash')
+    if moved:
+        print(f"✓ Moved {moved} images to the blob store")
+
+
+def _add_face_embeddings(cursor):
+    """Precomputed face encodings for check-in (filled as faces are captured)"""
+    if not _column_exists(cursor, 'users', 'face_image_hash'):
+        raise sqlite3.OperationalError("users.face_image_hash column not found")
+    create_embedding_schema(cursor)
+
+
+def _add_attendance_unique_key(cursor):
+    """One attendance row per student, class and day so check-ins can upsert"""
+    if not _table_exists(cursor, 'attendance_logs'):
+        raise sqlite3.OperationalError("attendance_logs table not found")
+
+    # Of any duplicates keep the best status (present, then late, then
+    # absent), and the first record among equals. The rollup triggers
+    # adjust the counts.
+    cursor.execute("""
+        DELETE FROM attendance_logs
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, assigned_course_id, date
+                    ORDER BY CASE status WHEN 'present' THEN 0 WHEN 'late' THEN 1 ELSE 2 END, id
+                ) AS position
+                FROM attendance_logs
+            )
+            WHERE position > 1
+        )
+    """)
+    if cursor.rowcount:
+        print(f"✓ Removed {cursor.rowcount} duplicate attendance records")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_logs_user_course_date
+        ON attendance_logs (user_id, assigned_course_id, date)
+    """)
+
+
+def _add_table_versions(cursor):
+    """Change counters the admin views use to skip reloading unchanged data"""
+    tables = [table for table in TRACKED_TABLES if _table_exists(cursor, table)]
+    create_table_version_schema(cursor, tables)
+
+
+def _add_email_outbox(cursor):
+    """Queue for emails the background sender delivers"""
+    create_outbox_schema(cursor)
+
+
+def _add_absence_notifications(cursor):
+    """Absence count each student was last alerted at, per class"""
+    create_notification_schema(cursor)
+
+
+def _add_approval_unique_key(cursor):
+    """One approval per student and class so enrollment can upsert"""
+    if not _table_exists(cursor, 'assigned_course_approvals'):
+        raise sqlite3.OperationalError("assigned_course_approvals table not found")
+
+    # Keep the latest decision of any duplicates
+    cursor.execute("""
+        DELETE FROM assigned_course_approvals
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM assigned_course_approvals
+            GROUP BY assigned_course_id, student_id
+        )
+    """)
+    if cursor.rowcount:
+        print(f"✓ Removed {cursor.rowcount} duplicate course approvals")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_assigned_course_approvals_course_student
+        ON assigned_course_approvals (assigned_course_id, student_id)
+    """)
+
+
+def _compact_face_images(cursor):
+    """Normalized face crops and thumbnails in place of whole camera frames"""
+    if not _column_exists(cursor, 'users', 'face_image_hash'):
+        raise sqlite3.OperationalError("users.face_image_hash column not found")
+
+    if not _column_exists(cursor, 'users', 'face_thumbnail_hash'):
+        cursor.execute("ALTER TABLE users ADD COLUMN face_thumbnail_hash VARCHAR(64)")
+    # Reference-counting triggers for the new column
+    create_blob_schema(cursor)
+
+    # Without a face detector every frame would be centre-cropped and the
+    # original freed by the next blob collection; leave them for
+    # DatabaseManager.compact_face_images() instead
+    if not face_detection_available():
+        print("⚠️  Face detection (OpenCV) is not available; stored face images were left unchanged.")
+        print("   Run DatabaseManager().compact_face_images() once OpenCV is installed to convert them.")
+        return
+
+    converted, skipped = compact_stored_face_images(cursor)
+    # The replaced frames are removed by the next blob garbage collection
+    if converted:
+        print(f"✓ Converted {converted} face images to compact crops")
+    if skipped:
+        print(f"⚠️  Left {skipped} face images unchanged")
+
+
+def _add_user_sort_indexes(cursor):
+    """Indexes serving the name and email sorts of the paginated user search"""
+    _create_index(cursor, 'ix_users_role_deleted_first_name', 'users', ['role', 'isDeleted', 'first_name', 'last_name'])
+    _create_index(cursor, 'ix_users_role_deleted_email', 'users', ['role', 'isDeleted', 'email'])
+
+
+def _add_outbox_claims(cursor):
+    """Claim time on outbox rows so only abandoned deliveries are retried"""
+    if not _table_exists(cursor, 'email_outbox'):
+        raise sqlite3.OperationalError("email_outbox table not found")
+    if not _column_exists(cursor, 'email_outbox', 'claimed_at'):
+        cursor.execute("ALTER TABLE email_outbox ADD COLUMN claimed_at TEXT")
+
+
+# (version, description, migration function) - append only, never renumber
+MIGRATIONS = [
+    (1, "Add secondary indexes for attendance, roster and OTP lookups", _add_lookup_indexes),
+    (2, "Add attendance rollup tables maintained by triggers", _add_attendance_rollups),
+    (3, "Add full-text user search index", _add_user_search_index),
+    (4, "Move face and attendance images to the blob store", _move_images_to_blob_store),
+    (5, "Add face embeddings table", _add_face_embeddings),
+    (6, "Make attendance unique per student, class and day", _add_attendance_unique_key),
+    (7, "Add per-table change counters", _add_table_versions),
+    (8, "Add email outbox", _add_email_outbox),
+    (9, "Add absence alert log", _add_absence_notifications),
+    (10, "Make course approvals unique per student and class", _add_approval_unique_key),
+    (11, "Store face images as compact crops with thumbnails", _compact_face_images),
+    (12, "Add indexes for sorting the user search", _add_user_sort_indexes),
+    (13, "Record when outbox emails were claimed for sending", _add_outbox_claims),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Migrations that free a lot of pages; VACUUM cannot run inside their transaction
+VACUUM_AFTER = {4}
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn):
+    """
+    Apply all pending migrations to an open connection.
+
+    Each migration runs in its own transaction together with the version
+    bump, so a failed migration leaves the database at the previous version.
+
+    Returns:
+        list: Versions that were applied (empty if already up to date)
+    """
+    current_version = get_schema_version(conn)
+    applied = []
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            migrate(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        print(f"✓ Applied schema migration {version}: {description}")
+        applied.append(version)
+
+    if VACUUM_AFTER.intersection(applied):
+        print("Compacting database...")
+        conn.execute("VACUUM")
+
+    return applied
@@ -0,0 +1,390 @@
+"""
+Durable email outbox with a background sender.
+
+EmailService.send_email() only inserts a row into email_outbox and
+returns; a sender thread delivers queued messages over SMTP sessions that
+stay connected and authenticated between messages (SMTPConnectionPool),
+so sending an OTP no longer blocks the login screen on a TCP connect,
+STARTTLS handshake and login.
+
+Failed deliveries are retried with exponential backoff (EMAIL_RETRY_BASE_SECONDS
+doubling per attempt) up to EMAIL_MAX_ATTEMPTS, after which the row is
+marked failed. Permanent rejections (5xx) fail immediately. Because the
+outbox lives in the database, messages queued when the app exits are sent
+the next time it starts.
+
+Rows move through: queued -> sending -> sent | failed (or back to queued
+with a later next_attempt_at when a retry is due). A sender claims a row
+by setting it to sending with claimed_at; several app instances can share
+one outbox, so a claim is only taken back (requeued) once it is older
+than EMAIL_SENDING_LEASE_SECONDS and its sender is presumed gone.
+"""
+import json
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from .config import (
+    EMAIL_SMTP_POOL_SIZE,
+    EMAIL_SMTP_IDLE_TIMEOUT,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_RETRY_BASE_SECONDS,
+    EMAIL_SENDING_LEASE_SECONDS
+)
+from .email_service import EmailService
+
+# Messages claimed per round by the sender thread
+SEND_BATCH_SIZE = 20
+# Upper bound on how long the sender sleeps when nothing is due
+IDLE_POLL_SECONDS = 60
+
+
+def create_outbox_schema(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY,
+            to_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body_text TEXT NOT NULL,
+            body_html TEXT,
+            attachments TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT,
+            claimed_at TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_email_outbox_due ON email_outbox (status, next_attempt_at)")
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class SMTPConnectionPool:
+    """
+    Reusable authenticated SMTP sessions.
+
+    At most max_connections sessions are open at once. Sessions idle for
+    longer than idle_timeout are closed instead of reused, since servers
+    drop idle clients.
+    """
+
+    def __init__(self, connect, max_connections=EMAIL_SMTP_POOL_SIZE, idle_timeout=EMAIL_SMTP_IDLE_TIMEOUT):
+        self._connect = connect
+        self.idle_timeout = idle_timeout
+        self._idle = []  # (server, last used)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.stats = {'connects': 0, 'reused': 0}
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    server = self._connect()
+                    self._count('connects')
+                    return server
+                server, last_used = item
+                if time.monotonic() - last_used <= self.idle_timeout:
+                    self._count('reused')
+                    return server
+                self._quit(server)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def release(self, server):
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+        self._slots.release()
+
+    def discard(self, server):
+        """Drop a session that failed; its slot becomes free again"""
+        self._quit(server)
+        self._slots.release()
+
+    @contextmanager
+    def session(self):
+        server = self.acquire()
+        try:
+            yield server
+        except Exception:
+            self.discard(server)
+            raise
+        else:
+            self.release(server)
+
+    def send(self, from_email, to_email, message):
+        """
+        Send one message on a pooled session.
+
+        A session the server closed while idle is replaced once.
+        """
+        for attempt in range(2):
+            server = self.acquire()
+            try:
+                server.sendmail(from_email, to_email, message)
+            except smtplib.SMTPServerDisconnected:
+                self.discard(server)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self.discard(server)
+                raise
+            self.release(server)
+            return
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._quit(server)
+
+    @staticmethod
+    def _quit(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+def _is_permanent(error):
+    """5xx replies will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(code, int) and code >= 500 and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+class EmailOutbox:
+    """Queues emails in the database and delivers them from a background thread"""
+
+    def __init__(self, pool, mailer=None, max_attempts=EMAIL_MAX_ATTEMPTS, retry_base=EMAIL_RETRY_BASE_SECONDS,
+                 lease=EMAIL_SENDING_LEASE_SECONDS):
+        self.pool = pool
+        # Builds messages and opens SMTP sessions; never queues itself
+        self.mailer = mailer or EmailService()
+        self.smtp_pool = SMTPConnectionPool(self.mailer._create_smtp_connection)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease = lease
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, to_email, subject, body_text, body_html=None, attachments=None):
+        """
+        Add a message to the outbox and wake the sender.
+
+        Returns:
+            int: outbox id, for get_status()
+        """
+        now = _now()
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.execute("""
+                INSERT INTO email_outbox
+                    (to_email, subject, body_text, body_html, attachments, status, attempts, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?)
+            """, (to_email, subject, body_text, body_html, json.dumps(attachments) if attachments else None, now, now))
+            conn.commit()
+            outbox_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        self.start()
+        self._wake.set()
+        return outbox_id
+
+    def get_status(self, outbox_id):
+        """
+        Returns:
+            dict: status, attempts, last_error, created_at, sent_at (None if unknown id)
+        """
+        conn = self.pool.acquire()
+        try:
+            row = conn.execute("""
+                SELECT status, attempts, last_error, created_at, sent_at, next_attempt_at
+                FROM email_outbox WHERE id = ?
+            """, (outbox_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """Message counts per status"""
+        conn = self.pool.acquire()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status").fetchall()
+            return {row[0]: row[1] for row in rows}
+        finally:
+            conn.close()
+
+    def start(self):
+        """Start the sender thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the sender; queued messages stay in the outbox"""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        self.smtp_pool.close_all()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._requeue_expired_claims()
+                processed = self._send_due()
+            except Exception as e:
+                print(f"Email outbox error: {e}")
+                processed = 0
+            if processed:
+                continue
+
+            # Idle: close sessions before the server times them out, then wait
+            self.smtp_pool.close_all()
+            self._wake.wait(self._seconds_until_next_due())
+            self._wake.clear()
+
+    def _requeue_expired_claims(self):
+        """
+        Messages left 'sending' by a sender that exited mid-delivery.
+
+        Claims younger than the lease may belong to another app instance
+        that is still delivering them, so they are left alone.
+        """
+        expired = (datetime.now() - timedelta(seconds=self.lease)).isoformat(timespec='seconds')
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.execute("""
+                UPDATE email_outbox SET status = 'queued', claimed_at = NULL
+                WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)
+            """, (expired,))
+            conn.commit()
+            if cursor.rowcount:
+                print(f"Requeued {cursor.rowcount} emails whose sender stopped mid-delivery")
+        finally:
+            conn.close()
+
+    def _seconds_until_next_due(self):
+        conn = self.pool.acquire()
+        try:
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM email_outbox WHERE status = 'queued'"
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row or not row[0]:
+            return IDLE_POLL_SECONDS
+        delay = (datetime.fromisoformat(row[0]) - datetime.now()).total_seconds()
+        return min(IDLE_POLL_SECONDS, max(0.0, delay))
+
+    def _send_due(self):
+        """Deliver up to SEND_BATCH_SIZE due messages; returns how many were processed"""
+        conn = self.pool.acquire()
+        try:
+            rows = conn.execute("""
+                SELECT id, to_email, subject, body_text, body_html, attachments, attempts
+                FROM email_outbox
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT ?
+            """, (_now(), SEND_BATCH_SIZE)).fetchall()
+
+            processed = 0
+            for row in rows:
+                if self._stop.is_set():
+                    break
+                # Claim the row so another app instance does not send it too
+                claimed = conn.execute(
+                    "UPDATE email_outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND status = 'queued'",
+                    (_now(), row['id'])
+                )
+                conn.commit()
+                if not claimed.rowcount:
+                    continue
+
+                error = self._deliver(row)
+                self._record_result(conn, row, error)
+                processed += 1
+            return processed
+        finally:
+            conn.close()
+
+    def _deliver(self, row):
+        """Send one outbox row; returns the exception on failure, else None"""
+        try:
+            attachments = json.loads(row['attachments']) if row['attachments'] else None
+            message = self.mailer.build_message(
+                row['to_email'], row['subject'], row['body_text'], row['body_html'], attachments
+            )
+            self.smtp_pool.send(self.mailer.email, row['to_email'], message.as_string())
+            return None
+        except Exception as e:
+            return e
+
+    def _record_result(self, conn, row, error):
+        attempts = row['attempts'] + 1
+        if error is None:
+            conn.execute("""
+                UPDATE email_outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL, claimed_at = NULL
+                WHERE id = ?
+            """, (attempts, _now(), row['id']))
+            print(f"Email sent successfully to {row['to_email']}")
+        elif attempts >= self.max_attempts or _is_permanent(error):
+            conn.execute("""
+                UPDATE email_outbox SET status = 'failed', attempts = ?, last_error = ?, claimed_at = NULL
+                WHERE id = ?
+            """, (attempts, str(error), row['id']))
+            print(f"Failed to send email to {row['to_email']}: {error}")
+        else:
+            retry_at = datetime.now() + timedelta(seconds=self.retry_base * 2 ** (attempts - 1))
+            conn.execute("""
+                UPDATE email_outbox SET status = 'queued', attempts = ?, last_error = ?, next_attempt_at = ?, claimed_at = NULL
+                WHERE id = ?
+            """, (attempts, str(error), retry_at.isoformat(timespec='seconds'), row['id']))
+            print(f"Email to {row['to_email']} failed (attempt {attempts}), retrying at {retry_at:%H:%M:%S}: {error}")
+        conn.commit()
+
+
+_outboxes = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_email_outbox(pool):
+    """Return the shared outbox for a connection pool (one sender per database)"""
+    with _outboxes_lock:
+        outbox = _outboxes.get(pool.db_path)
+        if outbox is None:
+            outbox = _outboxes[pool.db_path] = EmailOutbox(pool)
+        return outbox
@@ -19,36 +19,78 @@ from .config import (
 )
 
 class EmailService:
-    def __init__(self):
+    def __init__(self, outbox=None):
         self.smtp_server = EMAIL_SMTP_SERVER
         self.smtp_port = EMAIL_SMTP_PORT
         self.email = EMAIL_ADDRESS
         self.password = EMAIL_PASSWORD
         self.use_tls = EMAIL_USE_TLS
+        # When set (app.email_outbox.EmailOutbox), send_email only queues
+        self.outbox = outbox
         
     def _create_smtp_connection(self):
         """Create and return SMTP connection"""
         try:
             # Create SMTP connection
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
             
             if self.use_tls:
                 # Enable TLS encryption
                 context = ssl.create_default_context()
                 server.starttls(context=context)
             
-            # Login to email account
-            server.login(self.email, self.password)
+            # Login to email account (a local relay may not offer AUTH)
+            server.ehlo_or_helo_if_needed()
+            if server.has_extn('auth'):
+                server.login(self.email, self.password)
             
             return server
         except Exception as e:
             print(f"Error creating SMTP connection: {e}")
             raise
     
+    def build_message(self, to_email, subject, body_text, body_html=None, attachments=None):
+        """Build the MIME message for an email"""
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = self.email
+        message["To"] = to_email
+        
+        # Add text part
+        text_part = MIMEText(body_text, "plain")
+        message.attach(text_part)
+        
+        # Add HTML part if provided
+        if body_html:
+            html_part = MIMEText(body_html, "html")
+            message.attach(html_part)
+        
+        # Add attachments if provided
+        if attachments:
+            for file_path in attachments:
+                try:
+                    with open(file_path, "rb") as attachment:
+                        part = MIMEBase("application", "octet-stream")
+                        part.set_payload(attachment.read())
+                    
+                    encoders.encode_base64(part)
+                    part.add_header(
+                        "Content-Disposition",
+                        f"attachment; filename= {file_path.split('/')[-1]}"
+                    )
+                    message.attach(part)
+                except Exception as e:
+                    print(f"Error attaching file {file_path}: {e}")
+        
+        return message
+    
     def send_email(self, to_email, subject, body_text, body_html=None, attachments=None):
         """
         Send an email
         
+        With an outbox the email is queued and delivered in the background;
+        use queue_email() to get its outbox id.
+        
         Args:
             to_email (str): Recipient email address
             subject (str): Email subject
@@ -56,6 +98,55 @@ class EmailService:
             body_html (str, optional): HTML body
             attachments (list, optional): List of file paths to attach
             
+        Returns:
+            tuple: (success, message)
+        """
+        if self.outbox is not None:
+            success, result = self.queue_email(to_email, subject, body_text, body_html, attachments)
+            return (True, "Email queued for delivery") if success else (False, result)
+        return self.send_email_now(to_email, subject, body_text, body_html, attachments)
+    
+    def queue_email(self, to_email, subject, body_text, body_html=None, attachments=None):
+        """
+        Queue an email in the outbox
+        
+        Returns:
+            tuple: (success, outbox_id or error message)
+        """
+        try:
+            # Validate email configuration
+            if not self.email or not self.password:
+                return False, "Email credentials not configured"
+            if self.outbox is None:
+                return False, "Email outbox not configured"
+            
+            return True, self.outbox.enqueue(to_email, subject, body_text, body_html, attachments)
+        except Exception as e:
+            error_msg = f"Failed to queue email: {str(e)}"
+            print(error_msg)
+            return False, error_msg
+    
+    def get_delivery_status(self, outbox_id):
+        """
+        Delivery status of a queued email
+        
+        Returns:
+            tuple: (success, dict with status, attempts, last_error, created_at, sent_at)
+        """
+        try:
+            if self.outbox is None:
+                return False, "Email outbox not configured"
+            status = self.outbox.get_status(outbox_id)
+            if status is None:
+                return False, "Email not found"
+            return True, status
+        except Exception as e:
+            return False, f"Failed to read email status: {str(e)}"
+    
+    def send_email_now(self, to_email, subject, body_text, body_html=None, attachments=None):
+        """
+        Send an email synchronously on a new SMTP connection
+        
         Returns:
             tuple: (success, message)
         """
@@ -64,37 +155,7 @@ class EmailService:
             if not self.email or not self.password:
                 return False, "Email credentials not configured"
             
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.email
-            message["To"] = to_email
-            
-            # Add text part
-            text_part = MIMEText(body_text, "plain")
-            message.attach(text_part)
-            
-            # Add HTML part if provided
-            if body_html:
-                html_part = MIMEText(body_html, "html")
-                message.attach(html_part)
-            
-            # Add attachments if provided
-            if attachments:
-                for file_path in attachments:
-                    try:
-                        with open(file_path, "rb") as attachment:
-                            part = MIMEBase("application", "octet-stream")
-                            part.set_payload(attachment.read())
-                        
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            "Content-Disposition",
-                            f"attachment; filename= {file_path.split('/')[-1]}"
-                        )
-                        message.attach(part)
-                    except Exception as e:
-                        print(f"Error attaching file {file_path}: {e}")
+            message = self.build_message(to_email, subject, body_text, body_html, attachments)
             
             # Send email
             server = self._create_smtp_connection()
@@ -400,7 +461,8 @@ If you received this email, your {APP_NAME} email service is configured properly
 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             """.strip()
             
-            return self.send_email(self.email, subject, body_text)
+            # Sent directly so configuration errors are reported here
+            return self.send_email_now(self.email, subject, body_text)
             
         except Exception as e:
             error_msg = f"Email configuration test failed: {str(e)}"
@@ -0,0 +1,204 @@
+"""
+Haar-cascade face and eye detection for face captures.
+
+The face and eye cascades are loaded once per process (get_face_detector())
+instead of on every check. Faces are searched on a copy of the frame
+downscaled to DETECTION_WIDTH and the boxes are mapped back to the frame;
+eyes are searched inside the face box only, at full resolution.
+
+FaceTracker keeps the face box between frames of a live preview and only
+searches the area around it, running a search over the whole frame every
+FULL_DETECTION_INTERVAL frames or when the face is lost, which makes
+per-frame feedback cheap enough for the preview.
+"""
+import os
+import threading
+
+# Frames wider than this are downscaled before searching for faces
+DETECTION_WIDTH = 320
+# A tracked face is searched for over the whole frame every this many frames
+FULL_DETECTION_INTERVAL = 10
+# Area searched around a tracked face, as a fraction of its size on each side
+TRACK_MARGIN = 0.5
+
+# Smallest face / eye accepted, in pixels of the original frame
+MIN_FACE_SIZE = 30
+MIN_EYE_SIZE = 30
+
+STATUS_MESSAGES = {
+    'ok': "Face validation successful",
+    'no_face': "No face detected. Please ensure your face is clearly visible.",
+    'multiple_faces': "Multiple faces detected. Please ensure only your face is in the image.",
+    'eyes_hidden': "Eyes not clearly visible. Please remove sunglasses or any accessories covering your face.",
+}
+
+
+class FaceDetector:
+    """Cached face/eye cascades with downscaled face search"""
+
+    def __init__(self, detection_width=DETECTION_WIDTH):
+        import cv2
+
+        self.detection_width = detection_width
+        face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
+        self.available = os.path.exists(face_cascade_path) and os.path.exists(eye_cascade_path)
+        if self.available:
+            self.face_cascade = cv2.CascadeClassifier(face_cascade_path)
+            self.eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+        else:
+            print("Warning: Face detection cascades not found. Skipping face validation.")
+
+    @staticmethod
+    def to_gray(frame):
+        import cv2
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def detect_faces(self, gray, region=None, min_size=MIN_FACE_SIZE):
+        """
+        Face boxes (x, y, w, h) in gray's coordinates.
+
+        region (x, y, w, h) limits the search to part of the frame. The
+        search runs at the same scale as a whole-frame search so the two
+        find the same faces. min_size is the smallest face in gray's pixels;
+        pass it scaled down when gray is itself a downscaled frame.
+        """
+        import cv2
+
+        scale = min(1.0, self.detection_width / gray.shape[1])
+
+        offset_x, offset_y = 0, 0
+        if region is not None:
+            x, y, w, h = region
+            offset_x, offset_y = max(0, x), max(0, y)
+            gray = gray[offset_y:y + h, offset_x:x + w]
+            if gray.size == 0:
+                return []
+
+        if scale < 1.0:
+            small = cv2.resize(gray, (max(1, int(gray.shape[1] * scale)), max(1, int(gray.shape[0] * scale))),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+
+        min_size = max(1, int(min_size * scale))
+        faces = self.face_cascade.detectMultiScale(
+            small,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_size, min_size)
+        )
+        return [
+            (int(x / scale) + offset_x, int(y / scale) + offset_y, int(w / scale), int(h / scale))
+            for (x, y, w, h) in faces
+        ]
+
+    def detect_eyes(self, gray, face):
+        """Eye boxes (x, y, w, h) inside a face box, in gray's coordinates"""
+        x, y, w, h = face
+        eyes = self.eye_cascade.detectMultiScale(
+            gray[y:y+h, x:x+w],
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(MIN_EYE_SIZE, MIN_EYE_SIZE)
+        )
+        return [(int(ex) + x, int(ey) + y, int(ew), int(eh)) for (ex, ey, ew, eh) in eyes]
+
+    def eyes_visible(self, gray, face):
+        return len(self.detect_eyes(gray, face)) >= 2
+
+    def check(self, gray, faces):
+        """Status key (see STATUS_MESSAGES) for the faces found in a frame"""
+        if len(faces) == 0:
+            return 'no_face'
+        if len(faces) > 1:
+            return 'multiple_faces'
+        if not self.eyes_visible(gray, faces[0]):
+            return 'eyes_hidden'
+        return 'ok'
+
+    def validate(self, frame):
+        """
+        Check that a frame shows exactly one face with both eyes visible.
+
+        Returns:
+            tuple: (is_valid, message)
+        """
+        if not self.available:
+            return (True, "Face validation skipped")
+        gray = self.to_gray(frame)
+        status = self.check(gray, self.detect_faces(gray))
+        return (status == 'ok', STATUS_MESSAGES[status])
+
+
+class FaceTracker:
+    """Follows the face of a live preview, searching near its last position"""
+
+    def __init__(self, detector, interval=FULL_DETECTION_INTERVAL, margin=TRACK_MARGIN):
+        self.detector = detector
+        self.interval = interval
+        self.margin = margin
+        self.box = None
+        self._frames_since_full = 0
+
+    def reset(self):
+        self.box = None
+        self._frames_since_full = 0
+
+    def _search_region(self):
+        x, y, w, h = self.box
+        dx, dy = int(w * self.margin), int(h * self.margin)
+        return (x - dx, y - dy, w + 2 * dx, h + 2 * dy)
+
+    def update(self, frame):
+        """
+        Locate the face in the next BGR frame of the preview.
+
+        Returns:
+            dict: status (see STATUS_MESSAGES), message and box, the face's
+            (x, y, w, h) or None unless exactly one face was found
+        """
+        if not self.detector.available:
+            return {'status': 'ok', 'message': "Face validation skipped", 'box': None}
+
+        detector = self.detector
+        gray = detector.to_gray(frame)
+
+        faces = None
+        if self.box is not None and self._frames_since_full < self.interval:
+            faces = detector.detect_faces(gray, self._search_region())
+            self._frames_since_full += 1
+            # Lost it or found a second face: fall back to the whole frame
+            if len(faces) != 1:
+                faces = None
+        if faces is None:
+            faces = detector.detect_faces(gray)
+            self._frames_since_full = 0
+
+        self.box = faces[0] if len(faces) == 1 else None
+        status = detector.check(gray, faces)
+        return {'status': status, 'message': STATUS_MESSAGES[status], 'box': self.box}
+
+
+_detector = None
+_tracker = None
+_detector_lock = threading.Lock()
+
+
+def get_face_detector():
+    """Return this process's face detector, loading the cascades on first use"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = FaceDetector()
+        return _detector
+
+
+def get_face_tracker():
+    """Return this process's preview face tracker"""
+    global _tracker
+    detector = get_face_detector()
+    with _detector_lock:
+        if _tracker is None:
+            _tracker = FaceTracker(detector)
+        return _tracker
@@ -0,0 +1,240 @@
+"""
+Face embeddings for attendance check-in.
+
+A 128-d face_recognition encoding is computed once when a face image is
+captured and stored in face_embeddings next to the user. Check-in then
+only has to encode the live frame and compare vectors, instead of
+decoding the stored image and running SSIM over full frames.
+
+face_recognition (dlib) is an optional dependency: when it is missing,
+compute_face_encoding() returns None and callers fall back to their
+previous behaviour.
+
+Backfill encodings for users registered before embeddings existed with:
+    python -m app.face_embeddings
+"""
+import io
+from datetime import datetime
+
+import numpy as np
+
+from .config import FACE_MATCH_TOLERANCE
+
+EMBEDDING_SIZE = 128
+
+# Frames are downscaled to this size before face detection
+MAX_ENCODING_DIMENSION = 640
+
+
+def face_recognition_available():
+    try:
+        import face_recognition  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _prepare_image(rgb_image):
+    """Contiguous RGB array no larger than MAX_ENCODING_DIMENSION, and its scale"""
+    image = np.asarray(rgb_image.convert('RGB') if hasattr(rgb_image, 'convert') else rgb_image)
+    height, width = image.shape[:2]
+    scale = min(1.0, MAX_ENCODING_DIMENSION / max(height, width))
+    if scale < 1.0:
+        import cv2
+        image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(image), scale
+
+
+def compute_face_encoding(rgb_image):
+    """
+    Encode the largest face in an RGB image.
+
+    Args:
+        rgb_image: numpy array (H, W, 3) in RGB order, or a PIL image
+
+    Returns:
+        numpy.ndarray: 128-d float64 encoding, or None if no face was found
+        or face_recognition is not installed
+    """
+    try:
+        import face_recognition
+    except ImportError:
+        print("face_recognition is not installed; face embeddings are disabled")
+        return None
+
+    image, _ = _prepare_image(rgb_image)
+    locations = face_recognition.face_locations(image, model="hog")
+    if not locations:
+        return None
+
+    # (top, right, bottom, left) - keep the biggest face in the frame
+    largest = max(locations, key=lambda box: (box[2] - box[0]) * (box[1] - box[3]))
+    encodings = face_recognition.face_encodings(image, [largest])
+    return encodings[0] if encodings else None
+
+
+def compute_face_encodings(rgb_image):
+    """
+    Encode every face in an RGB image (kiosk mode sees several at once).
+
+    Returns:
+        tuple: (locations, encodings) - boxes as (top, right, bottom, left)
+        in the coordinates of the original image and an (M, 128) array;
+        both empty when no face was found or face_recognition is missing
+    """
+    try:
+        import face_recognition
+    except ImportError:
+        print("face_recognition is not installed; face embeddings are disabled")
+        return [], np.empty((0, EMBEDDING_SIZE))
+
+    image, scale = _prepare_image(rgb_image)
+    locations = face_recognition.face_locations(image, model="hog")
+    if not locations:
+        return [], np.empty((0, EMBEDDING_SIZE))
+
+    encodings = np.asarray(face_recognition.face_encodings(image, locations))
+    boxes = [tuple(int(round(value / scale)) for value in box) for box in locations]
+    return boxes, encodings
+
+
+def compute_face_encoding_from_bytes(image_data):
+    """Encode the face in stored image bytes (PNG/JPEG)"""
+    from PIL import Image
+    with Image.open(io.BytesIO(image_data)) as image:
+        return compute_face_encoding(image)
+
+
+def encoding_to_bytes(encoding):
+    """Serialize an encoding as 128 little-endian float32 values (512 bytes)"""
+    return np.asarray(encoding, dtype='<f4').tobytes()
+
+
+def encoding_from_bytes(data):
+    return np.frombuffer(data, dtype='<f4').astype(np.float64)
+
+
+def face_distances(known_encodings, encoding):
+    """Euclidean distance from one encoding to each row of an (N, 128) matrix"""
+    known = np.atleast_2d(known_encodings)
+    return np.linalg.norm(known - encoding, axis=1)
+
+
+def is_match(known_encoding, encoding, tolerance=FACE_MATCH_TOLERANCE):
+    """
+    Returns:
+        tuple: (matched, distance)
+    """
+    distance = float(face_distances(known_encoding, encoding)[0])
+    return distance <= tolerance, distance
+
+
+def create_embedding_schema(cursor):
+    """Create face_embeddings and the trigger that drops stale encodings"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS face_embeddings (
+            user_id INTEGER PRIMARY KEY REFERENCES users (id),
+            encoding BLOB NOT NULL,
+            source_hash VARCHAR(64),
+            created_at TEXT NOT NULL
+        )
+    """)
+    # An encoding belongs to one specific face image
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_users_face_embedding_stale
+        AFTER UPDATE OF face_image_hash ON users
+        WHEN OLD.face_image_hash IS NOT NEW.face_image_hash
+        BEGIN
+            DELETE FROM face_embeddings
+            WHERE user_id = NEW.id AND source_hash IS NOT NEW.face_image_hash;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_users_face_embedding_delete
+        AFTER DELETE ON users
+        BEGIN
+            DELETE FROM face_embeddings WHERE user_id = OLD.id;
+        END
+    """)
+
+
+def store_face_embedding(cursor, user_id, encoding):
+    """Save a user's encoding, tagged with the face image it was computed from"""
+    cursor.execute("""
+        INSERT OR REPLACE INTO face_embeddings (user_id, encoding, source_hash, created_at)
+        VALUES (?, ?, (SELECT face_image_hash FROM users WHERE id = ?), ?)
+    """, (user_id, encoding_to_bytes(encoding), user_id, datetime.now().isoformat()))
+
+
+def save_face_embedding(cursor, user_id, image_data, encoding=None):
+    """
+    Store the encoding for a user's newly saved face image.
+
+    The encoding computed at capture time is used when given; otherwise it
+    is computed from the image bytes.
+
+    Returns:
+        bool: True if an encoding was stored
+    """
+    if encoding is None and image_data:
+        try:
+            encoding = compute_face_encoding_from_bytes(image_data)
+        except Exception as e:
+            print(f"Error computing face encoding: {e}")
+            encoding = None
+    if encoding is None:
+        return False
+    store_face_embedding(cursor, user_id, encoding)
+    return True
+
+
+def backfill_embeddings(conn):
+    """
+    Compute encodings for users that have a face image but no embedding.
+
+    Returns:
+        tuple: (encoded, skipped) counts
+    """
+    from .blob_store import load_blob
+
+    rows = conn.execute("""
+        SELECT u.id, u.face_image_hash
+        FROM users u
+        LEFT JOIN face_embeddings fe ON fe.user_id = u.id
+        WHERE u.face_image_hash IS NOT NULL AND u.isDeleted = 0 AND fe.user_id IS NULL
+    """).fetchall()
+
+    encoded = skipped = 0
+    for user_id, face_image_hash in rows:
+        image_data = load_blob(face_image_hash)
+        encoding = compute_face_encoding_from_bytes(image_data) if image_data else None
+        if encoding is None:
+            skipped += 1
+            continue
+        store_face_embedding(conn.cursor(), user_id, encoding)
+        conn.commit()
+        encoded += 1
+    return encoded, skipped
+
+
+if __name__ == "__main__":
+    import os
+    import sqlite3
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    db_path = os.getenv('DB_PATH')
+    if not db_path or not os.path.exists(db_path):
+        print("❌ Database not found. Check DB_PATH in your .env file")
+        raise SystemExit(1)
+    if not face_recognition_available():
+        print("❌ face_recognition is not installed")
+        raise SystemExit(1)
+
+    print("Computing missing face embeddings...")
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        encoded, skipped = backfill_embeddings(conn)
+        print(f"✓ Encoded {encoded} users, skipped {skipped} (no usable face found)")
+    finally:
+        conn.close()
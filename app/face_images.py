@@ -0,0 +1,206 @@
+"""
+Compact storage for users' face images.
+
+A captured face used to be stored as the whole camera frame in lossless
+PNG (several hundred KB, up to 5 MB). It is now stored as a FACE_CROP_SIZE
+square around the face, rotated so the eyes are level, as JPEG (~15 KB),
+plus a FACE_THUMBNAIL_SIZE thumbnail for places that only show a preview.
+Both go to the blob store (users.face_image_hash, users.face_thumbnail_hash).
+
+The crop keeps a margin around the face box so face_recognition can still
+find and encode the face in it. When no face is found (or OpenCV is not
+available) the centre of the image is used, unless require_face is set:
+converting images that are already stored must not replace a frame with a
+crop that may have missed the face (see compact_stored_face_images()).
+"""
+import io
+import math
+
+import numpy as np
+from PIL import Image
+
+from .blob_store import store_blob, load_blob
+
+FACE_CROP_SIZE = 256
+FACE_CROP_QUALITY = 90
+# Context kept around the detected face box, as a fraction of its size on each side
+FACE_CROP_MARGIN = 0.4
+FACE_THUMBNAIL_SIZE = 64
+FACE_THUMBNAIL_QUALITY = 80
+# Larger eye-line angles are taken to be a misdetected eye and not corrected
+MAX_ALIGN_ANGLE = 20
+
+
+def _jpeg(image, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _get_detector():
+    """This process's face detector, or None without OpenCV or its cascades"""
+    try:
+        from .face_detector import get_face_detector
+        detector = get_face_detector()
+    except ImportError:
+        return None
+    return detector if detector.available else None
+
+
+def face_detection_available():
+    return _get_detector() is not None
+
+
+def _locate_face(image):
+    """Largest face box in a PIL RGB image and the tilt of its eye line in degrees"""
+    detector = _get_detector()
+    if detector is None:
+        return None, 0.0
+    import cv2
+
+    gray = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
+    faces = detector.detect_faces(gray)
+    if not faces:
+        return None, 0.0
+    face = max(faces, key=lambda box: box[2] * box[3])
+
+    # The two largest eyes in the upper half of the face
+    x, y, w, h = face
+    eyes = [eye for eye in detector.detect_eyes(gray, face) if eye[1] + eye[3] / 2 < y + h / 2]
+    eyes = sorted(sorted(eyes, key=lambda eye: eye[2] * eye[3])[-2:])
+    if len(eyes) < 2:
+        return face, 0.0
+    (lx, ly, lw, lh), (rx, ry, rw, rh) = eyes
+    angle = math.degrees(math.atan2((ry + rh / 2) - (ly + lh / 2), (rx + rw / 2) - (lx + lw / 2)))
+    return face, angle if abs(angle) <= MAX_ALIGN_ANGLE else 0.0
+
+
+def _crop_box(size, face):
+    """Square (left, top, right, bottom) around the face, kept inside the image"""
+    width, height = size
+    if face is None:
+        side = min(width, height)
+        center_x, center_y = width / 2, height / 2
+    else:
+        x, y, w, h = face
+        side = min(max(w, h) * (1 + 2 * FACE_CROP_MARGIN), width, height)
+        center_x, center_y = x + w / 2, y + h / 2
+    left = min(max(0, center_x - side / 2), width - side)
+    top = min(max(0, center_y - side / 2), height - side)
+    return (left, top, left + side, top + side)
+
+
+def make_thumbnail(image):
+    """FACE_THUMBNAIL_SIZE JPEG of a (square) face image"""
+    thumbnail = image.convert('RGB').resize((FACE_THUMBNAIL_SIZE, FACE_THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+    return _jpeg(thumbnail, FACE_THUMBNAIL_QUALITY)
+
+
+def _border_color(image):
+    """Mean colour of the image's outermost pixels"""
+    pixels = np.asarray(image)
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    return tuple(int(channel) for channel in border.mean(axis=0))
+
+
+def normalize_face_image(image, require_face=False):
+    """
+    Cut the stored face image out of a captured frame.
+
+    Args:
+        image: PIL image or RGB numpy array
+        require_face: raise ValueError instead of cropping the centre when
+            no face is found or face detection is unavailable
+
+    Returns:
+        tuple: (image_data, thumbnail_data) JPEG bytes
+    """
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(image)
+    image = image.convert('RGB')
+
+    face, angle = _locate_face(image)
+    if face is None and require_face:
+        raise ValueError("No face found in the image")
+    if face is not None and angle:
+        # Level the eyes by rotating about the face centre; corners rotated in
+        # from outside the frame take the border colour instead of black
+        x, y, w, h = face
+        image = image.rotate(angle, resample=Image.Resampling.BICUBIC, center=(x + w / 2, y + h / 2),
+                             expand=False, fillcolor=_border_color(image))
+
+    crop = image.resize((FACE_CROP_SIZE, FACE_CROP_SIZE), Image.Resampling.LANCZOS, box=_crop_box(image.size, face))
+    return _jpeg(crop, FACE_CROP_QUALITY), make_thumbnail(crop)
+
+
+def is_normalized(image):
+    return image.format == 'JPEG' and image.size == (FACE_CROP_SIZE, FACE_CROP_SIZE)
+
+
+def normalize_face_image_bytes(image_data, require_face=False):
+    """
+    normalize_face_image() for stored image bytes.
+
+    Images that are already a normalized crop are kept as they are (no
+    second round of JPEG compression); only their thumbnail is made.
+    """
+    with Image.open(io.BytesIO(image_data)) as image:
+        if is_normalized(image):
+            return image_data, make_thumbnail(image)
+        return normalize_face_image(image, require_face)
+
+
+def store_face_image(cursor, image_data, require_face=False):
+    """
+    Save a face image (normalized if it is not yet) and its thumbnail to the blob store.
+
+    Call inside the transaction that writes the user row (see store_blob).
+
+    Returns:
+        tuple: (face_image_hash, face_thumbnail_hash)
+    """
+    image_data, thumbnail_data = normalize_face_image_bytes(image_data, require_face)
+    return store_blob(cursor, image_data), store_blob(cursor, thumbnail_data)
+
+
+def compact_stored_face_images(cursor):
+    """
+    Replace stored whole-frame face images with normalized crops and thumbnails.
+
+    Only images in which a face is found are converted; the others keep
+    their original frame (and no thumbnail) so nothing is cropped blindly.
+    Call inside a transaction, with face detection available.
+
+    Returns:
+        tuple: (converted, skipped) counts
+    """
+    cursor.execute("""
+        SELECT id, face_image_hash FROM users
+        WHERE face_image_hash IS NOT NULL AND face_thumbnail_hash IS NULL
+    """)
+    rows = cursor.fetchall()
+    converted = skipped = 0
+    for user_id, face_image_hash in rows:
+        image_data = load_blob(face_image_hash)
+        if image_data is None:
+            print(f"⚠️  Face image of user {user_id} is missing from the blob store")
+            skipped += 1
+            continue
+        try:
+            new_hash, thumbnail_hash = store_face_image(cursor, image_data, require_face=True)
+        except Exception as e:
+            print(f"⚠️  Kept the original face image of user {user_id}: {e}")
+            skipped += 1
+            continue
+
+        # The stored encoding is of the same face, so it stays valid for the crop
+        cursor.execute(
+            "UPDATE face_embeddings SET source_hash = ? WHERE user_id = ? AND source_hash IS ?",
+            (new_hash, user_id, face_image_hash)
+        )
+        cursor.execute(
+            "UPDATE users SET face_image_hash = ?, face_thumbnail_hash = ? WHERE id = ?",
+            (new_hash, thumbnail_hash, user_id)
+        )
+        converted += 1
+    return converted, skipped
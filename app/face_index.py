@@ -0,0 +1,269 @@
+"""
+In-memory face identification index for kiosk-mode attendance.
+
+A kiosk identifies whoever stands in front of the camera instead of
+verifying one logged-in student, so every live encoding has to be
+compared with the encodings of the whole roster. FaceIndex keeps them in
+one (N, 128) float32 matrix and answers a batch of M faces with a single
+matrix product:
+
+    |q - k|^2 = |q|^2 + |k|^2 - 2 q.k
+
+For large rosters (FACE_INDEX_IVF_THRESHOLD and up) an inverted-file
+layer clusters the encodings with k-means and only scans the lists of the
+nearest centroids. Encodings added after the clustering are assigned to
+their nearest existing centroid; the clusters are retrained once the
+index has grown or shrunk substantially.
+
+SectionFaceIndex loads the roster of one section and refresh() reloads it
+incrementally: only encodings whose stored timestamp changed are fetched,
+and students who left the section (or lost their encoding) are dropped.
+"""
+import numpy as np
+
+from .config import FACE_MATCH_TOLERANCE, FACE_INDEX_IVF_THRESHOLD
+from .face_embeddings import EMBEDDING_SIZE
+
+
+# Inverted-file settings: number of lists is about sqrt(N), and each query
+# scans the lists of its IVF_PROBES nearest centroids
+IVF_PROBES = 8
+IVF_TRAINING_ITERATIONS = 10
+# Retrain the clusters once the index size changed by this fraction
+IVF_RETRAIN_RATIO = 0.5
+
+
+class FaceIndex:
+    """Exact (or IVF-approximate) nearest-neighbour search over face encodings"""
+
+    def __init__(self, tolerance=FACE_MATCH_TOLERANCE, ivf_threshold=FACE_INDEX_IVF_THRESHOLD):
+        self.tolerance = tolerance
+        self.ivf_threshold = ivf_threshold
+        self.user_ids = np.empty(0, dtype=np.int64)
+        self.encodings = np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        self._squared_norms = np.empty(0, dtype=np.float32)
+        self._rows = {}       # user_id -> row in encodings
+        self._versions = {}   # user_id -> created_at of the loaded encoding
+        self._ivf = None
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self._rows
+
+    def version(self, user_id):
+        return self._versions.get(user_id)
+
+    def upsert(self, entries):
+        """
+        Add or replace encodings.
+
+        Args:
+            entries: {user_id: (version, encoding)}
+        """
+        if not entries:
+            return
+        new_ids = []
+        new_rows = []
+        for user_id, (version, encoding) in entries.items():
+            encoding = np.asarray(encoding, dtype=np.float32)
+            self._versions[user_id] = version
+            row = self._rows.get(user_id)
+            if row is not None:
+                self.encodings[row] = encoding
+                self._squared_norms[row] = encoding @ encoding
+            else:
+                new_ids.append(user_id)
+                new_rows.append(encoding)
+
+        if new_ids:
+            start = len(self.user_ids)
+            added = np.vstack(new_rows)
+            self.user_ids = np.concatenate([self.user_ids, np.asarray(new_ids, dtype=np.int64)])
+            self.encodings = np.vstack([self.encodings, added])
+            self._squared_norms = np.concatenate([self._squared_norms, np.einsum('ij,ij->i', added, added)])
+            for offset, user_id in enumerate(new_ids):
+                self._rows[user_id] = start + offset
+
+        # New and replaced rows go to their nearest cluster until the next retrain
+        if self._ivf_stale():
+            self._ivf = None
+        else:
+            self._ivf.reassign(self.encodings, [self._rows[user_id] for user_id in entries])
+
+    def remove(self, user_ids):
+        """Drop encodings for the given users"""
+        rows = [self._rows[user_id] for user_id in user_ids if user_id in self._rows]
+        if not rows:
+            return
+        keep = np.ones(len(self.user_ids), dtype=bool)
+        keep[rows] = False
+        self.user_ids = self.user_ids[keep]
+        self.encodings = self.encodings[keep]
+        self._squared_norms = self._squared_norms[keep]
+        for user_id in user_ids:
+            self._versions.pop(user_id, None)
+        self._rows = {int(user_id): row for row, user_id in enumerate(self.user_ids)}
+        if self._ivf is not None:
+            self._ivf.set_assignments(self._ivf.assignments[keep])
+
+    def identify(self, encodings):
+        """
+        Find the closest enrolled face for each query encoding.
+
+        Args:
+            encodings: (M, 128) array, or a single 128-d encoding
+
+        Returns:
+            list: (user_id or None, distance) per query; user_id is None when
+            the closest face is farther than the tolerance
+        """
+        queries = np.atleast_2d(np.asarray(encodings, dtype=np.float32))
+        if len(queries) == 0:
+            return []
+        if len(self.user_ids) == 0:
+            return [(None, float('inf'))] * len(queries)
+
+        if self._use_ivf():
+            rows, squared = self._ivf.search(self, queries)
+        else:
+            rows, squared = self._nearest(queries, np.arange(len(self.user_ids)))
+
+        results = []
+        for row, distance in zip(rows, np.sqrt(np.maximum(squared, 0.0))):
+            distance = float(distance)
+            if row < 0 or distance > self.tolerance:
+                results.append((None, distance))
+            else:
+                results.append((int(self.user_ids[row]), distance))
+        return results
+
+    def _nearest(self, queries, candidates):
+        """Closest candidate row and squared distance for each query"""
+        if len(candidates) == 0:
+            return np.full(len(queries), -1), np.full(len(queries), np.inf)
+        subset = self.encodings[candidates]
+        squared = (
+            np.einsum('ij,ij->i', queries, queries)[:, None]
+            + self._squared_norms[candidates][None, :]
+            - 2.0 * (queries @ subset.T)
+        )
+        best = np.argmin(squared, axis=1)
+        return candidates[best], squared[np.arange(len(queries)), best]
+
+    def _use_ivf(self):
+        if len(self.user_ids) < self.ivf_threshold:
+            return False
+        if self._ivf_stale():
+            self._ivf = _InvertedFileIndex.train(self.encodings)
+        return True
+
+    def _ivf_stale(self):
+        if self._ivf is None:
+            return True
+        trained = self._ivf.trained_size
+        return abs(len(self.user_ids) - trained) > trained * IVF_RETRAIN_RATIO
+
+
+class _InvertedFileIndex:
+    """k-means coarse quantizer with one list of rows per centroid"""
+
+    def __init__(self, centroids, assignments):
+        self.centroids = centroids
+        self.trained_size = len(assignments)
+        self.set_assignments(assignments)
+
+    def set_assignments(self, assignments):
+        self.assignments = assignments
+        self._lists = None  # rows per list, rebuilt on the next search
+
+    def _list_rows(self):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind='stable')
+            bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._lists
+
+    @classmethod
+    def train(cls, encodings, seed=0):
+        list_count = max(1, int(np.sqrt(len(encodings))))
+        rng = np.random.default_rng(seed)
+        centroids = encodings[rng.choice(len(encodings), list_count, replace=False)].copy()
+
+        for _ in range(IVF_TRAINING_ITERATIONS):
+            assignments = cls._closest_centroid(centroids, encodings)
+            for list_id in range(list_count):
+                members = encodings[assignments == list_id]
+                if len(members):
+                    centroids[list_id] = members.mean(axis=0)
+
+        return cls(centroids, cls._closest_centroid(centroids, encodings))
+
+    @staticmethod
+    def _closest_centroid(centroids, encodings):
+        squared = (
+            np.einsum('ij,ij->i', centroids, centroids)[None, :]
+            - 2.0 * (encodings @ centroids.T)
+        )
+        return np.argmin(squared, axis=1)
+
+    def reassign(self, encodings, rows):
+        """Place new or changed rows in their nearest existing list"""
+        rows = np.asarray(rows, dtype=np.int64)
+        assignments = np.zeros(len(encodings), dtype=self.assignments.dtype)
+        assignments[:len(self.assignments)] = self.assignments
+        assignments[rows] = self._closest_centroid(self.centroids, encodings[rows])
+        self.set_assignments(assignments)
+
+    def search(self, index, queries):
+        probes = min(IVF_PROBES, len(self.centroids))
+        squared = (
+            np.einsum('ij,ij->i', self.centroids, self.centroids)[None, :]
+            - 2.0 * (queries @ self.centroids.T)
+        )
+        nearest_lists = np.argpartition(squared, probes - 1, axis=1)[:, :probes]
+        list_rows = self._list_rows()
+
+        rows = np.empty(len(queries), dtype=np.int64)
+        distances = np.empty(len(queries), dtype=np.float32)
+        for i, lists in enumerate(nearest_lists):
+            candidates = np.concatenate([list_rows[list_id] for list_id in lists])
+            row, distance = index._nearest(queries[i:i + 1], candidates)
+            rows[i], distances[i] = row[0], distance[0]
+        return rows, distances
+
+
+class SectionFaceIndex(FaceIndex):
+    """FaceIndex over the students of one section, reloaded from the database"""
+
+    def __init__(self, db_manager, section_id, **kwargs):
+        super().__init__(**kwargs)
+        self.db_manager = db_manager
+        self.section_id = section_id
+
+    def refresh(self):
+        """
+        Bring the index up to date with the database.
+
+        Only encodings that were added or re-captured since the last refresh
+        are loaded; students no longer in the roster are removed.
+
+        Returns:
+            tuple: (success, (updated_count, removed_count) or error message)
+        """
+        success, versions = self.db_manager.get_section_embedding_versions(self.section_id)
+        if not success:
+            return False, versions
+
+        removed = [user_id for user_id in self._versions if user_id not in versions]
+        changed = [user_id for user_id, version in versions.items() if self._versions.get(user_id) != version]
+
+        if changed:
+            success, embeddings = self.db_manager.get_face_embeddings(changed)
+            if not success:
+                return False, embeddings
+            self.upsert(embeddings)
+        self.remove(removed)
+
+        return True, (len(changed), len(removed))
@@ -0,0 +1,203 @@
+"""
+Cheap quality checks that keep unusable frames away from face matching.
+
+Encoding a face costs far more than looking at the frame first, so every
+frame is scored on a small grayscale thumbnail before it is matched:
+
+1. exposure: mean brightness between FRAME_MIN_BRIGHTNESS and FRAME_MAX_BRIGHTNESS
+2. face: the Haar face detector finds at least one face
+3. face size: the largest face is at least FRAME_MIN_FACE_SIZE of the frame width
+4. sharpness: the Laplacian variance over that face reaches FRAME_MIN_SHARPNESS
+
+A frame is rejected at the first check it fails. assess_frame() runs in
+the vision worker (task 'assess_frame'); FrameQualityGate counts the
+outcome of every check per stage, which is what the thresholds are tuned
+from, and picks the sharpest passing frame out of a short window for
+check-in.
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from .config import (
+    FRAME_MIN_BRIGHTNESS, FRAME_MAX_BRIGHTNESS, FRAME_MIN_SHARPNESS,
+    FRAME_MIN_FACE_SIZE, FRAME_SELECT_WINDOW
+)
+from .face_detector import DETECTION_WIDTH, MIN_FACE_SIZE
+
+# Checks in the order they run, with what to tell the user when the last frames failed them
+REJECTION_MESSAGES = {
+    'too_dark': "The image is too dark. Please move to a brighter spot.",
+    'too_bright': "The image is too bright. Please avoid facing a window or strong light.",
+    'no_face': "No face detected. Please face the camera directly and try again.",
+    'face_too_small': "Your face is too far away. Please move closer to the camera.",
+    'blurry': "The image is blurred. Please hold still and try again.",
+}
+
+
+def assess_frame(frame, detector, min_face_size=FRAME_MIN_FACE_SIZE):
+    """
+    Score a BGR frame on a DETECTION_WIDTH thumbnail.
+
+    Returns:
+        dict: passed, reason (the failed check, see REJECTION_MESSAGES, or
+        None), score (face sharpness; higher is better), brightness,
+        face_size and sharpness
+    """
+    import cv2
+
+    gray = detector.to_gray(frame)
+    scale = min(1.0, DETECTION_WIDTH / gray.shape[1])
+    if scale < 1.0:
+        gray = cv2.resize(gray, (DETECTION_WIDTH, max(1, int(gray.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+
+    assessment = {
+        'passed': False,
+        'reason': None,
+        'score': 0.0,
+        'brightness': round(float(gray.mean()), 1),
+        'face_size': None,
+        'sharpness': None,
+    }
+
+    if assessment['brightness'] < FRAME_MIN_BRIGHTNESS:
+        assessment['reason'] = 'too_dark'
+        return assessment
+    if assessment['brightness'] > FRAME_MAX_BRIGHTNESS:
+        assessment['reason'] = 'too_bright'
+        return assessment
+
+    region = gray
+    if detector.available:
+        # The thumbnail is already downscaled, so scale the smallest face the
+        # detector accepts (given in frame pixels) down with it
+        faces = detector.detect_faces(gray, min_size=MIN_FACE_SIZE * scale)
+        if not faces:
+            assessment['reason'] = 'no_face'
+            return assessment
+        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+        assessment['face_size'] = round(w / gray.shape[1], 3)
+        if assessment['face_size'] < min_face_size:
+            assessment['reason'] = 'face_too_small'
+            return assessment
+        region = gray[y:y+h, x:x+w]
+
+    sharpness = float(cv2.Laplacian(region, cv2.CV_64F).var())
+    assessment['sharpness'] = round(sharpness, 1)
+    if sharpness < FRAME_MIN_SHARPNESS:
+        assessment['reason'] = 'blurry'
+        return assessment
+
+    assessment['passed'] = True
+    assessment['score'] = sharpness
+    return assessment
+
+
+class FrameQualityGate:
+    """Per-stage counts of assessed frames, and best-frame selection"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def record(self, assessment):
+        with self._lock:
+            self._counts[assessment['reason'] or 'passed'] += 1
+
+    def check(self, frame, **options):
+        """
+        Assess a frame in the vision worker and count the outcome.
+
+        Blocks until the worker answers (at most about twice RESULT_TIMEOUT),
+        so call it off the Tk thread. A busy or unresponsive worker fails
+        the frame.
+
+        Returns:
+            tuple: (success, assessment or error message)
+        """
+        from .vision_worker import get_vision_worker, RESULT_TIMEOUT
+
+        future = get_vision_worker().submit('assess_frame', frame, timeout=RESULT_TIMEOUT, **options)
+        if future is None:
+            return False, "Face checks are busy. Please try again."
+        try:
+            success, assessment = future.result(timeout=RESULT_TIMEOUT)
+        except FutureTimeoutError:
+            return False, "Face checks timed out. Please try again."
+        if success:
+            self.record(assessment)
+        return success, assessment
+
+    def select_best(self, capture, window=FRAME_SELECT_WINDOW):
+        """
+        Assess the capture's new frames for window seconds and keep the sharpest passing one.
+
+        Blocks for the whole window, so call it off the Tk thread.
+
+        Returns:
+            tuple: (True, (frame, assessment)), or (False, message) naming
+            the most common reason frames were rejected
+        """
+        deadline = time.monotonic() + window
+        sequence = 0
+        best, best_frame, spare = None, None, None
+        rejections = Counter()
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sequence, frame = capture.read_into(spare, newer_than=sequence, timeout=remaining)
+            if frame is None:
+                if not capture.is_running:
+                    break
+                continue
+
+            success, assessment = self.check(frame)
+            if not success:
+                return False, assessment
+            if not assessment['passed']:
+                rejections[assessment['reason']] += 1
+                spare = frame
+            elif best is None or assessment['score'] > best['score']:
+                # Read the next frames into the buffer of the one this replaces
+                best, best_frame, spare = assessment, frame, best_frame
+            else:
+                spare = frame
+
+        if best is not None:
+            return True, (best_frame, best)
+        if not rejections:
+            return False, "No frame available. Please wait for the camera to start."
+        return False, REJECTION_MESSAGES[rejections.most_common(1)[0][0]]
+
+    def select_best_async(self, capture, window=FRAME_SELECT_WINDOW):
+        """select_best() on a background thread; returns a Future of its result"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-select")
+        return self._executor.submit(self.select_best, capture, window)
+
+    def get_stats(self):
+        """Frames assessed, passed and rejected per check"""
+        with self._lock:
+            counts = dict(self._counts)
+        stats = {reason: counts.get(reason, 0) for reason in REJECTION_MESSAGES}
+        stats['passed'] = counts.get('passed', 0)
+        stats['assessed'] = sum(counts.values())
+        return stats
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_frame_quality_gate():
+    """Return the shared frame quality gate"""
+    global _gate
+    with _gate_lock:
+        if _gate is None:
+            _gate = FrameQualityGate()
+        return _gate
@@ -0,0 +1,372 @@
+"""
+Opt-in SQL tracing for pooled database connections.
+
+With SQL_TRACE=true the connection pool hands out TracedConnection objects.
+Every statement run through them is timed (the execute call plus the fetches
+that read its rows) and recorded with its normalized SQL, the line of code
+that ran it and the number of rows it returned or changed. The sqlite3 trace
+callback counts the statements SQLite itself ran for each of them, which
+includes implicit BEGINs and the statements fired by triggers.
+
+Statements slower than SQL_SLOW_QUERY_MS are appended to SQL_SLOW_QUERY_LOG
+together with their EXPLAIN QUERY PLAN. The statements that took the most
+time in this process are printed as a table when it exits.
+"""
+import atexit
+import itertools
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from .config import ROOT_DIR, SQL_SLOW_QUERY_MS, SQL_SLOW_QUERY_LOG
+from .db_connection_pool import PooledConnection
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """SQL with literals replaced by ? and whitespace collapsed, so repeated statements group together"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=1024)
+def _display_path(filename):
+    try:
+        path = os.path.relpath(filename, ROOT_DIR)
+    except ValueError:
+        # Different drive on Windows
+        return filename
+    return filename if path.startswith("..") else path
+
+
+def _call_site():
+    """First frame outside this module: the code that ran the statement"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{_display_path(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def explain_query_plan(conn, sql, params=None):
+    """EXPLAIN QUERY PLAN of a statement as indented lines"""
+    if not _EXPLAINABLE.match(sql):
+        return []
+    try:
+        # Bypasses TracedConnection.execute so the EXPLAIN itself is not recorded
+        rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+    except (sqlite3.Error, ValueError) as e:
+        return [f"(no plan: {e})"]
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+class _Statement:
+    __slots__ = ('sql', 'params', 'call_site', 'explain', 'seconds', 'rows', 'statements')
+
+    def __init__(self, sql, params, call_site, explain=True):
+        self.sql = sql
+        self.params = params
+        self.call_site = call_site
+        # False when no single statement and parameter set can be explained
+        self.explain = explain
+        self.seconds = 0.0
+        self.rows = 0
+        self.statements = 0
+
+
+class SqlTracer:
+    """Collects statement timings from traced connections and writes the slow-query log"""
+
+    def __init__(self, slow_query_ms=SQL_SLOW_QUERY_MS, slow_query_log=SQL_SLOW_QUERY_LOG):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.slow_query_log = slow_query_log
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def connection_factory(self):
+        """sqlite3 connection class the pool creates for this tracer"""
+        return TracedConnection
+
+    def begin(self, sql, params=None, explain=True):
+        return _Statement(sql, params, _call_site(), explain)
+
+    def finish(self, conn, statement):
+        """Record a statement that has finished; conn must be the connection that ran it"""
+        normalized = normalize_sql(statement.sql)
+        elapsed_ms = statement.seconds * 1000
+        slow = statement.seconds >= self.slow_query_seconds
+
+        with self._lock:
+            entry = self._stats.get(normalized)
+            if entry is None:
+                entry = self._stats[normalized] = {
+                    'sql': normalized,
+                    'calls': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'rows': 0,
+                    'statements': 0,
+                    'slow': 0,
+                    'call_sites': {}
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['rows'] += statement.rows
+            entry['statements'] += statement.statements
+            entry['slow'] += slow
+            entry['call_sites'][statement.call_site] = entry['call_sites'].get(statement.call_site, 0) + 1
+
+        if slow:
+            self._log_slow(conn, statement, elapsed_ms)
+
+    def _log_slow(self, conn, statement, elapsed_ms):
+        lines = [
+            f"{datetime.now():%Y-%m-%d %H:%M:%S}  {elapsed_ms:.1f} ms  {statement.rows} rows  "
+            f"{statement.statements} statements  {statement.call_site}",
+            "    " + _WHITESPACE.sub(" ", statement.sql).strip(),
+        ]
+        plan = explain_query_plan(conn, statement.sql, statement.params) if statement.explain else []
+        if plan:
+            lines.append("    QUERY PLAN")
+            lines.extend("      " + line for line in plan)
+
+        try:
+            with self._log_lock:
+                with open(self.slow_query_log, "a", encoding="utf-8") as log:
+                    log.write("\n".join(lines) + "\n\n")
+        except OSError as e:
+            print(f"Could not write slow query log {self.slow_query_log}: {e}")
+
+    def summary(self, limit=10, order_by='total_ms'):
+        """
+        The statements that took the most time since the tracer started (or was reset).
+
+        Returns:
+            list: dicts with sql, calls, total_ms, mean_ms, max_ms, rows, statements, slow and call_site
+        """
+        with self._lock:
+            entries = [dict(entry, call_sites=dict(entry['call_sites'])) for entry in self._stats.values()]
+
+        entries.sort(key=lambda entry: entry[order_by], reverse=True)
+        top = []
+        for entry in entries[:limit]:
+            call_sites = entry.pop('call_sites')
+            entry['call_site'] = max(call_sites, key=call_sites.get)
+            entry['mean_ms'] = entry['total_ms'] / entry['calls']
+            top.append(entry)
+        return top
+
+    def format_summary(self, limit=10):
+        with self._lock:
+            queries = len(self._stats)
+            calls = sum(entry['calls'] for entry in self._stats.values())
+        if not calls:
+            return ""
+
+        lines = [
+            f"SQL trace: {calls:,} statements, {queries:,} distinct, since {self.started_at:%Y-%m-%d %H:%M:%S}",
+            f"  {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>10} {'slow':>6}  query / call site",
+        ]
+        for entry in self.summary(limit):
+            sql = entry['sql'] if len(entry['sql']) <= 100 else entry['sql'][:97] + "..."
+            lines.append(
+                f"  {entry['calls']:>8,} {entry['total_ms']:>10.1f} {entry['mean_ms']:>9.2f} "
+                f"{entry['max_ms']:>9.2f} {entry['rows']:>10,} {entry['slow']:>6,}  {sql}"
+            )
+            lines.append(f"  {'':>57}  at {entry['call_site']}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.started_at = datetime.now()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times its statements and the fetches that read their rows"""
+
+    _record = None
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        self._timed(super().execute, sql, parameters)
+        return self._executed()
+
+    def executemany(self, sql, seq_of_parameters):
+        # The first parameter row is kept for the slow-query plan; peek at it
+        # without consuming a generator
+        rows = iter(seq_of_parameters)
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain((first,), rows)
+        self._begin(sql, first, explain=first is not None)
+        self._timed(super().executemany, sql, rows)
+        return self._executed()
+
+    def executescript(self, sql_script):
+        self._begin(sql_script, explain=False)
+        self._timed(super().executescript, sql_script)
+        return self._executed()
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        self._fetched(0 if row is None else 1, exhausted=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        self._fetched(len(rows), exhausted=not rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._fetched(len(rows), exhausted=True)
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        self._fetched(1, exhausted=False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def _begin(self, sql, params=None, explain=True):
+        self._finish()
+        self._record = self.connection._tracer.begin(sql, params, explain)
+        self.connection._open_cursors.add(self)
+
+    def _timed(self, method, *args):
+        record = self._record
+        counter = self.connection._statement_counter
+        statements = counter.count
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if record is not None:
+                record.seconds += time.perf_counter() - started
+                record.statements += counter.count - statements
+
+    def _executed(self):
+        # Statements without a result set are complete once executed
+        if self.description is None:
+            if self._record is not None:
+                self._record.rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def _fetched(self, rows, exhausted):
+        if self._record is not None:
+            self._record.rows += rows
+        if exhausted:
+            self._finish()
+
+    def _finish(self):
+        record, self._record = self._record, None
+        if record is not None:
+            self.connection._open_cursors.discard(self)
+            self.connection._tracer.finish(self.connection, record)
+
+
+class _StatementCounter:
+    """sqlite3 trace callback; kept apart from the connection so it holds no reference to it"""
+
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, sql):
+        self.count += 1
+
+
+class TracedConnection(PooledConnection):
+    """Pooled connection whose statements are reported to a SqlTracer (set as _tracer by the pool)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tracer = None
+        self._open_cursors = set()
+        self._statement_counter = _StatementCounter()
+        self.set_trace_callback(self._statement_counter)
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        if not self.in_transaction:
+            return super().commit()
+        record = self._tracer.begin("COMMIT")
+        counter = self._statement_counter
+        statements = counter.count
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            record.seconds = time.perf_counter() - started
+            record.statements = counter.count - statements
+            self._tracer.finish(self, record)
+
+    def close(self):
+        # Results that were never read to the end are recorded when the connection is returned
+        for cursor in list(self._open_cursors):
+            cursor._finish()
+        super().close()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def _print_summary():
+    summary = _tracer.format_summary()
+    if summary:
+        print(summary)
+
+
+def get_sql_tracer():
+    """Return the process-wide tracer, creating it on first use"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = SqlTracer()
+            atexit.register(_print_summary)
+        return _tracer
@@ -0,0 +1,125 @@
+"""
+Memoized results of the admin statistics queries.
+
+Switching the year/semester filters of the Programs, Courses and Sections
+views re-runs the same handful of aggregate queries. StatisticsCache keeps
+the most recent results in memory, keyed by method and arguments, and
+serves a repeat call from there as long as none of the tables the method
+reads has changed since.
+
+Changes are detected with the table_versions counters (app/table_versions.py),
+which triggers bump on every write from any connection or process, so a
+lookup costs one small query instead of the aggregate. A method is only
+invalidated by writes to the tables it declares; the attendance rollup
+tables are covered by attendance_logs, which they are derived from.
+Entries also expire at midnight because some results are relative to the
+current month.
+"""
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from .config import STATISTICS_CACHE_SIZE
+from .table_versions import get_table_versions
+
+
+class StatisticsCache:
+    """LRU cache of statistics results, invalidated per table"""
+
+    def __init__(self, pool, max_entries=STATISTICS_CACHE_SIZE):
+        self.pool = pool
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (versions, day, result), least recently used first
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+    def _read_versions(self, tables):
+        with self.pool.connection() as conn:
+            versions = get_table_versions(conn, tables)
+        return tuple(versions.get(table) for table in tables)
+
+    def get_or_compute(self, key, tables, compute):
+        """
+        Return the cached result for key, or compute() it and cache it.
+
+        Failed results ((False, message) tuples) are returned but not cached.
+        """
+        if self.max_entries <= 0:
+            return compute()
+
+        # Read before computing, so a write that lands mid-query invalidates the result
+        versions = self._read_versions(tables)
+        today = date.today()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == versions and entry[1] == today:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    # Callers are free to modify what they get back
+                    return copy.deepcopy(entry[2])
+                del self._entries[key]
+                self._stats['invalidated'] += 1
+            self._stats['misses'] += 1
+
+        result = compute()
+        if isinstance(result, tuple) and result and result[0] is False:
+            return result
+
+        with self._lock:
+            self._entries[key] = (versions, today, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Return a snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        return stats
+
+
+def cached_statistics(*tables):
+    """
+    Serve a sub-manager statistics method from the shared StatisticsCache.
+
+    tables are the tracked tables (see TRACKED_TABLES) whose changes make
+    a cached result stale. The decorated method's instance must have a
+    db_manager with a statistics_cache.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self.db_manager, 'statistics_cache', None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+            try:
+                key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            return cache.get_or_compute(key, tables, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_statistics_cache(pool):
+    """Return the shared statistics cache for a connection pool (one cache per database)"""
+    with _caches_lock:
+        cache = _caches.get(pool.db_path)
+        if cache is None:
+            cache = _caches[pool.db_path] = StatisticsCache(pool)
+        return cache
@@ -0,0 +1,57 @@
+"""
+Per-table change counters.
+
+table_versions holds one counter per tracked table, bumped by triggers on
+every insert, update and delete. Reading a few counters is a cheap way to
+tell whether data a screen shows may have changed since it was loaded,
+regardless of which connection or process made the change.
+"""
+
+
+# Tables whose changes the admin views react to
+TRACKED_TABLES = [
+    'users', 'students', 'faculties', 'programs', 'sections',
+    'courses', 'assigned_courses', 'schedules', 'attendance_logs',
+]
+
+
+def _version_triggers(table):
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END
+        """
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+def create_table_version_schema(cursor, tables=TRACKED_TABLES):
+    """Create table_versions and the triggers that bump it"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table in tables:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+        for statement in _version_triggers(table):
+            cursor.execute(statement)
+
+
+def get_table_versions(conn, tables):
+    """
+    Returns:
+        dict: {table: version} for the requested tables that are tracked
+    """
+    tables = list(tables)
+    if not tables:
+        return {}
+    placeholders = ",".join("?" * len(tables))
+    rows = conn.execute(
+        f"SELECT name, version FROM table_versions WHERE name IN ({placeholders})", tables
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
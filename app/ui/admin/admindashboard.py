@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from components.sidebar import Sidebar
+from components.view_manager import ViewManager
 from views.dashboard import DashboardView
 from views.users import UsersView
 from views.sections import SectionsView
@@ -11,7 +12,12 @@ class AdminDashboard(ctk.CTkToplevel):
         super().__init__(master)
         
         self.on_logout = on_logout  # Store logout callback
-        self.db_manager = db_manager  # Store database manager
+        # One database manager for every view: the given one, the main app's, or a new one
+        main_app = getattr(master, 'main_app', None)
+        self.db_manager = db_manager or getattr(main_app, 'db_manager', None)
+        if not self.db_manager:
+            from app.db_manager import DatabaseManager
+            self.db_manager = DatabaseManager()
         
         # Configure window
         self.title("Admin Dashboard")
@@ -46,57 +52,39 @@ class AdminDashboard(ctk.CTkToplevel):
         )
         self.content_frame.grid(row=0, column=1, sticky="nsew")
         
+        # Views are built once and kept alive between sidebar clicks
+        self.views = ViewManager(
+            self.content_frame,
+            self.db_manager,
+            {
+                "dashboard": DashboardView,
+                "users": UsersView,
+                "sections": SectionsView,
+                "programs": ProgramsView,
+                "courses": CoursesView
+            },
+            fill="both",
+            expand=True,
+            padx=20
+        )
+        
         # Initialize with dashboard view
         self.current_view = None
         self.switch_view("dashboard")
         
     def switch_view(self, view_name):
-        # Clear current view
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-            
+        if view_name == "logout":
+            self.logout()
+            return
+        
         # Update current view
         self.current_view = view_name
         
         # Update sidebar active state
         self.sidebar.set_active(view_name)
         
-        # Create new view based on selection
-        if view_name == "dashboard":
-            self.load_dashboard_view()
-        elif view_name == "users":
-            self.load_users_view()
-        elif view_name == "sections":
-            self.load_sections_view()
-        elif view_name == "programs":
-            self.load_programs_view()
-        elif view_name == "courses":
-            self.load_courses_view()
-        elif view_name == "logout":
-            self.logout()
-    
-    def load_dashboard_view(self):
-        view = DashboardView(self.content_frame)
-        view.pack(fill="both", expand=True, padx=20)
-        
-    def load_users_view(self):
-        view = UsersView(self.content_frame)
-        view.pack(fill="both", expand=True, padx=20)
-        
-    def load_sections_view(self):
-        view = SectionsView(self.content_frame)
-        # Pass database manager to the view
-        if self.db_manager:
-            view.db_manager = self.db_manager
-        view.pack(fill="both", expand=True, padx=20)
-        
-    def load_programs_view(self):
-        view = ProgramsView(self.content_frame)
-        view.pack(fill="both", expand=True, padx=20)
-    
-    def load_courses_view(self):
-        view = CoursesView(self.content_frame)
-        view.pack(fill="both", expand=True, padx=20)
+        # Show the cached view (refreshed if its data changed) or build it
+        self.views.show(view_name)
     
     def logout(self):
         """Handle logout functionality"""
@@ -109,6 +97,9 @@ class AdminDashboard(ctk.CTkToplevel):
                 if hasattr(self.sidebar, 'cleanup'):
                     self.sidebar.cleanup()
                 
+                # Destroy cached views
+                self.views.clear()
+                
                 # Hide the window immediately
                 self.withdraw()
                 
@@ -0,0 +1,122 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# One small worker pool shared by every view. Each worker thread gets its
+# own pooled SQLite connection from DatabaseManager.get_connection.
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+QUERY_WORKERS = 4
+
+
+def get_worker_pool():
+    """Return the shared query worker pool, creating it on first use"""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="ui-query")
+        return _worker_pool
+
+
+class BackgroundQueryExecutor:
+    """
+    Runs slow data-loading calls on worker threads and hands the results
+    back to the Tk main thread.
+
+    Tk widgets must only be touched from the main thread, so results are
+    collected by polling with widget.after() and callbacks always run there.
+    cancel_all() drops every pending request: queued calls are cancelled and
+    results that arrive later are discarded. Views call shutdown() from
+    destroy() so nothing is delivered to a view that is gone.
+    """
+
+    def __init__(self, widget, poll_interval=30):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self._generation = 0
+        self._pending = []
+        self._poll_job = None
+        self._closed = False
+
+    def submit(self, func, on_success, on_error=None):
+        """
+        Run func() on a worker thread.
+
+        Args:
+            func: Callable executed off the main thread (must not touch widgets)
+            on_success: Called on the main thread with func's return value
+            on_error: Optional, called on the main thread with the exception
+
+        Returns:
+            Future: The underlying future
+        """
+        if self._closed:
+            return None
+
+        future = get_worker_pool().submit(func)
+        self._pending.append((self._generation, future, on_success, on_error))
+        self._schedule_poll()
+        return future
+
+    def cancel_all(self):
+        """Discard all outstanding requests"""
+        self._generation += 1
+        for _, future, _, _ in self._pending:
+            future.cancel()
+        self._pending = []
+
+        if self._poll_job is not None:
+            try:
+                self.widget.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def is_closed(self):
+        return self._closed
+
+    def _schedule_poll(self):
+        if self._poll_job is None and not self._closed:
+            self._poll_job = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        if self._closed:
+            return
+
+        still_pending = []
+        finished = []
+        for entry in self._pending:
+            generation, future, _, _ = entry
+            if generation != self._generation or future.cancelled():
+                continue
+            if future.done():
+                finished.append(entry)
+            else:
+                still_pending.append(entry)
+        self._pending = still_pending
+
+        for generation, future, on_success, on_error in finished:
+            # A callback may have cancelled everything that is left
+            if self._closed or generation != self._generation:
+                break
+            error = future.exception()
+            try:
+                if error is None:
+                    on_success(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    print(f"Background query failed: {error}")
+            except Exception as e:
+                print(f"Error handling background query result: {e}")
+
+        if self._pending:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Cancel everything and stop accepting new requests"""
+        self.cancel_all()
+        self._closed = True
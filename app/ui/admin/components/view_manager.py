@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+# Views kept alive at once; the least recently shown one is destroyed beyond this
+MAX_CACHED_VIEWS = 3
+
+
+class ViewManager:
+    """
+    Keeps the admin views alive between sidebar clicks.
+
+    Switching views hides the current one instead of destroying it, so going
+    back is instant. Every view gets the shared DatabaseManager. A view
+    class can list the tables it shows in WATCHED_TABLES; when one of them
+    changed since the view was last loaded (see app/table_versions.py), its
+    refresh_data() is called as it is shown again.
+
+    A view can define on_hide() to stop background work while it is hidden,
+    and set a true `stale` attribute to be refreshed when it is shown again
+    even though its tables did not change (e.g. a load that was cut short).
+    """
+
+    def __init__(self, container, db_manager, view_classes, max_views=MAX_CACHED_VIEWS, **pack_options):
+        self.container = container
+        self.db_manager = db_manager
+        self.view_classes = view_classes
+        self.max_views = max_views
+        self.pack_options = pack_options
+        self._views = OrderedDict()  # name -> view, least recently shown first
+        self._versions = {}          # name -> table versions the view last loaded
+        self.current = None
+
+    def show(self, name):
+        """Show a view, building it on first use; returns the view"""
+        view_class = self.view_classes[name]
+        if self.current is not None and self.current != name and self.current in self._views:
+            self._hide(self.current)
+
+        view = self._views.get(name)
+        if view is not None and not view.winfo_exists():
+            self._forget(name)
+            view = None
+
+        if view is None:
+            # Read the versions first so changes made while loading are not missed
+            self._versions[name] = self._read_versions(view_class)
+            view = view_class(self.container, db_manager=self.db_manager)
+            self._views[name] = view
+        else:
+            self._views.move_to_end(name)
+            versions = self._read_versions(view_class)
+            if versions is None or versions != self._versions.get(name) or getattr(view, 'stale', False):
+                self._versions[name] = versions
+                view.refresh_data()
+
+        if name != self.current:
+            view.pack(**self.pack_options)
+        self.current = name
+        self._evict()
+        return view
+
+    def _hide(self, name):
+        view = self._views[name]
+        on_hide = getattr(view, 'on_hide', None)
+        if on_hide is not None:
+            try:
+                on_hide()
+            except Exception as e:
+                print(f"Error hiding view {name}: {e}")
+        view.pack_forget()
+
+    def _read_versions(self, view_class):
+        tables = getattr(view_class, 'WATCHED_TABLES', ())
+        if not tables or not self.db_manager:
+            return {}
+        success, versions = self.db_manager.get_table_versions(tables)
+        # Unknown state: treat the view as stale
+        return versions if success else None
+
+    def _evict(self):
+        while len(self._views) > self.max_views:
+            name = next(name for name in self._views if name != self.current)
+            view = self._views[name]
+            self._forget(name)
+            try:
+                view.destroy()
+            except Exception as e:
+                print(f"Error destroying cached view {name}: {e}")
+
+    def _forget(self, name):
+        self._views.pop(name, None)
+        self._versions.pop(name, None)
+
+    def clear(self):
+        """Destroy every cached view"""
+        for name in list(self._views):
+            view = self._views[name]
+            self._forget(name)
+            try:
+                view.destroy()
+            except Exception:
+                pass
+        self.current = None
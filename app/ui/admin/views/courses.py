@@ -102,9 +102,12 @@ class CoursesFilterPopup(ctk.CTkToplevel):
         self.destroy()
 
 class CoursesView(ctk.CTkFrame):
-    def __init__(self, parent):
+    # Tables behind the courses table (reloaded when one of them changes)
+    WATCHED_TABLES = ('courses', 'programs')
+
+    def __init__(self, parent, db_manager=None):
         super().__init__(parent, fg_color="transparent")
-        self.db_manager = None
+        self.db_manager = db_manager
         self.courses_data = []
         self.filtered_courses_data = []
         
@@ -147,8 +150,9 @@ class CoursesView(ctk.CTkFrame):
     def load_courses_data(self):
         """Load courses data from database"""
         try:
-            from app.db_manager import DatabaseManager
-            self.db_manager = DatabaseManager()
+            if not self.db_manager:
+                from app.db_manager import DatabaseManager
+                self.db_manager = DatabaseManager()
             success, courses = self.db_manager.get_courses()
             
             if success:
@@ -824,4 +828,7 @@ class CoursesView(ctk.CTkFrame):
     def refresh_courses(self):
         """Refresh the courses data and update the UI"""
         self.load_courses_data()
-        print("Courses refreshed")
\ No newline at end of file
+        print("Courses refreshed")
+
+    def refresh_data(self):
+        self.load_courses_data()
\ No newline at end of file
@@ -31,8 +31,10 @@ class EditCoursePopup(ctk.CTkToplevel):
     def load_programs_data(self):
         """Load programs data from database"""
         try:
-            from app.db_manager import DatabaseManager
-            self.db_manager = DatabaseManager()
+            self.db_manager = getattr(self.parent_view, 'db_manager', None)
+            if not self.db_manager:
+                from app.db_manager import DatabaseManager
+                self.db_manager = DatabaseManager()
             success, programs = self.db_manager.get_programs()
             
             if success:
@@ -4,12 +4,16 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 from datetime import datetime, timedelta
 from app.ui.admin.components.sidebar import DateTimePill
+from app.ui.admin.components.query_executor import BackgroundQueryExecutor
 
 class DashboardView(ctk.CTkFrame):
-    def __init__(self, parent):
+    # Tables behind the metrics and charts (reloaded when one of them changes)
+    WATCHED_TABLES = ('users', 'students', 'faculties', 'programs', 'sections', 'courses', 'attendance_logs')
+
+    def __init__(self, parent, db_manager=None):
         super().__init__(parent, fg_color="transparent")
-        # Get database manager from parent or create new one
-        self.db_manager = getattr(parent, 'db_manager', None)
+        # Use the shared database manager, the parent's, or create a new one
+        self.db_manager = db_manager or getattr(parent, 'db_manager', None)
         if not self.db_manager:
             try:
                 from app.db_manager import DatabaseManager
@@ -18,71 +22,99 @@ class DashboardView(ctk.CTkFrame):
                 print(f"Error creating database manager: {e}")
                 self.db_manager = None
         
-        self.dashboard_data = {}
+        self.dashboard_data = self.get_default_dashboard_data()
+        
+        # Queries run on worker threads; results are rendered as they arrive
+        self.query_executor = BackgroundQueryExecutor(self)
+        # Set when a load was cancelled by hiding the view (see ViewManager)
+        self.stale = False
         
         self.setup_ui()
         # Load data after UI is set up
-        self.after(100, self.load_dashboard_data)
+        self._initial_load = self.after(100, self.load_dashboard_data)
+
+    def get_default_dashboard_data(self):
+        """Values shown until (or instead of) data from the database"""
+        return {
+            'total_students': 0,
+            'total_faculty': 0,
+            'total_courses': 0,
+            'total_programs': 0,
+            'total_sections': 0,
+            'attendance_overview': {},
+            'monthly_attendance': {'months': [], 'rates': []},
+            'program_enrollment': {'programs': [], 'counts': [], 'colors': []},
+            'section_performance': {'sections': [], 'rates': []},
+            'recent_activity': {'new_users_week': 0, 'today_attendance': 0}
+        }
+
+    def get_data_sources(self):
+        """Map each dashboard data key to its query and the widget it fills"""
+        return {
+            'total_students': (self.get_total_students, lambda: self.update_metric_card('students')),
+            'total_faculty': (self.get_total_faculty, lambda: self.update_metric_card('faculty')),
+            'total_courses': (self.get_total_courses, lambda: self.update_metric_card('courses')),
+            'total_programs': (self.get_total_programs, lambda: self.update_metric_card('programs')),
+            'total_sections': (self.get_total_sections, None),
+            'attendance_overview': (self.get_attendance_overview, self.update_attendance_overview_chart),
+            'monthly_attendance': (self.get_monthly_attendance_data, self.update_monthly_attendance_chart),
+            'program_enrollment': (self.get_program_enrollment_data, self.update_program_enrollment_chart),
+            'section_performance': (self.get_section_performance_data, self.update_section_performance_chart),
+            'recent_activity': (self.get_recent_activity, None)
+        }
 
     def load_dashboard_data(self):
-        """Load all dashboard data from database"""
-        try:
-            if not self.db_manager:
-                print("No database manager available")
-                # Set default values
-                self.dashboard_data = {
-                    'total_students': 0,
-                    'total_faculty': 0,
-                    'total_courses': 0,
-                    'total_programs': 0,
-                    'total_sections': 0,
-                    'attendance_overview': {},
-                    'monthly_attendance': {'months': [], 'rates': []},
-                    'program_enrollment': {'programs': [], 'counts': [], 'colors': []},
-                    'section_performance': {'sections': [], 'rates': []},
-                    'recent_activity': {'new_users_week': 0, 'today_attendance': 0}
-                }
-                self.update_metric_cards()
-                self.update_charts()
-                return
-            
-            # Get key metrics
-            self.dashboard_data = {
-                'total_students': self.get_total_students(),
-                'total_faculty': self.get_total_faculty(),
-                'total_courses': self.get_total_courses(),
-                'total_programs': self.get_total_programs(),
-                'total_sections': self.get_total_sections(),
-                'attendance_overview': self.get_attendance_overview(),
-                'monthly_attendance': self.get_monthly_attendance_data(),
-                'program_enrollment': self.get_program_enrollment_data(),
-                'section_performance': self.get_section_performance_data(),
-                'recent_activity': self.get_recent_activity()
-            }
-            
-            print(f"Loaded dashboard data: {self.dashboard_data}")
-            
-            # Update UI with loaded data
-            self.update_metric_cards()
-            self.update_charts()
-            
-        except Exception as e:
-            print(f"Error loading dashboard data: {e}")
-            # Set default values on error
-            self.dashboard_data = {
-                'total_students': 0,
-                'total_faculty': 0,
-                'total_courses': 0,
-                'total_programs': 0,
-                'total_sections': 0,
-                'attendance_overview': {},
-                'monthly_attendance': {'months': [], 'rates': []},
-                'program_enrollment': {'programs': [], 'counts': [], 'colors': []},
-                'section_performance': {'sections': [], 'rates': []},
-                'recent_activity': {'new_users_week': 0, 'today_attendance': 0}
-            }
+        """Load all dashboard data from database without blocking the UI"""
+        # Drop results of any earlier load that is still running
+        self.query_executor.cancel_all()
+        self._initial_load = None
+        self.stale = False
+        self.dashboard_data = self.get_default_dashboard_data()
+        
+        if not self.db_manager:
+            print("No database manager available")
             self.update_metric_cards()
             self.update_charts()
+            return
+        
+        for key, (query, render) in self.get_data_sources().items():
+            self.query_executor.submit(
+                query,
+                lambda value, key=key, render=render: self.on_dashboard_data_loaded(key, value, render),
+                lambda error, key=key, render=render: self.on_dashboard_data_failed(key, error, render)
+            )
+
+    def refresh_data(self):
+        """Reload when the view is shown again after its data changed"""
+        self.load_dashboard_data()
+
+    def on_dashboard_data_loaded(self, key, value, render):
+        """Store one query result and refresh the widget that shows it"""
+        self.dashboard_data[key] = value
+        if render:
+            render()
+
+    def on_dashboard_data_failed(self, key, error, render):
+        """Fall back to the default value for a query that failed"""
+        print(f"Error loading dashboard data '{key}': {error}")
+        self.dashboard_data[key] = self.get_default_dashboard_data()[key]
+        if render:
+            render()
+
+    def on_hide(self):
+        # Stop queries still in flight while hidden; reload when shown again
+        if self._initial_load is not None:
+            self.after_cancel(self._initial_load)
+            self._initial_load = None
+            self.stale = True
+        if self.query_executor.has_pending():
+            self.query_executor.cancel_all()
+            self.stale = True
+
+    def destroy(self):
+        # Evicted or closed: stop any queries still in flight
+        self.query_executor.shutdown()
+        super().destroy()
 
     def get_total_students(self):
         """Get total number of active students"""
@@ -172,11 +204,11 @@ class DashboardView(ctk.CTkFrame):
             conn = self.db_manager.get_connection()
             cursor = conn.execute("""
                 SELECT 
-                    COUNT(*) as total_logs,
-                    SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present_count,
-                    SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END) as absent_count,
-                    SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END) as late_count
-                FROM attendance_logs
+                    COALESCE(SUM(total_count), 0) as total_logs,
+                    SUM(present_count) as present_count,
+                    SUM(absent_count) as absent_count,
+                    SUM(late_count) as late_count
+                FROM attendance_daily_rollup
                 WHERE date >= datetime('now', '-30 days')
             """)
             result = cursor.fetchone()
@@ -226,9 +258,9 @@ class DashboardView(ctk.CTkFrame):
             cursor = conn.execute("""
                 SELECT 
                     strftime('%Y-%m', date) as month,
-                    COUNT(*) as total_logs,
-                    SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present_count
-                FROM attendance_logs
+                    SUM(total_count) as total_logs,
+                    SUM(present_count) as present_count
+                FROM attendance_daily_rollup
                 WHERE date >= datetime('now', '-6 months')
                 GROUP BY strftime('%Y-%m', date)
                 ORDER BY month
@@ -308,17 +340,17 @@ class DashboardView(ctk.CTkFrame):
                 SELECT 
                     s.name as section_name,
                     p.acronym as program_acronym,
-                    COUNT(al.id) as total_logs,
-                    SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) as present_count
+                    SUM(r.total_count) as total_logs,
+                    SUM(r.present_count) as present_count
                 FROM sections s
                 JOIN programs p ON s.program_id = p.id
                 JOIN assigned_courses ac ON s.id = ac.section_id
-                JOIN attendance_logs al ON ac.id = al.assigned_course_id
+                JOIN attendance_daily_rollup r ON ac.id = r.assigned_course_id
                 WHERE (ac.isDeleted = 0 OR ac.isDeleted IS NULL) 
                   AND (s.isDeleted = 0 OR s.isDeleted IS NULL)
                 GROUP BY s.id, s.name, p.acronym
-                HAVING COUNT(al.id) >= 5
-                ORDER BY (CAST(SUM(CASE WHEN al.status = 'present' THEN 1 ELSE 0 END) AS FLOAT) / COUNT(al.id)) DESC
+                HAVING SUM(r.total_count) >= 5
+                ORDER BY (CAST(SUM(r.present_count) AS FLOAT) / SUM(r.total_count)) DESC
                 LIMIT 10
             """)
             results = cursor.fetchall()
@@ -361,9 +393,9 @@ class DashboardView(ctk.CTkFrame):
             
             # Get today's attendance logs
             cursor = conn.execute("""
-                SELECT COUNT(*) as count 
-                FROM attendance_logs 
-                WHERE date(date) = date('now')
+                SELECT SUM(total_count) as count 
+                FROM attendance_daily_rollup 
+                WHERE date = date('now')
             """)
             today_attendance = cursor.fetchone()['count'] or 0
             
@@ -681,29 +713,19 @@ class DashboardView(ctk.CTkFrame):
         self.performance_chart_container = ctk.CTkFrame(chart_frame, fg_color="transparent")
         self.performance_chart_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-    def update_metric_cards(self):
-        """Update metric cards with loaded data"""
+    def update_metric_card(self, key):
+        """Update a single metric card with loaded data"""
         try:
-            # Update student count
-            if 'students' in self.metric_cards:
-                self.metric_cards['students'].value_label.configure(text=str(self.dashboard_data.get('total_students', 0)))
-            
-            # Update faculty count
-            if 'faculty' in self.metric_cards:
-                self.metric_cards['faculty'].value_label.configure(text=str(self.dashboard_data.get('total_faculty', 0)))
-            
-            # Update courses count
-            if 'courses' in self.metric_cards:
-                self.metric_cards['courses'].value_label.configure(text=str(self.dashboard_data.get('total_courses', 0)))
-            
-            # Update programs count
-            if 'programs' in self.metric_cards:
-                self.metric_cards['programs'].value_label.configure(text=str(self.dashboard_data.get('total_programs', 0)))
-                
-            print("Metric cards updated successfully")
-                
+            if key in self.metric_cards:
+                value = self.dashboard_data.get(f"total_{key}", 0)
+                self.metric_cards[key].value_label.configure(text=str(value))
         except Exception as e:
-            print(f"Error updating metric cards: {e}")
+            print(f"Error updating metric card '{key}': {e}")
+
+    def update_metric_cards(self):
+        """Update metric cards with loaded data"""
+        for key in ('students', 'faculty', 'courses', 'programs'):
+            self.update_metric_card(key)
 
     def update_charts(self):
         """Update all charts with loaded data"""
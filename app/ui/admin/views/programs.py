@@ -9,8 +9,12 @@ from PIL import Image
 import os
 
 class ProgramsView(ctk.CTkFrame):
-    def __init__(self, parent):
+    # Tables behind the program cards (reloaded when one of them changes)
+    WATCHED_TABLES = ('programs',)
+
+    def __init__(self, parent, db_manager=None):
         super().__init__(parent, fg_color="transparent")
+        self.db_manager = db_manager
         self._open_menu = None  # Track open menu widget
         self._open_menu_card = None  # Track which card the menu is for
         self.programs_data = self.load_programs_data()
@@ -19,9 +23,10 @@ class ProgramsView(ctk.CTkFrame):
     def load_programs_data(self):
         # Load from database using main DatabaseManager
         try:
-            from app.db_manager import DatabaseManager
-            db = DatabaseManager()
-            success, programs = db.get_programs()
+            if not self.db_manager:
+                from app.db_manager import DatabaseManager
+                self.db_manager = DatabaseManager()
+            success, programs = self.db_manager.get_programs()
             
             if success:
                 return programs
@@ -205,9 +210,7 @@ class ProgramsView(ctk.CTkFrame):
             close_menu()
             # Get database manager instance
             try:
-                from app.db_manager import DatabaseManager
-                db = DatabaseManager()
-                ViewProgramPopup(self, card.program_data, db_manager=db)
+                ViewProgramPopup(self, card.program_data, db_manager=self.db_manager)
             except Exception as e:
                 print(f"Error loading database manager: {e}")
                 # Fallback without db_manager
@@ -217,8 +220,7 @@ class ProgramsView(ctk.CTkFrame):
             close_menu()
             def on_delete():
                 try:
-                    from app.db_manager import DatabaseManager
-                    db = DatabaseManager()
+                    db = self.db_manager
                     
                     # Get program data
                     program_data = card.program_data
@@ -259,6 +261,9 @@ class ProgramsView(ctk.CTkFrame):
     def create_program(self):
         CreateProgramPopup(self)
 
+    def refresh_data(self):
+        self.refresh_programs()
+
     def refresh_programs(self):
         """Reload programs data and refresh UI"""
         # Reload data from database
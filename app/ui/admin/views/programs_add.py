@@ -418,7 +418,7 @@ class CreateProgramPopup(ctk.CTkToplevel):
             print(f"Program data: {program_data}")
             
             # Create program in database using main DatabaseManager
-            db = DatabaseManager()
+            db = getattr(self.parent_view, 'db_manager', None) or DatabaseManager()
             success, result = db.create_program(program_data)
             
             if success:
@@ -424,7 +424,7 @@ class EditProgramPopup(ctk.CTkToplevel):
             }
             
             # Update program in database
-            db = DatabaseManager()
+            db = getattr(self.parent_view, 'db_manager', None) or DatabaseManager()
             program_id = self.program_data.get('id')
             
             if not program_id:
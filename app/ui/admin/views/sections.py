@@ -147,10 +147,13 @@ class SectionsFilterPopup(ctk.CTkToplevel):
         self.destroy()
 
 class SectionsView(ctk.CTkFrame):
-    def __init__(self, parent):
+    # Tables behind the sections table (reloaded when one of them changes)
+    WATCHED_TABLES = ('sections', 'programs', 'students', 'users', 'assigned_courses')
+
+    def __init__(self, parent, db_manager=None):
         super().__init__(parent, fg_color="transparent")
-        # Get database manager from parent
-        self.db_manager = getattr(parent, 'db_manager', None)
+        # Use the shared database manager, or the parent's
+        self.db_manager = db_manager or getattr(parent, 'db_manager', None)
         self.sections_data = []
         self.filtered_sections_data = []
         
@@ -795,4 +798,7 @@ class SectionsView(ctk.CTkFrame):
     def refresh_sections(self):
         """Refresh the sections data and update the UI"""
         self.load_sections_data()
-        print("Sections refreshed")
\ No newline at end of file
+        print("Sections refreshed")
+
+    def refresh_data(self):
+        self.load_sections_data()
\ No newline at end of file
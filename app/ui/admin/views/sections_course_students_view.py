@@ -48,25 +48,30 @@ class CourseStudentsViewModal(ctk.CTkToplevel):
                 print("Missing course_id or section_id")
                 return
             
-            # Get all students in this section
-            students = self.get_section_students(section_id)
+            # Whole roster with per-student counts in one query, for the term this row shows
+            success, roster = self.db_manager.get_course_roster_attendance(
+                section_id,
+                course_id,
+                self.course_data.get('academic_year'),
+                self.course_data.get('semester')
+            )
+            if not success:
+                print(f"Error loading course roster: {roster}")
+                roster = []
             
-            # For each student, get their attendance data for this specific course
             self.table_data = []
-            for student in students:
-                attendance_stats = self.get_student_course_attendance(student['id'], course_id)
-                
+            for student in roster:
                 self.table_data.append({
                     'student_id': student['id'],
                     'student_name': f"{student['first_name']} {student['last_name']}",
-                    'student_number': student.get('student_number', 'N/A'),
-                    'email': student.get('email', 'N/A'),
-                    'present': attendance_stats['present'],
-                    'absent': attendance_stats['absent'],
-                    'late': attendance_stats['late'],
-                    'total': attendance_stats['total'],
-                    'percentage': f"{attendance_stats['percentage']:.1f}%",
-                    'status': student.get('status_name', 'Active')
+                    'student_number': student['student_number'] or 'N/A',
+                    'email': student['email'] or 'N/A',
+                    'present': student['present'],
+                    'absent': student['absent'],
+                    'late': student['late'],
+                    'total': student['total'],
+                    'percentage': f"{student['percentage']:.1f}%",
+                    'status': student['status_name']
                 })
             
             # Update student count display
@@ -79,100 +84,6 @@ class CourseStudentsViewModal(ctk.CTkToplevel):
             print(f"Error loading course students data: {e}")
             self.table_data = []
 
-    def get_section_students(self, section_id):
-        """Get all students in the section"""
-        try:
-            conn = self.db_manager.get_connection()
-            
-            query = """
-                SELECT u.id, u.first_name, u.last_name, u.email, 
-                       s.student_number, stat.name as status_name
-                FROM students s
-                JOIN users u ON s.user_id = u.id
-                LEFT JOIN statuses stat ON u.status_id = stat.id
-                WHERE s.section = ? AND u.isDeleted = 0
-                ORDER BY u.last_name, u.first_name
-            """
-            
-            cursor = conn.execute(query, (section_id,))
-            students = cursor.fetchall()
-            
-            return [{
-                'id': row['id'],
-                'first_name': row['first_name'],
-                'last_name': row['last_name'],
-                'email': row['email'],
-                'student_number': row['student_number'],
-                'status_name': row['status_name'] or 'Active'
-            } for row in students]
-            
-        except Exception as e:
-            print(f"Error getting section students: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def get_student_course_attendance(self, student_id, course_id):
-        """Get attendance statistics for a specific student in a specific course"""
-        try:
-            conn = self.db_manager.get_connection()
-            
-            # First, get the assigned_course_id for this course and section
-            assigned_course_query = """
-                SELECT id FROM assigned_courses 
-                WHERE course_id = ? AND section_id = ? AND isDeleted = 0
-            """
-            
-            cursor = conn.execute(assigned_course_query, (course_id, self.section_data.get('id')))
-            assigned_course = cursor.fetchone()
-            
-            if not assigned_course:
-                return {'present': 0, 'absent': 0, 'late': 0, 'total': 0, 'percentage': 0.0}
-            
-            assigned_course_id = assigned_course['id']
-            
-            # Get attendance statistics for this student and course
-            attendance_query = """
-                SELECT 
-                    COUNT(CASE WHEN status = 'present' THEN 1 END) as present_count,
-                    COUNT(CASE WHEN status = 'absent' THEN 1 END) as absent_count,
-                    COUNT(CASE WHEN status = 'late' THEN 1 END) as late_count,
-                    COUNT(*) as total_logs
-                FROM attendance_logs
-                WHERE user_id = ? AND assigned_course_id = ?
-            """
-            
-            cursor = conn.execute(attendance_query, (student_id, assigned_course_id))
-            result = cursor.fetchone()
-            
-            if result:
-                present = result['present_count'] or 0
-                absent = result['absent_count'] or 0
-                late = result['late_count'] or 0
-                total = result['total_logs'] or 0
-                
-                # Calculate percentage (count late as present)
-                if total > 0:
-                    percentage = ((present + late) / total) * 100
-                else:
-                    percentage = 0.0
-                
-                return {
-                    'present': present,
-                    'absent': absent,
-                    'late': late,
-                    'total': total,
-                    'percentage': percentage
-                }
-            else:
-                return {'present': 0, 'absent': 0, 'late': 0, 'total': 0, 'percentage': 0.0}
-                
-        except Exception as e:
-            print(f"Error getting student course attendance: {e}")
-            return {'present': 0, 'absent': 0, 'late': 0, 'total': 0, 'percentage': 0.0}
-        finally:
-            conn.close()
-
     def apply_filter(self):
         """Apply search filter to data"""
         if not self.current_search.strip():
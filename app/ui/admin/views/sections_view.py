@@ -454,105 +454,33 @@ class SectionViewPopup(ctk.CTkToplevel):
 
     def get_course_student_attendance_data(self, course_data, academic_year=None, semester=None):
         """Get detailed student attendance data for a specific course"""
-        try:
-            if not self.db_manager:
-                return []
-            
-            section_id = self.section_data.get('id')
-            course_id = course_data.get('course_id')
-            
-            if not section_id or not course_id:
-                return []
-            
-            # Get all students in this section
-            conn = self.db_manager.get_connection()
-            
-            # Get students query
-            students_query = """
-                SELECT u.id, u.first_name, u.last_name, u.email, 
-                       s.student_number
-                FROM students s
-                JOIN users u ON s.user_id = u.id
-                WHERE s.section = ? AND u.isDeleted = 0
-                ORDER BY u.last_name, u.first_name
-            """
-            
-            cursor = conn.execute(students_query, (section_id,))
-            students = cursor.fetchall()
-            
-            if not students:
-                conn.close()
-                return []
-            
-            # Get assigned course ID
-            assigned_course_query = """
-                SELECT id FROM assigned_courses 
-                WHERE course_id = ? AND section_id = ? AND isDeleted = 0
-            """
-            params = [course_id, section_id]
-            
-            if academic_year:
-                assigned_course_query += " AND academic_year = ?"
-                params.append(academic_year)
-            
-            if semester:
-                assigned_course_query += " AND semester = ?"
-                params.append(semester)
-            
-            cursor = conn.execute(assigned_course_query, params)
-            assigned_course = cursor.fetchone()
-            
-            if not assigned_course:
-                conn.close()
-                return []
-            
-            assigned_course_id = assigned_course['id']
-            
-            # Get attendance data for each student
-            students_data = []
-            for student in students:
-                # Get attendance statistics for this student and course
-                attendance_query = """
-                    SELECT 
-                        COUNT(CASE WHEN status = 'present' THEN 1 END) as present_count,
-                        COUNT(CASE WHEN status = 'absent' THEN 1 END) as absent_count,
-                        COUNT(CASE WHEN status = 'late' THEN 1 END) as late_count,
-                        COUNT(*) as total_logs
-                    FROM attendance_logs
-                    WHERE user_id = ? AND assigned_course_id = ?
-                """
-                
-                cursor = conn.execute(attendance_query, (student['id'], assigned_course_id))
-                result = cursor.fetchone()
-                
-                if result:
-                    present = result['present_count'] or 0
-                    absent = result['absent_count'] or 0
-                    late = result['late_count'] or 0
-                    total = result['total_logs'] or 0
-                    
-                    # Calculate percentage (count late as present)
-                    if total > 0:
-                        percentage = ((present + late) / total) * 100
-                    else:
-                        percentage = 0.0
-                    
-                    students_data.append({
-                        'student_name': f"{student['first_name']} {student['last_name']}",
-                        'student_number': student['student_number'] or 'N/A',
-                        'email': student['email'] or 'N/A',
-                        'present': present,
-                        'absent': absent,
-                        'late': late,
-                        'total': total,
-                        'percentage': percentage
-                    })
-            
-            conn.close()
-            return students_data
-            
-        except Exception as e:
-            print(f"Error getting course student attendance data: {e}")
-            if 'conn' in locals():
-                conn.close()
+        if not self.db_manager:
             return []
+        
+        section_id = self.section_data.get('id')
+        course_id = course_data.get('course_id')
+        
+        if not section_id or not course_id:
+            return []
+        
+        # Each course row belongs to one term; the filters only narrow it further
+        success, roster = self.db_manager.get_course_roster_attendance(
+            section_id,
+            course_id,
+            academic_year or course_data.get('academic_year'),
+            semester or course_data.get('semester')
+        )
+        if not success:
+            print(f"Error getting course student attendance data: {roster}")
+            return []
+        
+        return [{
+            'student_name': f"{student['first_name']} {student['last_name']}",
+            'student_number': student['student_number'] or 'N/A',
+            'email': student['email'] or 'N/A',
+            'present': student['present'],
+            'absent': student['absent'],
+            'late': student['late'],
+            'total': student['total'],
+            'percentage': student['percentage']
+        } for student in roster]
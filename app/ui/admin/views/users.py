@@ -112,12 +112,17 @@ class FilterPopup(ctk.CTkToplevel):
         self.destroy()
 
 class UsersView(ctk.CTkFrame):
-    def __init__(self, parent):
+    # Tables behind the student and faculty lists (reloaded when one of them changes)
+    WATCHED_TABLES = ('users', 'students', 'faculties', 'sections', 'programs')
+
+    def __init__(self, parent, db_manager=None):
         super().__init__(parent, fg_color="transparent")
-        self.db_manager = DatabaseManager()
-        self.all_users = []
+        self.db_manager = db_manager or DatabaseManager()
+        # Only the rows of the current page are held in memory
         self.students_data = []
         self.faculty_data = []
+        self.total_students = 0
+        self.total_faculty = 0
         
         # Filter state
         self.current_filters = {
@@ -129,11 +134,22 @@ class UsersView(ctk.CTkFrame):
             'faculty': ""
         }
         
+        self.current_sort = {
+            'student': None,
+            'faculty': None
+        }
+        
         # Pagination settings
         self.students_per_page = 10
         self.faculty_per_page = 10
         self.current_students_page = 1
         self.current_faculty_page = 1
+        # Keyset pagination: the cursor each visited page starts from
+        # (None for page 1), plus the cursor of the page after the current one
+        self.students_page_cursors = [None]
+        self.faculty_page_cursors = [None]
+        self.students_next_cursor = None
+        self.faculty_next_cursor = None
         
         # Setup UI first, then load data
         self.setup_ui()
@@ -141,49 +157,58 @@ class UsersView(ctk.CTkFrame):
 
     def get_total_students_pages(self):
         """Calculate total pages for students"""
-        total_students = len(self.students_data)
-        return max(1, (total_students + self.students_per_page - 1) // self.students_per_page)
+        return max(1, (self.total_students + self.students_per_page - 1) // self.students_per_page)
 
     def get_total_faculty_pages(self):
         """Calculate total pages for faculty"""
-        total_faculty = len(self.faculty_data)
-        return max(1, (total_faculty + self.faculty_per_page - 1) // self.faculty_per_page)
-
-    def get_students_for_page(self, page):
-        """Get students data for specific page"""
-        start_idx = (page - 1) * self.students_per_page
-        end_idx = start_idx + self.students_per_page
-        return self.students_data[start_idx:end_idx]
-
-    def get_faculty_for_page(self, page):
-        """Get faculty data for specific page"""
-        start_idx = (page - 1) * self.faculty_per_page
-        end_idx = start_idx + self.faculty_per_page
-        return self.faculty_data[start_idx:end_idx]
+        return max(1, (self.total_faculty + self.faculty_per_page - 1) // self.faculty_per_page)
 
     def change_students_page(self, direction):
         """Change students page"""
-        total_pages = self.get_total_students_pages()
         if direction == "prev" and self.current_students_page > 1:
+            self.students_page_cursors.pop()
             self.current_students_page -= 1
-        elif direction == "next" and self.current_students_page < total_pages:
+        elif direction == "next" and self.students_next_cursor:
+            self.students_page_cursors.append(self.students_next_cursor)
             self.current_students_page += 1
+        else:
+            return
+        # Same search as before, so the total from the first page still holds
+        self.load_students_page(count=False)
         self.refresh_students_table()
 
     def change_faculty_page(self, direction):
         """Change faculty page"""
-        total_pages = self.get_total_faculty_pages()
         if direction == "prev" and self.current_faculty_page > 1:
+            self.faculty_page_cursors.pop()
             self.current_faculty_page -= 1
-        elif direction == "next" and self.current_faculty_page < total_pages:
+        elif direction == "next" and self.faculty_next_cursor:
+            self.faculty_page_cursors.append(self.faculty_next_cursor)
             self.current_faculty_page += 1
+        else:
+            return
+        # Same search as before, so the total from the first page still holds
+        self.load_faculty_page(count=False)
         self.refresh_faculty_table()
 
+    def reset_pagination(self, user_type):
+        """Go back to the first page of the given user type"""
+        if user_type == 'student':
+            self.current_students_page = 1
+            self.students_page_cursors = [None]
+        else:
+            self.current_faculty_page = 1
+            self.faculty_page_cursors = [None]
+
     def load_users_data(self):
         """Load initial users data from database"""
         # Load all data initially (no filters)
         self.load_filtered_data()
 
+    def refresh_data(self):
+        """Reload the current pages, keeping filters, search and sort"""
+        self.load_filtered_data()
+
     def refresh_students_table(self):
         """Refresh the students table with current data"""
         try:
@@ -556,9 +581,7 @@ class UsersView(ctk.CTkFrame):
         data_to_display = []
         
         if self.students_data:
-            current_page_data = self.get_students_for_page(self.current_students_page)
-            
-            for i, student in enumerate(current_page_data):
+            for i, student in enumerate(self.students_data):
                 # Handle program display - show "N/A" only if program is null
                 program_display = student.get('program_name', '') or "N/A"
                 
@@ -833,9 +856,7 @@ class UsersView(ctk.CTkFrame):
         data_to_display = []
         
         if self.faculty_data:
-            current_page_data = self.get_faculty_for_page(self.current_faculty_page)
-            
-            for i, faculty in enumerate(current_page_data):
+            for i, faculty in enumerate(self.faculty_data):
                 data_to_display.append({
                     'name': f"{faculty.get('first_name', '')} {faculty.get('last_name', '')}",
                     'employee_number': faculty.get('employee_number', 'N/A'),
@@ -952,10 +973,7 @@ class UsersView(ctk.CTkFrame):
         self.current_filters[user_type] = filter_values
         
         # Reset to first page when applying filters
-        if user_type == 'student':
-            self.current_students_page = 1
-        else:
-            self.current_faculty_page = 1
+        self.reset_pagination(user_type)
         
         # Reload data with filters
         self.load_filtered_data()
@@ -964,6 +982,7 @@ class UsersView(ctk.CTkFrame):
         """Reset filters for the specified user type"""
         self.current_filters[user_type] = {}
         self.current_search[user_type] = ""
+        self.current_sort[user_type] = None
         
         # Reset sort dropdown to default
         if user_type == 'student' and hasattr(self, 'student_sort_var'):
@@ -972,10 +991,7 @@ class UsersView(ctk.CTkFrame):
             self.faculty_sort_var.set("↕")
         
         # Reset to first page
-        if user_type == 'student':
-            self.current_students_page = 1
-        else:
-            self.current_faculty_page = 1
+        self.reset_pagination(user_type)
         
         # Clear search entries
         if hasattr(self, 'student_search_entry') and user_type == 'student':
@@ -991,46 +1007,68 @@ class UsersView(ctk.CTkFrame):
         self.current_search[user_type] = search_term
         
         # Reset to first page when searching
-        if user_type == 'student':
-            self.current_students_page = 1
-        else:
-            self.current_faculty_page = 1
+        self.reset_pagination(user_type)
         
         # Reload data with search
         self.load_filtered_data()
 
+    def search_users(self, user_type, cursor=None, limit=None, include_count=True):
+        """Query users of one type with the current search, filters and sort"""
+        return self.db_manager.search_users(
+            user_type,
+            search_term=self.current_search.get(user_type, ""),
+            filters=self.current_filters.get(user_type, {}),
+            sort=self.current_sort.get(user_type),
+            cursor=cursor,
+            limit=limit,
+            include_count=include_count
+        )
+
+    def load_students_page(self, count=True):
+        """Load the current students page from the database, recounting all matches if count is set"""
+        success, result = self.search_users('student', self.students_page_cursors[-1], self.students_per_page, count)
+        if not success:
+            print(f"Error loading students: {result}")
+            self.students_data, self.total_students, self.students_next_cursor = [], 0, None
+            return
+        
+        # Rows may have been deleted since this page was opened
+        if not result['users'] and self.current_students_page > 1:
+            self.students_page_cursors.pop()
+            self.current_students_page -= 1
+            self.load_students_page(count)
+            return
+        
+        self.students_data = result['users']
+        if result['total_count'] is not None:
+            self.total_students = result['total_count']
+        self.students_next_cursor = result['next_cursor']
+
+    def load_faculty_page(self, count=True):
+        """Load the current faculty page from the database, recounting all matches if count is set"""
+        success, result = self.search_users('faculty', self.faculty_page_cursors[-1], self.faculty_per_page, count)
+        if not success:
+            print(f"Error loading faculty: {result}")
+            self.faculty_data, self.total_faculty, self.faculty_next_cursor = [], 0, None
+            return
+        
+        # Rows may have been deleted since this page was opened
+        if not result['users'] and self.current_faculty_page > 1:
+            self.faculty_page_cursors.pop()
+            self.current_faculty_page -= 1
+            self.load_faculty_page(count)
+            return
+        
+        self.faculty_data = result['users']
+        if result['total_count'] is not None:
+            self.total_faculty = result['total_count']
+        self.faculty_next_cursor = result['next_cursor']
+
     def load_filtered_data(self):
-        """Load data with current filters and search terms applied"""
+        """Load the current page with current filters and search terms applied"""
         try:
-            # Load filtered students using db_manager method
-            student_filters = self.current_filters.get('student', {})
-            success, students = self.db_manager.get_students_with_filters(
-                search_term=self.current_search.get('student', ""),
-                year_filter=student_filters.get('year', ""),
-                section_filter=student_filters.get('section', ""),
-                program_filter=student_filters.get('program', ""),
-                status_filter=student_filters.get('status', "")
-            )
-            
-            if success:
-                self.students_data = students
-            else:
-                print(f"Error loading students: {students}")
-                self.students_data = []
-            
-            # Load filtered faculty using db_manager method
-            faculty_filters = self.current_filters.get('faculty', {})
-            success, faculty = self.db_manager.get_faculty_with_filters(
-                search_term=self.current_search.get('faculty', ""),
-                status_filter=faculty_filters.get('status', ""),
-                role_filter=faculty_filters.get('role', "")
-            )
-            
-            if success:
-                self.faculty_data = faculty
-            else:
-                print(f"Error loading faculty: {faculty}")
-                self.faculty_data = []
+            self.load_students_page()
+            self.load_faculty_page()
             
             # Refresh tables
             self.refresh_students_table()
@@ -1105,10 +1143,10 @@ class UsersView(ctk.CTkFrame):
             width=80,
             height=32,
             font=ctk.CTkFont(size=12),
-            fg_color="#F3F4F6" if self.current_students_page == total_pages else "#1E3A8A",
-            text_color="#6B7280" if self.current_students_page == total_pages else "#fff",
-            hover_color="#E5E7EB" if self.current_students_page == total_pages else "#1D4ED8",
-            state="disabled" if self.current_students_page == total_pages else "normal",
+            fg_color="#F3F4F6" if not self.students_next_cursor else "#1E3A8A",
+            text_color="#6B7280" if not self.students_next_cursor else "#fff",
+            hover_color="#E5E7EB" if not self.students_next_cursor else "#1D4ED8",
+            state="disabled" if not self.students_next_cursor else "normal",
             command=lambda: self.change_students_page("next")
         )
         next_btn.pack(side="left")
@@ -1150,10 +1188,10 @@ class UsersView(ctk.CTkFrame):
             width=80,
             height=32,
             font=ctk.CTkFont(size=12),
-            fg_color="#F3F4F6" if self.current_faculty_page == total_pages else "#1E3A8A",
-            text_color="#6B7280" if self.current_faculty_page == total_pages else "#fff",
-            hover_color="#E5E7EB" if self.current_faculty_page == total_pages else "#1D4ED8",
-            state="disabled" if self.current_faculty_page == total_pages else "normal",
+            fg_color="#F3F4F6" if not self.faculty_next_cursor else "#1E3A8A",
+            text_color="#6B7280" if not self.faculty_next_cursor else "#fff",
+            hover_color="#E5E7EB" if not self.faculty_next_cursor else "#1D4ED8",
+            state="disabled" if not self.faculty_next_cursor else "normal",
             command=lambda: self.change_faculty_page("next")
         )
         next_btn.pack(side="left")
@@ -1166,8 +1204,14 @@ class UsersView(ctk.CTkFrame):
             import os
             from datetime import datetime
             
+            # Export every matching row, not just the current page
+            success, result = self.search_users('student')
+            if not success:
+                raise Exception(result)
+            export_data = result['users']
+            
             # Check if we have data to export
-            if not self.students_data:
+            if not export_data:
                 messagebox.showwarning("No Data", "No student data available to export.")
                 return
             
@@ -1189,7 +1233,7 @@ class UsersView(ctk.CTkFrame):
                 writer.writerow(['Student Name', 'Student Number', 'Email', 'Year', 'Section', 'Program', 'Status', 'Contact Number', 'Date of Birth'])
                 
                 # Write data
-                for student in self.students_data:
+                for student in export_data:
                     try:
                         # Handle section display
                         section_display = student.get('section_name', '') or "N/A"
@@ -1251,8 +1295,14 @@ class UsersView(ctk.CTkFrame):
             import os
             from datetime import datetime
             
+            # Export every matching row, not just the current page
+            success, result = self.search_users('faculty')
+            if not success:
+                raise Exception(result)
+            export_data = result['users']
+            
             # Check if we have data to export
-            if not self.faculty_data:
+            if not export_data:
                 messagebox.showwarning("No Data", "No faculty data available to export.")
                 return
             
@@ -1274,7 +1324,7 @@ class UsersView(ctk.CTkFrame):
                 writer.writerow(['Faculty Name', 'Employee Number', 'Email', 'Role', 'Status', 'Contact Number', 'Date of Birth'])
                 
                 # Write data
-                for faculty in self.faculty_data:
+                for faculty in export_data:
                     try:
                         # Handle date of birth formatting - use 'birthday' field from database
                         dob_value = faculty.get('birthday', '')
@@ -1314,74 +1364,39 @@ class UsersView(ctk.CTkFrame):
             traceback.print_exc()
             messagebox.showerror("Export Error", f"Failed to export faculty data:\n{str(e)}")
 
+    # Sort menu choices -> (column, descending) understood by search_users
+    SORT_CHOICES = {
+        "Sort by Name (A-Z)": ('name', False), "Sort by Name (Z-A)": ('name', True),
+        "Sort by Section (A-Z)": ('section', False), "Sort by Section (Z-A)": ('section', True),
+        "Sort by Program (A-Z)": ('program', False), "Sort by Program (Z-A)": ('program', True),
+        "Sort by Status (A-Z)": ('status', False), "Sort by Status (Z-A)": ('status', True),
+        "Sort by Employee Number (A-Z)": ('employee_number', False), "Sort by Employee Number (Z-A)": ('employee_number', True),
+        "Sort by Email (A-Z)": ('email', False), "Sort by Email (Z-A)": ('email', True),
+        "Sort by Role (A-Z)": ('role', False), "Sort by Role (Z-A)": ('role', True)
+    }
+
+    def apply_sort(self, user_type, sort_choice):
+        """Sort the given user type in the database and go back to the first page"""
+        if sort_choice == "None":
+            if user_type == 'student':
+                self.student_sort_var.set("↕")
+            else:
+                self.faculty_sort_var.set("↕")
+        
+        self.current_sort[user_type] = self.SORT_CHOICES.get(sort_choice)
+        self.reset_pagination(user_type)
+        
+        if user_type == 'student':
+            self.load_students_page()
+            self.refresh_students_table()
+        else:
+            self.load_faculty_page()
+            self.refresh_faculty_table()
+
     def apply_student_sort(self, sort_choice):
         """Apply sorting to students data"""
-        if not self.students_data or sort_choice == "None":
-            # If "None" is selected, reload data without sorting
-            if sort_choice == "None":
-                self.student_sort_var.set("↕")
-                self.load_filtered_data()
-            return
-            
-        # Create a copy of the data to sort
-        sorted_data = self.students_data.copy()
-        
-        if sort_choice == "Sort by Name (A-Z)":
-            sorted_data.sort(key=lambda x: f"{x.get('first_name', '')} {x.get('last_name', '')}")
-        elif sort_choice == "Sort by Name (Z-A)":
-            sorted_data.sort(key=lambda x: f"{x.get('first_name', '')} {x.get('last_name', '')}", reverse=True)
-        elif sort_choice == "Sort by Section (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('section_name', '') or 'zzz')
-        elif sort_choice == "Sort by Section (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('section_name', '') or '', reverse=True)
-        elif sort_choice == "Sort by Program (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('program_name', '') or 'zzz')
-        elif sort_choice == "Sort by Program (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('program_name', '') or '', reverse=True)
-        elif sort_choice == "Sort by Status (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('status_name', '') or 'zzz')
-        elif sort_choice == "Sort by Status (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('status_name', '') or '', reverse=True)
-        
-        # Update the data and refresh the table
-        self.students_data = sorted_data
-        self.current_students_page = 1  # Reset to first page
-        self.refresh_students_table()
+        self.apply_sort('student', sort_choice)
 
     def apply_faculty_sort(self, sort_choice):
         """Apply sorting to faculty data"""
-        if not self.faculty_data or sort_choice == "None":
-            # If "None" is selected, reload data without sorting
-            if sort_choice == "None":
-                self.faculty_sort_var.set("↕")
-                self.load_filtered_data()
-            return
-            
-        # Create a copy of the data to sort
-        sorted_data = self.faculty_data.copy()
-        
-        if sort_choice == "Sort by Name (A-Z)":
-            sorted_data.sort(key=lambda x: f"{x.get('first_name', '')} {x.get('last_name', '')}")
-        elif sort_choice == "Sort by Name (Z-A)":
-            sorted_data.sort(key=lambda x: f"{x.get('first_name', '')} {x.get('last_name', '')}", reverse=True)
-        elif sort_choice == "Sort by Employee Number (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('employee_number', '') or 'zzz')
-        elif sort_choice == "Sort by Employee Number (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('employee_number', '') or '', reverse=True)
-        elif sort_choice == "Sort by Email (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('email', '') or 'zzz')
-        elif sort_choice == "Sort by Email (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('email', '') or '', reverse=True)
-        elif sort_choice == "Sort by Role (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('role', '') or 'zzz')
-        elif sort_choice == "Sort by Role (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('role', '') or '', reverse=True)
-        elif sort_choice == "Sort by Status (A-Z)":
-            sorted_data.sort(key=lambda x: x.get('status_name', '') or 'zzz')
-        elif sort_choice == "Sort by Status (Z-A)":
-            sorted_data.sort(key=lambda x: x.get('status_name', '') or '', reverse=True)
-        
-        # Update the data and refresh the table
-        self.faculty_data = sorted_data
-        self.current_faculty_page = 1  # Reset to first page
-        self.refresh_faculty_table()
\ No newline at end of file
+        self.apply_sort('faculty', sort_choice)
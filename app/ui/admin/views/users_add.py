@@ -1,6 +1,5 @@
 import customtkinter as ctk
 import sqlite3
-import bcrypt
 import base64
 import re
 import winsound
@@ -8,6 +7,9 @@ from tkinter import messagebox
 from datetime import datetime
 from PIL import Image, ImageTk
 from app.db_manager import DatabaseManager
+from app.face_images import store_face_image
+from app.face_embeddings import save_face_embedding
+from app.auth_executor import hash_password
 from .users_add_camera import IndependentFacialRecognitionWindow
 
 class UsersAddModal(ctk.CTkToplevel):
@@ -15,11 +17,12 @@ class UsersAddModal(ctk.CTkToplevel):
         super().__init__(parent)
         self.parent_view = parent
         self.user_type = user_type
-        self.db_manager = DatabaseManager()
+        self.db_manager = getattr(parent, 'db_manager', None) or DatabaseManager()
         
         # Face verification variables
         self.face_image = None
         self.face_image_data = None
+        self.face_encoding = None
         
         # Animation variables
         self.shake_animation_running = False
@@ -1456,11 +1459,12 @@ class UsersAddModal(ctk.CTkToplevel):
         # Create camera window with callback - NO GRAB SET HERE
         self.camera_window = IndependentFacialRecognitionWindow(self.on_face_capture_complete)
 
-    def on_face_capture_complete(self, face_image, face_image_data):
+    def on_face_capture_complete(self, face_image, face_image_data, face_encoding=None):
         """Callback when face capture is completed - save to database with verified=1"""
         try:
             self.face_image = face_image
             self.face_image_data = face_image_data
+            self.face_encoding = face_encoding
             
             # Restore grab to parent modal with retry logic
             self._restore_modal_grab()
@@ -1657,15 +1661,9 @@ class UsersAddModal(ctk.CTkToplevel):
             conn = self.db_manager.get_connection()
             cursor = conn.cursor()
             
-            # Hash password using bcrypt
-            password_bytes = self.pending_form_data['password'].encode('utf-8')
-            password_hash = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-            password_hash_str = password_hash.decode('utf-8')
+            # Hash password using bcrypt at the configured cost
+            password_hash_str = hash_password(self.pending_form_data['password'])
             
-            # Convert face image to base64 or binary
-            face_image_data = None
-            if self.face_image_data:
-                face_image_data = self.face_image_data  # Store as binary (LargeBinary)
             
             # Get section ID
             section_id = None
@@ -1699,12 +1697,17 @@ class UsersAddModal(ctk.CTkToplevel):
             cursor.execute("BEGIN")
             
             try:
+                # Face crop and thumbnail go to the blob store; the row keeps their hashes
+                face_image_hash = face_thumbnail_hash = None
+                if self.face_image_data:
+                    face_image_hash, face_thumbnail_hash = store_face_image(cursor, self.face_image_data)
+                
                 # First, insert into users table with status_id and isDeleted
                 cursor.execute("""
                     INSERT INTO users (
                         first_name, last_name, email, birthday, password_hash, 
-                        contact_number, role, status_id, face_image, verified, isDeleted, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, 'Student', ?, ?, 1, 0, ?)
+                        contact_number, role, status_id, face_image_hash, face_thumbnail_hash, verified, isDeleted, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, 'Student', ?, ?, ?, 1, 0, ?)
                 """, (
                     self.pending_form_data['first_name'],
                     self.pending_form_data['last_name'],
@@ -1713,7 +1716,8 @@ class UsersAddModal(ctk.CTkToplevel):
                     password_hash_str,
                     self.pending_form_data.get('contact_number'),
                     status_id,
-                    face_image_data,
+                    face_image_hash,
+                    face_thumbnail_hash,
                     datetime.now()
                 ))
                 
@@ -1731,6 +1735,10 @@ class UsersAddModal(ctk.CTkToplevel):
                     section_id
                 ))
                 
+                # Face encoding used at check-in
+                if face_image_hash:
+                    save_face_embedding(cursor, user_id, self.face_image_data, self.face_encoding)
+                
                 # Commit transaction
                 cursor.execute("COMMIT")
                 
@@ -1762,15 +1770,9 @@ class UsersAddModal(ctk.CTkToplevel):
             conn = self.db_manager.get_connection()
             cursor = conn.cursor()
             
-            # Hash password using bcrypt
-            password_bytes = self.pending_form_data['password'].encode('utf-8')
-            password_hash = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-            password_hash_str = password_hash.decode('utf-8')
+            # Hash password using bcrypt at the configured cost
+            password_hash_str = hash_password(self.pending_form_data['password'])
             
-            # Convert face image to binary
-            face_image_data = None
-            if self.face_image_data:
-                face_image_data = self.face_image_data  # Store as binary (LargeBinary)
             
             # Get "Active" status ID (default for new faculty)
             status_id = None
@@ -1786,12 +1788,17 @@ class UsersAddModal(ctk.CTkToplevel):
             cursor.execute("BEGIN")
             
             try:
+                # Face crop and thumbnail go to the blob store; the row keeps their hashes
+                face_image_hash = face_thumbnail_hash = None
+                if self.face_image_data:
+                    face_image_hash, face_thumbnail_hash = store_face_image(cursor, self.face_image_data)
+                
                 # First, insert into users table with status_id and isDeleted
                 cursor.execute("""
                     INSERT INTO users (
                         first_name, last_name, email, birthday, password_hash, 
-                        contact_number, role, status_id, face_image, verified, isDeleted, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, 'Faculty', ?, ?, 1, 0, ?)
+                        contact_number, role, status_id, face_image_hash, face_thumbnail_hash, verified, isDeleted, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, 'Faculty', ?, ?, ?, 1, 0, ?)
                 """, (
                     self.pending_form_data['first_name'],
                     self.pending_form_data['last_name'],
@@ -1800,7 +1807,8 @@ class UsersAddModal(ctk.CTkToplevel):
                     password_hash_str,
                     self.pending_form_data.get('contact_number'),
                     status_id,
-                    face_image_data,
+                    face_image_hash,
+                    face_thumbnail_hash,
                     datetime.now()
                 ))
                 
@@ -1817,6 +1825,10 @@ class UsersAddModal(ctk.CTkToplevel):
                     self.pending_form_data['employee_number']
                 ))
                 
+                # Face encoding used at check-in
+                if face_image_hash:
+                    save_face_embedding(cursor, user_id, self.face_image_data, self.face_encoding)
+                
                 # Commit transaction
                 cursor.execute("COMMIT")
                 
@@ -1,13 +1,14 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import cv2
-import threading
-import time
 import io
 from PIL import Image, ImageTk
-import os
 import numpy as np
+from app.face_embeddings import face_recognition_available
+from app.vision_worker import get_vision_worker, UI_SUBMIT_TIMEOUT
+from app.auth_executor import await_future
+from app.camera_capture import CameraCapture
+from app.ui.components.camera_preview import CameraPreview, FaceFeedbackOverlay
 
 class IndependentFacialRecognitionWindow:
     """Completely independent facial recognition window"""
@@ -28,10 +29,10 @@ class IndependentFacialRecognitionWindow:
         # Camera variables
         self.camera = None
         self.is_camera_active = False
-        self.camera_thread = None
-        self.current_frame = None
+        self.camera_preview = None
         self.face_image = None
         self.face_image_data = None
+        self.face_encoding = None
         self.camera_canvas = None
         self.current_photo = None
         
@@ -203,8 +204,9 @@ class IndependentFacialRecognitionWindow:
     def start_camera(self):
         """Start camera capture"""
         try:
-            self.camera = cv2.VideoCapture(0)
-            if not self.camera.isOpened():
+            self.camera = CameraCapture(0)
+            if not self.camera.start():
+                self.camera = None
                 messagebox.showerror("Error", "Could not open camera. Please check your camera connection.", parent=self.verification_dialog)
                 return False
 
@@ -225,10 +227,9 @@ class IndependentFacialRecognitionWindow:
             )
             self.camera_canvas.place(x=0, y=0, width=410, height=240)
             
-            # Start video feed thread
-            self.camera_thread = threading.Thread(target=self._update_camera_display)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            # Frames are grabbed on the capture thread; the preview shows the latest one
+            self.camera_preview = CameraPreview(self.camera_canvas, self.camera, 410, 240, overlay=FaceFeedbackOverlay(self.camera))
+            self.camera_preview.start()
             
             return True
         except Exception as e:
@@ -241,82 +242,16 @@ class IndependentFacialRecognitionWindow:
         self._cleanup_camera_window()
         self._update_ui_after_camera_close()
 
-    def _update_camera_display(self):
-        """Update camera feed display"""
-        while self.is_camera_active:
-            try:
-                ret, frame = self.camera.read()
-                if ret:
-                    self.current_frame = frame.copy()
-                    frame_resized = cv2.resize(frame, (410, 240))
-                    frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-                    
-                    # Add face guide
-                    h, w = frame_rgb.shape[:2]
-                    center_x, center_y = w // 2, h // 2
-                    rect_w, rect_h = 160, 180
-                    cv2.rectangle(frame_rgb, 
-                                 (center_x - rect_w//2, center_y - rect_h//2),
-                                 (center_x + rect_w//2, center_y + rect_h//2),
-                                 (0, 255, 0), 2)
-                    
-                    try:
-                        pil_image = Image.fromarray(frame_rgb)
-                        
-                        if (hasattr(self, 'camera_canvas') and 
-                            self.camera_canvas and 
-                            self.verification_dialog and 
-                            self.verification_dialog.winfo_exists()):
-
-                            def update_canvas(img=pil_image):
-                                try:
-                                    if (hasattr(self, 'camera_canvas') and 
-                                        self.camera_canvas and 
-                                        self.camera_canvas.winfo_exists()):
-                                        
-                                        photo = ImageTk.PhotoImage(img)
-                                        self.camera_canvas.delete("all")
-                                        self.camera_canvas.create_image(205, 120, image=photo, anchor="center")
-                                        self.current_photo = photo
-                                        
-                                except tk.TclError:
-                                    self.is_camera_active = False
-                                except Exception as e:
-                                    print(f"Canvas update error: {e}")
-
-                            self.verification_dialog.after(0, update_canvas)
-                        else:
-                            break
-
-                    except Exception as img_error:
-                        print(f"Image processing error: {img_error}")
-                        break
-                        
-            except Exception as e:
-                print(f"Camera display error: {e}")
-                break
-
-            time.sleep(0.03)
-        
-        self.is_camera_active = False
-
     def _cleanup_camera_window(self):
         """Clean up camera resources"""
         self.is_camera_active = False
         
-        if hasattr(self, 'camera_thread') and self.camera_thread and self.camera_thread.is_alive():
-            try:
-                self.camera_thread.join(0.5)
-            except Exception:
-                pass
-
-        if hasattr(self, 'camera') and self.camera and self.camera.isOpened():
-            try:
-                self.camera.release()
-            except Exception:
-                pass
-            finally:
-                self.camera = None
+        if getattr(self, 'camera_preview', None):
+            self.camera_preview.stop()
+            self.camera_preview = None
+        if getattr(self, 'camera', None):
+            self.camera.stop()
+            self.camera = None
 
         if hasattr(self, 'camera_canvas') and self.camera_canvas:
             try:
@@ -349,34 +284,46 @@ class IndependentFacialRecognitionWindow:
             messagebox.showwarning("Warning", "Camera is not active. Please open camera first.", parent=self.verification_dialog)
             return
         
-        if not hasattr(self, 'current_frame') or self.current_frame is None:
+        frame = self.camera.read() if self.camera else None
+        if frame is None:
             messagebox.showwarning("Warning", "No frame available. Please wait for camera to initialize.", parent=self.verification_dialog)
             return
         
+        # Validation and encoding run in the vision worker while the preview keeps running
+        self.capture_button.configure(state="disabled")
+        future = get_vision_worker().submit('check_face', frame, timeout=UI_SUBMIT_TIMEOUT, encode=True)
+        if future is None:
+            self.capture_button.configure(state="normal")
+            messagebox.showwarning("Busy", "Face checks are busy. Please try again in a moment.", parent=self.verification_dialog)
+            return
+        await_future(self.verification_dialog, future, lambda result: self._finish_capture(result))
+
+    def _finish_capture(self, result):
+        """Keep the captured frame once the vision worker has checked it"""
+        if not self.is_camera_active:
+            return
+        self.capture_button.configure(state="normal")
+        
         try:
-            frame = self.current_frame.copy()
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.face_image = Image.fromarray(frame_rgb)
+            success, check = result
+            if not success:
+                raise RuntimeError(check)
             
-            img_byte_arr = io.BytesIO()
-            self.face_image.save(img_byte_arr, format='PNG')
-            self.face_image_data = img_byte_arr.getvalue()
-
-            if len(self.face_image_data) > 5 * 1024 * 1024:
-                messagebox.showwarning("Warning", "The captured image exceeds the 5MB limit. Please try again.", parent=self.verification_dialog)
-                self.face_image = None
-                self.face_image_data = None
+            if not check['valid']:
+                messagebox.showwarning("Face Validation Failed", check['message'], parent=self.verification_dialog)
                 return
-
-            # Validate face image
-            is_valid, message = self.validate_face_image(frame)
             
-            if not is_valid:
-                messagebox.showwarning("Face Validation Failed", message, parent=self.verification_dialog)
-                self.face_image = None
-                self.face_image_data = None
+            # Encoded now so check-in only has to compare vectors
+            if check['encoding'] is None and face_recognition_available():
+                messagebox.showwarning("Face Validation Failed", "Could not read facial features. Please face the camera directly and try again.", parent=self.verification_dialog)
                 return
             
+            # Store the normalized face crop the worker cut out, not the whole frame
+            self.face_image_data = check['image']
+            self.face_image = Image.open(io.BytesIO(self.face_image_data))
+            
+            self.face_encoding = check['encoding']
+            
             self.stop_camera()
             self.show_face_preview()
             self._update_buttons_after_capture()
@@ -435,6 +382,7 @@ class IndependentFacialRecognitionWindow:
         """Retake photo"""
         self.face_image = None
         self.face_image_data = None
+        self.face_encoding = None
         self._reset_buttons_for_retake()
         
         for widget in self.face_preview_frame.winfo_children():
@@ -473,7 +421,7 @@ class IndependentFacialRecognitionWindow:
             if self.face_image and self.face_image_data:
                 # Send data to parent callback
                 if self.parent_callback:
-                    self.parent_callback(self.face_image, self.face_image_data)
+                    self.parent_callback(self.face_image, self.face_image_data, self.face_encoding)
                 
                 self.on_verification_dialog_closing()
             else:
@@ -487,11 +435,11 @@ class IndependentFacialRecognitionWindow:
             # Stop camera first
             self.is_camera_active = False
             
-            if self.camera_thread and self.camera_thread.is_alive():
-                self.camera_thread.join(timeout=1.0)
-            
-            if self.camera:
-                self.camera.release()
+            if getattr(self, 'camera_preview', None):
+                self.camera_preview.stop()
+                self.camera_preview = None
+            if getattr(self, 'camera', None):
+                self.camera.stop()
                 self.camera = None
             
             # Remove topmost before releasing grab
@@ -518,46 +466,3 @@ class IndependentFacialRecognitionWindow:
                 self.verification_dialog.destroy()
             except:
                 pass
-
-    def validate_face_image(self, image):
-        """Validate that the image contains a properly visible face"""
-        try:
-            face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
-
-            if not os.path.exists(face_cascade_path) or not os.path.exists(eye_cascade_path):
-                print("Warning: Face detection cascades not found. Skipping face validation.")
-                return (True, "Face validation skipped")
-
-            face_cascade = cv2.CascadeClassifier(face_cascade_path)
-            eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(faces) == 0:
-                return (False, "No face detected. Please ensure your face is clearly visible.")
-            if len(faces) > 1:
-                return (False, "Multiple faces detected. Please ensure only your face is in the image.")
-
-            (x, y, w, h) = faces[0]
-            roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(
-                roi_gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(eyes) < 2:
-                return (False, "Eyes not clearly visible. Please remove sunglasses or any accessories covering your face.")
-
-            return (True, "Face validation successful")
-        except Exception as e:
-            print(f"Face validation error: {str(e)}")
-            return (True, "Face validation skipped due to an error")
@@ -12,7 +12,7 @@ class UsersDeleteModal(ctk.CTkToplevel):
         self.parent_view = parent
         self.user_data = user_data
         self.user_type = user_type
-        self.db_manager = DatabaseManager()
+        self.db_manager = getattr(parent, 'db_manager', None) or DatabaseManager()
         self.title(f"Delete User")
         # Responsive Modern Delete Modal
         self.geometry("340x210")
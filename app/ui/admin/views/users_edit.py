@@ -1,28 +1,27 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import cv2
-import threading
-import time
 import io
-import os
 from PIL import Image, ImageTk
 from app.db_manager import DatabaseManager
+from app.camera_capture import CameraCapture
+from app.vision_worker import get_vision_worker, UI_SUBMIT_TIMEOUT
+from app.auth_executor import await_future
+from app.ui.components.camera_preview import CameraPreview, FaceFeedbackOverlay
 
 class UsersEditModal(ctk.CTkToplevel):
     def __init__(self, parent, user_data, user_type="student"):
         super().__init__(parent)
         self.user_data = user_data
         self.user_type = user_type
-        self.db_manager = DatabaseManager()
+        self.db_manager = getattr(parent, 'db_manager', None) or DatabaseManager()
         
         # Camera variables
         self.face_image = None
         self.face_image_data = None
         self.camera = None
         self.is_camera_active = False
-        self.camera_thread = None
-        self.current_frame = None
+        self.camera_preview = None
         self.camera_canvas = None
         self.current_photo = None
         
@@ -1009,33 +1008,52 @@ class UsersEditModal(ctk.CTkToplevel):
             self.update_face_status(error=True)
 
     def update_face_status(self, error=False):
-        """Update the face data status with text only"""
+        """Update the face data status text and thumbnail"""
         try:
             if error:
                 # Error state
                 self.face_status_label.configure(
                     text="✗ Error loading face data",
-                    text_color="#dc2626"
+                    text_color="#dc2626",
+                    image=None
                 )
                 self.face_status_frame.configure(fg_color="#fef2f2")
             elif self.face_image_data or (hasattr(self, 'face_image') and self.face_image):
                 # Valid face data
                 self.face_status_label.configure(
-                    text="✓ Face data available",
-                    text_color="#10b981"
+                    text="  ✓ Face data available",
+                    text_color="#10b981",
+                    image=self._face_thumbnail_image(),
+                    compound="left"
                 )
                 self.face_status_frame.configure(fg_color="#f0fdf4")
             else:
                 # No face data
                 self.face_status_label.configure(
                     text="No Face Data",
-                    text_color="#757575"
+                    text_color="#757575",
+                    image=None
                 )
                 self.face_status_frame.configure(fg_color="#fff")
                 
         except Exception as e:
             print(f"Error updating face status: {e}")
 
+    def _face_thumbnail_image(self):
+        """Small preview of the face for the status row (the stored thumbnail until it is retaken)"""
+        try:
+            if not getattr(self, 'face_image_changed', False) and self.user_data.get('face_thumbnail'):
+                thumbnail = Image.open(io.BytesIO(self.user_data['face_thumbnail']))
+            elif getattr(self, 'face_image', None):
+                thumbnail = self.face_image.copy()
+                thumbnail.thumbnail((64, 64))
+            else:
+                return None
+            return ctk.CTkImage(light_image=thumbnail, dark_image=thumbnail, size=(40, 40))
+        except Exception as e:
+            print(f"Error loading face thumbnail: {e}")
+            return None
+
     def open_facial_recognition(self):
         """Open facial recognition popup"""
         # Create completely independent window
@@ -1045,10 +1063,10 @@ class UsersEditModal(ctk.CTkToplevel):
         """Callback when face capture is completed"""
         self.face_image = face_image
         self.face_image_data = face_image_data
-        self.update_face_status()
         
         # Mark that the face image has been changed from the original
         self.face_image_changed = True
+        self.update_face_status()
 
     def show_caution_modal(self):
         """Show caution modal before saving"""
@@ -1243,8 +1261,7 @@ class IndependentFacialRecognitionWindow:
         # Camera variables
         self.camera = None
         self.is_camera_active = False
-        self.camera_thread = None
-        self.current_frame = None
+        self.camera_preview = None
         self.face_image = None
         self.face_image_data = None
         self.camera_canvas = None
@@ -1421,8 +1438,9 @@ class IndependentFacialRecognitionWindow:
     def start_camera(self):
         """Start camera capture with embedded display"""
         try:
-            self.camera = cv2.VideoCapture(0)
-            if not self.camera.isOpened():
+            self.camera = CameraCapture(0)
+            if not self.camera.start():
+                self.camera = None
                 messagebox.showerror("Error", "Could not open camera. Please check your camera connection.", parent=self.verification_dialog)
                 return False
 
@@ -1443,13 +1461,9 @@ class IndependentFacialRecognitionWindow:
             )
             self.camera_canvas.place(x=0, y=0, width=410, height=240)
             
-            # Initialize photo reference
-            self.current_photo = None
-            
-            # Start video feed thread
-            self.camera_thread = threading.Thread(target=self._update_camera_display)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            # Frames are grabbed on the capture thread; the preview shows the latest one
+            self.camera_preview = CameraPreview(self.camera_canvas, self.camera, 410, 240, overlay=FaceFeedbackOverlay(self.camera))
+            self.camera_preview.start()
             
             return True
         except Exception as e:
@@ -1464,103 +1478,16 @@ class IndependentFacialRecognitionWindow:
         self._cleanup_camera_window()
         self._update_ui_after_camera_close()
 
-    def _update_camera_display(self):
-        """Update camera feed display using threading"""
-        while self.is_camera_active:
-            try:
-                ret, frame = self.camera.read()
-                if ret:
-                    # Store current frame for capture (use original resolution)
-                    self.current_frame = frame.copy()
-                    
-                    # Resize frame to fit preview area - 240px height
-                    frame_resized = cv2.resize(frame, (410, 240))
-                    
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-                    
-                    # Add overlay guide
-                    h, w = frame_rgb.shape[:2]
-                    center_x, center_y = w // 2, h // 2
-
-                    # Draw face positioning guide rectangle
-                    rect_w, rect_h = 160, 180
-                    cv2.rectangle(frame_rgb, 
-                                 (center_x - rect_w//2, center_y - rect_h//2),
-                                 (center_x + rect_w//2, center_y + rect_h//2),
-                                 (0, 255, 0), 2)
-                    
-                    # Convert to PIL Image
-                    try:
-                        pil_image = Image.fromarray(frame_rgb)
-                        
-                        # Schedule UI update on main thread
-                        if (hasattr(self, 'camera_canvas') and 
-                            self.camera_canvas and 
-                            self.verification_dialog and 
-                            self.verification_dialog.winfo_exists()):
-
-                            def update_canvas(img=pil_image):
-                                try:
-                                    if (hasattr(self, 'camera_canvas') and 
-                                        self.camera_canvas and 
-                                        self.camera_canvas.winfo_exists()):
-                                        
-                                        # Create PhotoImage on main thread
-                                        photo = ImageTk.PhotoImage(img)
-                                        
-                                        # Clear canvas and display image
-                                        self.camera_canvas.delete("all")
-                                        self.camera_canvas.create_image(205, 120, image=photo, anchor="center")
-                                        
-                                        # Keep reference to prevent garbage collection
-                                        self.current_photo = photo
-                                        
-                                except tk.TclError:
-                                    # Widget was destroyed, stop the camera feed
-                                    self.is_camera_active = False
-                                except Exception as e:
-                                    print(f"Canvas update error: {e}")
-
-                            # Schedule the update on main thread
-                            self.verification_dialog.after(0, update_canvas)
-                        else:
-                            # Canvas doesn't exist, stop the feed
-                            break
-
-                    except Exception as img_error:
-                        print(f"Image processing error: {img_error}")
-                        break
-                        
-            except Exception as e:
-                print(f"Camera display error: {e}")
-                break
-
-            time.sleep(0.03)  # ~30 FPS
-        
-        # Ensure camera is properly released when thread ends
-        self.is_camera_active = False
-
     def _cleanup_camera_window(self):
         """Clean up camera display and resources"""
-        # Signal thread to stop
         self.is_camera_active = False
         
-        # Wait for thread to finish
-        if hasattr(self, 'camera_thread') and self.camera_thread and self.camera_thread.is_alive():
-            try:
-                self.camera_thread.join(0.5)
-            except Exception:
-                pass
-
-        # Release camera
-        if hasattr(self, 'camera') and self.camera and self.camera.isOpened():
-            try:
-                self.camera.release()
-            except Exception:
-                pass
-            finally:
-                self.camera = None
+        if getattr(self, 'camera_preview', None):
+            self.camera_preview.stop()
+            self.camera_preview = None
+        if getattr(self, 'camera', None):
+            self.camera.stop()
+            self.camera = None
 
         # Clear camera canvas safely
         if hasattr(self, 'camera_canvas') and self.camera_canvas:
@@ -1597,34 +1524,39 @@ class IndependentFacialRecognitionWindow:
             messagebox.showwarning("Warning", "Camera is not active. Please open camera first.", parent=self.verification_dialog)
             return
         
-        if not hasattr(self, 'current_frame') or self.current_frame is None:
+        frame = self.camera.read() if self.camera else None
+        if frame is None:
             messagebox.showwarning("Warning", "No frame available. Please wait for camera to initialize.", parent=self.verification_dialog)
             return
         
+        # Validation runs in the vision worker while the preview keeps running
+        self.capture_button.configure(state="disabled")
+        future = get_vision_worker().submit('check_face', frame, timeout=UI_SUBMIT_TIMEOUT, encode=False)
+        if future is None:
+            self.capture_button.configure(state="normal")
+            messagebox.showwarning("Busy", "Face checks are busy. Please try again in a moment.", parent=self.verification_dialog)
+            return
+        await_future(self.verification_dialog, future, lambda result: self._finish_capture(result))
+
+    def _finish_capture(self, result):
+        """Keep the captured frame once the vision worker has validated it"""
+        if not self.is_camera_active:
+            return
+        self.capture_button.configure(state="normal")
+        
         try:
-            frame = self.current_frame.copy()
+            success, check = result
+            if not success:
+                raise RuntimeError(check)
             
             # Validate face image before capturing
-            is_valid, message = self.validate_face_image(frame)
-            if not is_valid:
-                messagebox.showwarning("Face Validation Failed", message, parent=self.verification_dialog)
+            if not check['valid']:
+                messagebox.showwarning("Face Validation Failed", check['message'], parent=self.verification_dialog)
                 return
             
-            # Convert to RGB and store
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.face_image = Image.fromarray(frame_rgb)
-            
-            # Convert to bytes for storage
-            img_byte_arr = io.BytesIO()
-            self.face_image.save(img_byte_arr, format='PNG')
-            self.face_image_data = img_byte_arr.getvalue()
-
-            # Check image size
-            if len(self.face_image_data) > 5 * 1024 * 1024:
-                messagebox.showwarning("Warning", "The captured image exceeds the 5MB limit. Please try again.", parent=self.verification_dialog)
-                self.face_image = None
-                self.face_image_data = None
-                return
+            # Store the normalized face crop the worker cut out, not the whole frame
+            self.face_image_data = check['image']
+            self.face_image = Image.open(io.BytesIO(self.face_image_data))
 
             # Stop camera and show preview
             self.stop_camera()
@@ -1769,13 +1701,11 @@ class IndependentFacialRecognitionWindow:
             # Stop camera first
             self.is_camera_active = False
             
-            # Wait for camera thread to finish
-            if self.camera_thread and self.camera_thread.is_alive():
-                self.camera_thread.join(timeout=1.0)
-            
-            # Release camera
-            if self.camera:
-                self.camera.release()
+            if getattr(self, 'camera_preview', None):
+                self.camera_preview.stop()
+                self.camera_preview = None
+            if getattr(self, 'camera', None):
+                self.camera.stop()
                 self.camera = None
             
             # Release grab safely
@@ -1807,47 +1737,3 @@ class IndependentFacialRecognitionWindow:
                 self.verification_dialog.destroy()
             except:
                 pass
-
-    def validate_face_image(self, image):
-        """Validate that the image contains a properly visible face"""
-        try:
-            face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
-
-            if not os.path.exists(face_cascade_path) or not os.path.exists(eye_cascade_path):
-                print("Warning: Face detection cascades not found. Skipping face validation.")
-
-                return (True, "Face validation skipped")
-
-            face_cascade = cv2.CascadeClassifier(face_cascade_path)
-            eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(faces) == 0:
-                return (False, "No face detected. Please ensure your face is clearly visible.")
-            if len(faces) > 1:
-                return (False, "Multiple faces detected. Please ensure only your face is in the image.")
-
-            (x, y, w, h) = faces[0]
-            roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(
-                roi_gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(eyes) < 2:
-                return (False, "Eyes not clearly visible. Please remove sunglasses or any accessories covering your face.")
-
-            return (True, "Face validation successful")
-        except Exception as e:
-            print(f"Face validation error: {str(e)}")
-            return (True, "Face validation skipped due to an error")
@@ -8,7 +8,7 @@ class UsersViewModal(ctk.CTkToplevel):
         super().__init__(parent)
         self.user_data = user_data
         self.user_type = user_type
-        self.db_manager = DatabaseManager()
+        self.db_manager = getattr(parent, 'db_manager', None) or DatabaseManager()
         self.table_data = []
         self.filtered_data = []
         self.current_search = ""
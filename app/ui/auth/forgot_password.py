@@ -2,6 +2,7 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 import re
+from ...auth_executor import await_future
 
 class ForgotPasswordDialog(ctk.CTkToplevel):
     def __init__(self, parent, db_manager=None):
@@ -410,7 +411,7 @@ class ForgotPasswordDialog(ctk.CTkToplevel):
         button_container.pack(fill="both", expand=True, pady=5)
         
         # Reset Password button (primary action)
-        reset_btn = ctk.CTkButton(
+        self.reset_btn = ctk.CTkButton(
             button_container,
             text="Reset Password",
             width=140,
@@ -421,7 +422,7 @@ class ForgotPasswordDialog(ctk.CTkToplevel):
             hover_color="#152a63",
             command=self.reset_password
         )
-        reset_btn.pack(side="right", padx=(10, 0))
+        self.reset_btn.pack(side="right", padx=(10, 0))
         
         # Cancel button (secondary action)
         cancel_btn = ctk.CTkButton(
@@ -574,28 +575,31 @@ class ForgotPasswordDialog(ctk.CTkToplevel):
         except tk.TclError:
             return  # Window was destroyed
         
-        try:
-            # Reset password via database manager
-            if self.db_manager:
-                success, message = self.db_manager.reset_password_with_otp(self.email, otp, new_password)
-                
-                if success:
-                    messagebox.showinfo("Success", "Password reset successfully! You can now log in with your new password.", parent=self)
-                    self.destroy()
-                else:
-                    messagebox.showerror("Error", message, parent=self)
-            else:
-                messagebox.showerror("Error", "Database not available.", parent=self)
+        if not self.db_manager:
+            self.configure(cursor="")
+            messagebox.showerror("Error", "Database not available.", parent=self)
+            return
         
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to reset password: {str(e)}", parent=self)
+        # Hashing the new password runs on the auth workers so the dialog stays responsive
+        self.reset_btn.configure(state="disabled")
+        future = self.db_manager.reset_password_with_otp_async(self.email, otp, new_password)
+        await_future(self, future, self.handle_reset_result)
+    
+    def handle_reset_result(self, result):
+        """Handle the finished password reset on the UI thread"""
+        # Reset cursor only if window still exists
+        try:
+            self.configure(cursor="")
+            self.reset_btn.configure(state="normal")
+        except tk.TclError:
+            return  # Window was destroyed
         
-        finally:
-            # Reset cursor only if window still exists
-            try:
-                self.configure(cursor="")
-            except tk.TclError:
-                pass  # Window was destroyed
+        success, message = result
+        if success:
+            messagebox.showinfo("Success", "Password reset successfully! You can now log in with your new password.", parent=self)
+            self.destroy()
+        else:
+            messagebox.showerror("Error", message, parent=self)
     
     def on_closing(self):
         """Handle dialog closing"""
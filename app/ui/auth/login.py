@@ -6,6 +6,7 @@ import os
 import base64
 from datetime import datetime
 from ...config import ROOT_DIR
+from ...auth_executor import await_future
 from .forgot_password import ForgotPasswordDialog
 from .login_otp import LoginOTPDialog
 
@@ -207,7 +208,7 @@ class LoginForm(ctk.CTkFrame):
         remember_checkbox.pack(side="left")
         
         # Sign in button
-        signin_button = ctk.CTkButton(
+        self.signin_button = ctk.CTkButton(
             padding_frame,
             text="Sign in",
             width=120,
@@ -218,7 +219,7 @@ class LoginForm(ctk.CTkFrame):
             hover_color="#1E3A8A",
             command=self.handle_login
         )
-        signin_button.pack(pady=(0, 8))
+        self.signin_button.pack(pady=(0, 8))
         
         # Forgot password link
         forgot_password = tk.Label(
@@ -261,17 +262,24 @@ class LoginForm(ctk.CTkFrame):
         else:
             self._clear_remembered_credentials()
             
-        # Implement actual login logic with database
+        # Password hashing runs on the auth workers so the window stays responsive
         if self.db_manager:
-            success, result = self.db_manager.login(email, password)
-            if success:
-                # Check if OTP verification is needed
-                self.check_otp_requirement(email, result)
-            else:
-                messagebox.showerror("Login Failed", result)
+            self.signin_button.configure(state="disabled", text="Signing in...")
+            future = self.db_manager.login_async(email, password)
+            await_future(self, future, lambda result: self.handle_login_result(email, result))
         else:
             messagebox.showerror("Error", "Database not available")
     
+    def handle_login_result(self, email, result):
+        """Handle the finished login call on the UI thread"""
+        self.signin_button.configure(state="normal", text="Sign in")
+        success, result = result
+        if success:
+            # Check if OTP verification is needed
+            self.check_otp_requirement(email, result)
+        else:
+            messagebox.showerror("Login Failed", result)
+    
     def check_otp_requirement(self, email, user_data):
         """Check if OTP verification is required or still valid"""
         try:
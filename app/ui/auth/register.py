@@ -1,15 +1,16 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import cv2
-import threading
-import time
 import io
-import os
 import winsound  # For Windows sound effects
 import re  # For regex pattern matching
 from datetime import datetime
 from PIL import Image, ImageTk
+from app.face_embeddings import face_recognition_available
+from app.vision_worker import get_vision_worker, UI_SUBMIT_TIMEOUT
+from app.auth_executor import await_future
+from app.camera_capture import CameraCapture
+from app.ui.components.camera_preview import CameraPreview, FaceFeedbackOverlay
 
 class RegisterForm(ctk.CTkFrame):
     def __init__(self, parent, db_manager=None, on_success=None):
@@ -20,9 +21,10 @@ class RegisterForm(ctk.CTkFrame):
         # Face verification variables
         self.face_image = None
         self.face_image_data = None
+        self.face_encoding = None
         self.camera = None
         self.is_camera_active = False
-        self.camera_thread = None
+        self.camera_preview = None
         self.verification_dialog = None
         
         # Animation variables
@@ -827,8 +829,9 @@ class RegisterForm(ctk.CTkFrame):
     def start_camera(self):
         """Start camera capture with embedded display"""
         try:
-            self.camera = cv2.VideoCapture(0)
-            if not self.camera.isOpened():
+            self.camera = CameraCapture(0)
+            if not self.camera.start():
+                self.camera = None
                 messagebox.showerror("Camera Error", "Could not open camera. Please check your camera connection.", parent=self.verification_dialog)
                 return False
 
@@ -849,13 +852,9 @@ class RegisterForm(ctk.CTkFrame):
             )
             self.camera_canvas.place(x=0, y=0, width=410, height=240)
             
-            # Initialize photo reference
-            self.current_photo = None
-            
-            # Start video feed thread
-            self.camera_thread = threading.Thread(target=self._update_camera_display)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            # Frames are grabbed on the capture thread; the preview shows the latest one
+            self.camera_preview = CameraPreview(self.camera_canvas, self.camera, 410, 240, overlay=FaceFeedbackOverlay(self.camera))
+            self.camera_preview.start()
             
             return True
         except Exception as e:
@@ -874,107 +873,16 @@ class RegisterForm(ctk.CTkFrame):
         except Exception as e:
             print(f"Error in stop_camera: {e}")
 
-    def _update_camera_display(self):
-        """Update camera feed display using threading"""
-        while self.is_camera_active:
-            try:
-                ret, frame = self.camera.read()
-                if ret:
-                    # Store current frame for capture (use original resolution)
-                    self.current_frame = frame.copy()
-                    
-                    # Resize frame to fit preview area - 240px height
-                    frame_resized = cv2.resize(frame, (410, 240))
-                    
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-                    
-                    # Add overlay guide
-                    h, w = frame_rgb.shape[:2]
-                    center_x, center_y = w // 2, h // 2
-                    
-
-                    # Draw face positioning guide rectangle - made larger
-                    rect_w, rect_h = 160, 180  # Increased from 120, 140 to 160, 180
-                    cv2.rectangle(frame_rgb, 
-                                 (center_x - rect_w//2, center_y - rect_h//2),
-                                 (center_x + rect_w//2, center_y + rect_h//2),
-                                 (0, 255, 0), 2)
-                    
-                    # Convert to PIL Image (do this in thread)
-                    try:
-                        pil_image = Image.fromarray(frame_rgb)
-                        
-                        # Schedule UI update on main thread with the PIL image
-                        if (hasattr(self, 'camera_canvas') and 
-                            self.camera_canvas and 
-                            self.verification_dialog and 
-                            self.verification_dialog.winfo_exists()):
-                            
-
-                            def update_canvas(img=pil_image):
-                                try:
-                                    if (hasattr(self, 'camera_canvas') and 
-                                        self.camera_canvas and 
-                                        self.camera_canvas.winfo_exists()):
-                                        
-                                        # Create PhotoImage on main thread
-                                        photo = ImageTk.PhotoImage(img)
-                                        
-                                        # Clear canvas and display image
-                                        self.camera_canvas.delete("all")
-                                        self.camera_canvas.create_image(205, 120, image=photo, anchor="center")  # Updated center position
-                                        
-                                        # Keep reference to prevent garbage collection
-                                        self.current_photo = photo
-                                        
-                                except tk.TclError:
-                                    # Widget was destroyed, stop the camera feed
-                                    self.is_camera_active = False
-                                except Exception as e:
-                                    print(f"Canvas update error: {e}")
-                            
-
-                            # Schedule the update on main thread
-                            self.verification_dialog.after(0, update_canvas)
-                        else:
-                            # Canvas doesn't exist, stop the feed
-                            break
-                            
-
-                    except Exception as img_error:
-                        print(f"Image processing error: {img_error}")
-                        break
-                        
-            except Exception as e:
-                print(f"Camera display error: {e}")
-                break
-
-            time.sleep(0.03)  # ~30 FPS
-        
-        # Ensure camera is properly released when thread ends
-        self.is_camera_active = False
-
     def _cleanup_camera_window(self):
         """Clean up camera display and resources"""
-        # Signal thread to stop
         self.is_camera_active = False
         
-        # Wait for thread to finish
-        if hasattr(self, 'camera_thread') and self.camera_thread and self.camera_thread.is_alive():
-            try:
-                self.camera_thread.join(0.5)  # Wait up to 0.5 seconds
-            except Exception:
-                pass
-
-        # Release camera
-        if hasattr(self, 'camera') and self.camera and self.camera.isOpened():
-            try:
-                self.camera.release()
-            except Exception:
-                pass
-            finally:
-                self.camera = None
+        if getattr(self, 'camera_preview', None):
+            self.camera_preview.stop()
+            self.camera_preview = None
+        if getattr(self, 'camera', None):
+            self.camera.stop()
+            self.camera = None
 
         # Clear camera canvas safely
         if hasattr(self, 'camera_canvas') and self.camera_canvas:
@@ -1033,49 +941,6 @@ class RegisterForm(ctk.CTkFrame):
         except Exception as e:
             print(f"Error showing face preview: {e}")
 
-    def validate_face_image(self, image):
-        """Validate that the image contains a properly visible face"""
-        try:
-            face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
-
-            if not os.path.exists(face_cascade_path) or not os.path.exists(eye_cascade_path):
-                print("Warning: Face detection cascades not found. Skipping face validation.")
-                return (True, "Face validation skipped")
-
-            face_cascade = cv2.CascadeClassifier(face_cascade_path)
-            eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(faces) == 0:
-                return (False, "No face detected. Please ensure your face is clearly visible.")
-            if len(faces) > 1:
-                return (False, "Multiple faces detected. Please ensure only your face is in the image.")
-
-            (x, y, w, h) = faces[0]
-            roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(
-                roi_gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-
-            if len(eyes) < 2:
-                return (False, "Eyes not clearly visible. Please remove sunglasses or any accessories covering your face.")
-
-            return (True, "Face validation successful")
-        except Exception as e:
-            print(f"Face validation error: {str(e)}")
-            return (True, "Face validation skipped due to an error")
-
     def complete_registration(self):
         """Complete the registration process"""
         try:
@@ -1144,6 +1009,7 @@ class RegisterForm(ctk.CTkFrame):
                 'student_number': student_number,
                 'password': password,
                 'face_image': self.face_image_data,
+                'face_encoding': self.face_encoding,
                 'contact_number': contact_number,
                 'date_of_birth': date_of_birth
             }
@@ -1192,6 +1058,7 @@ class RegisterForm(ctk.CTkFrame):
             # Reset face capture state
             self.face_image = None
             self.face_image_data = None
+            self.face_encoding = None
             
             # Destroy dialog
             if self.verification_dialog:
@@ -1221,38 +1088,46 @@ class RegisterForm(ctk.CTkFrame):
             messagebox.showwarning("Camera Error", "Camera is not active. Please open camera first.", parent=self.verification_dialog)
             return
         
-        if not hasattr(self, 'current_frame') or self.current_frame is None:
+        frame = self.camera.read() if self.camera else None
+        if frame is None:
             messagebox.showwarning("Camera Error", "No frame available. Please wait for camera to initialize.", parent=self.verification_dialog)
             return
         
+        # Validation and encoding run in the vision worker while the preview keeps running
+        self.capture_button.configure(state="disabled")
+        future = get_vision_worker().submit('check_face', frame, timeout=UI_SUBMIT_TIMEOUT, encode=True)
+        if future is None:
+            self.capture_button.configure(state="normal")
+            messagebox.showwarning("Busy", "Face checks are busy. Please try again in a moment.", parent=self.verification_dialog)
+            return
+        await_future(self.verification_dialog, future, lambda result: self._finish_capture(result))
+
+    def _finish_capture(self, result):
+        """Keep the captured frame once the vision worker has checked it"""
+        if not self.is_camera_active:
+            return
+        self.capture_button.configure(state="normal")
+        
         try:
-            frame = self.current_frame.copy()
+            success, check = result
+            if not success:
+                raise RuntimeError(check)
             
             # Validate face in the image
-            validation_result = self.validate_face_image(frame)
-            if not validation_result[0]:
-                messagebox.showwarning("Face Validation Failed", validation_result[1], parent=self.verification_dialog)
+            if not check['valid']:
+                messagebox.showwarning("Face Validation Failed", check['message'], parent=self.verification_dialog)
                 return
-
-            # Convert to RGB and store
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.face_image = Image.fromarray(frame_rgb)
             
-            # Convert to bytes for database storage
-            img_byte_arr = io.BytesIO()
-            self.face_image.save(img_byte_arr, format='PNG')
-            self.face_image_data = img_byte_arr.getvalue()
-
-            # Check image size
-            if len(self.face_image_data) > 5 * 1024 * 1024:
-                messagebox.showwarning(
-                    "Image Too Large",
-                    "The captured image exceeds the 5MB limit. Please try again.",
-                    parent=self.verification_dialog
-                )
-                self.face_image = None
-                self.face_image_data = None
+            # Encoded now so check-in only has to compare vectors
+            if check['encoding'] is None and face_recognition_available():
+                messagebox.showwarning("Face Validation Failed", "Could not read facial features. Please face the camera directly and try again.", parent=self.verification_dialog)
                 return
+            
+            # Store the normalized face crop the worker cut out, not the whole frame
+            self.face_image_data = check['image']
+            self.face_image = Image.open(io.BytesIO(self.face_image_data))
+            
+            self.face_encoding = check['encoding']
 
             # Stop camera and show preview
             self.stop_camera()
@@ -1296,6 +1171,7 @@ class RegisterForm(ctk.CTkFrame):
         """Retake photo - restart camera"""
         self.face_image = None
         self.face_image_data = None
+        self.face_encoding = None
         
         # Reset button states for retaking
         self._reset_buttons_for_retake()
@@ -0,0 +1,200 @@
+import time
+import tkinter as tk
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from app.camera_capture import FPS_WINDOW, _fps
+from app.vision_worker import get_vision_worker
+
+
+class CameraPreview:
+    """
+    Live view of a CameraCapture on a Tk canvas.
+
+    Runs on the Tk event loop: each tick takes the newest frame (if there is
+    one), resizes and converts it into preallocated buffers and pastes the
+    result into a single PhotoImage that stays on the canvas, so nothing is
+    created or deleted per frame. Ticks are scheduled to hit the target FPS
+    after subtracting the time the frame took.
+
+    If the camera stops delivering frames the preview stops, shows the
+    capture's error on the canvas and calls on_error(message).
+    """
+
+    def __init__(self, canvas, capture, width, height, fps=30, overlay=None, on_error=None):
+        self.canvas = canvas
+        self.capture = capture
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps
+        # overlay(rgba) draws on the converted frame before it is shown
+        self.overlay = overlay
+        self.on_error = on_error
+
+        self._frame = None
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgba = np.empty((height, width, 4), dtype=np.uint8)
+        # Shares memory with _rgba, so it always shows the latest conversion
+        self._image = Image.frombuffer('RGBA', (width, height), self._rgba, 'raw', 'RGBA', 0, 1)
+        self._photo = ImageTk.PhotoImage('RGBA', (width, height))
+        self._item = canvas.create_image(width // 2, height // 2, image=self._photo, anchor="center")
+
+        self._sequence = 0
+        self._after_id = None
+        self._shown = 0
+        self._shown_times = deque(maxlen=FPS_WINDOW)
+
+    def start(self):
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.canvas.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        started = time.monotonic()
+        self._after_id = None
+        try:
+            sequence, frame = self.capture.read_into(self._frame, newer_than=self._sequence)
+            if frame is not None:
+                self._frame = frame
+                self._sequence = sequence
+                cv2.resize(frame, (self.width, self.height), dst=self._resized, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+                if self.overlay:
+                    self.overlay(self._rgba)
+                self._photo.paste(self._image)
+                self._shown += 1
+                self._shown_times.append(time.monotonic())
+
+            if not self.capture.is_running:
+                if self.capture.error:
+                    self._show_error(self.capture.error)
+                return
+            delay = self.interval - (time.monotonic() - started)
+            self._after_id = self.canvas.after(max(1, int(delay * 1000)), self._tick)
+        except tk.TclError:
+            # Canvas was destroyed
+            pass
+        except Exception as e:
+            print(f"Camera preview error: {e}")
+
+    def _show_error(self, message):
+        self.canvas.create_rectangle(0, 0, self.width, self.height, fill="#2b2b3b", outline="")
+        self.canvas.create_text(
+            self.width // 2, self.height // 2,
+            text=message, fill="#ff6b6b", width=self.width - 40, justify="center"
+        )
+        if self.on_error:
+            self.on_error(message)
+
+    def get_stats(self):
+        """Capture counters plus the frames shown and the display rate"""
+        stats = self.capture.get_stats()
+        stats['displayed'] = self._shown
+        stats['display_fps'] = round(_fps(self._shown_times), 1)
+        return stats
+
+
+def face_guide_overlay(rect_w=160, rect_h=180, color=(0, 255, 0, 255), thickness=2):
+    """Overlay that draws the centered face positioning guide"""
+    def draw(rgba):
+        h, w = rgba.shape[:2]
+        center_x, center_y = w // 2, h // 2
+        cv2.rectangle(rgba,
+                      (center_x - rect_w // 2, center_y - rect_h // 2),
+                      (center_x + rect_w // 2, center_y + rect_h // 2),
+                      color, thickness)
+    return draw
+
+
+# Short on-screen versions of the face check results
+FACE_STATUS_LABELS = {
+    'ok': "Face found",
+    'no_face': "No face detected",
+    'multiple_faces': "Multiple faces",
+    'eyes_hidden': "Eyes not visible",
+}
+
+
+class FaceFeedbackOverlay:
+    """
+    Overlay with live "face found / eyes visible" feedback.
+
+    Every interval seconds the capture's latest frame goes to the vision
+    worker's track_face task (skipped while the previous one is still
+    running); the last result is drawn as a box around the face plus a
+    short status line, over the face positioning guide. on_status(status,
+    message) is called on the Tk thread whenever the status changes.
+    """
+
+    def __init__(self, capture, on_status=None, interval=0.2, guide=None):
+        self.capture = capture
+        self.on_status = on_status
+        self.interval = interval
+        self.guide = guide or face_guide_overlay()
+        self._frame = None
+        self._future = None
+        self._submitted = 0.0
+        self._result = None
+        self._frame_size = None
+
+    def __call__(self, rgba):
+        self.guide(rgba)
+        self._collect()
+        self._submit()
+
+        result = self._result
+        if result is None:
+            return
+        ok = result['status'] == 'ok'
+        color = (0, 200, 0, 255) if ok else (255, 170, 0, 255)
+        box = result['box']
+        if box is not None and self._frame_size:
+            scale_x = rgba.shape[1] / self._frame_size[1]
+            scale_y = rgba.shape[0] / self._frame_size[0]
+            x, y, w, h = box
+            cv2.rectangle(rgba,
+                          (int(x * scale_x), int(y * scale_y)),
+                          (int((x + w) * scale_x), int((y + h) * scale_y)),
+                          color, 2)
+        label = FACE_STATUS_LABELS.get(result['status'], result['message'])
+        cv2.putText(rgba, label, (8, rgba.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+
+    def _collect(self):
+        if self._future is None or not self._future.done():
+            return
+        future, self._future = self._future, None
+        try:
+            success, result = future.result()
+        except Exception as e:
+            success, result = False, str(e)
+        if not success:
+            print(f"Live face check failed: {result}")
+            return
+
+        changed = self._result is None or self._result['status'] != result['status']
+        self._result = result
+        if changed and self.on_status:
+            self.on_status(result['status'], result['message'])
+
+    def _submit(self):
+        now = time.monotonic()
+        if self._future is not None or now - self._submitted < self.interval:
+            return
+        _, frame = self.capture.read_into(self._frame)
+        if frame is None:
+            return
+        self._frame = frame
+        self._frame_size = frame.shape[:2]
+        self._submitted = now
+        # The first frame of a preview starts tracking afresh
+        self._future = get_vision_worker().try_submit('track_face', frame, reset=self._result is None)
@@ -0,0 +1,343 @@
+import tkinter as tk
+from tkinter import messagebox
+import customtkinter as ctk
+from PIL import Image
+import cv2
+import io
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from app.face_embeddings import face_recognition_available
+from app.face_index import SectionFaceIndex
+from app.config import ATTENDANCE_WRITE_TIMEOUT
+from app.camera_capture import CameraCapture
+from app.vision_worker import get_vision_worker, RESULT_TIMEOUT
+from app.frame_quality import get_frame_quality_gate
+from app.ui.components.camera_preview import CameraPreview
+
+# Seconds between identification passes over the latest camera frame
+IDENTIFY_INTERVAL = 0.5
+# Seconds between roster / current class reloads
+REFRESH_INTERVAL = 30
+# Check-ins listed on screen
+RECENT_CHECKINS = 12
+
+class KioskScreen(ctk.CTkFrame):
+    """
+    Shared classroom camera that checks in any student of one section.
+
+    Faces in the frame are identified against an in-memory index of the
+    section's face encodings (app.face_index), so students do not log in
+    first. Only students approved for the class currently in session are
+    checked in. The index, the class in session and its enrollment are
+    reloaded every REFRESH_INTERVAL seconds; the index reload only fetches
+    changed encodings.
+    """
+
+    def __init__(self, parent, controller, section_id):
+        super().__init__(parent)
+        self.controller = controller
+        self.db_manager = controller.db_manager
+        self.section_id = section_id
+
+        self.face_index = SectionFaceIndex(self.db_manager, section_id)
+        self.current_course = None
+        # User ids approved to attend current_course
+        self.enrolled_user_ids = set()
+        # (assigned_course_id, user_id) pairs already recorded this session
+        self.checked_in = set()
+        self.student_names = {}
+
+        self.camera = None
+        self.is_camera_active = False
+        self.camera_preview = None
+        # Number of the last camera frame identification looked at
+        self.identified_sequence = 0
+        # Reused for every frame identification reads
+        self.identify_buffer = None
+        self.last_refresh = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.create_kiosk()
+
+    def create_kiosk(self):
+        main_frame = ctk.CTkFrame(self)
+        main_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        main_frame.grid_columnconfigure(0, weight=1)
+        main_frame.grid_rowconfigure(1, weight=1)
+
+        # Header frame
+        header_frame = ctk.CTkFrame(main_frame, height=80)
+        header_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(10, 0))
+        header_frame.grid_columnconfigure(1, weight=1)
+
+        section = self.db_manager.get_section_details(self.section_id)
+        section_name = section['name'] if section else f"Section {self.section_id}"
+        ctk.CTkLabel(
+            header_frame,
+            text=f"Attendance Kiosk - {section_name}",
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).grid(row=0, column=0, padx=20, pady=(15, 0), sticky="w")
+
+        self.course_label = ctk.CTkLabel(
+            header_frame,
+            text="Loading class schedule...",
+            font=ctk.CTkFont(size=12)
+        )
+        self.course_label.grid(row=1, column=0, padx=20, pady=(0, 15), sticky="w")
+
+        self.camera_button = ctk.CTkButton(
+            header_frame,
+            text="Start Camera",
+            command=self.toggle_camera,
+            width=120,
+            height=35
+        )
+        self.camera_button.grid(row=0, column=2, rowspan=2, padx=10, pady=20)
+
+        ctk.CTkButton(
+            header_frame,
+            text="Exit Kiosk",
+            command=self.handle_exit,
+            width=100,
+            height=35
+        ).grid(row=0, column=3, rowspan=2, padx=(0, 20), pady=20)
+
+        # Camera container
+        self.camera_container = ctk.CTkFrame(main_frame, width=640, height=480)
+        self.camera_container.grid(row=1, column=0, padx=10, pady=10)
+        self.camera_container.grid_propagate(False)
+
+        self.camera_placeholder = ctk.CTkLabel(
+            self.camera_container,
+            text="Camera will appear here\nClick 'Start Camera' to begin",
+            font=ctk.CTkFont(size=12)
+        )
+        self.camera_placeholder.place(relx=0.5, rely=0.5, anchor="center")
+
+        # Recent check-ins
+        checkin_frame = ctk.CTkFrame(main_frame, width=260)
+        checkin_frame.grid(row=1, column=1, sticky="ns", padx=(0, 10), pady=10)
+        checkin_frame.grid_propagate(False)
+
+        ctk.CTkLabel(
+            checkin_frame,
+            text="Checked In",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(pady=(15, 5))
+
+        self.status_label = ctk.CTkLabel(checkin_frame, text="", font=ctk.CTkFont(size=11))
+        self.status_label.pack(pady=(0, 10))
+
+        self.checkin_list = ctk.CTkTextbox(checkin_frame, width=230, state="disabled")
+        self.checkin_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def toggle_camera(self):
+        """Toggle camera on/off"""
+        if self.is_camera_active:
+            self.stop_camera()
+            self.camera_button.configure(text="Start Camera")
+        elif self.start_camera():
+            self.camera_button.configure(text="Stop Camera")
+
+    def start_camera(self):
+        """Start the camera feed and the identification loop"""
+        if not face_recognition_available():
+            messagebox.showerror("Face Recognition Unavailable", "Face recognition is not installed on this computer.")
+            return False
+
+        try:
+            self.camera = CameraCapture(0)
+            if not self.camera.start():
+                self.camera = None
+                messagebox.showerror("Camera Error", "Could not open camera. Please check your camera connection.")
+                return False
+
+            self.is_camera_active = True
+            self.identified_sequence = 0
+            # Start the worker process while the camera warms up
+            get_vision_worker()
+
+            self.camera_canvas = tk.Canvas(
+                self.camera_container,
+                width=640,
+                height=480,
+                bg="#2b2b3b",
+                highlightthickness=0
+            )
+            self.camera_canvas.place(relx=0.5, rely=0.5, anchor="center")
+            self.camera_placeholder.place_forget()
+
+            # Frames are grabbed on the capture thread; the preview and the
+            # identification loop each take the latest one when they are ready,
+            # so slow face encoding never stalls the video feed
+            self.camera_preview = CameraPreview(self.camera_canvas, self.camera, 640, 480)
+            self.camera_preview.start()
+            self.identify_thread = threading.Thread(target=self.identify_loop, daemon=True)
+            self.identify_thread.start()
+
+            return True
+        except Exception as e:
+            messagebox.showerror("Camera Error", f"Error starting camera: {str(e)}")
+            return False
+
+    def refresh_roster(self):
+        """Reload changed face encodings and the class in session"""
+        success, result = self.face_index.refresh()
+        if not success:
+            print(f"Error refreshing kiosk face index: {result}")
+        elif any(result):
+            print(f"Kiosk face index: {result[0]} updated, {result[1]} removed, {len(self.face_index)} total")
+            self.student_names = {
+                student['id']: f"{student['first_name']} {student['last_name']}"
+                for student in self.db_manager.get_section_students(self.section_id)
+            }
+
+        success, course = self.db_manager.get_current_assigned_course(self.section_id)
+        course = course if success else None
+        enrolled = set()
+        if course:
+            success, result = self.db_manager.get_enrolled_user_ids(course['id'])
+            if success:
+                enrolled = result
+            else:
+                print(f"Error loading kiosk class enrollment: {result}")
+        # Matched faces are checked against the same course's enrollment
+        self.current_course, self.enrolled_user_ids = course, enrolled
+        self.last_refresh = time.monotonic()
+        self.after(0, self.update_course_label)
+
+    def update_course_label(self):
+        try:
+            course = self.current_course
+            if course:
+                text = f"{course['course_code']} - {course['course_name']}  ({course['start_time'][:5]} - {course['end_time'][:5]})"
+            else:
+                text = "No class in session"
+            self.course_label.configure(text=text)
+            if course:
+                text = f"{len(self.enrolled_user_ids)} students enrolled"
+            else:
+                text = f"{len(self.face_index)} students in section"
+            self.status_label.configure(text=text)
+        except tk.TclError:
+            pass
+
+    def identify_loop(self):
+        """Identify every face in the latest frame and record attendance"""
+        while self.is_camera_active:
+            started = time.monotonic()
+            try:
+                if started - self.last_refresh >= REFRESH_INTERVAL:
+                    self.refresh_roster()
+
+                sequence, frame = self.camera.read_into(self.identify_buffer, newer_than=self.identified_sequence)
+                if frame is not None and self.enrolled_user_ids and len(self.face_index):
+                    self.identify_buffer = frame
+                    self.identified_sequence = sequence
+                    self.identify_frame(frame)
+            except Exception as e:
+                print(f"Kiosk identification error: {e}")
+
+            time.sleep(max(0.0, IDENTIFY_INTERVAL - (time.monotonic() - started)))
+
+    def identify_frame(self, frame):
+        # Skip empty, dark and blurred frames before paying for encoding. Students
+        # stand at different distances from a kiosk, so any detected face counts
+        success, assessment = get_frame_quality_gate().check(frame, min_face_size=0)
+        if not success or not assessment['passed']:
+            return
+
+        # Encoding runs in the vision worker; this thread only waits for it.
+        # A busy or unresponsive worker skips the frame
+        future = get_vision_worker().submit('encode_faces', frame, timeout=RESULT_TIMEOUT)
+        if future is None:
+            return
+        try:
+            success, result = future.result(timeout=RESULT_TIMEOUT)
+        except FutureTimeoutError:
+            success, result = False, "face encoding timed out"
+        if not success:
+            print(f"Kiosk identification error: {result}")
+            return
+        _, encodings = result
+        if not len(encodings):
+            return
+
+        # The index covers the whole section so a student is matched to
+        # themselves rather than to an enrolled lookalike; only students
+        # approved for this class are then checked in
+        course, enrolled = self.current_course, self.enrolled_user_ids
+        new_user_ids = [
+            user_id for user_id, _ in self.face_index.identify(encodings)
+            if user_id in enrolled and (course['id'], user_id) not in self.checked_in
+        ]
+        if not new_user_ids:
+            return
+
+        # One image per frame; the blob store keeps a single copy for everyone in it
+        img_byte_arr = io.BytesIO()
+        Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).save(img_byte_arr, format='JPEG', quality=85)
+        img_data = img_byte_arr.getvalue()
+
+        # Queue everyone first so they are written in one transaction
+        queued = []
+        for user_id in dict.fromkeys(new_user_ids):
+            success, result = self.db_manager.queue_attendance(user_id, course['id'], self.section_id, img_data)
+            if success:
+                queued.append((user_id, result))
+            else:
+                print(f"Failed to record kiosk attendance for user {user_id}: {result}")
+
+        for user_id, future in queued:
+            try:
+                success, result = future.result(timeout=ATTENDANCE_WRITE_TIMEOUT)
+            except FutureTimeoutError:
+                success, result = False, "timed out"
+            if success:
+                self.checked_in.add((course['id'], user_id))
+                name = self.student_names.get(user_id, f"Student #{user_id}")
+                self.after(0, lambda name=name, status=result['status']: self.add_checkin(name, status))
+            else:
+                print(f"Failed to record kiosk attendance for user {user_id}: {result}")
+
+    def add_checkin(self, name, status):
+        try:
+            late = " (late)" if status == 'late' else ""
+            self.checkin_list.configure(state="normal")
+            self.checkin_list.insert("1.0", f"{datetime.now().strftime('%H:%M')}  {name}{late}\n")
+            # Keep only the most recent entries
+            self.checkin_list.delete(f"{RECENT_CHECKINS + 1}.0", "end")
+            self.checkin_list.configure(state="disabled")
+        except tk.TclError:
+            pass
+
+    def stop_camera(self):
+        """Stop the camera feed and identification"""
+        self.is_camera_active = False
+        if hasattr(self, 'identify_thread'):
+            self.identify_thread.join(0.2)
+
+        if self.camera_preview:
+            self.camera_preview.stop()
+            self.camera_preview = None
+
+        if self.camera:
+            self.camera.stop()
+            self.camera = None
+
+        if hasattr(self, 'camera_canvas') and self.camera_canvas.winfo_exists():
+            self.camera_canvas.destroy()
+
+        self.camera_placeholder.place(relx=0.5, rely=0.5, anchor="center")
+
+    def cleanup(self):
+        if self.is_camera_active:
+            self.stop_camera()
+
+    def handle_exit(self):
+        if messagebox.askyesno("Exit Kiosk", "Stop the kiosk and close the application?"):
+            self.cleanup()
+            self.controller.on_closing()
@@ -1,14 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
-from PIL import Image, ImageTk
-import cv2
-import io
-import threading
-import time
-import base64
-from io import BytesIO
-import numpy as np
+from app.camera_capture import CameraCapture
+from app.config import ATTENDANCE_WRITE_TIMEOUT
+from app.face_embeddings import face_recognition_available, is_match
+from app.vision_worker import get_vision_worker, UI_SUBMIT_TIMEOUT
+from app.frame_quality import get_frame_quality_gate
+from app.auth_executor import await_future
+from app.ui.components.camera_preview import CameraPreview
 
 class StudentDashboard(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -25,6 +24,9 @@ class StudentDashboard(ctk.CTkFrame):
         self.camera = None
         self.is_camera_active = False
         
+        # Registered face encoding, loaded on first validation
+        self.known_encoding = None
+        
         # Create a simple dashboard with logout button
         self.create_dashboard()
         
@@ -138,12 +140,15 @@ class StudentDashboard(ctk.CTkFrame):
     def start_camera(self):
         """Start the camera feed"""
         try:
-            self.camera = cv2.VideoCapture(0)  # Use default camera (0)
-            if not self.camera.isOpened():
+            self.camera = CameraCapture(0)  # Use default camera (0)
+            if not self.camera.start():
+                self.camera = None
                 messagebox.showerror("Camera Error", "Could not open camera. Please check your camera connection.")
                 return False
                 
             self.is_camera_active = True
+            # Start the worker process while the camera warms up
+            get_vision_worker()
             
             # Create a canvas for the camera feed instead of label
             self.camera_canvas = tk.Canvas(
@@ -158,78 +163,24 @@ class StudentDashboard(ctk.CTkFrame):
             # Hide placeholder
             self.camera_placeholder.place_forget()
             
-            # Start the video feed in a separate thread
-            self.camera_thread = threading.Thread(target=self.update_camera_feed)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            # Frames are grabbed on the capture thread; the preview shows the latest one
+            self.camera_preview = CameraPreview(self.camera_canvas, self.camera, 640, 480)
+            self.camera_preview.start()
             
             return True
         except Exception as e:
             messagebox.showerror("Camera Error", f"Error starting camera: {str(e)}")
             return False
 
-    def update_camera_feed(self):
-        """Update the camera feed in the UI"""
-        while self.is_camera_active:
-            try:
-                ret, frame = self.camera.read()
-                if ret:
-                    # Convert to RGB for PIL
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Convert to PIL Image (do this in thread)
-                    img = Image.fromarray(frame_rgb)
-                    
-                    # Resize to fit the camera container
-                    img = img.resize((640, 480), Image.LANCZOS)
-                    
-                    # Schedule GUI update on main thread
-                    if (hasattr(self, 'camera_canvas') and 
-                        self.camera_canvas and 
-                        self.camera_canvas.winfo_exists()):
-                        
-                        def update_canvas(image=img):
-                            try:
-                                if (hasattr(self, 'camera_canvas') and 
-                                    self.camera_canvas and 
-                                    self.camera_canvas.winfo_exists()):
-                                    
-                                    # Convert to PhotoImage on main thread
-                                    img_tk = ImageTk.PhotoImage(image=image)
-                                    
-                                    # Clear canvas and display image
-                                    self.camera_canvas.delete("all")
-                                    self.camera_canvas.create_image(320, 240, image=img_tk, anchor="center")
-                                    
-                                    # Keep a reference to prevent garbage collection
-                                    self.camera_canvas.image = img_tk
-                                    
-                            except tk.TclError:
-                                # Widget was destroyed, stop the camera feed
-                                self.is_camera_active = False
-                            except Exception as e:
-                                print(f"Camera canvas update error: {e}")
-                        
-                        # Schedule the update on main thread
-                        self.after(0, update_canvas)
-                    else:
-                        # Canvas doesn't exist, stop the feed
-                        break
-                        
-            except Exception as e:
-                print(f"Camera feed error: {e}")
-                break
-            
-            time.sleep(0.03)  # ~30 FPS
-
     def stop_camera(self):
         """Stop the camera feed"""
         self.is_camera_active = False
-        if hasattr(self, 'camera_thread'):
-            self.camera_thread.join(0.2)  # Wait briefly for thread to finish
+        if getattr(self, 'camera_preview', None):
+            self.camera_preview.stop()
+            self.camera_preview = None
             
-        if self.camera and self.camera.isOpened():
-            self.camera.release()
+        if self.camera:
+            self.camera.stop()
             self.camera = None
             
         # Clear camera canvas if it exists
@@ -239,116 +190,138 @@ class StudentDashboard(ctk.CTkFrame):
         # Show placeholder again
         self.camera_placeholder.place(relx=0.5, rely=0.5, anchor="center")
     
+    def get_user_id(self):
+        # Login returns 'user_id'; other callers pass 'id'
+        return self.user_data.get('id') or self.user_data.get('user_id')
+
+    def load_known_encoding(self):
+        """Load the user's registered face encoding (once per session)"""
+        if self.known_encoding is None:
+            success, result = self.db_manager.get_face_embedding(self.get_user_id())
+            if not success:
+                return False, result
+            self.known_encoding = result
+        return True, self.known_encoding
+
     def validate_face(self):
-        """Validate the user's face against stored image"""
+        """Validate the user's face against the registered face encoding"""
         if not self.camera or not self.is_camera_active:
             messagebox.showerror("Error", "Camera is not active. Please start the camera first.")
             return
         
-        # Check if user has a stored face image
-        if not self.user_data.get('face_image_b64'):
-            messagebox.showwarning("Missing Face Image", "You don't have a registered face image. Please update your profile first.")
+        if not face_recognition_available():
+            messagebox.showerror("Face Recognition Unavailable", "Face recognition is not installed on this computer.")
             return
         
-        # Capture the current frame
-        ret, frame = self.camera.read()
-        if not ret:
-            messagebox.showerror("Camera Error", "Failed to capture image from camera.")
+        # Check if user has a registered face
+        success, known_encoding = self.load_known_encoding()
+        if not success:
+            messagebox.showwarning("Missing Face Image", f"You don't have a usable registered face image ({known_encoding}). Please update your profile first.")
             return
-            
-        # Get stored face image
+        
+        # Display a loading indicator while the best frame of the next moment is picked
+        self.configure(cursor="wait")
+        self.validate_button.configure(state="disabled")
+        future = get_frame_quality_gate().select_best_async(self.camera)
+        await_future(self, future, lambda result: self._encode_best_frame(known_encoding, result))
+
+    def _encode_best_frame(self, known_encoding, result):
+        """Send the frame that passed the quality checks to the vision worker for encoding"""
+        success, selected = result
+        if not success:
+            self._end_validation()
+            # Dark, blurred or faceless frames never reach the matcher
+            messagebox.showwarning("Face Validation Failed", selected)
+            return
+        
+        frame, _ = selected
+        future = get_vision_worker().submit('encode_face', frame, timeout=UI_SUBMIT_TIMEOUT)
+        if future is None:
+            self._end_validation()
+            messagebox.showwarning("Busy", "Face checks are busy. Please try again in a moment.")
+            return
+        await_future(self, future, lambda result: self._finish_validation(frame, known_encoding, result))
+
+    def _finish_validation(self, frame, known_encoding, result):
+        """Compare the worker's encoding of the live frame and, on a match, have the worker encode the snapshot"""
         try:
-            stored_image_data = base64.b64decode(self.user_data['face_image_b64'])
-            stored_image = Image.open(BytesIO(stored_image_data))
-            stored_image_np = np.array(stored_image)
-            
-            # Convert to grayscale for comparison
-            stored_gray = cv2.cvtColor(stored_image_np, cv2.COLOR_RGB2GRAY)
-            
-            # Convert current frame to grayscale
-            current_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Resize stored image to match current frame
-            stored_gray_resized = cv2.resize(stored_gray, (current_gray.shape[1], current_gray.shape[0]))
+            success, encoding = result
+            if not success:
+                raise RuntimeError(encoding)
             
-            # Simple face validation using structural similarity
-            # In a real app, you'd use a more sophisticated face recognition algorithm
-            similarity = self.compare_images(stored_gray_resized, current_gray)
+            # Only the live frame needs encoding; the comparison is a vector distance
+            if encoding is None:
+                self._end_validation()
+                messagebox.showwarning(
+                    "Face Validation Failed",
+                    "No face detected. Please face the camera directly and try again."
+                )
+                return
             
-            # Display a loading indicator
-            self.configure(cursor="wait")
-            self.update_idletasks()
+            matched, distance = is_match(known_encoding, encoding)
+            print(f"Face distance: {distance:.3f}")
             
-            # Threshold for similarity (adjust as needed)
-            # This is a very simplistic approach - real face recognition would use ML
-            if similarity > 0.4:  # Arbitrary threshold, higher is more similar
-                # Success - Log attendance
-                # Assuming we'll use a default course/section for this prototype
-                course_id = 1
-                section_id = 1
-                
-                # Convert image to bytes for database
-                img_byte_arr = io.BytesIO()
-                img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                img.save(img_byte_arr, format='PNG')
-                img_data = img_byte_arr.getvalue()
-                
-                success, result = self.db_manager.log_attendance(
-                    self.user_data['id'],
-                    course_id,
-                    section_id,
-                    img_data
-                )
-                
-                # Reset cursor
-                self.configure(cursor="")
-                
-                if success:
-                    messagebox.showinfo(
-                        "Face Validated",
-                        "Your identity has been verified and attendance recorded successfully!"
-                    )
-                    
-                    # Stop camera
-                    self.stop_camera()
-                    self.camera_button.configure(text="Start Camera")
-                    self.validate_button.configure(state="disabled")
-                else:
-                    messagebox.showerror("Error", f"Failed to record attendance: {result}")
-            else:
-                # Reset cursor
-                self.configure(cursor="")
+            if not matched:
+                self._end_validation()
                 messagebox.showwarning(
                     "Face Validation Failed",
                     "Face does not match the registered image. Please try again."
                 )
+                return
+            
+            # The photo stored with the check-in is compressed off the Tk thread too
+            future = get_vision_worker().submit('encode_snapshot', frame, timeout=UI_SUBMIT_TIMEOUT)
+            if future is None:
+                self._end_validation()
+                messagebox.showwarning("Busy", "Face checks are busy. Please try again in a moment.")
+                return
+            await_future(self, future, self._record_attendance)
                 
         except Exception as e:
-            # Reset cursor
-            self.configure(cursor="")
+            self._end_validation()
             messagebox.showerror("Error", f"Error during face validation: {str(e)}")
-    
-    def compare_images(self, img1, img2):
-        """Compare two grayscale images using structural similarity"""
-        try:
-            # Use Structural Similarity Index (SSIM)
-            # A more robust approach would use a deep learning model
-            from skimage.metrics import structural_similarity as ssim
-            similarity = ssim(img1, img2)
-            print(f"Similarity score: {similarity}")
-            return similarity
-        except ImportError:
-            # Fallback if scikit-image is not available
-            # Use a very basic histogram comparison
-            hist1 = cv2.calcHist([img1], [0], None, [256], [0, 256])
-            hist2 = cv2.calcHist([img2], [0], None, [256], [0, 256])
-            
-            cv2.normalize(hist1, hist1, 0, 1, cv2.NORM_MINMAX)
-            cv2.normalize(hist2, hist2, 0, 1, cv2.NORM_MINMAX)
-            
-            similarity = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
-            print(f"Fallback similarity score: {similarity}")
-            return similarity
+
+    def _record_attendance(self, result):
+        """Queue the check-in for the class scheduled right now"""
+        success, img_data = result
+        if success:
+            success, result = self.db_manager.queue_attendance(self.get_user_id(), image_data=img_data)
+        else:
+            result = img_data
+        if not success:
+            self._end_validation()
+            messagebox.showerror("Error", f"Failed to record attendance: {result}")
+            return
+        await_future(
+            self, result, self._finish_check_in,
+            timeout=ATTENDANCE_WRITE_TIMEOUT,
+            timeout_message="Recording attendance timed out. Please try again."
+        )
+
+    def _finish_check_in(self, result):
+        """Report the written check-in and stop the camera"""
+        self._end_validation()
+        success, result = result
+        if not success:
+            messagebox.showerror("Error", f"Failed to record attendance: {result}")
+            return
+        
+        if result['created']:
+            message = f"Your identity has been verified and you are marked {result['status']}."
+        else:
+            message = "Your identity has been verified. Your attendance for this class was already recorded."
+        messagebox.showinfo("Face Validated", message)
+        
+        # Stop camera
+        self.stop_camera()
+        self.camera_button.configure(text="Start Camera")
+        self.validate_button.configure(state="disabled")
+
+    def _end_validation(self):
+        """Reset the cursor and let the student validate again"""
+        self.configure(cursor="")
+        if self.is_camera_active:
+            self.validate_button.configure(state="normal")
     
     def handle_logout(self):
         """Handle logout button click"""
@@ -0,0 +1,139 @@
+"""
+Full-text index for the admin user search.
+
+users_fts is an FTS5 table keyed by users.id (its rowid) holding the
+fields the Users view searches: full name, email, student number and
+employee number. It uses the trigram tokenizer, so a MATCH on a quoted
+phrase behaves like the case-insensitive substring search the view has
+always done, but is answered from the index instead of a table scan.
+
+Triggers on users, students and faculties keep the index in sync.
+Trigram matching needs at least three characters; shorter search terms
+fall back to a plain scan in DatabaseUserManager.search_users.
+"""
+import sqlite3
+
+
+USER_SEARCH_TABLE = 'users_fts'
+
+_CREATE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        full_name, email, student_number, employee_number,
+        tokenize = 'trigram'
+    )
+"""
+
+
+def _refresh_sql(user_id):
+    """Statements that re-index one user from the base tables"""
+    return f"""
+        DELETE FROM users_fts WHERE rowid = {user_id};
+
+        INSERT INTO users_fts (rowid, full_name, email, student_number, employee_number)
+        SELECT
+            u.id,
+            u.first_name || ' ' || u.last_name,
+            u.email,
+            (SELECT GROUP_CONCAT(student_number, ' ') FROM students WHERE user_id = u.id),
+            (SELECT GROUP_CONCAT(employee_number, ' ') FROM faculties WHERE user_id = u.id)
+        FROM users u
+        WHERE u.id = {user_id};
+    """
+
+
+_CREATE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_users_search_insert
+    AFTER INSERT ON users
+    BEGIN
+        {_refresh_sql('NEW.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_users_search_update
+    AFTER UPDATE OF first_name, last_name, email ON users
+    BEGIN
+        {_refresh_sql('NEW.id')}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_users_search_delete
+    AFTER DELETE ON users
+    BEGIN
+        DELETE FROM users_fts WHERE rowid = OLD.id;
+    END
+    """,
+]
+
+# students and faculties only contribute their numbers to the owning user's row
+for _table, _column in (('students', 'student_number'), ('faculties', 'employee_number')):
+    _CREATE_TRIGGERS += [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_search_insert
+        AFTER INSERT ON {_table}
+        BEGIN
+            {_refresh_sql('NEW.user_id')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_search_update
+        AFTER UPDATE OF user_id, {_column} ON {_table}
+        BEGIN
+            {_refresh_sql('OLD.user_id')}
+            {_refresh_sql('NEW.user_id')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_search_delete
+        AFTER DELETE ON {_table}
+        BEGIN
+            {_refresh_sql('OLD.user_id')}
+        END
+        """,
+    ]
+
+
+def create_search_index(cursor):
+    """
+    Create users_fts and its triggers.
+
+    Returns:
+        bool: False if this SQLite build lacks FTS5 or the trigram tokenizer
+    """
+    try:
+        cursor.execute(_CREATE_TABLE)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️  Full-text user search unavailable: {e}")
+        return False
+
+    for statement in _CREATE_TRIGGERS:
+        cursor.execute(statement)
+    return True
+
+
+def populate_search_index(cursor):
+    """Re-index every user from the base tables"""
+    cursor.execute("DELETE FROM users_fts")
+    cursor.execute("""
+        INSERT INTO users_fts (rowid, full_name, email, student_number, employee_number)
+        SELECT
+            u.id,
+            u.first_name || ' ' || u.last_name,
+            u.email,
+            (SELECT GROUP_CONCAT(student_number, ' ') FROM students WHERE user_id = u.id),
+            (SELECT GROUP_CONCAT(employee_number, ' ') FROM faculties WHERE user_id = u.id)
+        FROM users u
+    """)
+
+
+def search_index_exists(conn):
+    """Return True if users_fts was created in this database"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (USER_SEARCH_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def match_phrase(search_term):
+    """Quote a search term as a single FTS5 phrase (substring match with trigram)"""
+    return '"' + search_term.replace('"', '""') + '"'
@@ -0,0 +1,333 @@
+"""
+Face detection and encoding in a separate process.
+
+Haar-cascade validation and face_recognition encoding hold the GIL for tens
+to hundreds of milliseconds, which stalls the camera preview and the rest
+of the Tk loop when they run in the UI process. VisionWorker runs them in a
+child process on another core instead.
+
+Frames travel through a ring of fixed-size slots in one
+multiprocessing.shared_memory block: the caller copies a frame into a free
+slot and sends only (task, slot, shape) over a queue; the worker reads the
+slot through a NumPy view without copying it again. Results come back over
+a second queue and complete the Future returned by submit(). A slot is
+reused once its result has arrived.
+
+Every task returns the managers' (success, result) convention. When the
+worker process cannot be used (VISION_WORKER=False, no shared memory, or
+the process died) tasks run on a background thread in this process.
+"""
+import atexit
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .config import VISION_WORKER, VISION_RING_SLOTS
+from .face_detector import get_face_detector, get_face_tracker
+from .face_embeddings import compute_face_encoding, compute_face_encodings
+from .face_images import normalize_face_image
+from .frame_quality import assess_frame
+
+# Largest frame a slot holds (1080p BGR); bigger frames are processed in-process
+SLOT_BYTES = 1920 * 1080 * 3
+# Seconds callers that block on a task's result wait for it; covers the
+# worker loading the face models on its first task
+RESULT_TIMEOUT = 20
+# Seconds the Tk thread waits for a free slot before reporting the worker busy
+UI_SUBMIT_TIMEOUT = 0.1
+
+
+def validate_face(frame):
+    """Check that a BGR frame shows exactly one face with both eyes visible"""
+    try:
+        return get_face_detector().validate(frame)
+    except Exception as e:
+        print(f"Face validation error: {str(e)}")
+        return (True, "Face validation skipped due to an error")
+
+
+def track_face(frame, reset=False):
+    """Live preview feedback: the tracked face box and its status (see FaceTracker.update)"""
+    tracker = get_face_tracker()
+    if reset:
+        tracker.reset()
+    return True, tracker.update(frame)
+
+
+def assess(frame, **options):
+    """Frame quality scores ahead of face matching (see frame_quality.assess_frame)"""
+    return True, assess_frame(frame, get_face_detector(), **options)
+
+
+def _rgb(frame):
+    import cv2
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def check_face(frame, encode=True):
+    """
+    Validate a captured BGR frame and, if it passes, prepare it for storage.
+
+    Returns:
+        tuple: (True, {'valid', 'message', 'image', 'encoding'}); image is
+        the normalized face crop to store (JPEG bytes, see face_images) and
+        encoding is None when not requested, not found or face_recognition
+        is missing
+    """
+    valid, message = validate_face(frame)
+    result = {'valid': valid, 'message': message, 'image': None, 'encoding': None}
+    if valid:
+        rgb = _rgb(frame)
+        result['image'], _ = normalize_face_image(rgb)
+        if encode:
+            result['encoding'] = compute_face_encoding(rgb)
+    return True, result
+
+
+def encode_face(frame):
+    """Encoding of the largest face in a BGR frame, or None"""
+    return True, compute_face_encoding(_rgb(frame))
+
+
+def encode_faces(frame):
+    """(locations, encodings) of every face in a BGR frame"""
+    return True, compute_face_encodings(_rgb(frame))
+
+
+def encode_snapshot(frame, quality=85):
+    """JPEG bytes of a BGR frame, e.g. the check-in photo stored with attendance"""
+    import cv2
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        return False, "Could not encode the snapshot"
+    return True, buffer.tobytes()
+
+
+TASKS = {
+    'check_face': check_face,
+    'encode_face': encode_face,
+    'encode_faces': encode_faces,
+    'encode_snapshot': encode_snapshot,
+    'track_face': track_face,
+    'assess_frame': assess,
+}
+
+
+def run_task(task, frame, options):
+    try:
+        return TASKS[task](frame, **options)
+    except Exception as e:
+        print(f"Vision task {task} failed: {e}")
+        return False, f"{task} failed: {e}"
+
+
+class SharedFrameRing:
+    """Fixed-size frame slots in one shared memory block, viewed as NumPy arrays"""
+
+    def __init__(self, slots, slot_bytes=SLOT_BYTES, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=slots * slot_bytes)
+        self.name = self.shm.name
+
+    def view(self, slot, shape, dtype=np.uint8):
+        """Array backed by the slot's memory (no copy); drop it before close()"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _worker_main(ring_name, slots, slot_bytes, requests, results):
+    """Child process: run tasks on frames read straight from the ring"""
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            request_id, task, slot, shape, dtype, options = message
+            frame = ring.view(slot, shape, dtype)
+            result = run_task(task, frame, options)
+            del frame
+            results.put((request_id, result))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+class VisionWorker:
+    """Hands frames to the vision process and resolves the Futures of their results"""
+
+    def __init__(self, slots=VISION_RING_SLOTS, slot_bytes=SLOT_BYTES, use_process=VISION_WORKER):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._free = list(range(slots))
+        self._slot_freed = threading.Condition()
+        self._pending = {}  # request id -> (future, slot)
+        # Guards _pending and _collector_done, so a request registered while
+        # the process dies is either collected or failed, never left waiting
+        self._pending_lock = threading.Lock()
+        self._collector_done = False
+        self._ids = itertools.count(1)
+        self._fallback = None
+        self._ring = None
+        self._process = None
+
+        if use_process:
+            try:
+                self._start_process()
+            except Exception as e:
+                print(f"Vision worker process unavailable, running face checks in-process: {e}")
+                self._shutdown_process()
+
+    def _start_process(self):
+        # spawn on every platform: forking a process that runs Tk and camera threads is unsafe
+        context = multiprocessing.get_context('spawn')
+        self._ring = SharedFrameRing(self.slots, self.slot_bytes)
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(self._ring.name, self.slots, self.slot_bytes, self._requests, self._results),
+            name="vision-worker",
+            daemon=True
+        )
+        self._process.start()
+        self._collector = threading.Thread(target=self._collect, name="vision-results", daemon=True)
+        self._collector.start()
+
+    @property
+    def uses_process(self):
+        return self._process is not None and self._process.is_alive() and not self._collector_done
+
+    def submit(self, task, frame, timeout=None, **options):
+        """
+        Run a task (see TASKS) on a frame.
+
+        Waits up to timeout seconds (forever if None) for a free slot, so
+        code on the Tk thread should pass a short timeout (UI_SUBMIT_TIMEOUT)
+        or use try_submit(). Whoever waits on the Future should also bound
+        that wait (RESULT_TIMEOUT).
+
+        Returns:
+            Future or None: the Future resolves to the task's (success,
+            result); None means no slot became free in time and the task
+            was not run
+        """
+        frame = np.ascontiguousarray(frame)
+        if not self.uses_process or frame.nbytes > self.slot_bytes:
+            return self._submit_inline(task, frame, options)
+
+        with self._slot_freed:
+            if not self._slot_freed.wait_for(lambda: self._free, timeout):
+                return None
+            slot = self._free.pop()
+
+        view = self._ring.view(slot, frame.shape, frame.dtype)
+        np.copyto(view, frame)
+        del view
+
+        future = Future()
+        with self._pending_lock:
+            if self._collector_done:
+                # The process died after the check above; nothing would collect this result
+                self._release_slot(slot)
+                future.set_result((False, "Vision worker stopped"))
+                return future
+            request_id = next(self._ids)
+            self._pending[request_id] = (future, slot)
+            self._requests.put((request_id, task, slot, frame.shape, frame.dtype.str, options))
+        return future
+
+    def try_submit(self, task, frame, **options):
+        """submit() that returns None instead of waiting when every slot is busy (check for None)"""
+        return self.submit(task, frame, timeout=0, **options)
+
+    def _submit_inline(self, task, frame, options):
+        if self._fallback is None:
+            self._fallback = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision")
+        # The caller may reuse its buffer as soon as submit() returns
+        return self._fallback.submit(run_task, task, frame.copy(), options)
+
+    def _collect(self):
+        """Resolve futures as results arrive; fail them all if the process dies"""
+        while True:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if self._process is None or not self._process.is_alive():
+                    break
+                continue
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+
+            request_id, result = message
+            with self._pending_lock:
+                future, slot = self._pending.pop(request_id, (None, None))
+            if future is None:
+                continue
+            self._release_slot(slot)
+            future.set_result(result)
+
+        with self._pending_lock:
+            self._collector_done = True
+            pending, self._pending = self._pending, {}
+        for future, slot in pending.values():
+            self._release_slot(slot)
+            future.set_result((False, "Vision worker stopped"))
+
+    def _release_slot(self, slot):
+        with self._slot_freed:
+            self._free.append(slot)
+            self._slot_freed.notify()
+
+    def _shutdown_process(self):
+        if self._process is not None:
+            try:
+                self._requests.put(None)
+                self._process.join(2.0)
+                if self._process.is_alive():
+                    self._process.terminate()
+            except Exception as e:
+                print(f"Error stopping vision worker: {e}")
+            self._results.put(None)
+            self._process = None
+        if self._ring is not None:
+            self._ring.close(unlink=True)
+            self._ring = None
+
+    def stop(self):
+        self._shutdown_process()
+        if self._fallback is not None:
+            self._fallback.shutdown(wait=False)
+            self._fallback = None
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _stop_worker():
+    if _worker is not None:
+        _worker.stop()
+
+
+def get_vision_worker():
+    """Return the shared vision worker, starting its process on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = VisionWorker()
+            atexit.register(_stop_worker)
+        return _worker
@@ -0,0 +1,14 @@
+"""
+Benchmarks for DatabaseManager on generated datasets; run them with run_benchmarks.py
+"""
+
+from .harness import run_suite, compare, measure
+from .cases import CASES, SKIPPED
+
+__all__ = [
+    'run_suite',
+    'compare',
+    'measure',
+    'CASES',
+    'SKIPPED'
+]
@@ -0,0 +1,214 @@
+"""
+What the benchmark calls on DatabaseManager, and with which arguments.
+
+Arguments are resolved against the database being measured (load_context),
+so the same cases run on every dataset size. Methods that cannot be
+measured meaningfully in a loop are listed in SKIPPED with the reason;
+any other public method without a case is reported as uncovered, so new
+DatabaseManager methods show up in the results until they get a case.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import bcrypt
+
+from seeders.scale_seeder import SCALE_PASSWORDS
+
+
+def load_context(db_path):
+    """Representative ids and names from the database for the cases' arguments"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        def one(query, params=()):
+            return conn.execute(query, params).fetchone()
+
+        program = one("SELECT id, name, acronym FROM programs WHERE isDeleted = 0 ORDER BY id LIMIT 1")
+        # The busiest section and class, so the statistics have real work to do
+        section = one("""
+            SELECT s.id, s.name FROM sections s
+            JOIN students st ON st.section = s.id
+            WHERE s.program_id = ?
+            GROUP BY s.id ORDER BY COUNT(*) DESC, s.id LIMIT 1
+        """, (program['id'],))
+        assigned = one("""
+            SELECT ac.id, ac.course_id, ac.academic_year, ac.semester, ac.faculty_id
+            FROM assigned_courses ac
+            WHERE ac.section_id = ? AND ac.isDeleted = 0
+            ORDER BY ac.academic_year DESC, ac.id LIMIT 1
+        """, (section['id'],))
+        student = one("""
+            SELECT u.id, u.first_name, u.last_name, u.email, u.password_hash, u.contact_number
+            FROM users u JOIN students st ON st.user_id = u.id
+            WHERE st.section = ? AND u.isDeleted = 0
+            ORDER BY u.email LIMIT 1
+        """, (section['id'],))
+        student_ids = [row[0] for row in conn.execute("SELECT user_id FROM students WHERE section = ?", (section['id'],))]
+        # A time the section has class, so check-ins resolve to a class in session
+        schedule = one("""
+            SELECT sch.day_of_week, TIME(sch.start_time) AS start_time
+            FROM schedules sch JOIN assigned_courses ac ON sch.assigned_course_id = ac.id
+            WHERE ac.section_id = ? AND ac.isDeleted = 0
+            ORDER BY ac.academic_year DESC, ac.semester DESC, ac.id DESC LIMIT 1
+        """, (section['id'],))
+    finally:
+        conn.close()
+
+    # Generated accounts use one of a few known passwords
+    password = next(
+        (candidate for candidate in SCALE_PASSWORDS
+         if bcrypt.checkpw(candidate.encode('utf-8'), student['password_hash'].encode('utf-8'))),
+        None
+    )
+
+    # 2024-01-01 is a Monday; the first minute of class on the scheduled weekday
+    weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    class_time = datetime.combine(
+        datetime(2024, 1, 1) + timedelta(days=weekdays.index(schedule['day_of_week'])),
+        datetime.strptime(schedule['start_time'], '%H:%M:%S').time()
+    ) + timedelta(minutes=1)
+
+    return {
+        'program_id': program['id'],
+        'program_name': program['name'],
+        'program_acronym': program['acronym'],
+        'section_id': section['id'],
+        'section_name': section['name'],
+        'course_id': assigned['course_id'],
+        'assigned_course_id': assigned['id'],
+        'academic_year': assigned['academic_year'],
+        'semester': assigned['semester'],
+        'faculty_id': assigned['faculty_id'],
+        'user_id': student['id'],
+        'first_name': student['first_name'],
+        'last_name': student['last_name'],
+        'email': student['email'],
+        'contact_number': student['contact_number'],
+        'password': password,
+        'section_user_ids': student_ids,
+        'class_time': class_time,
+    }
+
+
+# method name -> function(ctx) returning (args, kwargs)
+CASES = {
+    # Auth
+    'login': lambda c: ((c['email'], c['password']), {}),
+    'check_email_exists': lambda c: ((c['email'],), {}),
+    'check_student_id_exists': lambda c: (("SCALE-000001",), {}),
+    'check_employee_number_exists': lambda c: (("SCALE-EMP-00001",), {}),
+    'check_otp_requirement': lambda c: ((c['user_id'],), {}),
+
+    # Users
+    'get_all_users_simple': lambda c: ((), {}),
+    'get_all_faculty': lambda c: ((), {}),
+    'search_users': lambda c: (("student", c['last_name']), {}),
+    'get_students_with_filters': lambda c: ((), {'search_term': c['last_name']}),
+    'get_faculty_with_filters': lambda c: ((), {}),
+    'get_user_by_name': lambda c: ((c['first_name'], c['last_name']), {}),
+    'get_user_details': lambda c: ((c['user_id'],), {}),
+    'get_user_section_and_program_ids': lambda c: ((c['user_id'],), {}),
+    'update_user': lambda c: ((c['user_id'], {
+        'first_name': c['first_name'], 'last_name': c['last_name'],
+        'email': c['email'], 'contact_number': c['contact_number'],
+        # Without these the student's section would be cleared
+        'program': c['program_name'], 'section': c['section_name']
+    }), {}),
+    'validate_section_assignment': lambda c: ((c['program_acronym'], c['section_name']), {}),
+    'get_deleted_users': lambda c: ((), {}),
+    'get_assigned_courses': lambda c: ((), {'faculty_id': c['faculty_id']}),
+    'get_student_attendance_summary': lambda c: ((c['user_id'],), {}),
+    'get_face_embedding': lambda c: ((c['user_id'],), {}),
+    'get_face_embeddings': lambda c: ((c['section_user_ids'],), {}),
+    'get_statuses': lambda c: ((), {}),
+    'get_dropdown_options_for_user_type': lambda c: (("student",), {}),
+    'get_sections_by_program': lambda c: ((c['program_name'],), {}),
+
+    # Programs
+    'get_programs': lambda c: ((), {}),
+    'check_program_in_use': lambda c: ((c['program_id'],), {}),
+    'get_program_statistics': lambda c: ((c['program_id'], c['academic_year'], c['semester']), {}),
+    'get_program_key_metrics': lambda c: ((c['program_id'], c['academic_year'], c['semester']), {}),
+    'get_program_monthly_attendance': lambda c: ((c['program_id'], c['academic_year'], c['semester']), {}),
+    'get_available_academic_years': lambda c: ((), {}),
+    'get_available_semesters': lambda c: ((), {}),
+
+    # Courses
+    'get_courses': lambda c: ((), {}),
+    'check_course_in_use': lambda c: ((c['course_id'],), {}),
+    'get_course_statistics': lambda c: ((c['course_id'], c['academic_year'], c['semester']), {}),
+    'get_available_programs_for_courses': lambda c: ((), {}),
+    'get_courses_by_year': lambda c: ((1,), {}),
+    'get_courses_by_section': lambda c: ((c['section_name'],), {}),
+    'get_courses_by_program_id': lambda c: ((c['program_id'],), {}),
+    'get_course_section_statistics': lambda c: ((c['course_id'], c['academic_year'], c['semester']), {}),
+    'get_course_schedule_statistics': lambda c: ((c['course_id'], c['academic_year'], c['semester']), {}),
+    'get_course_monthly_attendance': lambda c: ((c['course_id'], c['academic_year'], c['semester']), {}),
+
+    # Sections
+    'get_sections': lambda c: ((), {}),
+    'get_sections_all': lambda c: ((), {}),
+    'get_sections_with_filters': lambda c: ((), {'academic_year': c['academic_year'], 'semester': c['semester']}),
+    'check_section_in_use': lambda c: ((c['section_id'],), {}),
+    'get_section_details': lambda c: ((c['section_id'],), {}),
+    'get_section_students': lambda c: ((c['section_id'],), {}),
+    'get_current_assigned_course': lambda c: ((c['section_id'],), {}),
+    'get_enrolled_user_ids': lambda c: ((c['assigned_course_id'],), {}),
+    'get_section_embedding_versions': lambda c: ((c['section_id'],), {}),
+    'get_section_courses': lambda c: ((c['section_id'], c['academic_year'], c['semester']), {}),
+    'get_course_roster_attendance': lambda c: ((c['section_id'], c['course_id'], c['academic_year'], c['semester']), {}),
+    'get_section_statistics': lambda c: ((c['section_id'], c['academic_year'], c['semester']), {}),
+    'get_available_academic_years_for_section': lambda c: ((c['section_id'],), {}),
+    'get_available_academic_years_for_course_section': lambda c: ((c['course_id'], c['section_id']), {}),
+
+    # Attendance
+    'log_attendance': lambda c: ((c['user_id'],), {'section_id': c['section_id'], 'status': 'present', 'timestamp': c['class_time']}),
+    'send_absence_notifications': lambda c: ((), {'dry_run': True}),
+
+    # Maintenance
+    'get_table_versions': lambda c: ((['users', 'attendance_logs'],), {}),
+    'rebuild_attendance_rollups': lambda c: ((), {}),
+}
+
+SKIPPED = {
+    'get_connection': "pool plumbing",
+    'connection': "pool plumbing",
+    'close': "pool plumbing",
+    'get_pool_stats': "reports on the pool itself",
+    'get_sql_trace_summary': "reports on the SQL tracer",
+    'get_statistics_cache_stats': "reports on the statistics cache",
+    'get_auth_latency_stats': "reports on the auth stages",
+    'collect_unused_blobs': "walks the blob store, not the database",
+    'compact_face_images': "one-off conversion of stored face images",
+    'login_async': "same work as login on a worker thread",
+    'reset_password_with_otp_async': "same work as reset_password_with_otp on a worker thread",
+    'queue_attendance': "returns before the write; log_attendance measures it",
+    'flush_attendance': "waits for queued check-ins",
+    'generate_otp': "no database work",
+    'get_email_status': "needs a queued email",
+    'create_login_otp': "sends email",
+    'create_registration_otp': "sends email",
+    'create_password_reset_otp': "sends email",
+    'update_login_otp_verification': "needs a fresh OTP",
+    'verify_login_otp': "needs a fresh OTP",
+    'verify_registration_otp_and_register': "needs a fresh OTP",
+    'verify_password_reset_otp': "needs a fresh OTP",
+    'reset_password_with_otp': "needs a fresh OTP",
+    'cleanup_expired_otps': "only does work when OTPs expired",
+    'create_program': "creates rows that cannot be repeated",
+    'update_program': "changes the catalog",
+    'delete_program': "changes the catalog",
+    'create_course': "creates rows that cannot be repeated",
+    'update_course': "changes the catalog",
+    'delete_course': "changes the catalog",
+    'create_section': "creates rows that cannot be repeated",
+    'update_section': "changes the catalog",
+    'delete_section': "changes the catalog",
+    'delete_user': "changes the measured data",
+    'restore_user': "changes the measured data",
+}
+
+
+def public_methods(cls):
+    """Public methods of a class, in definition order"""
+    return [name for name, value in vars(cls).items() if callable(value) and not name.startswith('_')]
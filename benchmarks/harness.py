@@ -0,0 +1,239 @@
+"""
+Headless benchmark harness for DatabaseManager.
+
+For every dataset size the harness
+
+    1. builds (or reuses) a seeded database: create_db.py for the schema,
+       then create_scale_dataset.py for the rows
+    2. copies it and measures every case in benchmarks/cases.py in a child
+       process, because DatabaseManager reads DB_PATH when it is imported
+    3. records p50/p95/mean/min per method, the peak memory a call
+       allocates (tracemalloc) and the child's peak RSS
+
+The results are one JSON document; compare() diffs two of them and flags
+methods whose median got slower than a threshold.
+"""
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "benchmarks")
+
+RESULTS_FORMAT = 1
+
+
+def dataset_name(scale, years, seed):
+    return f"scale-{scale:g}-years-{years}-seed-{seed}"
+
+
+def build_dataset(path, scale, years, seed, workers=None):
+    """Create a fresh database at path and fill it with a scale dataset"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # create_db.py also clears the remembered login under DATA_DIR; keep it in the cache directory
+    env = dict(os.environ, DB_PATH=path, DATA_DIR=os.path.dirname(os.path.abspath(path)))
+    subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "create_db.py")],
+        input="n\n", text=True, env=env, cwd=PROJECT_ROOT, check=True,
+        stdout=subprocess.DEVNULL
+    )
+    command = [sys.executable, os.path.join(PROJECT_ROOT, "create_scale_dataset.py"),
+               "--scale", str(scale), "--years", str(years), "--seed", str(seed), "--db", path]
+    if workers:
+        command += ["--workers", str(workers)]
+    subprocess.run(command, env=env, cwd=PROJECT_ROOT, check=True, stdout=subprocess.DEVNULL)
+
+
+def table_counts(db_path, tables=("users", "students", "assigned_courses", "attendance_logs")):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+
+def _percentile(sorted_samples, fraction):
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * fraction))]
+
+
+def measure(fn, args, kwargs, warmup, repeat):
+    """Time repeat calls after warmup calls, then one more call under tracemalloc"""
+    result = None
+    for _ in range(warmup):
+        result = fn(*args, **kwargs)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        samples.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    measurement = {
+        'p50_ms': round(1000 * _percentile(samples, 0.50), 3),
+        'p95_ms': round(1000 * _percentile(samples, 0.95), 3),
+        'mean_ms': round(1000 * sum(samples) / len(samples), 3),
+        'min_ms': round(1000 * samples[0], 3),
+        'peak_kb': round(peak / 1024, 1),
+        'calls': repeat,
+    }
+    # Managers report failures as (False, message) instead of raising
+    if isinstance(result, tuple) and result and result[0] is False:
+        measurement['error'] = str(result[1])[:200]
+    return measurement
+
+
+def measure_database(db_path, warmup, repeat, only=None):
+    """
+    Run every case against db_path in this process.
+    DB_PATH must already point at db_path before app.db_manager is imported.
+    """
+    from app.db_manager import DatabaseManager
+    from .cases import CASES, SKIPPED, load_context, public_methods
+
+    context = load_context(db_path)
+    db_manager = DatabaseManager()
+
+    results = {}
+    for name, build_args in CASES.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        args, kwargs = build_args(context)
+        try:
+            results[name] = measure(getattr(db_manager, name), args, kwargs, warmup, repeat)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"[:200]}
+
+    db_manager.close()
+    covered = set(CASES) | set(SKIPPED)
+    return {
+        'results': results,
+        'skipped': SKIPPED,
+        'uncovered': [name for name in public_methods(DatabaseManager) if name not in covered],
+        'max_rss_kb': _max_rss_kb(),
+    }
+
+
+def _max_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_dataset(db_path, warmup, repeat, only=None):
+    """Measure a copy of db_path in a child process and return its results"""
+    with tempfile.TemporaryDirectory(prefix="attendance-bench-") as workdir:
+        # Cases like log_attendance write, so the cached database is never measured in place
+        working_copy = os.path.join(workdir, "bench.db")
+        shutil.copyfile(db_path, working_copy)
+        output = os.path.join(workdir, "results.json")
+
+        env = dict(os.environ, DB_PATH=working_copy, BLOB_STORE_DIR=os.path.join(workdir, "blobs"))
+        # Repeated calls would otherwise be served from the statistics cache instead of running the queries
+        env.setdefault('STATISTICS_CACHE_SIZE', '0')
+        # log_attendance would otherwise mostly time the writer waiting for more check-ins to batch
+        env.setdefault('ATTENDANCE_BATCH_WINDOW', '0')
+        command = [sys.executable, os.path.join(PROJECT_ROOT, "run_benchmarks.py"), "--measure", working_copy,
+                   "--output", output, "--warmup", str(warmup), "--repeat", str(repeat)]
+        for pattern in only or []:
+            command += ["--only", pattern]
+        subprocess.run(command, env=env, cwd=PROJECT_ROOT, check=True, stdout=subprocess.DEVNULL)
+
+        with open(output) as f:
+            return json.load(f)
+
+
+def run_suite(scales, years, seed, warmup, repeat, cache_dir=DEFAULT_CACHE_DIR, rebuild=False,
+              workers=None, only=None, progress=print):
+    """
+    Build (or reuse) each dataset and measure it.
+
+    Returns:
+        dict: JSON-ready results for every dataset
+    """
+    report = {
+        'format': RESULTS_FORMAT,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'warmup': warmup,
+        'repeat': repeat,
+        'datasets': {},
+    }
+    for scale in scales:
+        name = dataset_name(scale, years, seed)
+        db_path = os.path.join(cache_dir, f"{name}.db")
+        if rebuild or not os.path.exists(db_path):
+            progress(f"Building {name}...")
+            started = time.perf_counter()
+            build_dataset(db_path, scale, years, seed, workers)
+            progress(f"  built in {time.perf_counter() - started:.1f}s")
+
+        progress(f"Measuring {name}...")
+        measured = run_dataset(db_path, warmup, repeat, only)
+        measured['rows'] = table_counts(db_path)
+        report['datasets'][name] = measured
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, threshold=0.2, min_delta_ms=1.0):
+    """
+    Median changes of every method measured in both reports.
+
+    A method regressed when its p50 grew by more than threshold (a fraction)
+    and by more than min_delta_ms, so sub-millisecond noise is not flagged.
+
+    Returns:
+        list: dicts with dataset, method, baseline_ms, current_ms, change, regressed
+    """
+    changes = []
+    for dataset, measured in report['datasets'].items():
+        base_results = baseline.get('datasets', {}).get(dataset, {}).get('results', {})
+        for method, result in measured['results'].items():
+            base = base_results.get(method)
+            if not base or 'p50_ms' not in base or 'p50_ms' not in result:
+                continue
+            delta = result['p50_ms'] - base['p50_ms']
+            change = delta / base['p50_ms'] if base['p50_ms'] else 0.0
+            changes.append({
+                'dataset': dataset,
+                'method': method,
+                'baseline_ms': base['p50_ms'],
+                'current_ms': result['p50_ms'],
+                'change': round(change, 3),
+                'regressed': change > threshold and delta > min_delta_ms,
+            })
+    return changes
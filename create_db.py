@@ -22,7 +22,7 @@ DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), "data")
 DB_PATH = os.getenv("DB_PATH", os.path.join(DATA_DIR, "attendance.db"))
 
 # Also define the remembered credentials file path
-REMEMBERED_CREDENTIALS_PATH = os.getenv("DATA_DIR", os.path.join(DATA_DIR, "remembered_credentials.txt"))
+REMEMBERED_CREDENTIALS_PATH = os.path.join(DATA_DIR, "remembered_credentials.txt")
 
 def seed_statuses(db_path):
     """Seed status data directly into the database"""
@@ -280,6 +280,18 @@ try:
 except Exception as e:
     print(f"Error checking database schema: {e}")
 
+# Apply versioned schema migrations (indexes etc.)
+print("\nApplying schema migrations...")
+try:
+    from app.db_migrations import run_migrations
+    
+    conn = sqlite3.connect(DB_PATH)
+    run_migrations(conn)
+    conn.close()
+except Exception as e:
+    print(f"Error applying schema migrations: {e}")
+    exit(1)
+
 # Seed status data
 print("\nSeeding status data...")
 if seed_statuses(DB_PATH):
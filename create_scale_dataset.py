@@ -0,0 +1,73 @@
+import os
+import sys
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables first
+load_dotenv()
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+def main():
+    """Generate a reproducible dataset of a chosen size for performance testing"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for performance testing")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Dataset size in thousands of students (1 = 1k, 10 = 10k, 100 = 100k)")
+    parser.add_argument("--years", type=int, default=1,
+                        help="Academic years of classes and attendance history")
+    parser.add_argument("--until", default=None,
+                        help="Last academic year to generate, e.g. 2023-2024 (default: last configured seeder year)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed; the same arguments always produce the same data")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes generating rows (default: CPU count)")
+    parser.add_argument("--db", default=None,
+                        help="Database to fill (default: DB_PATH)")
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ['DB_PATH'] = args.db
+
+    DB_PATH = os.getenv('DB_PATH')
+    if not DB_PATH:
+        print("❌ DB_PATH not found in environment variables")
+        print("Please check your .env file or pass --db")
+        return False
+
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Database not found at: {DB_PATH}")
+        print("Please run 'python create_db.py' first to create the database")
+        return False
+
+    from seeders.scale_seeder import ScaleSeeder
+
+    print("=" * 60)
+    print(f"SCALE DATASET (scale {args.scale:g}, {args.years} year(s), seed {args.seed})")
+    print("=" * 60)
+
+    seeder = ScaleSeeder(
+        scale=args.scale,
+        years=args.years,
+        random_seed=args.seed,
+        workers=args.workers,
+        last_academic_year=args.until
+    )
+    success, counts = seeder.seed()
+    if not success:
+        print("\n❌ Failed to generate the dataset. Check the logs above for details.")
+        return False
+
+    print("\nRows inserted:")
+    for table, count in counts.items():
+        print(f"  {table}: {count:,}")
+    return True
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -15,16 +15,17 @@ ctk.set_default_color_theme("dark-blue")
 # Add parent directory to path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.config import THEME_NAME, APP_NAME, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT
+from app.config import THEME_NAME, APP_NAME, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT, KIOSK_SECTION_ID
 from app.db_manager import DatabaseManager
 from app.ui.auth.auth import LoginRegister
 from app.ui.student.studentdashboard import StudentDashboard
 from app.ui.auth.initial_screen import InitialScreen
+from app.ui.kiosk.kiosk import KioskScreen
 
 class AttendanceApp:
     """Main application controller for the Attendance App"""
     
-    def __init__(self):
+    def __init__(self, kiosk_section_id=None):
         try:
             # Initialize database manager
             self.db_manager = DatabaseManager()
@@ -65,8 +66,11 @@ class AttendanceApp:
         self.auth_screen = None
         self.dashboard_screen = None
         
-        # Show initial screen
-        self.show_initial_screen()
+        # Show initial screen, or run as a classroom kiosk
+        if kiosk_section_id is not None:
+            self.show_kiosk(kiosk_section_id)
+        else:
+            self.show_initial_screen()
         
     def center_window(self):
         """Center the window on screen"""
@@ -183,6 +187,21 @@ class AttendanceApp:
             # Application may be closing
             pass
         
+    def show_kiosk(self, section_id):
+        """Show the kiosk screen that checks in any student of a section"""
+        if self._is_closing:
+            return
+            
+        self.clear_content()
+        
+        try:
+            self.dashboard_screen = KioskScreen(self.main_container, self, section_id)
+            self.dashboard_screen.pack(fill="both", expand=True)
+            self.current_screen = "kiosk"
+        except tk.TclError:
+            # Application may be closing
+            pass
+        
     def logout(self):
         """Handle user logout"""
         if self._is_closing:
@@ -266,6 +285,17 @@ class AttendanceApp:
             print(f"Application error: {e}")
             self.on_closing()
 
+def parse_kiosk_section(argv):
+    """Section id for `main.py --kiosk [SECTION_ID]`, or None for the normal app"""
+    if "--kiosk" not in argv:
+        return None
+    position = argv.index("--kiosk")
+    value = argv[position + 1] if position + 1 < len(argv) else KIOSK_SECTION_ID
+    if not str(value).isdigit():
+        print("❌ Kiosk mode needs a section id: python main.py --kiosk SECTION_ID (or set KIOSK_SECTION_ID)")
+        sys.exit(1)
+    return int(value)
+
 if __name__ == "__main__":
-    app = AttendanceApp()
+    app = AttendanceApp(kiosk_section_id=parse_kiosk_section(sys.argv))
     app.run()
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, LargeBinary
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -25,7 +25,8 @@ class User(Base):
     contact_number = Column(String(20), nullable=False)
     role = Column(String(50), nullable=False, default="Student")
     status_id = Column(Integer, ForeignKey("statuses.id"), nullable=True)  # Added status reference
-    face_image = Column(LargeBinary, nullable=True)  # LargeBinary (LBLOB)
+    face_image_hash = Column(String(64), nullable=True)  # SHA-256 key in the blob store (app/blob_store.py)
+    face_thumbnail_hash = Column(String(64), nullable=True)  # Small preview of the face image (app/face_images.py)
     verified = Column(Integer, nullable=False, default=0)  # 0 for False, 1 for True
     isDeleted = Column(Integer, nullable=False, default=0)  # 0 for False, 1 for True
     last_verified_otp = Column(DateTime, nullable=True)  # Last OTP verification time
@@ -126,7 +127,7 @@ class AttendanceLog(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     assigned_course_id = Column(Integer, ForeignKey("assigned_courses.id"), nullable=False)
     date = Column(DateTime, nullable=False)
-    image = Column(LargeBinary, nullable=True)  # Changed from LONGBLOB to LargeBinary
+    image_hash = Column(String(64), nullable=True)  # SHA-256 key in the blob store (app/blob_store.py)
     status = Column(String(50), nullable=False)  # e.g., "present", "absent", "late"
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
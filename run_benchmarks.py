@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load environment variables first
+load_dotenv()
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+def print_report(report):
+    for dataset, measured in report['datasets'].items():
+        rows = ", ".join(f"{table} {count:,}" for table, count in measured['rows'].items())
+        print(f"\n{dataset} ({rows}; peak RSS {measured['max_rss_kb'] or 0:,} KB)")
+        print(f"  {'method':<50} {'p50 ms':>10} {'p95 ms':>10} {'peak KB':>10}")
+        for method, result in sorted(measured['results'].items(), key=lambda item: -item[1].get('p50_ms', 0)):
+            if 'p50_ms' not in result:
+                print(f"  {method:<50} {'failed':>10}  {result.get('error', '')}")
+                continue
+            note = f"  ({result['error']})" if 'error' in result else ""
+            print(f"  {method:<50} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['peak_kb']:>10,.0f}{note}")
+        if measured['uncovered']:
+            print(f"  ⚠️  No benchmark case for: {', '.join(measured['uncovered'])}")
+
+def print_comparison(changes):
+    regressions = [change for change in changes if change['regressed']]
+    print(f"\nCompared {len(changes)} measurements with the baseline")
+    for change in sorted(changes, key=lambda c: -c['change'])[:10]:
+        marker = "❌" if change['regressed'] else "  "
+        print(f"  {marker} {change['dataset']:<30} {change['method']:<45} "
+              f"{change['baseline_ms']:>9.2f} -> {change['current_ms']:>9.2f} ms ({change['change']:+.0%})")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s)")
+    else:
+        print("✅ No regressions")
+    return not regressions
+
+def main():
+    """Benchmark DatabaseManager methods on generated datasets of several sizes"""
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager methods")
+    parser.add_argument("--scales", default="0.1,1",
+                        help="Comma-separated dataset sizes in thousands of students (default: 0.1,1)")
+    parser.add_argument("--years", type=int, default=1, help="Academic years of attendance per dataset")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed calls before measuring")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per method")
+    parser.add_argument("--only", action="append", default=[],
+                        help="Only methods whose name contains this (repeatable)")
+    parser.add_argument("--cache-dir", default=None, help="Where generated datasets are kept")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate cached datasets")
+    parser.add_argument("--workers", type=int, default=None, help="Processes generating datasets")
+    parser.add_argument("--output", default=None, help="Results JSON file (default: in the cache directory)")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Median slowdown that counts as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from benchmarks.harness import run_suite, compare, measure_database, DEFAULT_CACHE_DIR
+
+    # Child process started by the harness for one dataset
+    if args.measure:
+        measured = measure_database(args.measure, args.warmup, args.repeat, args.only)
+        with open(args.output, "w") as f:
+            json.dump(measured, f)
+        return True
+
+    cache_dir = args.cache_dir or DEFAULT_CACHE_DIR
+    scales = [float(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    print("=" * 60)
+    print("DATABASE BENCHMARKS")
+    print("=" * 60)
+
+    report = run_suite(scales, args.years, args.seed, args.warmup, args.repeat,
+                       cache_dir=cache_dir, rebuild=args.rebuild, workers=args.workers, only=args.only)
+    print_report(report)
+
+    output = args.output or os.path.join(cache_dir, f"results-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return print_comparison(compare(report, baseline, args.threshold))
+    return True
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -8,6 +8,7 @@ from .program_seeder import ProgramSeeder
 from .user_seeder import UserSeeder
 from .course_assignment_seeder import CourseAssignmentSeeder
 from .attendance_seeder import AttendanceSeeder
+from .scale_seeder import ScaleSeeder
 
 __all__ = [
     'SEEDER_CONFIG',
@@ -15,5 +16,6 @@ __all__ = [
     'ProgramSeeder',
     'UserSeeder', 
     'CourseAssignmentSeeder',
-    'AttendanceSeeder'
+    'AttendanceSeeder',
+    'ScaleSeeder'
 ]
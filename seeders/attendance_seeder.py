@@ -52,20 +52,15 @@ class AttendanceSeeder(BaseSeeder):
         """
         Simulate student progression: assign courses, approvals, and attendance logs year by year.
         Promote students if all courses are passed, stop at 2025 or if not all passed.
+        
+        Everything the simulation looks up is loaded once up front; the
+        approvals and attendance it decides on are then written in bulk.
         """
         from .config import get_academic_years_to_generate
         academic_years = get_academic_years_to_generate()
         # Assume academic_years are sorted, e.g., ['2023-2024', '2024-2025']
         max_year = 2025
 
-        # Get all sections and their year levels
-        cursor = self.execute_query(conn, """
-            SELECT s.id, s.name, p.name as program_name, p.acronym
-            FROM sections s
-            JOIN programs p ON s.program_id = p.id
-        """)
-        section_info = {row[0]: row for row in cursor.fetchall()}
-
         # Get all assigned courses with details
         cursor = self.execute_query(conn, """
             SELECT ac.id, ac.section_id, ac.academic_year, ac.semester, c.id as course_id
@@ -77,9 +72,19 @@ class AttendanceSeeder(BaseSeeder):
             ac_id, section_id, academic_year, semester, course_id = row
             assigned_course_map.setdefault((section_id, academic_year, semester), []).append((ac_id, course_id))
 
+        cursor = self.execute_query(conn, "SELECT user_id, id FROM students")
+        student_ids = dict(cursor.fetchall())
+        section_programs, year_sections = self._get_year_sections(conn)
+
+        # (assigned_course_id, student_id) -> status; later decisions overwrite earlier ones
+        approvals = {}
+        # (user_id, assigned_course_id, academic_year, semester, attendance_rate)
+        attendance_plans = []
+
         # For each student, simulate progression
         for student in students_list:
             user_id, first_name, last_name, section_id = student
+            student_id = student_ids.get(user_id)
             # Start at 1st year
             current_section_id = section_id
             year_level = 1
@@ -97,21 +102,17 @@ class AttendanceSeeder(BaseSeeder):
                     for assigned_course_id, course_id in assigned_courses:
                         # Simulate approval status
                         approval_status = self._simulate_approval_status()
-                        # Insert approval record
-                        self._insert_or_update_approval(conn, user_id, assigned_course_id, approval_status)
+                        if student_id is not None:
+                            approvals[(assigned_course_id, student_id)] = approval_status
                         # Only generate attendance if enrolled or passed
                         if approval_status in ("enrolled", "passed"):
-                            self._generate_attendance_for_course(
-                                conn, user_id, assigned_course_id, academic_year, semester
-                            )
+                            attendance_plans.append((user_id, assigned_course_id, academic_year, semester, None))
                         elif approval_status == "failed":
                             # 50% chance: student attended but failed (low scores), 50%: failed due to non-attendance
                             if random.random() < 0.5:
                                 # Simulate poor attendance (e.g., 40-65%)
                                 attendance_rate = random.uniform(0.40, 0.65)
-                                self._generate_attendance_for_course(
-                                    conn, user_id, assigned_course_id, academic_year, semester, attendance_rate=attendance_rate
-                                )
+                                attendance_plans.append((user_id, assigned_course_id, academic_year, semester, attendance_rate))
                             # else: no attendance logs (failed due to non-attendance)
                         if approval_status != "passed":
                             all_passed = False
@@ -123,12 +124,86 @@ class AttendanceSeeder(BaseSeeder):
                 if all_passed:
                     year_level += 1
                     # Find next section for this program/year
-                    current_section_id = self._find_section_for_year(conn, current_section_id, year_level)
+                    current_section_id = year_sections.get((section_programs.get(current_section_id), year_level))
                     if not current_section_id:
                         break
                 else:
                     break
 
+        current_time = self.get_current_time()
+        self.insert_many(conn, """
+            INSERT INTO assigned_course_approvals (assigned_course_id, student_id, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(assigned_course_id, student_id) DO UPDATE SET
+                status = excluded.status,
+                updated_at = excluded.updated_at
+        """, (
+            (assigned_course_id, student_id, status, current_time, current_time)
+            for (assigned_course_id, student_id), status in approvals.items()
+        ), label="Course approvals")
+
+        # The unique (user_id, assigned_course_id, date) index skips days already logged
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO attendance_logs 
+            (user_id, assigned_course_id, date, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, self._attendance_rows(conn, attendance_plans, current_time), label="Attendance logs")
+
+    def _get_year_sections(self, conn):
+        """
+        Returns:
+            tuple: ({section_id: program_id}, {(program_id, year_level): section_id}) where
+                   the section for a year level is the first by name starting with that level
+        """
+        cursor = self.execute_query(conn, "SELECT id, name, program_id FROM sections ORDER BY name")
+        section_programs = {}
+        year_sections = {}
+        for section_id, name, program_id in cursor.fetchall():
+            section_programs[section_id] = program_id
+            year_prefix = name.split('-', 1)[0]
+            if '-' in name and year_prefix.isdigit():
+                year_sections.setdefault((program_id, int(year_prefix)), section_id)
+        return section_programs, year_sections
+
+    def _attendance_rows(self, conn, attendance_plans, current_time):
+        """Yield attendance_logs rows for every planned (student, class) pair"""
+        from .config import get_semester_date_ranges_for_academic_year
+        
+        cursor = self.execute_query(conn, "SELECT assigned_course_id, day_of_week FROM schedules")
+        schedules = {}
+        for assigned_course_id, day_of_week in cursor.fetchall():
+            schedules.setdefault(assigned_course_id, []).append(day_of_week)
+        
+        # Class meetings are the same for every student in a class
+        class_dates_cache = {}
+        for user_id, assigned_course_id, academic_year, semester, attendance_rate in attendance_plans:
+            key = (assigned_course_id, academic_year, semester)
+            class_dates = class_dates_cache.get(key)
+            if class_dates is None:
+                class_dates = []
+                schedule_days = schedules.get(assigned_course_id)
+                if schedule_days:
+                    for sem, start_date, end_date in get_semester_date_ranges_for_academic_year(academic_year):
+                        if sem == semester:
+                            class_dates = self._generate_class_dates(start_date, end_date, schedule_days)
+                            break
+                class_dates_cache[key] = class_dates
+            
+            # Assign performance for this student
+            if attendance_rate is None:
+                attendance_rate = 0.9
+            student_performance = {user_id: {'attendance_rate': attendance_rate, 'category': 'average'}}
+            for class_date in class_dates:
+                status = self._determine_attendance_status(user_id, student_performance, class_date)
+                yield (
+                    user_id,
+                    assigned_course_id,
+                    class_date.strftime('%Y-%m-%d'),
+                    status,
+                    current_time,
+                    current_time
+                )
+
     def _simulate_approval_status(self):
         """Randomly determine approval status for a course (simulate real-world outcomes)"""
         # 80% pass, 15% enrolled, 3% failed, 1% rejected, 1% pending
@@ -144,85 +219,6 @@ class AttendanceSeeder(BaseSeeder):
         else:
             return "pending"
 
-    def _insert_or_update_approval(self, conn, user_id, assigned_course_id, status):
-        """Insert or update assigned_course_approvals for a student/course"""
-        # Get student_id from user_id
-        cursor = self.execute_query(conn, "SELECT id FROM students WHERE user_id = ?", (user_id,))
-        row = cursor.fetchone()
-        if not row:
-            return
-        student_id = row[0]
-        # Check if approval exists
-        cursor = self.execute_query(conn, """
-            SELECT id FROM assigned_course_approvals
-            WHERE assigned_course_id = ? AND student_id = ?
-        """, (assigned_course_id, student_id))
-        approval = cursor.fetchone()
-        if approval:
-            self.execute_query(conn, """
-                UPDATE assigned_course_approvals SET status = ? WHERE id = ?
-            """, (status, approval[0]))
-        else:
-            self.execute_query(conn, """
-                INSERT INTO assigned_course_approvals (assigned_course_id, student_id, status, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (assigned_course_id, student_id, status, self.get_current_time(), self.get_current_time()))
-
-    def _generate_attendance_for_course(self, conn, user_id, assigned_course_id, academic_year, semester, attendance_rate=None):
-        """Generate attendance logs for a student in a course for the given academic year and semester"""
-        # Get course schedule
-        schedule_days = self._get_course_schedule(conn, assigned_course_id)
-        if not schedule_days:
-            return
-        # Get semester date range
-        from .config import get_semester_date_ranges_for_academic_year
-        periods = get_semester_date_ranges_for_academic_year(academic_year)
-        for sem, start_date, end_date in periods:
-            if sem == semester:
-                class_dates = self._generate_class_dates(start_date, end_date, schedule_days)
-                # Assign performance for this student
-                if attendance_rate is None:
-                    attendance_rate = 0.9
-                student_performance = {user_id: {'attendance_rate': attendance_rate, 'category': 'average'}}
-                for class_date in class_dates:
-                    # Check if record already exists
-                    existing = self.check_exists(conn, "attendance_logs", {
-                        "user_id": user_id,
-                        "assigned_course_id": assigned_course_id,
-                        "date": class_date.strftime('%Y-%m-%d')
-                    })
-                    if existing:
-                        continue
-                    status = self._determine_attendance_status(user_id, student_performance, class_date)
-                    self.execute_query(conn, """
-                        INSERT INTO attendance_logs 
-                        (user_id, assigned_course_id, date, status, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        user_id,
-                        assigned_course_id,
-                        class_date.strftime('%Y-%m-%d'),
-                        status,
-                        self.get_current_time(),
-                        self.get_current_time()
-                    ))
-
-    def _find_section_for_year(self, conn, current_section_id, year_level):
-        """Find the section_id for the next year in the same program"""
-        cursor = self.execute_query(conn, """
-            SELECT s2.id
-            FROM sections s1
-            JOIN programs p ON s1.program_id = p.id
-            JOIN sections s2 ON s2.program_id = p.id
-            WHERE s1.id = ? AND s2.name LIKE ?
-            ORDER BY s2.name
-            LIMIT 1
-        """, (current_section_id, f"{year_level}-%"))
-        row = cursor.fetchone()
-        if row:
-            return row[0]
-        return None
-    
     def _get_course_info(self, conn, assigned_course_id):
         """Get course, section, and program information"""
         cursor = self.execute_query(conn, """
@@ -1,8 +1,10 @@
 import sqlite3
 import logging
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from .config import DB_PATH
+from itertools import islice
+from .config import DB_PATH, SEEDER_CONFIG
 
 class BaseSeeder(ABC):
     """Base class for all seeders providing common database operations"""
@@ -31,6 +33,43 @@ class BaseSeeder(ABC):
             self.logger.error(f"Database error: {e}")
             raise
     
+    def insert_many(self, conn, query, rows, label=None, batch_size=None):
+        """
+        Run an INSERT for every parameter tuple in rows with executemany.
+        
+        rows may be any iterable (generators are consumed batch by batch, so
+        large datasets are never held in memory). Use INSERT OR IGNORE or an
+        ON CONFLICT clause to let unique constraints skip existing records.
+        Everything runs in the caller's transaction.
+        
+        Returns:
+            int: Rows inserted (ignored rows are not counted)
+        """
+        batch_size = batch_size or SEEDER_CONFIG['insert_batch_size']
+        cursor = conn.cursor()
+        inserted = 0
+        started = time.perf_counter()
+        rows = iter(rows)
+        try:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(query, batch)
+                inserted += max(cursor.rowcount, 0)
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+        
+        if label:
+            self.log_rate(label, inserted, time.perf_counter() - started)
+        return inserted
+    
+    def log_rate(self, label, rows, seconds):
+        """Log how many rows were written and the rows/second achieved"""
+        rate = rows / seconds if seconds > 0 else 0
+        self.logger.info(f"✓ {label}: {rows:,} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+    
     def check_exists(self, conn, table, conditions):
         """Check if record exists based on conditions"""
         where_clause = " AND ".join([f"{k} = ?" for k in conditions.keys()])
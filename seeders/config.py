@@ -4,8 +4,8 @@ import random
 from datetime import datetime
 
 # Database configuration
-SCRIPT_DIR = os.getenv('SCRIPT_DIR', Path(__file__).resolve().parent)
-DATA_DIR = os.getenv('DATA_DIR', SCRIPT_DIR / 'data')
+SCRIPT_DIR = Path(os.getenv('SCRIPT_DIR', Path(__file__).resolve().parent))
+DATA_DIR = Path(os.getenv('DATA_DIR', SCRIPT_DIR / 'data'))
 DB_PATH = os.getenv('DB_PATH', DATA_DIR / 'attendance.db')
 
 # Philippine holidays for 2024-2025
@@ -136,6 +136,9 @@ def random_time_slot():
     return (start, end)
 
 SEEDER_CONFIG = {
+    # Rows per executemany() call; each seeder still commits once at the end
+    'insert_batch_size': 5000,
+    
     'academic_years': {
         'generate_previous': True,
         'generate_current': True,
@@ -222,6 +225,27 @@ COURSES_DATA = [
     {'name': 'Operating Systems', 'code': 'CS-201', 'description': 'System software and operating system concepts', 'program': 'Bachelor of Science in Computer Science'},
 ]
 
+# Filipino names for generated students
+FILIPINO_FIRST_NAMES = [
+    # Male names
+    'Juan', 'Jose', 'Mark', 'John', 'Miguel', 'Carlo', 'Angelo', 'Paul', 'Christian', 'Rafael',
+    'Gabriel', 'Anthony', 'Daniel', 'Joshua', 'Matthew', 'Emmanuel', 'Francis', 'Vincent', 'Leo', 'Adrian',
+    'Kenneth', 'Kevin', 'Ryan', 'Jerome', 'Jasper', 'Cedric', 'Ronnie', 'Rodel', 'Arnel', 'Edgar',
+    'Alexander', 'Christopher', 'Patrick', 'Stephen', 'Benjamin', 'Samuel', 'Nathan', 'Jonathan', 'David', 'Andrew',
+    # Female names
+    'Maria', 'Ana', 'Rose', 'Grace', 'Joy', 'Angel', 'Princess', 'Christine', 'Michelle', 'Sarah',
+    'Angelica', 'Mary', 'Cristina', 'Jennifer', 'Catherine', 'Stephanie', 'Nicole', 'Jessica', 'Patricia', 'Jasmine',
+    'Sophia', 'Isabella', 'Emma', 'Olivia', 'Ava', 'Emily', 'Abigail', 'Mia', 'Elizabeth', 'Sofia'
+]
+
+FILIPINO_LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Tomas', 'Andres',
+    'Marquez', 'Romualdez', 'Mercado', 'Agbayani', 'Tolentino', 'Castillo', 'Villanueva', 'Soriano', 'Abad', 'Hernandez',
+    'Morales', 'Castro', 'Ramos', 'Gutierrez', 'Gonzales', 'Rodriguez', 'Perez', 'Sanchez', 'Ramirez', 'Flores',
+    'Rivera', 'Martinez', 'Gomez', 'Lopez', 'Gonzalez', 'Dela Cruz', 'De Leon', 'Del Rosario', 'Fernandez', 'Aguilar',
+    'Jimenez', 'Vargas', 'Herrera', 'Medina', 'Ruiz', 'Aquino', 'Diaz', 'Navarro', 'Pascual', 'Salazar'
+]
+
 # Section distributions - 2 sections per year level
 SECTION_DISTRIBUTIONS = {
     'Bachelor of Science in Information Technology': ['1-1', '1-2', '2-1', '2-2', '3-1', '3-2', '4-1', '4-2'],
@@ -210,37 +210,18 @@ class CourseAssignmentSeeder(BaseSeeder):
             }
         }
         
-        # Create courses for each program
-        for program_id, program_name, program_acronym in programs:
-            if program_name in course_structure:
-                program_courses = course_structure[program_name]
-                
-                for year_level, semesters in program_courses.items():
-                    for semester, courses in semesters.items():
-                        for course_data in courses:
-                            # Check if course already exists
-                            existing = self.check_exists(conn, "courses", {
-                                "code": course_data['code'],
-                                "program_id": program_id
-                            })
-                            
-                            if existing:
-                                continue
-                            
-                            try:
-                                self.execute_query(conn, """
-                                    INSERT INTO courses (name, code, description, program_id, isDeleted, created_at, updated_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                                """, (
-                                    course_data['name'], course_data['code'], course_data['description'],
-                                    program_id, 0, current_time, current_time
-                                ))
-                                
-                                self.logger.info(f"Created course: {course_data['name']} ({course_data['code']}) for {program_acronym}")
-                                
-                            except Exception as e:
-                                self.logger.error(f"Failed to create course {course_data['name']}: {e}")
-                                continue
+        # Create courses for each program; code is unique, so existing courses are skipped
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO courses (name, code, description, program_id, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (
+            (course_data['name'], course_data['code'], course_data['description'], program_id, current_time, current_time)
+            for program_id, program_name, program_acronym in programs
+            if program_name in course_structure
+            for semesters in course_structure[program_name].values()
+            for courses in semesters.values()
+            for course_data in courses
+        ), label="Courses")
     
     def _get_faculty(self, conn):
         """Get all faculty members"""
@@ -272,7 +253,8 @@ class CourseAssignmentSeeder(BaseSeeder):
     
     def _create_year_based_assignments(self, conn, faculty_list, courses_list, sections_list):
         """Create course assignments for multiple academic years dynamically"""
-        assigned_course_ids = []
+        # (faculty_id, course_id, section_id, academic_year, semester, room) in creation order
+        assignments = []
         current_time = self.get_current_time()
         
         # Get academic years to generate from config
@@ -345,29 +327,7 @@ class CourseAssignmentSeeder(BaseSeeder):
                         
                         for section_id, section_name in sections:
                             room = random.choice(SEEDER_CONFIG['rooms'])
-                            
-                            # Check if assignment already exists
-                            existing = self.check_exists(conn, "assigned_courses", {
-                                "faculty_id": faculty_user_id,
-                                "course_id": course_id,
-                                "section_id": section_id,
-                                "academic_year": academic_year,
-                                "semester": semester
-                            })
-                            
-                            if existing:
-                                assigned_course_ids.append(existing[0])
-                                continue
-                            
-                            # Insert assigned course
-                            cursor = self.execute_query(conn, """
-                                INSERT INTO assigned_courses 
-                                (faculty_id, course_id, section_id, academic_year, semester, room, isDeleted, created_at, updated_at)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (faculty_user_id, course_id, section_id, academic_year, semester, room, 0, current_time, current_time))
-                            
-                            assigned_course_id = cursor.lastrowid
-                            assigned_course_ids.append(assigned_course_id)
+                            assignments.append((faculty_user_id, course_id, section_id, academic_year, semester, room))
                     
                     self.logger.info(f"✓ Assigned courses for {program_name} Year {year_level} Section(s): {', '.join([s[1] for s in sections])} - {semester} {academic_year}")
             
@@ -389,29 +349,31 @@ class CourseAssignmentSeeder(BaseSeeder):
                                 
                                 for section_id, section_name in sections:
                                     room = random.choice(SEEDER_CONFIG['rooms'])
-                                    
-                                    # Check if assignment already exists
-                                    existing = self.check_exists(conn, "assigned_courses", {
-                                        "faculty_id": faculty_user_id,
-                                        "course_id": course_id,
-                                        "section_id": section_id,
-                                        "academic_year": academic_year,
-                                        "semester": "Summer"
-                                    })
-                                    
-                                    if existing:
-                                        assigned_course_ids.append(existing[0])
-                                        continue
-                                    
-                                    # Insert assigned course
-                                    cursor = self.execute_query(conn, """
-                                        INSERT INTO assigned_courses 
-                                        (faculty_id, course_id, section_id, academic_year, semester, room, isDeleted, created_at, updated_at)
-                                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    """, (faculty_user_id, course_id, section_id, academic_year, "Summer", room, 0, current_time, current_time))
-                                    
-                                    assigned_course_id = cursor.lastrowid
-                                    assigned_course_ids.append(assigned_course_id)
+                                    assignments.append((faculty_user_id, course_id, section_id, academic_year, "Summer", room))
+        
+        # assigned_courses has no unique key, so the insert itself skips existing assignments
+        self.insert_many(conn, """
+            INSERT INTO assigned_courses 
+            (faculty_id, course_id, section_id, academic_year, semester, room, isDeleted, created_at, updated_at)
+            SELECT ?, ?, ?, ?, ?, ?, 0, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM assigned_courses
+                WHERE faculty_id = ? AND course_id = ? AND section_id = ? AND academic_year = ? AND semester = ?
+            )
+        """, (
+            (faculty_id, course_id, section_id, academic_year, semester, room, current_time, current_time,
+             faculty_id, course_id, section_id, academic_year, semester)
+            for faculty_id, course_id, section_id, academic_year, semester, room in assignments
+        ), label="Course assignments")
+        
+        # Resolve the ids of new and existing assignments in one pass
+        cursor = self.execute_query(conn, """
+            SELECT faculty_id, course_id, section_id, academic_year, semester, MIN(id)
+            FROM assigned_courses
+            GROUP BY faculty_id, course_id, section_id, academic_year, semester
+        """)
+        assignment_ids = {tuple(row[:5]): row[5] for row in cursor.fetchall()}
+        assigned_course_ids = [assignment_ids[assignment[:5]] for assignment in assignments]
         
         self.logger.info(f"Total course assignments created across all academic years: {len(assigned_course_ids)}")
         return assigned_course_ids
@@ -441,33 +403,42 @@ class CourseAssignmentSeeder(BaseSeeder):
         return filtered_courses
     
     def _create_schedules(self, conn, assigned_course_ids):
-        """Create schedules for assigned courses"""
+        """Create schedules for assigned courses that do not have any yet"""
         current_time = self.get_current_time()
         days_of_week = SEEDER_CONFIG['course_schedule']['days_of_week']
         time_slots = SEEDER_CONFIG['course_schedule']['time_slots']
         
-        for assigned_course_id in assigned_course_ids:
-            # Most courses meet 2-3 times per week
-            num_meetings = random.choice([2, 3])
-            selected_days = random.sample(days_of_week, num_meetings)
-            
-            for day in selected_days:
-                start_time, end_time = random.choice(time_slots)
+        cursor = self.execute_query(conn, "SELECT DISTINCT assigned_course_id FROM schedules")
+        scheduled = {row[0] for row in cursor.fetchall()}
+        today = datetime.now().date()
+        
+        def schedule_rows():
+            for assigned_course_id in dict.fromkeys(assigned_course_ids):
+                if assigned_course_id in scheduled:
+                    continue
                 
-                # Convert to datetime for storage
-                today = datetime.now().date()
-                start_datetime = datetime.combine(today, datetime.strptime(start_time, '%H:%M:%S').time())
-                end_datetime = datetime.combine(today, datetime.strptime(end_time, '%H:%M:%S').time())
+                # Most courses meet 2-3 times per week
+                num_meetings = random.choice([2, 3])
+                selected_days = random.sample(days_of_week, num_meetings)
                 
-                self.execute_query(conn, """
-                    INSERT INTO schedules 
-                    (assigned_course_id, day_of_week, start_time, end_time, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    assigned_course_id,
-                    day,
-                    start_datetime.isoformat(),
-                    end_datetime.isoformat(),
-                    current_time,
-                    current_time
-                ))
+                for day in selected_days:
+                    start_time, end_time = random.choice(time_slots)
+                    
+                    # Convert to datetime for storage
+                    start_datetime = datetime.combine(today, datetime.strptime(start_time, '%H:%M:%S').time())
+                    end_datetime = datetime.combine(today, datetime.strptime(end_time, '%H:%M:%S').time())
+                    
+                    yield (
+                        assigned_course_id,
+                        day,
+                        start_datetime.isoformat(),
+                        end_datetime.isoformat(),
+                        current_time,
+                        current_time
+                    )
+        
+        self.insert_many(conn, """
+            INSERT INTO schedules 
+            (assigned_course_id, day_of_week, start_time, end_time, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, schedule_rows(), label="Schedules")
@@ -1,4 +1,3 @@
-import sqlite3
 from .base_seeder import BaseSeeder
 from .config import PROGRAMS_DATA, COURSES_DATA, SECTION_DISTRIBUTIONS
 
@@ -39,110 +38,72 @@ class ProgramSeeder(BaseSeeder):
     
     def _seed_programs(self, conn):
         """Seed programs table"""
-        program_ids = {}
         current_time = self.get_current_time()
         
-        for program_data in PROGRAMS_DATA:
-            # Check if exists
-            existing = self.check_exists(conn, "programs", {"name": program_data['name']})
-            
-            if existing:
-                program_ids[program_data['name']] = existing[0]
-                continue
-                
-            try:
-                cursor = self.execute_query(conn, """
-                    INSERT INTO programs (name, acronym, code, description, color, isDeleted, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    program_data['name'], program_data['acronym'], program_data['code'],
-                    program_data['description'], program_data['color'], 0, current_time, current_time
-                ))
-                
-                program_id = cursor.lastrowid
-                program_ids[program_data['name']] = program_id
-                self.logger.info(f"✓ Created program: {program_data['name']} ({program_data['acronym']})")
-                
-            except sqlite3.IntegrityError as e:
-                self.logger.error(f"Failed to create program {program_data['name']}: {e}")
-                continue
-                
-        return program_ids
+        # acronym and code are unique; the name guard keeps reruns from adding renamed copies
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO programs (name, acronym, code, description, color, isDeleted, created_at, updated_at)
+            SELECT ?, ?, ?, ?, ?, 0, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM programs WHERE name = ?)
+        """, (
+            (program_data['name'], program_data['acronym'], program_data['code'],
+             program_data['description'], program_data['color'], current_time, current_time,
+             program_data['name'])
+            for program_data in PROGRAMS_DATA
+        ), label="Programs")
+        
+        cursor = self.execute_query(conn, "SELECT name, id FROM programs")
+        existing = dict(cursor.fetchall())
+        return {data['name']: existing[data['name']] for data in PROGRAMS_DATA if data['name'] in existing}
     
     def _seed_courses(self, conn, program_ids):
         """Seed courses"""
-        course_ids = {}
         current_time = self.get_current_time()
+        courses = [course_data for course_data in COURSES_DATA if course_data['program'] in program_ids]
         
-        for course_data in COURSES_DATA:
-            if course_data['program'] not in program_ids:
-                continue
-                
-            program_id = program_ids[course_data['program']]
-            
-            # Check if exists
-            existing = self.check_exists(conn, "courses", {
-                "code": course_data['code'],
-                "program_id": program_id
-            })
-            
-            if existing:
-                course_ids[course_data['name']] = existing[0]
-                continue
-            
-            try:
-                cursor = self.execute_query(conn, """
-                    INSERT INTO courses (name, code, description, program_id, isDeleted, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    course_data['name'], course_data['code'], course_data['description'],
-                    program_id, 0, current_time, current_time
-                ))
-                
-                course_id = cursor.lastrowid
-                course_ids[course_data['name']] = course_id
-                
-            except sqlite3.Error as e:
-                self.logger.error(f"Failed to create course {course_data['name']}: {e}")
-                continue
+        # code is unique, so courses that already exist are skipped
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO courses (name, code, description, program_id, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (
+            (course_data['name'], course_data['code'], course_data['description'],
+             program_ids[course_data['program']], current_time, current_time)
+            for course_data in courses
+        ), label="Courses")
         
-        return course_ids
+        cursor = self.execute_query(conn, "SELECT code, program_id, id FROM courses")
+        existing = {(code, program_id): course_id for code, program_id, course_id in cursor.fetchall()}
+        return {
+            course_data['name']: existing[(course_data['code'], program_ids[course_data['program']])]
+            for course_data in courses
+            if (course_data['code'], program_ids[course_data['program']]) in existing
+        }
     
     def _seed_sections(self, conn, program_ids):
         """Seed sections for each program"""
-        section_ids = {}
         current_time = self.get_current_time()
+        sections = [
+            (section_name, program_name)
+            for program_name, section_names in SECTION_DISTRIBUTIONS.items()
+            if program_name in program_ids
+            for section_name in section_names
+        ]
         
-        for program_name, sections in SECTION_DISTRIBUTIONS.items():
-            if program_name not in program_ids:
-                continue
-                
-            program_id = program_ids[program_name]
-            
-            for section_name in sections:
-                section_key = f"{section_name}-{program_name}"
-                
-                # Check if exists
-                existing = self.check_exists(conn, "sections", {
-                    "name": section_name,
-                    "program_id": program_id
-                })
-                
-                if existing:
-                    section_ids[section_key] = existing[0]
-                    continue
-                
-                try:
-                    cursor = self.execute_query(conn, """
-                        INSERT INTO sections (name, program_id, isDeleted, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (section_name, program_id, 0, current_time, current_time))
-                    
-                    section_id = cursor.lastrowid
-                    section_ids[section_key] = section_id
-                    
-                except sqlite3.Error as e:
-                    self.logger.error(f"Failed to create section {section_name}: {e}")
-                    continue
+        # Sections have no unique constraint, so the insert itself skips existing ones
+        self.insert_many(conn, """
+            INSERT INTO sections (name, program_id, isDeleted, created_at, updated_at)
+            SELECT ?, ?, 0, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM sections WHERE name = ? AND program_id = ?)
+        """, (
+            (section_name, program_ids[program_name], current_time, current_time,
+             section_name, program_ids[program_name])
+            for section_name, program_name in sections
+        ), label="Sections")
         
-        return section_ids
+        cursor = self.execute_query(conn, "SELECT name, program_id, MIN(id) FROM sections GROUP BY name, program_id")
+        existing = {(name, program_id): section_id for name, program_id, section_id in cursor.fetchall()}
+        return {
+            f"{section_name}-{program_name}": existing[(section_name, program_ids[program_name])]
+            for section_name, program_name in sections
+            if (section_name, program_ids[program_name]) in existing
+        }
@@ -0,0 +1,482 @@
+"""
+Synthetic datasets sized by a scale factor, for performance testing.
+
+--scale 1 is 1,000 students; 10 and 100 give the 10k and 100k student
+databases. Sections grow with the student count (about
+STUDENTS_PER_SECTION each), and --years sets how many academic years of
+classes and attendance are generated.
+
+The data only depends on the scale, years and seed (timestamps and bcrypt
+salts aside): every shard draws from its own random.Random seeded with the
+run seed and the shard's name, so the same arguments produce the same rows
+whether the shards run in one process or many. Bulk rows (students, approvals, attendance) are generated
+per section across a process pool, and the parent process writes them with
+executemany as the shards come back.
+
+Accounts are studentNNNNNN@scale.pup.edu.ph and facultyNNNNN@scale.pup.edu.ph;
+their passwords are drawn from a small pool (SCALE_PASSWORDS) that is
+bcrypt-hashed once per run.
+"""
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+
+import bcrypt
+
+from .base_seeder import BaseSeeder
+from .config import (
+    SEEDER_CONFIG, PROGRAMS_DATA, FILIPINO_FIRST_NAMES, FILIPINO_LAST_NAMES,
+    PHILIPPINE_HOLIDAYS, ACADEMIC_SUSPENSIONS,
+    get_semester_date_ranges_for_academic_year, get_semester_attendance_modifier
+)
+
+# Students per unit of --scale
+STUDENTS_PER_SCALE = 1000
+STUDENTS_PER_SECTION = 40
+YEAR_LEVELS = 4
+COURSES_PER_TERM = 6
+TERMS = ["1st Semester", "2nd Semester"]
+# One faculty member per this many students
+STUDENTS_PER_FACULTY = 40
+
+SCALE_PASSWORDS = ['student123', 'faculty123', 'scale123', 'bench123']
+SCALE_EMAIL_DOMAIN = 'scale.pup.edu.ph'
+
+TIME_SLOTS = [
+    ('07:30:00', '09:00:00'), ('09:00:00', '10:30:00'), ('10:30:00', '12:00:00'),
+    ('13:00:00', '14:30:00'), ('14:30:00', '16:00:00'), ('16:00:00', '17:30:00')
+]
+WEEKDAYS = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5}
+
+STUDENT_STATUS_WEIGHTS = [('Enrolled', 88), ('On Leave', 5), ('Suspended', 3), ('Dropout', 2), ('Graduated', 2)]
+
+
+def academic_years_until(last_academic_year, years):
+    """The `years` academic years ending with last_academic_year, oldest first"""
+    last_start = int(last_academic_year.split('-')[0])
+    return [f"{start}-{start + 1}" for start in range(last_start - years + 1, last_start + 1)]
+
+
+@lru_cache(maxsize=None)
+def _class_dates(academic_year, semester, weekdays):
+    """Meeting dates of a class, skipping holidays and academic breaks"""
+    for sem, start_date, end_date in get_semester_date_ranges_for_academic_year(academic_year):
+        if sem != semester:
+            continue
+        dates = []
+        current_date = start_date
+        while current_date <= end_date:
+            date_str = current_date.strftime('%m-%d')
+            if (current_date.weekday() in weekdays
+                    and date_str not in PHILIPPINE_HOLIDAYS.get(current_date.year, {})
+                    and date_str not in ACADEMIC_SUSPENSIONS):
+                dates.append(current_date)
+            current_date += timedelta(days=1)
+        return tuple(dates)
+    return ()
+
+
+def _generate_students(task):
+    """
+    Student rows for one section (runs in a worker process).
+
+    Returns:
+        list: (first_name, last_name, email, birthday, password, contact_number, student_number, status)
+    """
+    seed, shard, year_level, first_index, count = task
+    rng = random.Random(f"{seed}:students:{shard}")
+    statuses, weights = zip(*STUDENT_STATUS_WEIGHTS)
+    rows = []
+    for index in range(first_index, first_index + count):
+        birth_year = 2006 - year_level - rng.randint(0, 2)
+        rows.append((
+            rng.choice(FILIPINO_FIRST_NAMES),
+            rng.choice(FILIPINO_LAST_NAMES),
+            f"student{index:06d}@{SCALE_EMAIL_DOMAIN}",
+            f"{birth_year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            rng.choice(SCALE_PASSWORDS),
+            f"09{rng.randint(100000000, 999999999)}",
+            f"SCALE-{index:06d}",
+            rng.choices(statuses, weights=weights)[0]
+        ))
+    return rows
+
+
+def _generate_attendance(task):
+    """
+    Approval and attendance rows for one section's classes (runs in a worker process).
+
+    Returns:
+        tuple: (approval rows, attendance rows) ready for executemany
+    """
+    seed, shard, students, classes, last_academic_year, current_time = task
+    rng = random.Random(f"{seed}:attendance:{shard}")
+    performance = SEEDER_CONFIG['student_performance']
+    categories = list(performance)
+    weights = [performance[category]['percentage'] for category in categories]
+    rates = {}
+    for user_id, student_id in students:
+        category = rng.choices(categories, weights=weights)[0]
+        rates[user_id] = rng.uniform(*performance[category]['attendance_range'])
+
+    approvals = []
+    logs = []
+    for assigned_course_id, academic_year, semester, weekdays in classes:
+        dates = _class_dates(academic_year, semester, weekdays)
+        approval_status = 'enrolled' if academic_year == last_academic_year else 'passed'
+        modifiers = [get_semester_attendance_modifier(class_date, semester) for class_date in dates]
+        for user_id, student_id in students:
+            approvals.append((assigned_course_id, student_id, approval_status, current_time, current_time))
+            rate = rates[user_id]
+            for class_date, modifier in zip(dates, modifiers):
+                if rng.random() < min(1.0, rate * modifier):
+                    status = 'late' if rng.random() < 0.08 else 'present'
+                else:
+                    status = 'absent'
+                logs.append((user_id, assigned_course_id, class_date.strftime('%Y-%m-%d'), status, current_time, current_time))
+    return approvals, logs
+
+
+class ScaleSeeder(BaseSeeder):
+    """Seeder for reproducible datasets of a chosen size"""
+
+    def __init__(self, scale=1.0, years=1, random_seed=42, workers=None, last_academic_year=None):
+        super().__init__()
+        self.students = max(1, round(scale * STUDENTS_PER_SCALE))
+        self.years = max(1, years)
+        self.random_seed = random_seed
+        self.workers = workers or os.cpu_count() or 1
+        self.last_academic_year = last_academic_year or SEEDER_CONFIG['academic_years']['years_to_generate'][-1]
+        self.academic_years = academic_years_until(self.last_academic_year, self.years)
+        self.rng = random.Random(f"{random_seed}:catalog")
+        self.current_time = self.get_current_time()
+
+    def seed(self):
+        """
+        Generate the dataset.
+
+        Returns:
+            tuple: (success, {table: rows inserted})
+        """
+        conn = None
+        try:
+            conn = self.get_connection()
+            # A generated dataset can simply be regenerated, so skip fsyncs while loading it
+            conn.execute("PRAGMA synchronous = OFF")
+            started = time.perf_counter()
+
+            sections_per_level = max(1, math.ceil(self.students / (len(PROGRAMS_DATA) * YEAR_LEVELS * STUDENTS_PER_SECTION)))
+            self.logger.info(
+                f"Scale dataset: {self.students:,} students, {sections_per_level * YEAR_LEVELS * len(PROGRAMS_DATA)} sections, "
+                f"academic years {', '.join(self.academic_years)}, seed {self.random_seed}, {self.workers} worker(s)"
+            )
+
+            self._password_hashes = {
+                password: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                for password in SCALE_PASSWORDS
+            }
+            statuses = {row[0]: row[1] for row in self.execute_query(conn, "SELECT name, id FROM statuses").fetchall()}
+
+            counts = {}
+            sections, courses = self._seed_catalog(conn, sections_per_level, counts)
+            faculty_ids = self._seed_faculty(conn, statuses, counts)
+            self._seed_classes(conn, sections, courses, faculty_ids, counts)
+            conn.commit()
+
+            with ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else _InlineExecutor() as executor:
+                self._seed_students(conn, executor, sections, statuses, counts)
+                self._seed_attendance(conn, executor, sections, counts)
+
+            self.log_rate("Scale dataset", sum(counts.values()), time.perf_counter() - started)
+            return True, counts
+
+        except Exception as e:
+            self.logger.error(f"Error generating scale dataset: {e}")
+            if conn:
+                conn.rollback()
+            return False, {}
+        finally:
+            if conn:
+                conn.close()
+
+    def _seed_catalog(self, conn, sections_per_level, counts):
+        """
+        Programs, sections and courses.
+
+        Returns:
+            tuple: ([(section_id, shard name, program_id, year_level)],
+                    {(program_id, year_level, semester): [course_id]})
+        """
+        counts['programs'] = self.insert_many(conn, """
+            INSERT OR IGNORE INTO programs (name, acronym, code, description, color, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+        """, (
+            (program['name'], program['acronym'], program['code'], program['description'], program['color'],
+             self.current_time, self.current_time)
+            for program in PROGRAMS_DATA
+        ))
+        cursor = self.execute_query(conn, "SELECT acronym, id FROM programs")
+        program_ids = {acronym: program_id for acronym, program_id in cursor.fetchall()}
+        programs = [(program['acronym'], program_ids[program['acronym']]) for program in PROGRAMS_DATA]
+
+        section_rows = [
+            (f"{year_level}-{number}", program_id)
+            for acronym, program_id in programs
+            for year_level in range(1, YEAR_LEVELS + 1)
+            for number in range(1, sections_per_level + 1)
+        ]
+        counts['sections'] = self.insert_many(conn, """
+            INSERT INTO sections (name, program_id, isDeleted, created_at, updated_at)
+            SELECT ?, ?, 0, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM sections WHERE name = ? AND program_id = ?)
+        """, (
+            (name, program_id, self.current_time, self.current_time, name, program_id)
+            for name, program_id in section_rows
+        ), label="Sections")
+        cursor = self.execute_query(conn, "SELECT name, program_id, MIN(id) FROM sections GROUP BY name, program_id")
+        section_ids = {(name, program_id): section_id for name, program_id, section_id in cursor.fetchall()}
+        acronyms = {program_id: acronym for acronym, program_id in programs}
+        sections = [
+            (section_ids[(name, program_id)], f"{acronyms[program_id]}:{name}", program_id, int(name.split('-')[0]))
+            for name, program_id in section_rows
+        ]
+
+        course_rows = [
+            (acronym, program_id, year_level, term, number)
+            for acronym, program_id in programs
+            for year_level in range(1, YEAR_LEVELS + 1)
+            for term in TERMS
+            for number in range(1, COURSES_PER_TERM + 1)
+        ]
+
+        def course_code(acronym, year_level, term, number):
+            return f"{acronym}-S{year_level}{TERMS.index(term) + 1}{number:02d}"
+
+        counts['courses'] = self.insert_many(conn, """
+            INSERT OR IGNORE INTO courses (name, code, description, program_id, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (
+            (f"{acronym} Year {year_level} {term} Course {number}", course_code(acronym, year_level, term, number),
+             "Generated course for performance testing", program_id, self.current_time, self.current_time)
+            for acronym, program_id, year_level, term, number in course_rows
+        ), label="Courses")
+        cursor = self.execute_query(conn, "SELECT code, id FROM courses")
+        course_ids = dict(cursor.fetchall())
+        courses = {}
+        for acronym, program_id, year_level, term, number in course_rows:
+            courses.setdefault((program_id, year_level, term), []).append(
+                course_ids[course_code(acronym, year_level, term, number)]
+            )
+        self.course_ids = {course_id for ids in courses.values() for course_id in ids}
+        return sections, courses
+
+    def _seed_faculty(self, conn, statuses, counts):
+        """Faculty users; returns their user ids"""
+        faculty_count = max(5, math.ceil(self.students / STUDENTS_PER_FACULTY))
+        faculty = [
+            (
+                self.rng.choice(FILIPINO_FIRST_NAMES),
+                self.rng.choice(FILIPINO_LAST_NAMES),
+                f"faculty{index:05d}@{SCALE_EMAIL_DOMAIN}",
+                f"{self.rng.randint(1965, 1995)}-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}",
+                self._password_hashes[self.rng.choice(SCALE_PASSWORDS)],
+                f"09{self.rng.randint(100000000, 999999999)}",
+                f"SCALE-EMP-{index:05d}"
+            )
+            for index in range(1, faculty_count + 1)
+        ]
+        counts['faculty_users'] = self.insert_many(conn, """
+            INSERT OR IGNORE INTO users (first_name, last_name, email, birthday, password_hash,
+                             contact_number, role, status_id, verified, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, 'Faculty', ?, 1, 0, ?, ?)
+        """, (
+            row[:6] + (statuses.get('Active'), self.current_time, self.current_time) for row in faculty
+        ), label="Faculty users")
+        counts['faculties'] = self.insert_many(conn, """
+            INSERT OR IGNORE INTO faculties (user_id, employee_number)
+            SELECT u.id, ? FROM users u
+            WHERE u.email = ? AND NOT EXISTS (SELECT 1 FROM faculties f WHERE f.user_id = u.id)
+        """, ((row[6], row[2]) for row in faculty))
+
+        cursor = self.execute_query(conn, "SELECT id FROM users WHERE email LIKE ? ORDER BY email",
+                                    (f"faculty%@{SCALE_EMAIL_DOMAIN}",))
+        return [row[0] for row in cursor.fetchall()]
+
+    def _seed_classes(self, conn, sections, courses, faculty_ids, counts):
+        """Assigned courses and schedules for every section, term and academic year"""
+        assignments = [
+            (self.rng.choice(faculty_ids), course_id, section_id, academic_year, term,
+             self.rng.choice(SEEDER_CONFIG['rooms']))
+            for academic_year in self.academic_years
+            for section_id, shard, program_id, year_level in sections
+            for term in TERMS
+            for course_id in courses[(program_id, year_level, term)]
+        ]
+        counts['assigned_courses'] = self.insert_many(conn, """
+            INSERT INTO assigned_courses
+            (faculty_id, course_id, section_id, academic_year, semester, room, isDeleted, created_at, updated_at)
+            SELECT ?, ?, ?, ?, ?, ?, 0, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM assigned_courses
+                WHERE course_id = ? AND section_id = ? AND academic_year = ? AND semester = ?
+            )
+        """, (
+            (faculty_id, course_id, section_id, academic_year, term, room, self.current_time, self.current_time,
+             course_id, section_id, academic_year, term)
+            for faculty_id, course_id, section_id, academic_year, term, room in assignments
+        ), label="Course assignments")
+
+        # Classes that have no schedule yet, in generation order
+        cursor = self.execute_query(conn, """
+            SELECT ac.course_id, ac.section_id, ac.academic_year, ac.semester, MIN(ac.id)
+            FROM assigned_courses ac
+            WHERE NOT EXISTS (SELECT 1 FROM schedules s WHERE s.assigned_course_id = ac.id)
+            GROUP BY ac.course_id, ac.section_id, ac.academic_year, ac.semester
+        """)
+        unscheduled = {tuple(row[:4]): row[4] for row in cursor.fetchall()}
+
+        def schedule_rows():
+            for faculty_id, course_id, section_id, academic_year, term, room in assignments:
+                assigned_course_id = unscheduled.get((course_id, section_id, academic_year, term))
+                if assigned_course_id is None:
+                    continue
+                start_time, end_time = self.rng.choice(TIME_SLOTS)
+                for day in self.rng.sample(list(WEEKDAYS), self.rng.choice([2, 3])):
+                    yield (assigned_course_id, day, f"2000-01-01T{start_time}", f"2000-01-01T{end_time}",
+                           self.current_time, self.current_time)
+
+        counts['schedules'] = self.insert_many(conn, """
+            INSERT INTO schedules (assigned_course_id, day_of_week, start_time, end_time, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, schedule_rows(), label="Schedules")
+
+    def _seed_students(self, conn, executor, sections, statuses, counts):
+        """Students, generated per section by the workers"""
+        base, extra = divmod(self.students, len(sections))
+        tasks = []
+        first_index = 1
+        for position, (section_id, shard, program_id, year_level) in enumerate(sections):
+            count = base + (1 if position < extra else 0)
+            tasks.append((self.random_seed, shard, year_level, first_index, count))
+            first_index += count
+
+        counts['student_users'] = counts['students'] = 0
+        started = time.perf_counter()
+        for (section_id, shard, program_id, year_level), rows in zip(sections, _ordered_map(executor, _generate_students, tasks, self.workers)):
+            counts['student_users'] += self.insert_many(conn, """
+                INSERT OR IGNORE INTO users (first_name, last_name, email, birthday, password_hash,
+                                 contact_number, role, status_id, verified, isDeleted, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'Student', ?, 1, 0, ?, ?)
+            """, (
+                (first_name, last_name, email, birthday, self._password_hashes[password], contact_number,
+                 statuses.get(status), self.current_time, self.current_time)
+                for first_name, last_name, email, birthday, password, contact_number, student_number, status in rows
+            ))
+            counts['students'] += self.insert_many(conn, """
+                INSERT OR IGNORE INTO students (user_id, student_number, section)
+                SELECT u.id, ?, ? FROM users u
+                WHERE u.email = ? AND NOT EXISTS (SELECT 1 FROM students st WHERE st.user_id = u.id)
+            """, ((row[6], section_id, row[2]) for row in rows))
+            conn.commit()
+        self.log_rate("Students", counts['student_users'] + counts['students'], time.perf_counter() - started)
+
+    def _seed_attendance(self, conn, executor, sections, counts):
+        """Approvals and attendance, generated per section by the workers"""
+        cursor = self.execute_query(conn, """
+            SELECT st.section, st.user_id, st.id
+            FROM students st
+            WHERE st.student_number LIKE 'SCALE-%'
+            ORDER BY st.student_number
+        """)
+        section_students = {}
+        for section_id, user_id, student_id in cursor.fetchall():
+            section_students.setdefault(section_id, []).append((user_id, student_id))
+
+        placeholders = ','.join('?' * len(self.academic_years))
+        cursor = self.execute_query(conn, f"""
+            SELECT ac.section_id, ac.id, ac.academic_year, ac.semester, s.day_of_week, ac.course_id
+            FROM assigned_courses ac
+            JOIN schedules s ON s.assigned_course_id = ac.id
+            WHERE ac.academic_year IN ({placeholders})
+            ORDER BY ac.id, s.id
+        """, self.academic_years)
+        class_days = {}
+        for section_id, assigned_course_id, academic_year, semester, day_of_week, course_id in cursor.fetchall():
+            # Sections can be shared with the regular seed data; only attend the generated courses
+            if course_id not in self.course_ids or day_of_week not in WEEKDAYS:
+                continue
+            key = (section_id, assigned_course_id, academic_year, semester)
+            class_days.setdefault(key, set()).add(WEEKDAYS[day_of_week])
+        section_classes = {}
+        for (section_id, assigned_course_id, academic_year, semester), weekdays in class_days.items():
+            section_classes.setdefault(section_id, []).append(
+                (assigned_course_id, academic_year, semester, frozenset(weekdays))
+            )
+
+        shards = [(section_id, shard) for section_id, shard, program_id, year_level in sections]
+        tasks = [
+            (self.random_seed, shard, section_students.get(section_id, []), section_classes.get(section_id, []),
+             self.last_academic_year, self.current_time)
+            for section_id, shard in shards
+        ]
+
+        counts['approvals'] = counts['attendance_logs'] = 0
+        started = time.perf_counter()
+        for done, (approvals, logs) in enumerate(_ordered_map(executor, _generate_attendance, tasks, self.workers), 1):
+            counts['approvals'] += self.insert_many(conn, """
+                INSERT OR IGNORE INTO assigned_course_approvals (assigned_course_id, student_id, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, approvals)
+            counts['attendance_logs'] += self.insert_many(conn, """
+                INSERT OR IGNORE INTO attendance_logs (user_id, assigned_course_id, date, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, logs)
+            conn.commit()
+            if done % 10 == 0 or done == len(tasks):
+                self.logger.info(f"  {done}/{len(tasks)} sections, {counts['attendance_logs']:,} attendance rows")
+        self.log_rate("Attendance logs", counts['attendance_logs'], time.perf_counter() - started)
+
+
+class _InlineExecutor:
+    """Runs tasks in the calling process when only one worker is requested"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        return _DoneFuture(fn(*args))
+
+
+class _DoneFuture:
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+
+def _ordered_map(executor, fn, tasks, workers):
+    """
+    Like executor.map, but keeps at most 2 * workers tasks in flight so the
+    results cannot pile up in memory faster than the database takes them.
+    """
+    pending = deque()
+    tasks = iter(tasks)
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= 2 * workers:
+            break
+    while pending:
+        result = pending.popleft().result()
+        for task in tasks:
+            pending.append(executor.submit(fn, task))
+            break
+        yield result
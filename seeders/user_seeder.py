@@ -1,11 +1,16 @@
 import bcrypt
 import random
 from .base_seeder import BaseSeeder
-from .config import SEEDER_CONFIG
+from .config import SEEDER_CONFIG, FILIPINO_FIRST_NAMES, FILIPINO_LAST_NAMES
 
 class UserSeeder(BaseSeeder):
     """Seeder for users, students, and faculty"""
     
+    def __init__(self):
+        super().__init__()
+        # Seed accounts share a few passwords; bcrypt runs once per password
+        self._password_hashes = {}
+    
     def seed(self, section_ids):
         """Seed users with their roles"""
         try:
@@ -82,35 +87,33 @@ class UserSeeder(BaseSeeder):
         
         current_time = self.get_current_time()
         
-        for faculty in faculty_data:
-            # Check if exists
-            existing = self.check_exists(conn, "users", {"email": faculty['email']})
-            if existing:
-                continue
-            
-            # Hash password
-            hashed_pw = bcrypt.hashpw(faculty['password'].encode('utf-8'), bcrypt.gensalt())
-            
-            # Get status ID
-            status_id = faculty_statuses.get(faculty['status'])
-            
-            # Insert user
-            cursor = self.execute_query(conn, """
-                INSERT INTO users (first_name, last_name, email, birthday, password_hash, 
-                                 contact_number, role, status_id, verified, isDeleted, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                faculty['first_name'], faculty['last_name'], faculty['email'], faculty['birthday'],
-                hashed_pw.decode('utf-8'), faculty['contact_number'], faculty['role'],
-                status_id, faculty['verified'], 0, current_time, current_time
-            ))
-            
-            user_id = cursor.lastrowid
-            
-            # Insert into faculties table
-            self.execute_query(conn, """
-                INSERT INTO faculties (user_id, employee_number) VALUES (?, ?)
-            """, (user_id, faculty['employee_number']))
+        self._insert_users(conn, faculty_data, faculty_statuses, current_time, label="Faculty users")
+        
+        # employee_number is unique; users that already had a faculty record are skipped
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO faculties (user_id, employee_number)
+            SELECT u.id, ? FROM users u
+            WHERE u.email = ? AND NOT EXISTS (SELECT 1 FROM faculties f WHERE f.user_id = u.id)
+        """, ((faculty['employee_number'], faculty['email']) for faculty in faculty_data), label="Faculty records")
+    
+    def _hash_password(self, password):
+        """bcrypt hash, computed once per distinct seed password"""
+        if password not in self._password_hashes:
+            self._password_hashes[password] = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return self._password_hashes[password]
+    
+    def _insert_users(self, conn, users, statuses, current_time, label):
+        """Insert user rows; email is unique, so existing users are skipped"""
+        return self.insert_many(conn, """
+            INSERT OR IGNORE INTO users (first_name, last_name, email, birthday, password_hash,
+                             contact_number, role, status_id, verified, isDeleted, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+        """, (
+            (user['first_name'], user['last_name'], user['email'], user['birthday'],
+             self._hash_password(user['password']), user['contact_number'], user['role'],
+             statuses.get(user['status']), user['verified'], current_time, current_time)
+            for user in users
+        ), label=label)
     
     def _seed_students(self, conn, student_statuses, section_ids):
         """Seed students with random students per section using dynamic configuration"""
@@ -136,27 +139,6 @@ class UserSeeder(BaseSeeder):
         
         self.logger.info(f"Found {len(section_details)} sections for student assignment")
         
-        # Filipino names for diversity
-        filipino_first_names = [
-            # Male names
-            'Juan', 'Jose', 'Mark', 'John', 'Miguel', 'Carlo', 'Angelo', 'Paul', 'Christian', 'Rafael',
-            'Gabriel', 'Anthony', 'Daniel', 'Joshua', 'Matthew', 'Emmanuel', 'Francis', 'Vincent', 'Leo', 'Adrian',
-            'Kenneth', 'Kevin', 'Ryan', 'Jerome', 'Jasper', 'Cedric', 'Ronnie', 'Rodel', 'Arnel', 'Edgar',
-            'Alexander', 'Christopher', 'Patrick', 'Stephen', 'Benjamin', 'Samuel', 'Nathan', 'Jonathan', 'David', 'Andrew',
-            # Female names
-            'Maria', 'Ana', 'Rose', 'Grace', 'Joy', 'Angel', 'Princess', 'Christine', 'Michelle', 'Sarah',
-            'Angelica', 'Mary', 'Cristina', 'Jennifer', 'Catherine', 'Stephanie', 'Nicole', 'Jessica', 'Patricia', 'Jasmine',
-            'Sophia', 'Isabella', 'Emma', 'Olivia', 'Ava', 'Emily', 'Abigail', 'Mia', 'Elizabeth', 'Sofia'
-        ]
-        
-        filipino_last_names = [
-            'Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Tomas', 'Andres',
-            'Marquez', 'Romualdez', 'Mercado', 'Agbayani', 'Tolentino', 'Castillo', 'Villanueva', 'Soriano', 'Abad', 'Hernandez',
-            'Morales', 'Castro', 'Ramos', 'Gutierrez', 'Gonzales', 'Rodriguez', 'Perez', 'Sanchez', 'Ramirez', 'Flores',
-            'Rivera', 'Martinez', 'Gomez', 'Lopez', 'Gonzalez', 'Dela Cruz', 'De Leon', 'Del Rosario', 'Fernandez', 'Aguilar',
-            'Jimenez', 'Vargas', 'Herrera', 'Medina', 'Ruiz', 'Aquino', 'Diaz', 'Navarro', 'Pascual', 'Salazar'
-        ]
-        
         student_data = []
         student_counter = 1
         
@@ -182,8 +164,8 @@ class UserSeeder(BaseSeeder):
             self.logger.info(f"Generating {students_in_section} students for {program_acronym} {section_name} (range: {min_students}-{max_students})")
             
             for i in range(students_in_section):
-                first_name = random.choice(filipino_first_names)
-                last_name = random.choice(filipino_last_names)
+                first_name = random.choice(FILIPINO_FIRST_NAMES)
+                last_name = random.choice(FILIPINO_LAST_NAMES)
                 
                 # Generate realistic birth years based on year level
                 if year_level == 1:
@@ -252,34 +234,16 @@ class UserSeeder(BaseSeeder):
         
         self.logger.info(f"Inserting {len(all_students)} students into database")
         
-        for student in all_students:
-            # Check if exists
-            existing = self.check_exists(conn, "users", {"email": student['email']})
-            if existing:
-                continue
-            
-            # Hash password
-            hashed_pw = bcrypt.hashpw(student['password'].encode('utf-8'), bcrypt.gensalt())
-            
-            # Get status ID
-            status_id = student_statuses.get(student['status'])
-            
-            # Insert user
-            cursor = self.execute_query(conn, """
-                INSERT INTO users (first_name, last_name, email, birthday, password_hash,
-                                 contact_number, role, status_id, verified, isDeleted, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                student['first_name'], student['last_name'], student['email'], student['birthday'],
-                hashed_pw.decode('utf-8'), student['contact_number'], student['role'],
-                status_id, student['verified'], 0, current_time, current_time
-            ))
-            
-            user_id = cursor.lastrowid
-            
-            # Insert into students table
-            self.execute_query(conn, """
-                INSERT INTO students (user_id, student_number, section) VALUES (?, ?, ?)
-            """, (user_id, student['student_number'], student['section_id']))
+        self._insert_users(conn, all_students, student_statuses, current_time, label="Student users")
+        
+        # A repeated generated email belongs to the first student that used it
+        self.insert_many(conn, """
+            INSERT OR IGNORE INTO students (user_id, student_number, section)
+            SELECT u.id, ?, ? FROM users u
+            WHERE u.email = ? AND NOT EXISTS (SELECT 1 FROM students st WHERE st.user_id = u.id)
+        """, (
+            (student['student_number'], student['section_id'], student['email'])
+            for student in all_students
+        ), label="Student records")
         
         self.logger.info(f"Successfully created {len(all_students)} students across all sections with variable counts ({min_students}-{max_students} per section)")
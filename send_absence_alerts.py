@@ -0,0 +1,62 @@
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables first
+load_dotenv()
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+def main():
+    """Email students whose absences crossed the alert threshold"""
+    parser = argparse.ArgumentParser(description="Send absence alert emails")
+    parser.add_argument("--threshold", type=int, default=None,
+                        help="Absences in a class that trigger an alert (default: ABSENCE_ALERT_THRESHOLD)")
+    parser.add_argument("--course", type=int, default=None,
+                        help="Only this assigned course id")
+    parser.add_argument("--include-faculty", action="store_true",
+                        help="Also send each class's faculty a summary")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only count who would be alerted")
+    args = parser.parse_args()
+
+    from app.db_manager import DatabaseManager
+
+    db_manager = DatabaseManager()
+
+    def show_progress(done, total, sent, failed):
+        if done == total or done % 50 == 0:
+            print(f"  {done}/{total} processed ({sent} sent, {failed} failed)")
+
+    print("=" * 60)
+    print("ABSENCE ALERTS")
+    print("=" * 60)
+
+    success, summary = db_manager.send_absence_notifications(
+        threshold=args.threshold,
+        include_faculty=args.include_faculty,
+        assigned_course_id=args.course,
+        dry_run=args.dry_run,
+        progress=show_progress
+    )
+    if not success:
+        print(f"❌ Failed to send absence alerts: {summary}")
+        return False
+
+    print(f"Students due an alert: {summary['recipients']}")
+    print(f"Emails: {summary['messages']}")
+    if args.dry_run:
+        print("Dry run - nothing was sent")
+        return True
+
+    print(f"✅ Sent {summary['sent']}, ❌ failed {summary['failed']} in {summary['seconds']:.1f}s")
+    for error in summary['errors']:
+        print(f"  {error}")
+    return summary['failed'] == 0
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)